@@ -4,6 +4,7 @@ from uuid import uuid4
 from datetime import datetime
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.metrics import instrument_crud
 
 
 def get_user_by_email(db: Session, email: str) -> User | None:
@@ -35,3 +36,6 @@ def update_last_login(db: Session, user: User):
     setattr(user, "last_login", datetime.utcnow())
     db.commit()
     db.refresh(user)
+
+
+instrument_crud(__name__)
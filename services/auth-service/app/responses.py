@@ -0,0 +1,363 @@
+"""
+JSON responses shared by the services.
+
+Like ``app/metrics.py`` this module is kept identical in every service's
+``app/responses.py``; change them together.
+
+``ORJSONResponse`` is every app's ``default_response_class``: FastAPI still
+validates and serializes through the ``response_model``, only the final
+encoding moves from stdlib ``json`` to orjson.
+
+List endpoints that read rows straight from our own tables can skip the
+validation as well. ``trusted_response(Schema, rows)`` copies the schema's
+fields off each ORM row and encodes the result in one pass; the route keeps
+``response_model=`` for the OpenAPI docs. Only use it for plain projection
+schemas: validators, computed fields and custom serializers do not run.
+
+Those list endpoints also take a ``fields=`` sparse fieldset:
+``parse_fields(Schema, fields)`` checks the requested names, ``load_fields``
+narrows the query to those columns and ``trusted_response(..., fields=)``
+emits only those keys.
+
+``install_compression(app)`` compresses responses of at least
+``COMPRESSION_MINIMUM_SIZE`` bytes with brotli when the client accepts it
+and the ``brotli`` package is installed, otherwise with gzip.
+"""
+
+import os
+import zlib
+from decimal import Decimal
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import orjson
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Same wire format as pydantic's JSON mode: "Z" for UTC, Decimal as a string
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """``JSONResponse`` encoded with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _model_type(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The nested schema behind ``annotation`` and whether it is a list of it"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None, False
+        annotation = args[0]
+    if get_origin(annotation) in (list, List, tuple, set):
+        args = get_args(annotation)
+        nested, _ = _model_type(args[0]) if args else (None, False)
+        return nested, nested is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def parse_fields(
+    schema: Type[BaseModel], fields: Optional[str]
+) -> Optional[Tuple[str, ...]]:
+    """
+    The ``schema`` attributes named by a ``fields=a,b`` query parameter, in
+    schema order. Names may be given as attributes or as their JSON keys.
+    None when no selection was asked for; 400 for unknown names.
+    """
+    if not fields:
+        return None
+    names = {}
+    for name, field in schema.model_fields.items():
+        names[name] = name
+        names[field.serialization_alias or field.alias or name] = name
+    requested = {part.strip() for part in fields.split(",") if part.strip()}
+    unknown = sorted(part for part in requested if part not in names)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    selected = {names[part] for part in requested}
+    return tuple(name for name in schema.model_fields if name in selected) or None
+
+
+def load_fields(model: type, fields: Optional[Iterable[str]]) -> List[Any]:
+    """
+    Loader options reading only the columns behind ``fields`` (plus the
+    primary key) for ``select(model).options(*...)``. Names the model does
+    not have are skipped; anything that is not a plain column (relationships,
+    properties) needs the whole row, so nothing is narrowed.
+    """
+    if not fields:
+        return []
+    mapper = inspect(model)
+    columns = []
+    for name in fields:
+        if name in mapper.column_attrs:
+            columns.append(getattr(model, name))
+        elif hasattr(model, name):
+            return []
+    return [load_only(*columns)] if columns else []
+
+
+class TrustedSerializer:
+    """
+    Turns ORM rows (or plain mappings) into the dicts ``schema`` would
+    produce, without validating them. Keys follow the aliases, as FastAPI's
+    ``by_alias`` default does. With ``fields`` only those attributes are
+    read, so rows loaded through ``load_fields`` never touch an unloaded
+    column.
+    """
+
+    def __init__(
+        self, schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None
+    ):
+        self.schema = schema
+        self.fields = []
+        for name, field in schema.model_fields.items():
+            if fields is not None and name not in fields:
+                continue
+            key = field.serialization_alias or field.alias or name
+            nested, many = _model_type(field.annotation)
+            self.fields.append(
+                (name, key, serializer_for(nested) if nested else None, many)
+            )
+
+    def dump(self, row: Any) -> dict:
+        data = {}
+        mapping = isinstance(row, Mapping)
+        for name, key, nested, many in self.fields:
+            value = row.get(name) if mapping else getattr(row, name, None)
+            if nested is not None and value is not None:
+                value = nested.dump_many(value) if many else nested.dump(value)
+            data[key] = value
+        return data
+
+    def dump_many(self, rows: Iterable[Any]) -> List[dict]:
+        return [self.dump(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def serializer_for(
+    schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None
+) -> TrustedSerializer:
+    return TrustedSerializer(schema, fields)
+
+
+def trusted_response(
+    schema: Type[BaseModel],
+    content: Any,
+    status_code: int = 200,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> ORJSONResponse:
+    """
+    Response for a row, or a list of rows, from our own tables, shaped by
+    ``schema`` without validating it; ``fields`` (from ``parse_fields``)
+    keeps only those keys
+    """
+    serializer = serializer_for(schema, fields)
+    if isinstance(content, (list, tuple)):
+        data = serializer.dump_many(content)
+    else:
+        data = serializer.dump(content)
+    return ORJSONResponse(data, status_code=status_code)
+
+
+# Already compressed or streamed event by event
+UNCOMPRESSED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "application/zip",
+)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def _gzip_encoder() -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+def _brotli_encoder() -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return compressor.process, compressor.finish
+
+
+# In order of preference
+ENCODERS = {"gzip": _gzip_encoder}
+if brotli is not None:
+    ENCODERS = {"br": _brotli_encoder, **ENCODERS}
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The preferred encoding in ``ENCODERS`` the client accepts"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        name, _, value = params.partition("=")
+        try:
+            if name.strip() == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    for encoding in ENCODERS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class _CompressionResponder:
+    def __init__(self, app, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start = None
+        self.length = None
+        self.passthrough = False
+        self.buffer = []
+        self.process = self.finish = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            length = headers.get("content-length")
+            self.length = int(length) if length is not None else None
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(
+                    UNCOMPRESSED_CONTENT_TYPES
+                )
+                or (self.length is not None and self.length < self.minimum_size)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held back until the body shows whether to compress
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.length is not None:
+            # Sized responses are in memory already (the ``http`` middlewares
+            # re-stream them in chunks): compress them whole and keep an
+            # accurate Content-Length
+            self.buffer.append(body)
+            if more_body:
+                return
+            process, finish = ENCODERS[self.encoding]()
+            body = process(b"".join(self.buffer)) + finish()
+            self._set_headers(len(body))
+            await self._send_start()
+            await self.send({**message, "body": body})
+            return
+
+        if self.start is not None:
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self._send_start()
+                await self.send(message)
+                return
+            self.process, self.finish = ENCODERS[self.encoding]()
+            self._set_headers(None)
+            await self._send_start()
+        body = self.process(body) + (b"" if more_body else self.finish())
+        await self.send({**message, "body": body})
+
+    def _set_headers(self, length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        if length is not None:
+            headers["Content-Length"] = str(length)
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses of at least ``minimum_size``
+    bytes with the best encoding the client accepts. Streaming responses
+    without a Content-Length are compressed chunk by chunk; event streams,
+    media and bodies that already carry a ``Content-Encoding`` pass through.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["method"] != "HEAD":
+            encoding = negotiate_encoding(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+            if encoding is not None:
+                responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def install_compression(app) -> None:
+    """
+    Compress ``app``'s responses. Install it before ``install_metrics`` so
+    the response size histogram records the bytes actually sent.
+    """
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    )
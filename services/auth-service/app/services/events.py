@@ -2,6 +2,10 @@ import json
 from typing import Dict, Any, Optional
 from datetime import datetime
 import os
+import time
+
+from ..metrics import record_publish
+from ..tracing import publish_span
 
 try:
     import redis
@@ -38,14 +42,20 @@ class EventPublisher:
         for k, v in payload.items():
             if v is not None:
                 event[k] = str(v)
-        try:
-            r = EventPublisher.get_redis_client()
-            r.xadd(stream, {k: v for k, v in event.items()})
-            print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
-            return event
-        except Exception as e:
-            print(f"[EVENT][ERROR] Redis publish failed: {e}")
-            return {"error": str(e), **event}
+        with publish_span(stream, event, event_type=event_type):
+            started = time.perf_counter()
+            try:
+                r = EventPublisher.get_redis_client()
+                r.xadd(stream, {k: v for k, v in event.items()})
+                record_publish(stream, event_type, time.perf_counter() - started)
+                print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
+                return event
+            except Exception as e:
+                record_publish(
+                    stream, event_type, time.perf_counter() - started, ok=False
+                )
+                print(f"[EVENT][ERROR] Redis publish failed: {e}")
+                return {"error": str(e), **event}
 
     @staticmethod
     def publish_user_registered(
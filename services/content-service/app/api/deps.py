@@ -1,7 +1,9 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.base import get_db
+from app.db.base import get_async_db, get_db
+from app.db.engine import read_only
 from app.core.config import settings
 import httpx
 
@@ -11,6 +13,19 @@ def get_db_session() -> Generator[Session, None, None]:
     yield from get_db()
 
 
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get async database session"""
+    async for db in get_async_db():
+        yield db
+
+
+async def get_async_read_db_session(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncSession:
+    """Dependency to get a read-only async session (replica when configured)"""
+    return read_only(db)
+
+
 def verify_admin_token(token: str) -> bool:
     """Verify admin token - placeholder for actual JWT verification"""
     # In a real implementation, this would verify JWT tokens
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from app.api.deps import get_db_session, require_admin_auth
-from app.services.content_service import ContentService
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_async_db_session, get_async_read_db_session, require_admin_auth
+from app.crud.news_article import async_news_article_crud
+from app.responses import parse_fields, trusted_response
+from app.services.content_service import AsyncContentService
 from app.schemas.news_article import (
     NewsArticleCreate,
     NewsArticleUpdate,
@@ -17,17 +19,21 @@ async def list_news(
     skip: int = 0,
     limit: int = 100,
     is_featured: Optional[bool] = None,
-    db: Session = Depends(get_db_session),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. article_id,title"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ):
-    articles = ContentService.get_active_news_articles_with_filter(
-        db, skip, limit, is_featured
+    selected = parse_fields(NewsArticleResponse, fields)
+    articles = await async_news_article_crud.get_active_articles_with_filter(
+        db, skip, limit, is_featured, selected
     )
-    return articles
+    return trusted_response(NewsArticleResponse, articles, fields=selected)
 
 
 @router.get("/news/{article_id}", response_model=NewsArticleResponse, tags=["public"])
-async def get_news(article_id: str, db: Session = Depends(get_db_session)):
-    article = ContentService.get_news_article(db, article_id)
+async def get_news(article_id: str, db: AsyncSession = Depends(get_async_read_db_session)):
+    article = await AsyncContentService.get_news_article(db, article_id)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -38,11 +44,11 @@ async def get_news(article_id: str, db: Session = Depends(get_db_session)):
 @router.post("/news/", response_model=NewsArticleResponse, tags=["admin"])
 async def create_news(
     article_data: NewsArticleCreate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     require_admin_auth(authorization)
-    article = ContentService.create_news_article(db, article_data)
+    article = await AsyncContentService.create_news_article(db, article_data)
     return article
 
 
@@ -50,11 +56,11 @@ async def create_news(
 async def put_news(
     article_id: str,
     article_data: NewsArticleUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     require_admin_auth(authorization)
-    article = ContentService.update_news_article(db, article_id, article_data)
+    article = await AsyncContentService.update_news_article(db, article_id, article_data)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -66,11 +72,11 @@ async def put_news(
 async def patch_news(
     article_id: str,
     article_data: NewsArticleUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     require_admin_auth(authorization)
-    article = ContentService.update_news_article(db, article_id, article_data)
+    article = await AsyncContentService.update_news_article(db, article_id, article_data)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -81,11 +87,11 @@ async def patch_news(
 @router.delete("/news/{article_id}", tags=["admin"])
 async def delete_news(
     article_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     require_admin_auth(authorization)
-    success = ContentService.delete_news_article(db, article_id)
+    success = await AsyncContentService.delete_news_article(db, article_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from app.api.deps import get_db_session, require_admin_auth
-from app.services.content_service import ContentService
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_async_db_session, get_async_read_db_session, require_admin_auth
+from app.crud.news_article import async_news_article_crud
+from app.responses import parse_fields, trusted_response
+from app.services.content_service import AsyncContentService
 from app.schemas.news_article import (
     NewsArticleCreate,
     NewsArticleUpdate,
@@ -15,14 +17,14 @@ router = APIRouter()
 @router.post("/news/articles", response_model=NewsArticleResponse, tags=["admin"])
 async def create_news_article(
     article_data: NewsArticleCreate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Create a new news article (Admin only)"""
     # Verify admin authentication
     require_admin_auth(authorization)
 
-    article = ContentService.create_news_article(db, article_data)
+    article = await AsyncContentService.create_news_article(db, article_data)
     return article
 
 
@@ -31,32 +33,44 @@ async def get_news_articles(
     skip: int = 0,
     limit: int = 100,
     is_featured: Optional[bool] = None,
-    db: Session = Depends(get_db_session),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. article_id,title"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ):
     """Get active news articles with optional is_featured filter (Public endpoint)"""
-    articles = ContentService.get_active_news_articles_with_filter(
-        db, skip, limit, is_featured
+    selected = parse_fields(NewsArticleResponse, fields)
+    articles = await async_news_article_crud.get_active_articles_with_filter(
+        db, skip, limit, is_featured, selected
     )
-    return articles
+    return trusted_response(NewsArticleResponse, articles, fields=selected)
 
 
 @router.get(
     "/news/articles/featured", response_model=List[NewsArticleResponse], tags=["public"]
 )
 async def get_featured_news_articles(
-    skip: int = 0, limit: int = 10, db: Session = Depends(get_db_session)
+    skip: int = 0,
+    limit: int = 10,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. article_id,title"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ):
     """Get featured news articles (Public endpoint)"""
-    articles = ContentService.get_featured_news_articles(db, skip, limit)
-    return articles
+    selected = parse_fields(NewsArticleResponse, fields)
+    articles = await async_news_article_crud.get_featured_articles(
+        db, skip, limit, selected
+    )
+    return trusted_response(NewsArticleResponse, articles, fields=selected)
 
 
 @router.get(
     "/news/articles/{article_id}", response_model=NewsArticleResponse, tags=["public"]
 )
-async def get_news_article(article_id: str, db: Session = Depends(get_db_session)):
+async def get_news_article(article_id: str, db: AsyncSession = Depends(get_async_read_db_session)):
     """Get a specific news article by ID (Public endpoint)"""
-    article = ContentService.get_news_article(db, article_id)
+    article = await AsyncContentService.get_news_article(db, article_id)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -70,14 +84,14 @@ async def get_news_article(article_id: str, db: Session = Depends(get_db_session
 async def update_news_article(
     article_id: str,
     article_data: NewsArticleUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Update a news article (Admin only)"""
     # Verify admin authentication
     require_admin_auth(authorization)
 
-    article = ContentService.update_news_article(db, article_id, article_data)
+    article = await AsyncContentService.update_news_article(db, article_id, article_data)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -91,12 +105,12 @@ async def update_news_article(
 async def patch_news_article(
     article_id: str,
     article_data: NewsArticleUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Partially update a news article (Admin only)"""
     require_admin_auth(authorization)
-    article = ContentService.update_news_article(db, article_id, article_data)
+    article = await AsyncContentService.update_news_article(db, article_id, article_data)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -107,14 +121,14 @@ async def patch_news_article(
 @router.delete("/news/articles/{article_id}", tags=["admin"])
 async def delete_news_article(
     article_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Delete a news article (Admin only)"""
     # Verify admin authentication
     require_admin_auth(authorization)
 
-    success = ContentService.delete_news_article(db, article_id)
+    success = await AsyncContentService.delete_news_article(db, article_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News article not found"
@@ -1,5 +1,12 @@
-from .news_article import news_article_crud
-from .video import video_crud
-from .system_setting import system_setting_crud
+from .news_article import async_news_article_crud, news_article_crud
+from .video import async_video_crud, video_crud
+from .system_setting import async_system_setting_crud, system_setting_crud
 
-__all__ = ["news_article_crud", "video_crud", "system_setting_crud"]
+__all__ = [
+    "news_article_crud",
+    "video_crud",
+    "system_setting_crud",
+    "async_news_article_crud",
+    "async_video_crud",
+    "async_system_setting_crud",
+]
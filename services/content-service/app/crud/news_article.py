@@ -1,9 +1,12 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 from datetime import date, datetime
 from app.models.news_article import NewsArticle
 from app.schemas.news_article import NewsArticleCreate, NewsArticleUpdate
+from app.metrics import instrument_crud
+from app.responses import load_fields
 
 
 class NewsArticleCRUD:
@@ -110,4 +113,93 @@ class NewsArticleCRUD:
         return True
 
 
+class AsyncNewsArticleCRUD:
+    """
+    NewsArticleCRUD for AsyncSession, used by the async endpoints.
+    Column defaults are client-side and sessions do not expire on commit,
+    so written rows are returned without a refresh query.
+    """
+
+    async def create(self, db: AsyncSession, obj_in: NewsArticleCreate) -> NewsArticle:
+        """Create a new news article"""
+        db_obj = NewsArticle(**obj_in.model_dump())
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, article_id: str) -> Optional[NewsArticle]:
+        """Get a news article by ID"""
+        return await db.scalar(
+            select(NewsArticle).where(NewsArticle.article_id == article_id)
+        )
+
+    async def get_active_articles_with_filter(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        is_featured: Optional[bool] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[NewsArticle]:
+        """
+        Get active news articles with optional is_featured filter; ``fields``
+        limits the columns read
+        """
+        query = (
+            select(NewsArticle)
+            .options(*load_fields(NewsArticle, fields))
+            .where(NewsArticle.is_active == True)
+        )
+        if is_featured is not None:
+            query = query.where(NewsArticle.is_featured == is_featured)
+        return list(await db.scalars(query.offset(skip).limit(limit)))
+
+    async def get_active_articles(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> List[NewsArticle]:
+        """Get all active news articles"""
+        return await self.get_active_articles_with_filter(db, skip, limit)
+
+    async def get_featured_articles(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[NewsArticle]:
+        """Get featured active news articles"""
+        return await self.get_active_articles_with_filter(
+            db, skip, limit, True, fields
+        )
+
+    async def update(
+        self, db: AsyncSession, article_id: str, obj_in: NewsArticleUpdate
+    ) -> Optional[NewsArticle]:
+        """Update a news article"""
+        db_obj = await self.get(db, article_id)
+        if not db_obj:
+            return None
+
+        update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+
+        await db.commit()
+        return db_obj
+
+    async def delete(self, db: AsyncSession, article_id: str) -> bool:
+        """Delete a news article"""
+        db_obj = await self.get(db, article_id)
+        if not db_obj:
+            return False
+
+        await db.delete(db_obj)
+        await db.commit()
+        return True
+
+
 news_article_crud = NewsArticleCRUD()
+async_news_article_crud = AsyncNewsArticleCRUD()
+
+
+instrument_crud(__name__)
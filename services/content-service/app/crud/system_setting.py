@@ -1,7 +1,10 @@
 from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.system_setting import SystemSetting
 from app.schemas.system_setting import SystemSettingCreate, SystemSettingUpdate
+from app.metrics import instrument_crud
 
 
 class SystemSettingCRUD:
@@ -83,4 +86,90 @@ class SystemSettingCRUD:
         return setting.setting_value if setting else None
 
 
+class AsyncSystemSettingCRUD:
+    """
+    SystemSettingCRUD for AsyncSession, used by the async endpoints.
+    Column defaults are client-side and sessions do not expire on commit,
+    so written rows are returned without a refresh query.
+    """
+
+    async def create(self, db: AsyncSession, obj_in: SystemSettingCreate) -> SystemSetting:
+        """Create a new system setting"""
+        db_obj = SystemSetting(**obj_in.model_dump())
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, setting_id: str) -> Optional[SystemSetting]:
+        """Get a system setting by ID"""
+        return await db.scalar(
+            select(SystemSetting).where(SystemSetting.setting_id == setting_id)
+        )
+
+    async def get_by_key(
+        self, db: AsyncSession, setting_key: str
+    ) -> Optional[SystemSetting]:
+        """Get a system setting by key"""
+        return await db.scalar(
+            select(SystemSetting).where(SystemSetting.setting_key == setting_key)
+        )
+
+    async def get_all(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> List[SystemSetting]:
+        """Get all system settings"""
+        return list(await db.scalars(select(SystemSetting).offset(skip).limit(limit)))
+
+    async def _apply_update(
+        self,
+        db: AsyncSession,
+        db_obj: Optional[SystemSetting],
+        obj_in: SystemSettingUpdate,
+    ) -> Optional[SystemSetting]:
+        if not db_obj:
+            return None
+
+        update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+
+        await db.commit()
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, setting_id: str, obj_in: SystemSettingUpdate
+    ) -> Optional[SystemSetting]:
+        """Update a system setting"""
+        return await self._apply_update(db, await self.get(db, setting_id), obj_in)
+
+    async def update_by_key(
+        self, db: AsyncSession, setting_key: str, obj_in: SystemSettingUpdate
+    ) -> Optional[SystemSetting]:
+        """Update a system setting by key"""
+        return await self._apply_update(
+            db, await self.get_by_key(db, setting_key), obj_in
+        )
+
+    async def delete(self, db: AsyncSession, setting_id: str) -> bool:
+        """Delete a system setting"""
+        db_obj = await self.get(db, setting_id)
+        if not db_obj:
+            return False
+
+        await db.delete(db_obj)
+        await db.commit()
+        return True
+
+    async def get_setting_value(
+        self, db: AsyncSession, setting_key: str
+    ) -> Optional[str]:
+        """Get setting value by key"""
+        setting = await self.get_by_key(db, setting_key)
+        return setting.setting_value if setting else None
+
+
 system_setting_crud = SystemSettingCRUD()
+async_system_setting_crud = AsyncSystemSettingCRUD()
+
+
+instrument_crud(__name__)
@@ -1,20 +1,36 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 from datetime import date, datetime
 from app.models.video import Video
 from app.schemas.video import VideoCreate, VideoUpdate
+from app.metrics import instrument_crud
+from app.responses import load_fields
+
+
+def _video_data(obj_in: VideoCreate) -> dict:
+    # Convert video_type enum to string for SQLite compatibility
+    data = obj_in.model_dump()
+    if data.get('video_type'):
+        data['video_type'] = data['video_type'].value
+    return data
+
+
+def _apply_update(db_obj: Video, obj_in: VideoUpdate) -> None:
+    update_data = obj_in.model_dump(exclude_unset=True)
+    # Convert video_type enum to string if present
+    if 'video_type' in update_data and update_data['video_type']:
+        update_data['video_type'] = update_data['video_type'].value
+
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
 
 
 class VideoCRUD:
     def create(self, db: Session, obj_in: VideoCreate) -> Video:
         """Create a new video"""
-        # Convert video_type enum to string for SQLite compatibility
-        data = obj_in.model_dump()
-        if data.get('video_type'):
-            data['video_type'] = data['video_type'].value
-        
-        db_obj = Video(**data)
+        db_obj = Video(**_video_data(obj_in))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -68,14 +84,7 @@ class VideoCRUD:
         if not db_obj:
             return None
 
-        update_data = obj_in.model_dump(exclude_unset=True)
-        # Convert video_type enum to string if present
-        if 'video_type' in update_data and update_data['video_type']:
-            update_data['video_type'] = update_data['video_type'].value
-            
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
+        _apply_update(db_obj, obj_in)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -110,4 +119,97 @@ class VideoCRUD:
         return True
 
 
+class AsyncVideoCRUD:
+    """
+    VideoCRUD for AsyncSession, used by the async endpoints.
+    Column defaults are client-side and sessions do not expire on commit,
+    so written rows are returned without a refresh query.
+    """
+
+    async def create(self, db: AsyncSession, obj_in: VideoCreate) -> Video:
+        """Create a new video"""
+        db_obj = Video(**_video_data(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, video_id: str) -> Optional[Video]:
+        """Get a video by ID"""
+        return await db.scalar(select(Video).where(Video.video_id == video_id))
+
+    async def _active(
+        self,
+        db: AsyncSession,
+        skip: int,
+        limit: int,
+        fields: Optional[Sequence[str]],
+        *criteria,
+    ) -> List[Video]:
+        query = (
+            select(Video)
+            .options(*load_fields(Video, fields))
+            .where(Video.is_active == True, *criteria)
+        )
+        return list(await db.scalars(query.offset(skip).limit(limit)))
+
+    async def get_active_videos(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Video]:
+        """Get all active videos; ``fields`` limits the columns read"""
+        return await self._active(db, skip, limit, fields)
+
+    async def get_featured_videos(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Video]:
+        """Get featured active videos"""
+        return await self._active(db, skip, limit, fields, Video.is_featured == True)
+
+    async def get_videos_by_type(
+        self,
+        db: AsyncSession,
+        video_type: str,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Video]:
+        """Get videos by type"""
+        return await self._active(
+            db, skip, limit, fields, Video.video_type == video_type
+        )
+
+    async def update(
+        self, db: AsyncSession, video_id: str, obj_in: VideoUpdate
+    ) -> Optional[Video]:
+        """Update a video"""
+        db_obj = await self.get(db, video_id)
+        if not db_obj:
+            return None
+
+        _apply_update(db_obj, obj_in)
+        await db.commit()
+        return db_obj
+
+    async def delete(self, db: AsyncSession, video_id: str) -> bool:
+        """Delete a video"""
+        db_obj = await self.get(db, video_id)
+        if not db_obj:
+            return False
+
+        await db.delete(db_obj)
+        await db.commit()
+        return True
+
+
 video_crud = VideoCRUD()
+async_video_crud = AsyncVideoCRUD()
+
+
+instrument_crud(__name__)
@@ -1,22 +1,35 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from app.api.v1.endpoints import news_articles, videos, system_settings, news
 from app.core.config import settings
-from app.db.base import engine, Base
+from app.db.base import dispose_async_engine
+from app.db.engine import db_context_middleware
+from app.db.migrate import migrate
 import os
 
 # Import models after creating Base to avoid circular imports
 import app.db.init_db
-
-# Create tables only if not in testing environment
-if os.getenv("TESTING") != "true":
-    Base.metadata.create_all(bind=engine)
+from app.metrics import install_metrics
+from app.responses import ORJSONResponse, install_compression
+from app.tracing import install_tracing
 
 app = FastAPI(
     title="Content Service",
     description="Service for managing content including news articles, videos, and system settings",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Scope the read-your-writes window of replica reads to the caller
+app.middleware("http")(db_context_middleware)
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "content-service")
+
 # Include routers
 app.include_router(news_articles.router, prefix="/api/v1", tags=["news_articles"])
 app.include_router(videos.router, prefix="/api/v1", tags=["videos"])
@@ -24,6 +37,23 @@ app.include_router(news.router, prefix="/api/v1", tags=["news"])  # alias routes
 app.include_router(system_settings.router, prefix="/api/v1", tags=["system_settings"])
 
 
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await dispose_async_engine()
+
+
 @app.get("/")
 async def root():
     return {"message": "Content Service is running"}
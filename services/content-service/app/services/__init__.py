@@ -1,4 +1,4 @@
-from .content_service import ContentService
+from .content_service import AsyncContentService, ContentService
 from .retention_service import RetentionService
 
-__all__ = ["ContentService", "RetentionService"]
+__all__ = ["AsyncContentService", "ContentService", "RetentionService"]
@@ -2,6 +2,7 @@ import os
 os.environ["TESTING"] = "true"
 
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.db.base import Base
@@ -35,3 +36,12 @@ def db_session():
         yield session
     finally:
         session.close()
+
+
+@pytest_asyncio.fixture
+async def async_db_session():
+    """Provide an async database session on the same test database"""
+    from app.db.base import get_async_db
+
+    async for session in get_async_db():
+        yield session
@@ -0,0 +1,79 @@
+import pytest
+from datetime import date
+from app.services.content_service import AsyncContentService
+from app.schemas.news_article import NewsArticleCreate, NewsArticleUpdate
+from app.schemas.video import VideoCreate, VideoType
+from app.schemas.system_setting import SystemSettingCreate, SystemSettingUpdate
+
+
+class TestAsyncContentService:
+    """AsyncContentService against the test database"""
+
+    @pytest.mark.asyncio
+    async def test_news_article_lifecycle(self, async_db_session):
+        featured = await AsyncContentService.create_news_article(
+            async_db_session,
+            NewsArticleCreate(
+                title="Featured", content="...", is_featured=True, publish_date=date.today()
+            ),
+        )
+        await AsyncContentService.create_news_article(
+            async_db_session, NewsArticleCreate(title="Plain", content="...")
+        )
+
+        articles = await AsyncContentService.get_active_news_articles(async_db_session)
+        assert {a.title for a in articles} == {"Featured", "Plain"}
+        featured_only = await AsyncContentService.get_featured_news_articles(
+            async_db_session
+        )
+        assert [a.article_id for a in featured_only] == [featured.article_id]
+
+        updated = await AsyncContentService.update_news_article(
+            async_db_session, str(featured.article_id), NewsArticleUpdate(title="Renamed")
+        )
+        assert updated.title == "Renamed"
+        assert await AsyncContentService.delete_news_article(
+            async_db_session, str(featured.article_id)
+        )
+        assert (
+            await AsyncContentService.get_news_article(
+                async_db_session, str(featured.article_id)
+            )
+            is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_videos_by_type(self, async_db_session):
+        await AsyncContentService.create_video(
+            async_db_session,
+            VideoCreate(
+                title="How to",
+                video_url="https://example.com/v.mp4",
+                video_type=VideoType.TUTORIAL,
+            ),
+        )
+
+        videos = await AsyncContentService.get_videos_by_type(
+            async_db_session, VideoType.TUTORIAL.value
+        )
+        assert [v.title for v in videos] == ["How to"]
+
+    @pytest.mark.asyncio
+    async def test_system_setting_by_key(self, async_db_session):
+        await AsyncContentService.create_system_setting(
+            async_db_session,
+            SystemSettingCreate(setting_key="max_radius", setting_value="5"),
+        )
+
+        await AsyncContentService.update_system_setting_by_key(
+            async_db_session, "max_radius", SystemSettingUpdate(setting_value="10")
+        )
+
+        assert (
+            await AsyncContentService.get_setting_value(async_db_session, "max_radius")
+            == "10"
+        )
+        assert (
+            await AsyncContentService.get_setting_value(async_db_session, "missing")
+            is None
+        )
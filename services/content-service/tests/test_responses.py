@@ -0,0 +1,104 @@
+import os
+os.environ["TESTING"] = "true"
+
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.main import app
+from app.models.news_article import NewsArticle
+from app.models.video import Video
+from app.responses import (
+    ORJSONResponse,
+    dumps,
+    load_fields,
+    negotiate_encoding,
+    parse_fields,
+)
+from app.schemas.news_article import NewsArticleResponse
+from app.schemas.video import VideoResponse
+
+client = TestClient(app)
+
+
+def test_list_endpoints_match_validated_output(db_session):
+    for i in range(3):
+        db_session.add(
+            NewsArticle(
+                title=f"Article {i}",
+                content="Body " * 50,
+                is_featured=i == 0,
+                publish_date=date(2024, 5, i + 1),
+            )
+        )
+        db_session.add(
+            Video(
+                title=f"Video {i}",
+                video_url=f"https://example.com/{i}.mp4",
+                video_type="tutorial",
+            )
+        )
+    db_session.commit()
+    articles = db_session.query(NewsArticle).all()
+    videos = db_session.query(Video).all()
+
+    news = client.get("/api/v1/news/articles")
+    video_list = client.get("/api/v1/videos")
+
+    assert news.status_code == 200
+    assert news.headers["content-type"] == "application/json"
+    assert sorted(news.json(), key=lambda a: a["title"]) == [
+        NewsArticleResponse.model_validate(a).model_dump(mode="json")
+        for a in sorted(articles, key=lambda a: a.title)
+    ]
+    assert sorted(video_list.json(), key=lambda v: v["title"]) == [
+        VideoResponse.model_validate(v).model_dump(mode="json")
+        for v in sorted(videos, key=lambda v: v.title)
+    ]
+
+
+def test_default_response_class_is_orjson():
+    assert app.router.default_response_class is ORJSONResponse
+    assert dumps({"amount": Decimal("1.50")}) == b'{"amount":"1.50"}'
+
+
+def test_sparse_fieldset_reads_only_selected_columns(db_session):
+    db_session.add(NewsArticle(title="Road reopened", content="Body " * 400))
+    db_session.commit()
+
+    response = client.get("/api/v1/news/articles?fields=title,article_id")
+    statement = select(NewsArticle).options(
+        *load_fields(NewsArticle, parse_fields(NewsArticleResponse, "title"))
+    )
+
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"article_id", "title"}
+    assert "news_articles.content" not in str(statement)
+    assert "news_articles.title" in str(statement)
+
+
+def test_sparse_fieldset_rejects_unknown_fields():
+    response = client.get("/api/v1/videos?fields=title,password")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
+
+
+def test_large_responses_are_compressed(db_session):
+    for i in range(20):
+        db_session.add(NewsArticle(title=f"Article {i}", content="Body " * 200))
+    db_session.commit()
+
+    large = client.get("/api/v1/news/articles", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/api/v1/news/articles", headers={"Accept-Encoding": ""})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < len(identity.content) / 10
+    assert large.json() == identity.json()
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in identity.headers
+    assert negotiate_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("identity") is None
@@ -0,0 +1,473 @@
+"""
+Engine factory shared by the services.
+
+Each service image only ships its own ``app/`` tree, so this module is kept
+identical in every service's ``app/db/engine.py``; change them together.
+
+Pool sizing, timeouts and instrumentation come from the environment:
+
+``DB_POOL_SIZE`` / ``DB_MAX_OVERFLOW``
+    Persistent and burst connections per engine, per worker process. Budget
+    ``replicas x workers x (size + overflow)`` against ``max_connections``.
+``DB_POOL_TIMEOUT``
+    Seconds a checkout waits for a free connection before failing.
+``DB_POOL_RECYCLE``
+    Seconds after which a pooled connection is replaced.
+``DB_POOL_PRE_PING``
+    Test connections on checkout so server restarts are survived.
+``DB_STATEMENT_TIMEOUT_MS``
+    Server-side ``statement_timeout``; 0 leaves the server default.
+``DB_POOL_MODE``
+    ``session`` (default) pools connections to Postgres here.
+    ``transaction`` is for PgBouncer in transaction pooling mode: PgBouncer
+    owns the pool so the engine uses NullPool, asyncpg's prepared statement
+    caches are off, and the statement timeout is applied with ``SET LOCAL``
+    per transaction because PgBouncer rejects it as a startup parameter.
+``DB_SLOW_QUERY_MS``
+    Statements slower than this are logged and passed to the hooks
+    registered with ``on_slow_query``; 0 disables the check. Hooks
+    registered with ``on_query`` see every statement regardless.
+``DB_REPLICA_STICKY_SECONDS``
+    After a request context commits a write, its reads stay on the primary
+    for this long so it reads its own writes (see ``ReplicaRouter``).
+
+Every engine built here records checkouts, checked-out and overflow
+connections, checkout wait time and slow statements in ``POOL_METRICS``.
+"""
+
+import logging
+import os
+import threading
+import hashlib
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("session", "transaction")
+SLOW_QUERY_LOG_CHARS = 500
+
+# hook(engine_name, statement, seconds); parameters are left out on purpose
+SlowQueryHook = Callable[[str, str, float], None]
+SLOW_QUERY_HOOKS: List[SlowQueryHook] = []
+QUERY_HOOKS: List[SlowQueryHook] = []
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_mode() -> str:
+    mode = os.getenv("DB_POOL_MODE", "session").strip().lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {POOL_MODES}, got {mode!r}")
+    return mode
+
+
+def on_slow_query(hook: SlowQueryHook) -> SlowQueryHook:
+    """Register ``hook`` to be called for every slow statement"""
+    SLOW_QUERY_HOOKS.append(hook)
+    return hook
+
+
+def on_query(hook: SlowQueryHook) -> SlowQueryHook:
+    """Register ``hook`` to be called with the duration of every statement"""
+    QUERY_HOOKS.append(hook)
+    return hook
+
+
+class PoolMetrics:
+    """Counters for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.checked_out_peak = 0
+        self.overflow_peak = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+
+    def _overflow(self) -> int:
+        pool = self.engine.pool if self.engine is not None else None
+        overflow = getattr(pool, "overflow", None)
+        # QueuePool counts up from -pool_size, so only positive values are in use
+        return max(0, overflow()) if overflow is not None else 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.checked_out_peak = max(self.checked_out_peak, self.checked_out)
+            self.overflow_peak = max(self.overflow_peak, self._overflow())
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        size = getattr(pool, "size", None)
+        with self._lock:
+            return {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "pool_size": size() if size is not None else 0,
+                "checked_out": self.checked_out,
+                "checked_out_peak": self.checked_out_peak,
+                "overflow": self._overflow(),
+                "overflow_peak": self.overflow_peak,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "slow_queries": self.slow_queries,
+            }
+
+
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every engine's pool counters, keyed by engine name"""
+    return {name: metrics.snapshot() for name, metrics in POOL_METRICS.items()}
+
+
+def _timed_pool_class(pool_class: type, metrics: PoolMetrics) -> type:
+    """Subclass of ``pool_class`` that times how long each checkout waits"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return pool_class.connect(self)
+        except PoolTimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - started)
+
+    # A class attribute survives Pool.recreate() on engine.dispose()
+    return type(pool_class.__name__, (pool_class,), {"connect": connect})
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """``create_engine`` keyword arguments for ``url`` from the environment"""
+    if url.startswith("sqlite"):
+        if is_async:
+            # aiosqlite connections belong to the loop that opened them
+            return {"poolclass": NullPool}
+        return {"connect_args": {"check_same_thread": False}}
+
+    mode = pool_mode()
+    options: Dict[str, Any] = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    connect_args: Dict[str, Any] = {}
+    timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+
+    if mode == "transaction":
+        options["poolclass"] = NullPool
+        if is_async:
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+        )
+        if timeout_ms > 0 and url.startswith("postgresql"):
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def _instrument(engine: Engine, metrics: PoolMetrics, slow_query_ms: float) -> None:
+    metrics.engine = engine
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if (
+        timeout_ms > 0
+        and engine.dialect.name == "postgresql"
+        and pool_mode() == "transaction"
+    ):
+
+        @event.listens_for(engine, "begin")
+        def _set_local_timeout(conn):
+            # Runs on the raw cursor so it opens the transaction it applies to
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+            finally:
+                cursor.close()
+
+    threshold = slow_query_ms / 1000.0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        for hook in QUERY_HOOKS:
+            try:
+                hook(metrics.name, statement, seconds)
+            except Exception as e:
+                logger.error(f"Query hook failed: {e}")
+        if threshold <= 0 or seconds < threshold:
+            return
+        metrics.slow_queries += 1
+        logger.warning(
+            "[SLOW QUERY] %s %.1fms: %s",
+            metrics.name,
+            seconds * 1000,
+            statement[:SLOW_QUERY_LOG_CHARS],
+        )
+        for hook in SLOW_QUERY_HOOKS:
+            try:
+                hook(metrics.name, statement, seconds)
+            except Exception as e:
+                logger.error(f"Slow query hook failed: {e}")
+
+
+def _prepare(url: str, name: str, is_async: bool, overrides: Dict[str, Any]):
+    options = engine_options(url, is_async=is_async)
+    options.update(overrides)
+    metrics = PoolMetrics(name)
+    pool_class = options.get("poolclass")
+    if pool_class is not None and issubclass(pool_class, Pool):
+        options["poolclass"] = _timed_pool_class(pool_class, metrics)
+    POOL_METRICS[name] = metrics
+    return options, metrics
+
+
+def build_engine(
+    url: str,
+    name: str = "default",
+    slow_query_ms: Optional[float] = None,
+    **overrides: Any,
+) -> Engine:
+    """
+    Synchronous engine for ``url`` with the environment's pool settings and
+    metrics registered under ``name``. ``overrides`` win over the defaults.
+    """
+    options, metrics = _prepare(url, name, False, overrides)
+    engine = create_engine(url, **options)
+    if slow_query_ms is None:
+        slow_query_ms = _env_int("DB_SLOW_QUERY_MS", 500)
+    _instrument(engine, metrics, slow_query_ms)
+    return engine
+
+
+def build_async_engine(
+    url: str,
+    name: str = "async",
+    slow_query_ms: Optional[float] = None,
+    **overrides: Any,
+):
+    """asyncio counterpart of ``build_engine``; instruments the sync core"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options, metrics = _prepare(url, name, True, overrides)
+    engine = create_async_engine(url, **options)
+    if slow_query_ms is None:
+        slow_query_ms = _env_int("DB_SLOW_QUERY_MS", 500)
+    _instrument(engine.sync_engine, metrics, slow_query_ms)
+    return engine
+
+
+class StickyWrites:
+    """When each request context last committed a write, for read-your-writes"""
+
+    def __init__(self, window_seconds: float, max_entries: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, key: Optional[str]) -> None:
+        if key is None or self.window_seconds <= 0:
+            return
+        with self._lock:
+            self._until[key] = time.monotonic() + self.window_seconds
+            self._until.move_to_end(key)
+            while len(self._until) > self.max_entries:
+                self._until.popitem(last=False)
+
+    def active(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            until = self._until.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._until[key]
+                return False
+            return True
+
+
+sticky_writes = StickyWrites(float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5")))
+
+# Who the current request acts for; set by db_context_middleware
+_db_context: ContextVar[Optional[str]] = ContextVar("db_context", default=None)
+
+
+def db_context_key(request) -> str:
+    """The caller's bearer token (hashed), or its address without one"""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    client = request.client.host if request.client else "unknown"
+    return "client:" + client
+
+
+async def db_context_middleware(request, call_next):
+    """HTTP middleware scoping the sticky-primary window to the caller"""
+    token = _db_context.set(db_context_key(request))
+    try:
+        return await call_next(request)
+    finally:
+        _db_context.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the router's replica once it is marked
+    read-only with ``read_only()``, unless the current request context
+    wrote within the sticky window. Everything else uses the primary.
+    """
+
+    router: Optional["ReplicaRouter"] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and self.router is not None:
+            replica = self.router.read_bind()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _bulk_write(orm_execute_state):
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _committed(session):
+    if session.info.pop("wrote", False):
+        sticky_writes.mark(_db_context.get())
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
+def read_only(session):
+    """Mark a (sync or async) session as serving a read-only endpoint"""
+    session.info["read_only"] = True
+    return session
+
+
+class ReplicaRouter:
+    """
+    Owns the replica engine behind a ``RoutingSession`` class. The engine
+    is built on first use by ``factory``, which returns None when no replica
+    is configured; reads then stay on the primary.
+
+    The sticky window is tracked per process, so read-your-writes holds for
+    follow-up requests served by the same pod.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._engine = None
+        self._built = False
+        self._lock = threading.Lock()
+        self.session_class = type(
+            "RoutingSession", (RoutingSession,), {"router": self}
+        )
+
+    @property
+    def engine(self):
+        """The replica engine (sync or async), building it if needed"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._engine = self._factory()
+                    self._built = True
+        return self._engine
+
+    def read_bind(self) -> Optional[Engine]:
+        """Sync engine to read from, or None to use the primary"""
+        if sticky_writes.active(_db_context.get()):
+            return None
+        engine = self.engine
+        # An AsyncSession's inner Session binds to the sync core engine
+        return getattr(engine, "sync_engine", engine)
+
+    def reset(self):
+        """Forget the replica engine and return it for disposal"""
+        with self._lock:
+            engine, self._engine, self._built = self._engine, None, False
+        return engine
@@ -1,26 +1,46 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import os
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
 from app.api.v1.endpoints import investments
-from app.db.base import Base, engine
-
-
-# Create tables only if not in testing environment
-if os.getenv("TESTING") != "true":
-    Base.metadata.create_all(bind=engine)
+from app.db.migrate import migrate
+from app.metrics import install_metrics
+from app.responses import ORJSONResponse, install_compression
+from app.tracing import install_tracing
 
 
 app = FastAPI(
     title="Investment Service",
     description="Service for managing investment opportunities",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "investment-service")
+
 
 app.include_router(investments.router, prefix="/api/v1", tags=["investments"])
 
 
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
 @app.get("/")
 async def root():
     return {"message": "Investment Service is running"}
@@ -7,6 +7,7 @@ from ..models.address import UserAddress
 from ..models.address import POSTGIS_AVAILABLE
 from ..services.location_service import LocationService
 from ..schemas.address import AddressCreate
+from ..metrics import instrument_crud
 
 
 class AddressCRUD:
@@ -157,3 +158,6 @@ class AddressCRUD:
 
 # Create instance for easy import
 address_crud = AddressCRUD()
+
+
+instrument_crud(__name__)
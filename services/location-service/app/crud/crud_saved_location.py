@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 import uuid
 
 from app.models.saved_location import SavedLocation
+from app.metrics import instrument_crud
 
 
 class SavedLocationCRUD:
@@ -41,9 +42,4 @@ class SavedLocationCRUD:
 saved_location_crud = SavedLocationCRUD()
 
 
-
-
-
-
-
-
+instrument_crud(__name__)
@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.declarative import declarative_base
 import os
 
+from .engine import build_engine
+
 # Choose database URL. In TESTING mode default to SQLite to avoid external deps
 if os.getenv("TESTING") == "true" and not os.getenv("DATABASE_URL"):
     DATABASE_URL = "sqlite:///./test_location_service.db"
@@ -13,7 +14,7 @@ else:
     )
 
 # Create SQLAlchemy engine with PostGIS support
-engine = create_engine(
+engine = build_engine(
     DATABASE_URL,
     echo=False,  # Set to True for SQL debugging
 )
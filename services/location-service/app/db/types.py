@@ -0,0 +1,26 @@
+"""
+PostGIS column types.
+
+``Geography`` declares the same ``geography(POINT,4326)`` column geoalchemy2
+does, without importing geoalchemy2 (and shapely and numpy behind it) when
+the service boots. Values are written as SQL expressions
+(``ST_GeomFromText``) and read back as WKT, the same text the SQLite test
+schema stores.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.types import UserDefinedType
+
+
+class Geography(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, geometry_type: str = "POINT", srid: int = 4326):
+        self.geometry_type = geometry_type
+        self.srid = srid
+
+    def get_col_spec(self, **kw) -> str:
+        return f"geography({self.geometry_type},{self.srid})"
+
+    def column_expression(self, col):
+        return func.ST_AsText(col, type_=self)
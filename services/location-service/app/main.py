@@ -1,26 +1,50 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
+import os
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from app.api.v1.endpoints import addresses, locations
 from app.models import saved_location  # ensure model is imported for table creation
 from app.core.config import settings
-from app.db.base import engine, Base
+from app.db.migrate import migrate
 
 # Import models after creating Base to avoid circular imports
 import app.db.init_db
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from app.metrics import install_metrics
+from app.responses import ORJSONResponse, install_compression
+from app.tracing import install_tracing
 
 app = FastAPI(
     title="Location Service",
     description="Service for managing addresses and location validation",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "location-service")
+
 # Include routers
 app.include_router(addresses.router, prefix="/api/v1", tags=["addresses"])
 app.include_router(locations.router, prefix="/api/v1", tags=["locations"])
 
 
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
 @app.get("/")
 async def root():
     return {"message": "Location Service is running"}
@@ -1,12 +1,12 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 import os
 
-# Only import PostGIS if not in test environment
+# Only use PostGIS if not in test environment
 if os.getenv("TESTING") != "true":
-    from geoalchemy2 import Geography
+    from app.db.types import Geography
 
     POSTGIS_AVAILABLE = True
 else:
@@ -17,6 +17,12 @@ from app.db.base import Base
 
 class UserAddress(Base):
     __tablename__ = "user_addresses"
+    # Spatial index under the name geoalchemy2 used to create implicitly
+    __table_args__ = (
+        (Index("idx_user_addresses_location", "location", postgresql_using="gist"),)
+        if POSTGIS_AVAILABLE
+        else ()
+    )
 
     address_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), nullable=False)
@@ -1,15 +1,30 @@
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.base import get_db
-from typing import Optional
+from app.db.base import get_async_db, get_db
+from app.db.engine import read_only
+from typing import AsyncGenerator, Generator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_db_session() -> Session:
+def get_db_session() -> Generator[Session, None, None]:
     """Get database session"""
-    return next(get_db())
+    yield from get_db()
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session"""
+    async for db in get_async_db():
+        yield db
+
+
+async def get_async_read_db_session(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncSession:
+    """Get read-only async database session (replica when configured)"""
+    return read_only(db)
 
 
 def verify_admin_token(token: Optional[str]) -> bool:
@@ -7,9 +7,12 @@ from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+# EventService is synchronous; these handlers are plain functions so FastAPI
+# runs them in its threadpool instead of on the event loop.
+
 
 @router.post("/events/user-registered", tags=["events"])
-async def handle_user_registered(
+def handle_user_registered(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -29,7 +32,7 @@ async def handle_user_registered(
 
 
 @router.post("/events/profile-updated", tags=["events"])
-async def handle_profile_updated(
+def handle_profile_updated(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -49,7 +52,7 @@ async def handle_profile_updated(
 
 
 @router.post("/events/mode-changed", tags=["events"])
-async def handle_mode_changed(
+def handle_mode_changed(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -69,7 +72,7 @@ async def handle_mode_changed(
 
 
 @router.post("/events/service-request-created", tags=["events"])
-async def handle_service_request_created(
+def handle_service_request_created(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -89,7 +92,7 @@ async def handle_service_request_created(
 
 
 @router.post("/events/service-completed", tags=["events"])
-async def handle_service_completed(
+def handle_service_completed(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -109,7 +112,7 @@ async def handle_service_completed(
 
 
 @router.post("/events/payment-processed", tags=["events"])
-async def handle_payment_processed(
+def handle_payment_processed(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -129,7 +132,7 @@ async def handle_payment_processed(
 
 
 @router.post("/events/payment-failed", tags=["events"])
-async def handle_payment_failed(
+def handle_payment_failed(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -149,7 +152,7 @@ async def handle_payment_failed(
 
 
 @router.post("/events/dispute-opened", tags=["events"])
-async def handle_dispute_opened(
+def handle_dispute_opened(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -169,7 +172,7 @@ async def handle_dispute_opened(
 
 
 @router.post("/events/safety-report-filed", tags=["events"])
-async def handle_safety_report_filed(
+def handle_safety_report_filed(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -189,7 +192,7 @@ async def handle_safety_report_filed(
 
 
 @router.post("/events/payment-refunded", tags=["events"])
-async def handle_payment_refunded(
+def handle_payment_refunded(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -209,7 +212,7 @@ async def handle_payment_refunded(
 
 
 @router.post("/events/dispute-resolved", tags=["events"])
-async def handle_dispute_resolved(
+def handle_dispute_resolved(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -229,7 +232,7 @@ async def handle_dispute_resolved(
 
 
 @router.post("/events/rating-created", tags=["events"])
-async def handle_rating_created(
+def handle_rating_created(
     event_data: Dict[str, Any],
     db: Session = Depends(get_db_session),
     authorization: Optional[str] = Header(None),
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.api.deps import get_db_session, require_admin_auth
-from app.services.message_service import MessageService
+from app.api.deps import get_async_db_session, get_async_read_db_session, require_admin_auth
+from app.crud.message import async_message_crud
+from app.responses import parse_fields, trusted_response
+from app.services.message_service import AsyncMessageService
 from app.schemas.message import (
     MessageCreate,
     MessageUpdate,
@@ -16,28 +18,28 @@ router = APIRouter()
 @router.post("/messages", response_model=MessageResponse, tags=["messages"])
 async def create_message(
     message_data: MessageCreate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Create a new message"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    message = MessageService.create_message(db, message_data)
+    message = await AsyncMessageService.create_message(db, message_data)
     return message
 
 
 @router.get("/messages/{message_id}", response_model=MessageResponse, tags=["messages"])
 async def get_message(
     message_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get a specific message by ID"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    message = MessageService.get_message(db, message_id)
+    message = await AsyncMessageService.get_message(db, message_id)
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
@@ -55,15 +57,25 @@ async def get_conversation(
     user2_id: str,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get conversation between two users"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    conversation = MessageService.get_conversation(db, user1_id, user2_id, skip, limit)
-    return conversation
+    messages = await async_message_crud.get_conversation(
+        db, user1_id, user2_id, skip, limit
+    )
+    unread_count = await async_message_crud.get_unread_count(db, user1_id)
+    return trusted_response(
+        ConversationResponse,
+        {
+            "messages": messages,
+            "total_count": len(messages),
+            "unread_count": unread_count,
+        },
+    )
 
 
 @router.get(
@@ -75,28 +87,34 @@ async def get_user_messages(
     user_id: str,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_session),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. message_id,is_read"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get all messages for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    messages = MessageService.get_user_messages(db, user_id, skip, limit)
-    return messages
+    selected = parse_fields(MessageResponse, fields)
+    messages = await async_message_crud.get_user_messages(
+        db, user_id, skip, limit, selected
+    )
+    return trusted_response(MessageResponse, messages, fields=selected)
 
 
 @router.get("/messages/unread/{user_id}", tags=["messages"])
 async def get_unread_count(
     user_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get count of unread messages for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    count = MessageService.get_unread_count(db, user_id)
+    count = await AsyncMessageService.get_unread_count(db, user_id)
     return {"unread_count": count}
 
 
@@ -105,14 +123,14 @@ async def get_unread_count(
 )
 async def mark_message_as_read(
     message_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark a message as read"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    message = MessageService.mark_as_read(db, message_id)
+    message = await AsyncMessageService.mark_as_read(db, message_id)
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
@@ -127,14 +145,14 @@ async def mark_message_as_read(
 async def mark_conversation_as_read(
     user_id: str,
     other_user_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark all messages in a conversation as read"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    count = MessageService.mark_conversation_as_read(db, user_id, other_user_id)
+    count = await AsyncMessageService.mark_conversation_as_read(db, user_id, other_user_id)
     return {"messages_marked_read": count}
 
 
@@ -142,14 +160,14 @@ async def mark_conversation_as_read(
 async def update_message(
     message_id: str,
     message_data: MessageUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Update a message"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    message = MessageService.update_message(db, message_id, message_data)
+    message = await AsyncMessageService.update_message(db, message_id, message_data)
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
@@ -160,14 +178,14 @@ async def update_message(
 @router.delete("/messages/{message_id}", tags=["messages"])
 async def delete_message(
     message_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Delete a message"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    success = MessageService.delete_message(db, message_id)
+    success = await AsyncMessageService.delete_message(db, message_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
@@ -179,7 +197,7 @@ async def delete_message(
 
 @router.get("/messages/conversations/", response_model=List[dict], tags=["messages"])
 async def get_conversations_list(
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get list of conversations for the current user (frontend compatibility)"""
@@ -188,14 +206,14 @@ async def get_conversations_list(
     
     # This is a simplified version - in a real implementation, you'd get the current user ID
     # and return their conversation list
-    conversations = MessageService.get_conversations_list(db)
+    conversations = await AsyncMessageService.get_conversations_list(db)
     return conversations
 
 
 @router.post("/messages/conversations/{user_id}/mark_read", tags=["messages"])
 async def mark_conversation_read_for_frontend(
     user_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark conversation as read (frontend compatibility endpoint)"""
@@ -205,13 +223,13 @@ async def mark_conversation_read_for_frontend(
     # Redirect to the existing endpoint
     # In a real implementation, you'd get the current user ID
     current_user_id = "123e4567-e89b-12d3-a456-426614174000"  # Mock user ID
-    count = MessageService.mark_conversation_as_read(db, current_user_id, user_id)
+    count = await AsyncMessageService.mark_conversation_as_read(db, current_user_id, user_id)
     return {"messages_marked_read": count}
 
 
 @router.get("/messages/unread/count", tags=["messages"])
 async def get_unread_count_for_frontend(
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get unread message count for current user (frontend compatibility)"""
@@ -220,6 +238,6 @@ async def get_unread_count_for_frontend(
     
     # In a real implementation, you'd get the current user ID
     current_user_id = "123e4567-e89b-12d3-a456-426614174000"  # Mock user ID
-    count = MessageService.get_unread_count(db, current_user_id)
+    count = await AsyncMessageService.get_unread_count(db, current_user_id)
     return {"unread_count": count}
 
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.api.deps import get_db_session, require_admin_auth
-from app.services.notification_service import NotificationService
+from app.api.deps import get_async_db_session, get_async_read_db_session, require_admin_auth
+from app.crud.notification import async_notification_crud
+from app.responses import parse_fields, trusted_response
+from app.services.notification_service import AsyncNotificationService
 from app.schemas.notification import (
     NotificationCreate,
     NotificationUpdate,
@@ -18,14 +20,14 @@ router = APIRouter()
 )
 async def create_notification(
     notification_data: NotificationCreate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Create a new notification"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notification = NotificationService.create_notification(db, notification_data)
+    notification = await AsyncNotificationService.create_notification(db, notification_data)
     return notification
 
 
@@ -36,14 +38,14 @@ async def create_notification(
 )
 async def get_notification(
     notification_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get a specific notification by ID"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notification = NotificationService.get_notification(db, notification_id)
+    notification = await AsyncNotificationService.get_notification(db, notification_id)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
@@ -60,15 +62,25 @@ async def get_user_notifications(
     user_id: str,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get notifications for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notifications = NotificationService.get_user_notifications(db, user_id, skip, limit)
-    return notifications
+    notifications = await async_notification_crud.get_user_notifications(
+        db, user_id, skip, limit
+    )
+    unread_count = await async_notification_crud.get_unread_count(db, user_id)
+    return trusted_response(
+        NotificationSummary,
+        {
+            "notifications": notifications,
+            "total_count": len(notifications),
+            "unread_count": unread_count,
+        },
+    )
 
 
 @router.get(
@@ -80,30 +92,34 @@ async def get_unread_notifications(
     user_id: str,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_session),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. notification_id,title"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get unread notifications for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notifications = NotificationService.get_unread_notifications(
-        db, user_id, skip, limit
+    selected = parse_fields(NotificationResponse, fields)
+    notifications = await async_notification_crud.get_unread_notifications(
+        db, user_id, skip, limit, selected
     )
-    return notifications
+    return trusted_response(NotificationResponse, notifications, fields=selected)
 
 
 @router.get("/notifications/unread/{user_id}", tags=["notifications"])
 async def get_unread_count(
     user_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get count of unread notifications for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    count = NotificationService.get_unread_count(db, user_id)
+    count = await AsyncNotificationService.get_unread_count(db, user_id)
     return {"unread_count": count}
 
 
@@ -114,14 +130,14 @@ async def get_unread_count(
 )
 async def mark_notification_as_read(
     notification_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark a notification as read"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notification = NotificationService.mark_as_read(db, notification_id)
+    notification = await AsyncNotificationService.mark_as_read(db, notification_id)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
@@ -132,14 +148,14 @@ async def mark_notification_as_read(
 @router.put("/notifications/user/{user_id}/read-all", tags=["notifications"])
 async def mark_all_notifications_as_read(
     user_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark all notifications for a user as read"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    count = NotificationService.mark_all_as_read(db, user_id)
+    count = await AsyncNotificationService.mark_all_as_read(db, user_id)
     return {"notifications_marked_read": count}
 
 
@@ -151,14 +167,14 @@ async def mark_all_notifications_as_read(
 async def update_delivery_status(
     notification_id: str,
     status: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Update delivery status of a notification"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notification = NotificationService.update_delivery_status(
+    notification = await AsyncNotificationService.update_delivery_status(
         db, notification_id, status
     )
     if not notification:
@@ -178,30 +194,34 @@ async def get_notifications_by_type(
     notification_type: str,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_session),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. notification_id,title"
+    ),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get notifications by type for a user"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notifications = NotificationService.get_by_type(
-        db, user_id, notification_type, skip, limit
+    selected = parse_fields(NotificationResponse, fields)
+    notifications = await async_notification_crud.get_by_type(
+        db, user_id, notification_type, skip, limit, selected
     )
-    return notifications
+    return trusted_response(NotificationResponse, notifications, fields=selected)
 
 
 @router.delete("/notifications/{notification_id}", tags=["notifications"])
 async def delete_notification(
     notification_id: str,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Delete a notification"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    success = NotificationService.delete_notification(db, notification_id)
+    success = await AsyncNotificationService.delete_notification(db, notification_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
@@ -213,14 +233,14 @@ async def delete_notification(
 async def update_notification(
     notification_id: str,
     notification_data: NotificationUpdate,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Update a notification"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    notification = NotificationService.update_notification(db, notification_id, notification_data)
+    notification = await AsyncNotificationService.update_notification(db, notification_id, notification_data)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
@@ -231,14 +251,14 @@ async def update_notification(
 @router.delete("/notifications/cleanup", tags=["notifications"])
 async def cleanup_old_notifications(
     days: int = 90,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Delete notifications older than specified days"""
     # Verify authentication
     require_admin_auth(authorization)
 
-    count = NotificationService.cleanup_old_notifications(db, days)
+    count = await AsyncNotificationService.cleanup_old_notifications(db, days)
     return {"notifications_deleted": count}
 
 
@@ -246,7 +266,7 @@ async def cleanup_old_notifications(
 
 @router.post("/notifications/mark_all_read", tags=["notifications"])
 async def mark_all_notifications_read_for_frontend(
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Mark all notifications as read for current user (frontend compatibility)"""
@@ -255,13 +275,13 @@ async def mark_all_notifications_read_for_frontend(
     
     # In a real implementation, you'd get the current user ID
     current_user_id = "123e4567-e89b-12d3-a456-426614174000"  # Mock user ID
-    count = NotificationService.mark_all_as_read(db, current_user_id)
+    count = await AsyncNotificationService.mark_all_as_read(db, current_user_id)
     return {"notifications_marked_read": count}
 
 
 @router.get("/notifications/unread/count", tags=["notifications"])
 async def get_unread_notification_count_for_frontend(
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
     authorization: Optional[str] = Header(None),
 ):
     """Get unread notification count for current user (frontend compatibility)"""
@@ -270,6 +290,6 @@ async def get_unread_notification_count_for_frontend(
     
     # In a real implementation, you'd get the current user ID
     current_user_id = "123e4567-e89b-12d3-a456-426614174000"  # Mock user ID
-    count = NotificationService.get_unread_count(db, current_user_id)
+    count = await AsyncNotificationService.get_unread_count(db, current_user_id)
     return {"unread_count": count}
 
@@ -1,4 +1,9 @@
-from .message import message_crud
-from .notification import notification_crud
+from .message import async_message_crud, message_crud
+from .notification import async_notification_crud, notification_crud
 
-__all__ = ["message_crud", "notification_crud"]
+__all__ = [
+    "async_message_crud",
+    "async_notification_crud",
+    "message_crud",
+    "notification_crud",
+]
@@ -1,28 +1,60 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func, select, update
 from datetime import datetime
 from app.models.message import Message
 from app.schemas.message import MessageCreate, MessageUpdate
+from app.metrics import instrument_crud
+from app.responses import load_fields
+
+
+def _message_data(obj_in: MessageCreate) -> dict:
+    # Convert message_type enum to string for SQLite compatibility
+    data = obj_in.model_dump()
+    if data.get("message_type"):
+        data["message_type"] = data["message_type"].value
+
+    # Ensure UUID fields are strings for SQLite compatibility
+    if data.get("sender_id"):
+        data["sender_id"] = str(data["sender_id"])
+    if data.get("recipient_id"):
+        data["recipient_id"] = str(data["recipient_id"])
+    if data.get("service_request_id"):
+        data["service_request_id"] = str(data["service_request_id"])
+    return data
+
+
+def _apply_update(db_obj: Message, obj_in: MessageUpdate) -> None:
+    # Update only provided fields
+    update_data = obj_in.model_dump(exclude_unset=True)
+
+    # Handle is_read status update
+    if "is_read" in update_data:
+        db_obj.is_read = update_data["is_read"]
+        if update_data["is_read"]:
+            db_obj.read_at = datetime.utcnow()
+        else:
+            db_obj.read_at = None
+
+    # Update content if provided
+    if "content" in update_data:
+        db_obj.content = update_data["content"]
+
+
+def _between(user1_id: str, user2_id: str):
+    # Ensure user IDs are strings for SQLite compatibility
+    user1_id_str, user2_id_str = str(user1_id), str(user2_id)
+    return or_(
+        and_(Message.sender_id == user1_id_str, Message.recipient_id == user2_id_str),
+        and_(Message.sender_id == user2_id_str, Message.recipient_id == user1_id_str),
+    )
 
 
 class MessageCRUD:
     def create(self, db: Session, obj_in: MessageCreate) -> Message:
         """Create a new message"""
-        # Convert message_type enum to string for SQLite compatibility
-        data = obj_in.model_dump()
-        if data.get("message_type"):
-            data["message_type"] = data["message_type"].value
-
-        # Ensure UUID fields are strings for SQLite compatibility
-        if data.get("sender_id"):
-            data["sender_id"] = str(data["sender_id"])
-        if data.get("recipient_id"):
-            data["recipient_id"] = str(data["recipient_id"])
-        if data.get("service_request_id"):
-            data["service_request_id"] = str(data["service_request_id"])
-
-        db_obj = Message(**data)
+        db_obj = Message(**_message_data(obj_in))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -133,21 +165,7 @@ class MessageCRUD:
         if not db_obj:
             return None
 
-        # Update only provided fields
-        update_data = obj_in.model_dump(exclude_unset=True)
-        
-        # Handle is_read status update
-        if "is_read" in update_data:
-            db_obj.is_read = update_data["is_read"]
-            if update_data["is_read"]:
-                db_obj.read_at = datetime.utcnow()
-            else:
-                db_obj.read_at = None
-        
-        # Update content if provided
-        if "content" in update_data:
-            db_obj.content = update_data["content"]
-
+        _apply_update(db_obj, obj_in)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -163,4 +181,128 @@ class MessageCRUD:
         return True
 
 
+class AsyncMessageCRUD:
+    """
+    MessageCRUD for AsyncSession, used by the async endpoints.
+    Column defaults are client-side and sessions do not expire on commit,
+    so written rows are returned without a refresh query.
+    """
+
+    async def create(self, db: AsyncSession, obj_in: MessageCreate) -> Message:
+        """Create a new message"""
+        db_obj = Message(**_message_data(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, message_id: str) -> Optional[Message]:
+        """Get a message by ID"""
+        return await db.scalar(select(Message).where(Message.message_id == message_id))
+
+    async def get_conversation(
+        self,
+        db: AsyncSession,
+        user1_id: str,
+        user2_id: str,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Message]:
+        """Get conversation between two users"""
+        result = await db.scalars(
+            select(Message)
+            .where(_between(user1_id, user2_id))
+            .order_by(desc(Message.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    async def get_user_messages(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Message]:
+        """
+        Get all messages for a user (sent and received); ``fields`` limits
+        the columns read
+        """
+        user_id_str = str(user_id)
+        result = await db.scalars(
+            select(Message)
+            .options(*load_fields(Message, fields))
+            .where(
+                or_(Message.sender_id == user_id_str, Message.recipient_id == user_id_str)
+            )
+            .order_by(desc(Message.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    async def get_unread_count(self, db: AsyncSession, user_id: str) -> int:
+        """Get count of unread messages for a user"""
+        return await db.scalar(
+            select(func.count())
+            .select_from(Message)
+            .where(Message.recipient_id == str(user_id), Message.is_read == False)
+        )
+
+    async def mark_as_read(self, db: AsyncSession, message_id: str) -> Optional[Message]:
+        """Mark a message as read"""
+        db_obj = await self.get(db, message_id)
+        if not db_obj:
+            return None
+
+        db_obj.is_read = True
+        db_obj.read_at = datetime.utcnow()
+        await db.commit()
+        return db_obj
+
+    async def mark_conversation_as_read(
+        self, db: AsyncSession, user_id: str, other_user_id: str
+    ) -> int:
+        """Mark all messages in a conversation as read"""
+        result = await db.execute(
+            update(Message)
+            .where(
+                Message.sender_id == str(other_user_id),
+                Message.recipient_id == str(user_id),
+                Message.is_read == False,
+            )
+            .values(is_read=True, read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def update(
+        self, db: AsyncSession, message_id: str, obj_in: MessageUpdate
+    ) -> Optional[Message]:
+        """Update a message"""
+        db_obj = await self.get(db, message_id)
+        if not db_obj:
+            return None
+
+        _apply_update(db_obj, obj_in)
+        await db.commit()
+        return db_obj
+
+    async def delete(self, db: AsyncSession, message_id: str) -> bool:
+        """Delete a message"""
+        db_obj = await self.get(db, message_id)
+        if not db_obj:
+            return False
+
+        await db.delete(db_obj)
+        await db.commit()
+        return True
+
+
 message_crud = MessageCRUD()
+async_message_crud = AsyncMessageCRUD()
+
+
+instrument_crud(__name__)
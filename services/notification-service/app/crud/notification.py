@@ -1,30 +1,62 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, delete, desc, func, select, update
 from datetime import datetime, timedelta
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate, NotificationUpdate
+from app.metrics import instrument_crud
+from app.responses import load_fields
+
+
+def _notification_data(obj_in: NotificationCreate) -> dict:
+    # Convert enum values to strings for SQLite compatibility
+    data = obj_in.model_dump()
+    if data.get("notification_type"):
+        data["notification_type"] = data["notification_type"].value
+    if data.get("delivery_method"):
+        data["delivery_method"] = data["delivery_method"].value
+    if data.get("delivery_status"):
+        data["delivery_status"] = data["delivery_status"].value
+
+    # Ensure UUID fields are strings for SQLite compatibility
+    if data.get("user_id"):
+        data["user_id"] = str(data["user_id"])
+    if data.get("related_id"):
+        data["related_id"] = str(data["related_id"])
+    return data
+
+
+def _apply_update(db_obj: Notification, obj_in: NotificationUpdate) -> None:
+    # Update only provided fields
+    update_data = obj_in.model_dump(exclude_unset=True)
+
+    # Handle is_read status update
+    if "is_read" in update_data:
+        db_obj.is_read = update_data["is_read"]
+        if update_data["is_read"]:
+            db_obj.read_at = datetime.utcnow()
+        else:
+            db_obj.read_at = None
+
+    # Update other fields if provided
+    if "title" in update_data:
+        db_obj.title = update_data["title"]
+    if "content" in update_data:
+        db_obj.content = update_data["content"]
+    if "delivery_status" in update_data:
+        db_obj.delivery_status = update_data["delivery_status"].value if hasattr(update_data["delivery_status"], 'value') else update_data["delivery_status"]
+
+
+def _unread(user_id: str):
+    # Ensure user_id is a string for SQLite compatibility
+    return and_(Notification.user_id == str(user_id), Notification.is_read == False)
 
 
 class NotificationCRUD:
     def create(self, db: Session, obj_in: NotificationCreate) -> Notification:
         """Create a new notification"""
-        # Convert enum values to strings for SQLite compatibility
-        data = obj_in.model_dump()
-        if data.get("notification_type"):
-            data["notification_type"] = data["notification_type"].value
-        if data.get("delivery_method"):
-            data["delivery_method"] = data["delivery_method"].value
-        if data.get("delivery_status"):
-            data["delivery_status"] = data["delivery_status"].value
-
-        # Ensure UUID fields are strings for SQLite compatibility
-        if data.get("user_id"):
-            data["user_id"] = str(data["user_id"])
-        if data.get("related_id"):
-            data["related_id"] = str(data["related_id"])
-
-        db_obj = Notification(**data)
+        db_obj = Notification(**_notification_data(obj_in))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -167,25 +199,7 @@ class NotificationCRUD:
         if not db_obj:
             return None
 
-        # Update only provided fields
-        update_data = obj_in.model_dump(exclude_unset=True)
-        
-        # Handle is_read status update
-        if "is_read" in update_data:
-            db_obj.is_read = update_data["is_read"]
-            if update_data["is_read"]:
-                db_obj.read_at = datetime.utcnow()
-            else:
-                db_obj.read_at = None
-        
-        # Update other fields if provided
-        if "title" in update_data:
-            db_obj.title = update_data["title"]
-        if "content" in update_data:
-            db_obj.content = update_data["content"]
-        if "delivery_status" in update_data:
-            db_obj.delivery_status = update_data["delivery_status"].value if hasattr(update_data["delivery_status"], 'value') else update_data["delivery_status"]
-
+        _apply_update(db_obj, obj_in)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -202,4 +216,162 @@ class NotificationCRUD:
         return result
 
 
+class AsyncNotificationCRUD:
+    """
+    NotificationCRUD for AsyncSession, used by the async endpoints.
+    Column defaults are client-side and sessions do not expire on commit,
+    so written rows are returned without a refresh query.
+    """
+
+    async def create(self, db: AsyncSession, obj_in: NotificationCreate) -> Notification:
+        """Create a new notification"""
+        db_obj = Notification(**_notification_data(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def get(self, db: AsyncSession, notification_id: str) -> Optional[Notification]:
+        """Get a notification by ID"""
+        return await db.scalar(
+            select(Notification).where(Notification.notification_id == notification_id)
+        )
+
+    async def get_user_notifications(
+        self, db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+    ) -> List[Notification]:
+        """Get notifications for a user"""
+        result = await db.scalars(
+            select(Notification)
+            .where(Notification.user_id == str(user_id))
+            .order_by(desc(Notification.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    async def get_unread_notifications(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Notification]:
+        """
+        Get unread notifications for a user; ``fields`` limits the columns
+        read
+        """
+        result = await db.scalars(
+            select(Notification)
+            .options(*load_fields(Notification, fields))
+            .where(_unread(user_id))
+            .order_by(desc(Notification.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    async def get_unread_count(self, db: AsyncSession, user_id: str) -> int:
+        """Get count of unread notifications for a user"""
+        return await db.scalar(
+            select(func.count()).select_from(Notification).where(_unread(user_id))
+        )
+
+    async def mark_as_read(
+        self, db: AsyncSession, notification_id: str
+    ) -> Optional[Notification]:
+        """Mark a notification as read"""
+        db_obj = await self.get(db, notification_id)
+        if not db_obj:
+            return None
+
+        db_obj.is_read = True
+        db_obj.read_at = datetime.utcnow()
+        await db.commit()
+        return db_obj
+
+    async def mark_all_as_read(self, db: AsyncSession, user_id: str) -> int:
+        """Mark all notifications for a user as read"""
+        result = await db.execute(
+            update(Notification)
+            .where(_unread(user_id))
+            .values(is_read=True, read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def update_delivery_status(
+        self, db: AsyncSession, notification_id: str, status: str
+    ) -> Optional[Notification]:
+        """Update delivery status of a notification"""
+        db_obj = await self.get(db, notification_id)
+        if not db_obj:
+            return None
+
+        db_obj.delivery_status = status
+        await db.commit()
+        return db_obj
+
+    async def get_by_type(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        notification_type: str,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Notification]:
+        """Get notifications by type for a user"""
+        result = await db.scalars(
+            select(Notification)
+            .options(*load_fields(Notification, fields))
+            .where(
+                Notification.user_id == str(user_id),
+                Notification.notification_type == notification_type,
+            )
+            .order_by(desc(Notification.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result)
+
+    async def delete(self, db: AsyncSession, notification_id: str) -> bool:
+        """Delete a notification"""
+        db_obj = await self.get(db, notification_id)
+        if not db_obj:
+            return False
+
+        await db.delete(db_obj)
+        await db.commit()
+        return True
+
+    async def update(
+        self, db: AsyncSession, notification_id: str, obj_in: NotificationUpdate
+    ) -> Optional[Notification]:
+        """Update a notification"""
+        db_obj = await self.get(db, notification_id)
+        if not db_obj:
+            return None
+
+        _apply_update(db_obj, obj_in)
+        await db.commit()
+        return db_obj
+
+    async def cleanup_old_notifications(self, db: AsyncSession, days: int = 90) -> int:
+        """Delete notifications older than specified days"""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        result = await db.execute(
+            delete(Notification)
+            .where(Notification.created_at < cutoff_date)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+
 notification_crud = NotificationCRUD()
+async_notification_crud = AsyncNotificationCRUD()
+
+
+instrument_crud(__name__)
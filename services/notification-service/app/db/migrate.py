@@ -0,0 +1,24 @@
+"""
+Schema setup for the notification-service-migrate Job, run once per rollout instead of at
+import time in every pod:
+
+    python -m app.db.migrate
+
+notification-service has no Alembic history yet, so missing tables are created from the
+models; existing tables are left as they are.
+"""
+
+import time
+
+import app.db.init_db  # noqa: F401  (registers the models)
+from app.db.base import Base, engine
+
+
+def migrate() -> None:
+    Base.metadata.create_all(bind=engine)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    migrate()
+    print(f"[MIGRATE] schema up to date in {time.perf_counter() - started:.2f}s")
@@ -1,5 +1,11 @@
-from .message_service import MessageService
-from .notification_service import NotificationService
+from .message_service import AsyncMessageService, MessageService
+from .notification_service import AsyncNotificationService, NotificationService
 from .event_service import EventService
 
-__all__ = ["MessageService", "NotificationService", "EventService"]
+__all__ = [
+    "AsyncMessageService",
+    "AsyncNotificationService",
+    "MessageService",
+    "NotificationService",
+    "EventService",
+]
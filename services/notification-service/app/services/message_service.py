@@ -1,6 +1,7 @@
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.crud.message import message_crud
+from app.crud.message import async_message_crud, message_crud
 from app.schemas.message import (
     MessageCreate,
     MessageUpdate,
@@ -72,3 +73,78 @@ class MessageService:
     def delete_message(db: Session, message_id: str) -> bool:
         """Delete a message"""
         return message_crud.delete(db, message_id)
+
+
+class AsyncMessageService:
+    """MessageService on AsyncSession, for the async endpoints"""
+
+    @staticmethod
+    async def create_message(
+        db: AsyncSession, message_data: MessageCreate
+    ) -> MessageResponse:
+        """Create a new message"""
+        message = await async_message_crud.create(db, message_data)
+        return MessageResponse.model_validate(message)
+
+    @staticmethod
+    async def get_message(db: AsyncSession, message_id: str) -> Optional[MessageResponse]:
+        """Get a message by ID"""
+        message = await async_message_crud.get(db, message_id)
+        return MessageResponse.model_validate(message) if message else None
+
+    @staticmethod
+    async def get_conversation(
+        db: AsyncSession, user1_id: str, user2_id: str, skip: int = 0, limit: int = 50
+    ) -> ConversationResponse:
+        """Get conversation between two users"""
+        messages = await async_message_crud.get_conversation(
+            db, user1_id, user2_id, skip, limit
+        )
+        unread_count = await async_message_crud.get_unread_count(db, user1_id)
+
+        return ConversationResponse(
+            messages=[MessageResponse.model_validate(msg) for msg in messages],
+            total_count=len(messages),
+            unread_count=unread_count,
+        )
+
+    @staticmethod
+    async def get_user_messages(
+        db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+    ) -> List[MessageResponse]:
+        """Get all messages for a user"""
+        messages = await async_message_crud.get_user_messages(db, user_id, skip, limit)
+        return [MessageResponse.model_validate(msg) for msg in messages]
+
+    @staticmethod
+    async def get_unread_count(db: AsyncSession, user_id: str) -> int:
+        """Get count of unread messages for a user"""
+        return await async_message_crud.get_unread_count(db, user_id)
+
+    @staticmethod
+    async def mark_as_read(db: AsyncSession, message_id: str) -> Optional[MessageResponse]:
+        """Mark a message as read"""
+        message = await async_message_crud.mark_as_read(db, message_id)
+        return MessageResponse.model_validate(message) if message else None
+
+    @staticmethod
+    async def mark_conversation_as_read(
+        db: AsyncSession, user_id: str, other_user_id: str
+    ) -> int:
+        """Mark all messages in a conversation as read"""
+        return await async_message_crud.mark_conversation_as_read(
+            db, user_id, other_user_id
+        )
+
+    @staticmethod
+    async def update_message(
+        db: AsyncSession, message_id: str, message_data: MessageUpdate
+    ) -> Optional[MessageResponse]:
+        """Update a message"""
+        message = await async_message_crud.update(db, message_id, message_data)
+        return MessageResponse.model_validate(message) if message else None
+
+    @staticmethod
+    async def delete_message(db: AsyncSession, message_id: str) -> bool:
+        """Delete a message"""
+        return await async_message_crud.delete(db, message_id)
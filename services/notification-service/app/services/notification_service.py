@@ -1,6 +1,7 @@
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.crud.notification import notification_crud
+from app.crud.notification import async_notification_crud, notification_crud
 from app.schemas.notification import (
     NotificationCreate,
     NotificationUpdate,
@@ -119,3 +120,119 @@ class NotificationService:
     def cleanup_old_notifications(db: Session, days: int = 90) -> int:
         """Delete notifications older than specified days"""
         return notification_crud.cleanup_old_notifications(db, days)
+
+
+class AsyncNotificationService:
+    """NotificationService on AsyncSession, for the async endpoints"""
+
+    @staticmethod
+    async def create_notification(
+        db: AsyncSession, notification_data: NotificationCreate
+    ) -> NotificationResponse:
+        """Create a new notification"""
+        notification = await async_notification_crud.create(db, notification_data)
+        return NotificationResponse.model_validate(notification)
+
+    @staticmethod
+    async def get_notification(
+        db: AsyncSession, notification_id: str
+    ) -> Optional[NotificationResponse]:
+        """Get a notification by ID"""
+        notification = await async_notification_crud.get(db, notification_id)
+        return (
+            NotificationResponse.model_validate(notification) if notification else None
+        )
+
+    @staticmethod
+    async def get_user_notifications(
+        db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+    ) -> NotificationSummary:
+        """Get notifications for a user"""
+        notifications = await async_notification_crud.get_user_notifications(
+            db, user_id, skip, limit
+        )
+        unread_count = await async_notification_crud.get_unread_count(db, user_id)
+
+        return NotificationSummary(
+            notifications=[
+                NotificationResponse.model_validate(notif) for notif in notifications
+            ],
+            total_count=len(notifications),
+            unread_count=unread_count,
+        )
+
+    @staticmethod
+    async def get_unread_notifications(
+        db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+    ) -> List[NotificationResponse]:
+        """Get unread notifications for a user"""
+        notifications = await async_notification_crud.get_unread_notifications(
+            db, user_id, skip, limit
+        )
+        return [NotificationResponse.model_validate(notif) for notif in notifications]
+
+    @staticmethod
+    async def get_unread_count(db: AsyncSession, user_id: str) -> int:
+        """Get count of unread notifications for a user"""
+        return await async_notification_crud.get_unread_count(db, user_id)
+
+    @staticmethod
+    async def mark_as_read(
+        db: AsyncSession, notification_id: str
+    ) -> Optional[NotificationResponse]:
+        """Mark a notification as read"""
+        notification = await async_notification_crud.mark_as_read(db, notification_id)
+        return (
+            NotificationResponse.model_validate(notification) if notification else None
+        )
+
+    @staticmethod
+    async def mark_all_as_read(db: AsyncSession, user_id: str) -> int:
+        """Mark all notifications for a user as read"""
+        return await async_notification_crud.mark_all_as_read(db, user_id)
+
+    @staticmethod
+    async def update_delivery_status(
+        db: AsyncSession, notification_id: str, status: str
+    ) -> Optional[NotificationResponse]:
+        """Update delivery status of a notification"""
+        notification = await async_notification_crud.update_delivery_status(
+            db, notification_id, status
+        )
+        return (
+            NotificationResponse.model_validate(notification) if notification else None
+        )
+
+    @staticmethod
+    async def get_by_type(
+        db: AsyncSession,
+        user_id: str,
+        notification_type: str,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[NotificationResponse]:
+        """Get notifications by type for a user"""
+        notifications = await async_notification_crud.get_by_type(
+            db, user_id, notification_type, skip, limit
+        )
+        return [NotificationResponse.model_validate(notif) for notif in notifications]
+
+    @staticmethod
+    async def delete_notification(db: AsyncSession, notification_id: str) -> bool:
+        """Delete a notification"""
+        return await async_notification_crud.delete(db, notification_id)
+
+    @staticmethod
+    async def update_notification(
+        db: AsyncSession, notification_id: str, notification_data: NotificationUpdate
+    ) -> Optional[NotificationResponse]:
+        """Update a notification"""
+        notification = await async_notification_crud.update(
+            db, notification_id, notification_data
+        )
+        return NotificationResponse.model_validate(notification) if notification else None
+
+    @staticmethod
+    async def cleanup_old_notifications(db: AsyncSession, days: int = 90) -> int:
+        """Delete notifications older than specified days"""
+        return await async_notification_crud.cleanup_old_notifications(db, days)
@@ -1,4 +1,5 @@
 import pytest
+import pytest_asyncio
 import os
 
 # Set testing environment EARLY before importing app modules
@@ -37,3 +38,12 @@ def db_session():
         yield session
     finally:
         session.close()
+
+
+@pytest_asyncio.fixture
+async def async_db_session():
+    """Provide an async database session on the same test database"""
+    from app.db.base import get_async_db
+
+    async for session in get_async_db():
+        yield session
@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+from app.main import app
+from app.schemas.message import MessageCreate, MessageType
+from app.schemas.notification import (
+    DeliveryMethod,
+    NotificationCreate,
+    NotificationType,
+)
+from app.services.message_service import AsyncMessageService
+from app.services.notification_service import AsyncNotificationService
+
+USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+OTHER_USER_ID = "550e8400-e29b-41d4-a716-446655440001"
+
+
+def notification_data(title="Welcome to Our Platform!"):
+    return NotificationCreate(
+        user_id=USER_ID,
+        notification_type=NotificationType.WELCOME,
+        title=title,
+        content="Hi User, welcome to our platform!",
+        delivery_method=DeliveryMethod.EMAIL,
+    )
+
+
+class TestAsyncNotificationService:
+    """AsyncNotificationService against the test database"""
+
+    @pytest.mark.asyncio
+    async def test_create_read_and_mark(self, async_db_session):
+        created = await AsyncNotificationService.create_notification(
+            async_db_session, notification_data()
+        )
+        await AsyncNotificationService.create_notification(
+            async_db_session, notification_data("Second")
+        )
+
+        fetched = await AsyncNotificationService.get_notification(
+            async_db_session, str(created.notification_id)
+        )
+        assert fetched.title == created.title
+        assert await AsyncNotificationService.get_unread_count(async_db_session, USER_ID) == 2
+
+        read = await AsyncNotificationService.mark_as_read(
+            async_db_session, str(created.notification_id)
+        )
+        assert read.is_read is True and read.read_at is not None
+        assert await AsyncNotificationService.mark_all_as_read(async_db_session, USER_ID) == 1
+
+        summary = await AsyncNotificationService.get_user_notifications(
+            async_db_session, USER_ID
+        )
+        assert summary.total_count == 2
+        assert summary.unread_count == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_missing_notification(self, async_db_session):
+        assert not await AsyncNotificationService.delete_notification(
+            async_db_session, "non-existent-id"
+        )
+
+
+class TestAsyncMessageService:
+    """AsyncMessageService against the test database"""
+
+    @pytest.mark.asyncio
+    async def test_conversation(self, async_db_session):
+        for sender, recipient in ((USER_ID, OTHER_USER_ID), (OTHER_USER_ID, USER_ID)):
+            await AsyncMessageService.create_message(
+                async_db_session,
+                MessageCreate(
+                    sender_id=sender,
+                    recipient_id=recipient,
+                    message_type=MessageType.DIRECT,
+                    content="Hello",
+                ),
+            )
+
+        conversation = await AsyncMessageService.get_conversation(
+            async_db_session, USER_ID, OTHER_USER_ID
+        )
+        assert conversation.total_count == 2
+        assert conversation.unread_count == 1
+
+        marked = await AsyncMessageService.mark_conversation_as_read(
+            async_db_session, USER_ID, OTHER_USER_ID
+        )
+        assert marked == 1
+        assert await AsyncMessageService.get_unread_count(async_db_session, USER_ID) == 0
+
+
+@pytest.mark.asyncio
+async def test_endpoints_serve_concurrent_requests():
+    """Requests overlap on one event loop instead of queueing behind each other"""
+    headers = {"Authorization": "admin_test_token"}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        created = await asyncio.gather(
+            *(
+                client.post(
+                    "/api/v1/notifications",
+                    json=notification_data(f"n{i}").model_dump(mode="json"),
+                    headers=headers,
+                )
+                for i in range(20)
+            )
+        )
+        assert all(r.status_code == 200 for r in created)
+
+        response = await client.get(
+            f"/api/v1/notifications/unread/{USER_ID}", headers=headers
+        )
+    assert response.json() == {"unread_count": 20}
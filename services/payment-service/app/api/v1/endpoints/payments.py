@@ -1,23 +1,25 @@
 from typing import Optional
 from uuid import UUID
 
-import stripe
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.payment import (
     PaymentHistoryResponse,
     PaymentProcess,
     PaymentProcessResponse,
+    PaymentSummaryResponse,
     RefundCreate,
     RefundResponse,
 )
 from app.schemas.payment_method import (
     PaymentMethodCreate,
+    PaymentMethodListResponse,
     PaymentMethodOut,
     PaymentMethodUpdate,
 )
 from app.services.payment_method_service import PaymentMethodService
 from app.services.payment_service import PaymentService
 from app.services.paypal_service import PayPalService
+from app.services.sdks import stripe
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
@@ -77,12 +79,12 @@ class PayPalCreateOrderOut(BaseModel):
 
 
 @router.post("/process", response_model=PaymentProcessResponse)
-def process_payment(payment_in: PaymentProcess, db: Session = Depends(get_db)):
+async def process_payment(payment_in: PaymentProcess, db: Session = Depends(get_db)):
     """
     Process a new payment
     """
     try:
-        payment = PaymentService.process_payment(db, payment_in)
+        payment = await PaymentService.process_payment(db, payment_in)
         return PaymentProcessResponse(
             payment_id=payment.payment_id,
             status=payment.payment_status,
@@ -103,19 +105,27 @@ def get_payment_history(
     user_id: UUID = Query(..., description="User ID to get payment history for"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (keyset paging)"
+    ),
+    db: Session = Depends(get_read_db),
 ):
     """
     Get payment history for a user with pagination
     """
     try:
-        result = PaymentService.get_payment_history(db, user_id, page, page_size)
+        result = PaymentService.get_payment_history(
+            db, user_id, page, page_size, cursor=cursor
+        )
         return PaymentHistoryResponse(
             payments=result["payments"],
             total_count=result["total_count"],
             page=result["page"],
             page_size=result["page_size"],
+            next_cursor=result.get("next_cursor"),
         )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -123,8 +133,26 @@ def get_payment_history(
         )
 
 
+@router.get("/summary", response_model=PaymentSummaryResponse)
+def get_payment_summary(
+    user_id: UUID = Query(..., description="User ID to get the payment summary for"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Get precomputed payment totals (by status, by method, refunds) and the most
+    recent payments for a user
+    """
+    try:
+        return PaymentService.get_payment_summary(db, user_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get payment summary: {str(e)}",
+        )
+
+
 @router.post("/{payment_id}/refund", response_model=RefundResponse)
-def process_refund(
+async def process_refund(
     payment_id: UUID,
     refund_in: RefundCreate,
     admin_id: UUID = Query(..., description="Admin ID processing the refund"),
@@ -134,7 +162,9 @@ def process_refund(
     Process a refund for a payment (admin only)
     """
     try:
-        result = PaymentService.process_refund(db, payment_id, refund_in, admin_id)
+        result = await PaymentService.process_refund(
+            db, payment_id, refund_in, admin_id
+        )
         return RefundResponse(
             refund_id=result["refund_id"],
             status=result["status"],
@@ -150,14 +180,14 @@ def process_refund(
 
 
 @router.post("/paypal/execute")
-def execute_paypal_payment(
+async def execute_paypal_payment(
     payment_id: str = Query(..., description="Payment ID"),
     payer_id: str = Query(..., description="PayPal Payer ID"),
     db: Session = Depends(get_db),
 ):
     """Execute a PayPal payment after user approval"""
     try:
-        payment = PayPalService.execute_payment(db, payment_id, payer_id)
+        payment = await PayPalService.execute_payment(db, payment_id, payer_id)
         return PaymentProcessResponse(
             payment_id=payment.payment_id,
             status=payment.payment_status,
@@ -592,7 +622,10 @@ def delete_payment_method_for_frontend(
 def get_transactions_for_frontend(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (keyset paging)"
+    ),
+    db: Session = Depends(get_read_db),
     current_user_id: UUID = Depends(get_current_user_id),
 ):
     """
@@ -600,14 +633,17 @@ def get_transactions_for_frontend(
     """
     try:
         result = PaymentService.get_payment_history(
-            db, current_user_id, page, page_size
+            db, current_user_id, page, page_size, cursor=cursor
         )
         return PaymentHistoryResponse(
             payments=result["payments"],
             total_count=result["total_count"],
             page=result["page"],
             page_size=result["page_size"],
+            next_cursor=result.get("next_cursor"),
         )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -618,7 +654,7 @@ def get_transactions_for_frontend(
 @router.get("/transactions/{transaction_id}", response_model=TransactionOut)
 def get_transaction_for_frontend(
     transaction_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user_id: UUID = Depends(get_current_user_id),
 ):
     """
@@ -0,0 +1,59 @@
+from app.core.config import settings
+from app.models.webhook_event import WebhookProvider
+from app.services.webhook_service import (
+    PAYPAL_SIGNATURE_HEADERS,
+    WebhookQueue,
+    verify_stripe_signature,
+)
+from fastapi import APIRouter, HTTPException, Request, status
+
+router = APIRouter()
+
+
+def _enqueue(provider: str, payload: bytes, headers: dict) -> dict:
+    try:
+        message_id = WebhookQueue.enqueue(provider, payload, headers)
+    except Exception as e:
+        # Not queued: let the provider retry delivery
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Webhook queue unavailable: {str(e)}",
+        )
+    return {"received": True, "queue_id": message_id}
+
+
+@router.post("/stripe")
+async def stripe_webhook(request: Request):
+    """
+    Receive a Stripe webhook: verify the signature and queue the raw event.
+    State transitions are applied asynchronously by the webhook workers.
+    """
+    payload = await request.body()
+    if not verify_stripe_signature(
+        payload,
+        request.headers.get("stripe-signature"),
+        settings.stripe_webhook_secret,
+        settings.stripe_webhook_tolerance_seconds,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Stripe signature",
+        )
+    return _enqueue(WebhookProvider.STRIPE.value, payload, {})
+
+
+@router.post("/paypal")
+async def paypal_webhook(request: Request):
+    """
+    Receive a PayPal webhook and queue the raw event with its transmission
+    headers. PayPal signatures are verified against the PayPal API by the
+    webhook workers, keeping the provider round trip off the intake path.
+    """
+    headers = {name: request.headers.get(name) for name in PAYPAL_SIGNATURE_HEADERS}
+    if not all(headers.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing PayPal transmission headers",
+        )
+    payload = await request.body()
+    return _enqueue(WebhookProvider.PAYPAL.value, payload, headers)
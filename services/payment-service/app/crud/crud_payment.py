@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy import and_, desc, or_
+from typing import List, Optional, Tuple
+from datetime import datetime
 from uuid import UUID
+import base64
 from ..models.payment import (
     Payment,
     PaymentHistory,
@@ -16,6 +18,12 @@ from ..schemas.payment import (
     RefundCreate,
     RefundUpdate,
 )
+from .crud_payment_summary import (
+    record_payment_created,
+    record_refund_completed,
+    record_status_change,
+)
+from ..metrics import instrument_crud
 
 
 def create_payment(db: Session, payment_in: PaymentCreate) -> Payment:
@@ -28,6 +36,7 @@ def create_payment(db: Session, payment_in: PaymentCreate) -> Payment:
         payment_status=PaymentStatus.PENDING,
     )
     db.add(payment)
+    record_payment_created(db, payment)
     db.commit()
     db.refresh(payment)
     return payment
@@ -50,6 +59,47 @@ def get_payments_by_user(
     )
 
 
+def encode_payment_cursor(payment: Payment) -> str:
+    raw = f"{payment.created_at.isoformat()}|{payment.payment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_payment_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, payment_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(payment_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_payments_by_user_after(
+    db: Session, user_id: UUID, cursor: Optional[str] = None, limit: int = 20
+) -> List[Payment]:
+    """
+    Keyset page of a payer's payments, newest first. ``cursor`` is the value
+    returned for the last row of the previous page; no OFFSET scan is needed.
+    """
+    query = db.query(Payment).filter(Payment.payer_id == user_id)
+    if cursor:
+        created_at, payment_id = decode_payment_cursor(cursor)
+        query = query.filter(
+            or_(
+                Payment.created_at < created_at,
+                and_(
+                    Payment.created_at == created_at,
+                    Payment.payment_id < payment_id,
+                ),
+            )
+        )
+    return (
+        query.order_by(desc(Payment.created_at), desc(Payment.payment_id))
+        .limit(limit)
+        .all()
+    )
+
+
 def get_payments_by_request(db: Session, request_id: UUID) -> List[Payment]:
     return db.query(Payment).filter(Payment.request_id == request_id).all()
 
@@ -57,11 +107,23 @@ def get_payments_by_request(db: Session, request_id: UUID) -> List[Payment]:
 def update_payment(
     db: Session, payment_id: UUID, payment_update: PaymentUpdate
 ) -> Optional[Payment]:
-    payment = get_payment_by_id(db, payment_id)
+    # Locked and re-read, so a concurrent webhook cannot move the payment out
+    # of the status its summary bucket is decremented for
+    payment = (
+        db.query(Payment)
+        .filter(Payment.payment_id == payment_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
     if not payment:
         return None
 
     update_data = payment_update.dict(exclude_unset=True)
+    if "payment_status" in update_data:
+        record_status_change(
+            db, payment, payment.payment_status, update_data["payment_status"]
+        )
     for field, value in update_data.items():
         setattr(payment, field, value)
 
@@ -118,6 +180,11 @@ def update_refund(
         return None
 
     update_data = refund_update.dict(exclude_unset=True)
+    if (
+        update_data.get("status") == RefundStatus.COMPLETED
+        and refund.status != RefundStatus.COMPLETED
+    ):
+        record_refund_completed(db, refund.payment, refund.amount)
     for field, value in update_data.items():
         setattr(refund, field, value)
 
@@ -128,3 +195,6 @@ def update_refund(
 
 def get_refunds_by_payment(db: Session, payment_id: UUID) -> List[Refund]:
     return db.query(Refund).filter(Refund.payment_id == payment_id).all()
+
+
+instrument_crud(__name__)
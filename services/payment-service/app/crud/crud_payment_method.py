@@ -5,6 +5,7 @@ from uuid import UUID
 
 from ..models.payment_method import UserPaymentMethod, PaymentMethodUsage
 from ..schemas.payment_method import PaymentMethodCreate, PaymentMethodUpdate
+from ..metrics import instrument_crud
 
 
 def create_payment_method(
@@ -218,3 +219,6 @@ def get_payment_method_usage_history(
         .limit(limit)
         .all()
     )
+
+
+instrument_crud(__name__)
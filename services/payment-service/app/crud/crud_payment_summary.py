@@ -0,0 +1,195 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+from ..models.payment import Payment, Refund, RefundStatus
+from ..models.payment_summary import PaymentSummary, SummaryDimension
+from ..metrics import instrument_crud
+
+
+def _value(enum_or_str) -> str:
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+def apply_summary_delta(
+    db: Session,
+    user_id: UUID,
+    dimension: str,
+    bucket: str,
+    count_delta: int,
+    amount_delta: Decimal,
+) -> None:
+    """
+    Add to one summary bucket in the caller's transaction (no commit).
+    A single INSERT ... ON CONFLICT DO UPDATE adds to the bucket in SQL, so
+    concurrent transitions neither lose updates nor race to create the row.
+    """
+    insert = (
+        postgresql.insert
+        if db.get_bind().dialect.name == "postgresql"
+        else sqlite.insert
+    )
+    stmt = insert(PaymentSummary).values(
+        user_id=user_id,
+        dimension=dimension,
+        bucket=bucket,
+        payment_count=count_delta,
+        amount=amount_delta,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "dimension", "bucket"],
+            set_={
+                "payment_count": PaymentSummary.payment_count
+                + stmt.excluded.payment_count,
+                "amount": PaymentSummary.amount + stmt.excluded.amount,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def record_payment_created(db: Session, payment: Payment) -> None:
+    amount = Decimal(payment.amount)
+    apply_summary_delta(db, payment.payer_id, SummaryDimension.TOTAL, "all", 1, amount)
+    apply_summary_delta(
+        db,
+        payment.payer_id,
+        SummaryDimension.STATUS,
+        _value(payment.payment_status),
+        1,
+        amount,
+    )
+    apply_summary_delta(
+        db,
+        payment.payer_id,
+        SummaryDimension.METHOD,
+        _value(payment.payment_method),
+        1,
+        amount,
+    )
+
+
+def record_status_change(db: Session, payment: Payment, old_status, new_status) -> None:
+    """Move a payment between status buckets; no-op if the status is unchanged"""
+    old_status, new_status = _value(old_status), _value(new_status)
+    if old_status == new_status:
+        return
+    amount = Decimal(payment.amount)
+    apply_summary_delta(
+        db, payment.payer_id, SummaryDimension.STATUS, old_status, -1, -amount
+    )
+    apply_summary_delta(
+        db, payment.payer_id, SummaryDimension.STATUS, new_status, 1, amount
+    )
+
+
+def record_refund_completed(db: Session, payment: Payment, amount: Decimal) -> None:
+    apply_summary_delta(
+        db, payment.payer_id, SummaryDimension.REFUND, "completed", 1, Decimal(amount)
+    )
+
+
+def get_payment_summary(db: Session, user_id: UUID) -> dict:
+    """Read every bucket of a user's summary (a handful of rows, one PK range)"""
+    summary = {
+        "user_id": user_id,
+        "total_count": 0,
+        "total_amount": Decimal("0"),
+        "by_status": {},
+        "by_method": {},
+        "refunded_count": 0,
+        "refunded_amount": Decimal("0"),
+    }
+    rows = db.query(PaymentSummary).filter(PaymentSummary.user_id == user_id).all()
+    for row in rows:
+        bucket = {"count": row.payment_count, "amount": Decimal(row.amount)}
+        if row.dimension == SummaryDimension.TOTAL:
+            summary["total_count"] = bucket["count"]
+            summary["total_amount"] = bucket["amount"]
+        elif row.dimension == SummaryDimension.STATUS:
+            # Statuses every payment has since left are kept at zero; hide them
+            if bucket["count"]:
+                summary["by_status"][row.bucket] = bucket
+        elif row.dimension == SummaryDimension.METHOD:
+            summary["by_method"][row.bucket] = bucket
+        elif row.dimension == SummaryDimension.REFUND:
+            summary["refunded_count"] = bucket["count"]
+            summary["refunded_amount"] = bucket["amount"]
+    return summary
+
+
+def get_payment_count(db: Session, user_id: UUID) -> int:
+    row = (
+        db.query(PaymentSummary.payment_count)
+        .filter(
+            PaymentSummary.user_id == user_id,
+            PaymentSummary.dimension == SummaryDimension.TOTAL,
+            PaymentSummary.bucket == "all",
+        )
+        .first()
+    )
+    return row[0] if row else 0
+
+
+def rebuild_payment_summary(db: Session, user_id: Optional[UUID] = None) -> int:
+    """
+    Recompute summaries from the payments and refunds tables (backfill or
+    repair). Rebuilds one user, or every user when ``user_id`` is None.
+    Returns the number of summary rows written.
+    """
+    delete_query = db.query(PaymentSummary)
+    if user_id is not None:
+        delete_query = delete_query.filter(PaymentSummary.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    def grouped(*bucket_columns):
+        columns = (Payment.payer_id,) + bucket_columns
+        query = db.query(
+            *columns,
+            func.count(Payment.payment_id),
+            func.coalesce(func.sum(Payment.amount), 0),
+        )
+        if user_id is not None:
+            query = query.filter(Payment.payer_id == user_id)
+        return query.group_by(*columns).all()
+
+    rows = []
+    for payer_id, count, amount in grouped():
+        rows.append((payer_id, SummaryDimension.TOTAL, "all", count, amount))
+    for payer_id, status, count, amount in grouped(Payment.payment_status):
+        rows.append((payer_id, SummaryDimension.STATUS, status, count, amount))
+    for payer_id, method, count, amount in grouped(Payment.payment_method):
+        rows.append((payer_id, SummaryDimension.METHOD, method, count, amount))
+
+    refunds = (
+        db.query(
+            Payment.payer_id,
+            func.count(Refund.refund_id),
+            func.coalesce(func.sum(Refund.amount), 0),
+        )
+        .join(Refund, Refund.payment_id == Payment.payment_id)
+        .filter(Refund.status == RefundStatus.COMPLETED)
+    )
+    if user_id is not None:
+        refunds = refunds.filter(Payment.payer_id == user_id)
+    for payer_id, count, amount in refunds.group_by(Payment.payer_id).all():
+        rows.append((payer_id, SummaryDimension.REFUND, "completed", count, amount))
+
+    db.add_all(
+        PaymentSummary(
+            user_id=payer_id,
+            dimension=dimension,
+            bucket=_value(bucket),
+            payment_count=count,
+            amount=Decimal(str(amount)),
+        )
+        for payer_id, dimension, bucket, count, amount in rows
+    )
+    db.commit()
+    return len(rows)
+
+
+instrument_crud(__name__)
@@ -1,11 +1,24 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Depends
+from sqlalchemy.orm import Session, sessionmaker
 from ..core.config import settings
+from .engine import ReplicaRouter, build_engine, read_only
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+# Read-only endpoints use get_read_db and go to the replica, except for a
+# caller that has just written (see engine.ReplicaRouter)
+replica_router = ReplicaRouter(
+    lambda: build_engine(settings.replica_database_url, name="replica")
+    if settings.replica_database_url
+    else None
+)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=replica_router.session_class,
+)
 
 
 def get_db():
@@ -14,3 +27,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(db: Session = Depends(get_db)):
+    """Session for read-only endpoints, served by the replica when configured"""
+    return read_only(db)
@@ -1,17 +1,62 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 
-from .api.v1.endpoints import payment_methods, payments
+from .api.v1.endpoints import payment_methods, payments, webhooks
+from .core.config import settings
+from .db.engine import db_context_middleware
+from .services.outbox_relay import start_outbox_relay
+from .services.provider_gateway import close_gateways
+from .services.webhook_service import start_webhook_workers
+from .metrics import install_metrics
+from .responses import ORJSONResponse, install_compression
+from .tracing import install_tracing
 
 app = FastAPI(
     title="Payment Service",
     description="Payment processing and management service",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Scope the read-your-writes window of replica reads to the caller
+app.middleware("http")(db_context_middleware)
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "payment-service")
+
 app.include_router(payments.router, prefix="/api/v1/payments", tags=["payments"])
 app.include_router(
     payment_methods.router, prefix="/api/v1/payment-methods", tags=["payment-methods"]
 )
+app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["webhooks"])
+
+webhook_workers = []
+outbox_relays = []
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the webhook worker pool and the outbox relay"""
+    started = time.perf_counter()
+    if settings.webhook_worker_count > 0:
+        webhook_workers.extend(start_webhook_workers())
+    if settings.outbox_relay_enabled:
+        outbox_relays.append(start_outbox_relay())
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and release pooled provider connections"""
+    for worker in webhook_workers + outbox_relays:
+        worker.stop()
+    await close_gateways()
 
 
 @app.get("/")
@@ -33,6 +78,7 @@ async def info():
             "Payment execution",
             "Payment methods",
             "Event publishing",
+            "Provider webhooks",
         ],
         "configuration": {},
     }
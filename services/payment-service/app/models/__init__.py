@@ -12,6 +12,14 @@ from .payment_method import (
     PaymentMethodType,
     PaymentProvider,
 )
+from .webhook_event import WebhookEvent, WebhookEventStatus, WebhookProvider
+from .outbox import OutboxEvent
+from .payment_summary import PaymentSummary, SummaryDimension
+from .reconciliation import (
+    DiscrepancyKind,
+    ReconciliationDiscrepancy,
+    ReconciliationRun,
+)
 
 __all__ = [
     "Payment",
@@ -24,4 +32,13 @@ __all__ = [
     "PaymentMethodUsage",
     "PaymentMethodType",
     "PaymentProvider",
+    "WebhookEvent",
+    "WebhookEventStatus",
+    "WebhookProvider",
+    "OutboxEvent",
+    "PaymentSummary",
+    "SummaryDimension",
+    "DiscrepancyKind",
+    "ReconciliationDiscrepancy",
+    "ReconciliationRun",
 ]
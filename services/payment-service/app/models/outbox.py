@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, JSON, Index, func
+from ..db.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Events written in the same transaction as the state change they describe.
+    The outbox relay publishes unsent rows to Redis and stamps ``published_at``.
+    """
+
+    __tablename__ = "outbox_events"
+
+    outbox_id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(String(36), nullable=False, unique=True)
+    stream = Column(String(100), nullable=False)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)  # Flat str -> str stream fields
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    published_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_published_at_outbox_id", "published_at", "outbox_id"),
+    )
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, String, DECIMAL, TIMESTAMP, func, Text, ForeignKey
+from sqlalchemy import (
+    Column,
+    String,
+    DECIMAL,
+    TIMESTAMP,
+    func,
+    Text,
+    ForeignKey,
+    Index,
+    column,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -50,6 +60,19 @@ class Payment(Base):
     payment_history = relationship("PaymentHistory", back_populates="payment")
     refunds = relationship("Refund", back_populates="payment")
 
+    __table_args__ = (
+        # Keyset paging of a payer's history, newest first
+        Index("ix_payments_payer_created", "payer_id", "created_at", "payment_id"),
+        # Webhook lookups
+        Index("ix_payments_transaction_id", "transaction_id"),
+        # Reconciliation keyset scan, in the byte-wise order of the merge-join
+        Index(
+            "ix_payments_transaction_id_c",
+            column("transaction_id").collate("C"),
+            "payment_id",
+        ).ddl_if(dialect="postgresql"),
+    )
+
 
 class PaymentHistory(Base):
     __tablename__ = "payment_history"
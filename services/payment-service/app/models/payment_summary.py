@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, DECIMAL, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID
+from ..db.base import Base
+
+
+class SummaryDimension:
+    TOTAL = "total"  # bucket "all": every payment made by the user
+    STATUS = "status"  # bucket = PaymentStatus value
+    METHOD = "method"  # bucket = PaymentMethod value
+    REFUND = "refund"  # bucket "completed": completed refunds
+
+
+class PaymentSummary(Base):
+    """
+    Per-payer payment totals, maintained incrementally in the same transaction
+    as each payment / refund transition so history headers never count rows.
+    """
+
+    __tablename__ = "payment_summaries"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    bucket = Column(String(50), primary_key=True)
+    payment_count = Column(Integer, nullable=False, default=0)
+    amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    updated_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,58 @@
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    DECIMAL,
+    TIMESTAMP,
+    JSON,
+    ForeignKey,
+    func,
+)
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from ..db.base import Base
+from enum import Enum
+
+
+class DiscrepancyKind(str, Enum):
+    MISSING_IN_PROVIDER = "missing_in_provider"  # Successful payment not settled
+    MISSING_IN_LEDGER = "missing_in_ledger"  # Settlement without a payment
+    AMOUNT_MISMATCH = "amount_mismatch"
+    STATUS_MISMATCH = "status_mismatch"
+    DUPLICATE_SETTLEMENT = "duplicate_settlement"
+
+
+class ReconciliationRun(Base):
+    __tablename__ = "reconciliation_runs"
+
+    run_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    provider = Column(String(20), nullable=False)
+    source = Column(String(500), nullable=False)  # Settlement export location
+    status = Column(String(20), nullable=False, default="running")
+    ledger_count = Column(Integer, nullable=False, default=0)
+    provider_count = Column(Integer, nullable=False, default=0)
+    matched_count = Column(Integer, nullable=False, default=0)
+    discrepancy_count = Column(Integer, nullable=False, default=0)
+    discrepancy_counts = Column(JSON)  # kind -> count
+    started_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    finished_at = Column(TIMESTAMP(timezone=True))
+
+
+class ReconciliationDiscrepancy(Base):
+    __tablename__ = "reconciliation_discrepancies"
+
+    discrepancy_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    run_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("reconciliation_runs.run_id"),
+        nullable=False,
+        index=True,
+    )
+    kind = Column(String(30), nullable=False)
+    transaction_id = Column(String(255), nullable=False)
+    payment_id = Column(UUID(as_uuid=True))
+    ledger_amount = Column(DECIMAL(10, 2))
+    provider_amount = Column(DECIMAL(10, 2))
+    ledger_status = Column(String(50))
+    provider_status = Column(String(50))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, TIMESTAMP, func, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from ..db.base import Base
+from enum import Enum
+
+
+class WebhookProvider(str, Enum):
+    STRIPE = "stripe"
+    PAYPAL = "paypal"
+
+
+class WebhookEventStatus(str, Enum):
+    APPLIED = "applied"  # Caused a payment state transition
+    IGNORED = "ignored"  # Unhandled type, no-op, or payment unknown past retries
+    INVALID = "invalid"  # Signature verification failed in the worker
+
+
+class WebhookEvent(Base):
+    """Processed provider webhook events, used to make redelivery idempotent"""
+
+    __tablename__ = "webhook_events"
+
+    webhook_event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    provider = Column(String(20), nullable=False)
+    event_id = Column(String(255), nullable=False)  # Provider's event ID
+    event_type = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False)
+    processed_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="unique_provider_event"),
+    )
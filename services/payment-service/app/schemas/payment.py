@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
 from datetime import datetime
 from decimal import Decimal
@@ -88,6 +88,23 @@ class PaymentHistoryResponse(BaseModel):
     total_count: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
+
+
+class PaymentSummaryBucket(BaseModel):
+    count: int
+    amount: Decimal
+
+
+class PaymentSummaryResponse(BaseModel):
+    user_id: UUID
+    total_count: int
+    total_amount: Decimal
+    by_status: Dict[str, PaymentSummaryBucket]
+    by_method: Dict[str, PaymentSummaryBucket]
+    refunded_count: int
+    refunded_amount: Decimal
+    recent_payments: List[PaymentOut]
 
 
 class PaymentProcessResponse(BaseModel):
@@ -2,6 +2,13 @@ import json
 from typing import Dict, Any, Optional
 from datetime import datetime
 import os
+import time
+
+from sqlalchemy.orm import Session
+
+from ..metrics import record_publish
+from ..models.outbox import OutboxEvent
+from ..tracing import publish_span
 
 try:
     import redis
@@ -20,9 +27,9 @@ class EventPublisher:
         return redis.Redis.from_url(redis_url)
 
     @staticmethod
-    def publish_event(stream: str, event_type: str, payload: dict) -> dict:
+    def build_event(event_type: str, payload: dict) -> dict:
         """
-        通用事件发布方法，自动生成 event_id、timestamp，标准化结构。
+        生成标准化事件结构（event_id、timestamp），payload 值统一转为字符串。
         """
         import uuid
 
@@ -35,18 +42,52 @@ class EventPublisher:
         for k, v in payload.items():
             if v is not None:
                 event[k] = str(v)
-        try:
-            r = EventPublisher.get_redis_client()
-            r.xadd(stream, {k: v for k, v in event.items()})
-            print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
-            return event
-        except Exception as e:
-            print(f"[EVENT][ERROR] Redis publish failed: {e}")
-            return {"error": str(e), **event}
+        return event
+
+    @staticmethod
+    def publish_event(
+        stream: str, event_type: str, payload: dict, db: Optional[Session] = None
+    ) -> dict:
+        """
+        通用事件发布方法，自动生成 event_id、timestamp，标准化结构。
+
+        When ``db`` is given the event is added to the outbox in the caller's
+        transaction instead of being sent to Redis directly; it is delivered by
+        the outbox relay once that transaction commits.
+        """
+        event = EventPublisher.build_event(event_type, payload)
+        with publish_span(stream, event, event_type=event_type):
+            if db is not None:
+                db.add(
+                    OutboxEvent(
+                        event_id=event["event_id"],
+                        stream=stream,
+                        event_type=event_type,
+                        payload=event,
+                    )
+                )
+                return event
+            started = time.perf_counter()
+            try:
+                r = EventPublisher.get_redis_client()
+                r.xadd(stream, {k: v for k, v in event.items()})
+                record_publish(stream, event_type, time.perf_counter() - started)
+                print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
+                return event
+            except Exception as e:
+                record_publish(
+                    stream, event_type, time.perf_counter() - started, ok=False
+                )
+                print(f"[EVENT][ERROR] Redis publish failed: {e}")
+                return {"error": str(e), **event}
 
     @staticmethod
     def publish_payment_processed(
-        payment_id: str, request_id: str, amount: str, status: str = "success"
+        payment_id: str,
+        request_id: str,
+        amount: str,
+        status: str = "success",
+        db: Optional[Session] = None,
     ):
         """
         发布支付成功事件到 payment_lifecycle 流
@@ -58,7 +99,7 @@ class EventPublisher:
             "status": status,
         }
         return EventPublisher.publish_event(
-            "payment_lifecycle", "PaymentProcessed", payload
+            "payment_lifecycle", "PaymentProcessed", payload, db=db
         )
 
     @staticmethod
@@ -68,6 +109,7 @@ class EventPublisher:
         amount: str,
         error_code: str,
         error_message: str,
+        db: Optional[Session] = None,
     ):
         """
         发布支付失败事件到 payment_lifecycle 流
@@ -80,12 +122,16 @@ class EventPublisher:
             "error_message": error_message,
         }
         return EventPublisher.publish_event(
-            "payment_lifecycle", "PaymentFailed", payload
+            "payment_lifecycle", "PaymentFailed", payload, db=db
         )
 
     @staticmethod
     def publish_payment_refunded(
-        payment_id: str, request_id: str, amount: str, refund_reason: str
+        payment_id: str,
+        request_id: str,
+        amount: str,
+        refund_reason: str,
+        db: Optional[Session] = None,
     ):
         """
         发布退款事件到 payment_lifecycle 流
@@ -97,7 +143,7 @@ class EventPublisher:
             "refund_reason": refund_reason,
         }
         return EventPublisher.publish_event(
-            "payment_lifecycle", "PaymentRefunded", payload
+            "payment_lifecycle", "PaymentRefunded", payload, db=db
         )
 
     @staticmethod
@@ -0,0 +1,135 @@
+"""
+Outbox relay.
+
+Lifecycle events are written to ``outbox_events`` in the same transaction as
+the payment state change (see ``EventPublisher.publish_event(..., db=db)``).
+The relay drains unsent rows in ``outbox_id`` order, sends each batch to Redis
+in a single XADD pipeline and stamps ``published_at`` afterwards. A crash
+between the pipeline and the commit re-sends the batch, so delivery is
+at-least-once and consumers dedupe on ``event_id``.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..metrics import record_publish_batch
+from ..models.outbox import OutboxEvent
+from .events import EventPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Publishes pending outbox rows to Redis streams in batches"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.outbox_batch_size
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else settings.outbox_poll_interval_seconds
+        )
+        self.running = False
+
+    def _get_session(self) -> Session:
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def relay_batch(self, db: Session, r) -> int:
+        """
+        Publish up to ``batch_size`` pending rows and mark them sent.
+
+        Rows are locked with ``SKIP LOCKED`` so several replicas can relay
+        concurrently without sending the same row twice.
+        """
+        rows = (
+            db.query(OutboxEvent)
+            .filter(OutboxEvent.published_at.is_(None))
+            .order_by(OutboxEvent.outbox_id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            db.rollback()
+            return 0
+
+        sent = [(row.stream, row.event_type) for row in rows]
+        pipe = r.pipeline(transaction=False)
+        for row in rows:
+            pipe.xadd(row.stream, row.payload)
+        started = time.perf_counter()
+        try:
+            pipe.execute()
+        except Exception:
+            record_publish_batch(sent, time.perf_counter() - started, ok=False)
+            db.rollback()
+            raise
+        record_publish_batch(sent, time.perf_counter() - started)
+
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.published_at = now
+        db.commit()
+        return len(rows)
+
+    def purge_published(self, db: Session) -> int:
+        """Delete rows published longer than ``outbox_retention_hours`` ago"""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            hours=settings.outbox_retention_hours
+        )
+        deleted = (
+            db.query(OutboxEvent)
+            .filter(OutboxEvent.published_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def relay_once(self) -> int:
+        db = self._get_session()
+        try:
+            r = EventPublisher.get_redis_client()
+            sent = self.relay_batch(db, r)
+            if sent == 0:
+                self.purge_published(db)
+            return sent
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        self.running = True
+        while self.running:
+            try:
+                sent = await asyncio.to_thread(self.relay_once)
+            except Exception as e:
+                logger.error(f"[OUTBOX] relay error: {e}")
+                sent = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if sent < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def stop(self) -> None:
+        self.running = False
+
+
+def start_outbox_relay() -> OutboxRelay:
+    """Start the relay on the running loop"""
+    relay = OutboxRelay()
+    asyncio.create_task(relay.run())
+    return relay
@@ -1,5 +1,3 @@
-import stripe
-import paypalrestsdk
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from uuid import UUID
@@ -30,6 +28,7 @@ from ..crud.crud_payment_method import (
     create_payment_method_usage,
 )
 from .events import EventPublisher
+from .sdks import stripe
 
 
 class PaymentMethodService:
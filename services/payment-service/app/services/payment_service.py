@@ -1,5 +1,5 @@
-import stripe
 from sqlalchemy.orm import Session
+import asyncio
 from typing import Optional, List
 from uuid import UUID
 from decimal import Decimal
@@ -19,34 +19,35 @@ from ..crud.crud_payment import (
     create_payment,
     get_payment_by_id,
     get_payments_by_user,
+    get_payments_by_user_after,
+    encode_payment_cursor,
     get_payments_by_request,
     update_payment,
     create_payment_history,
     create_refund,
     update_refund,
     get_refund_by_id,
+    get_refunds_by_payment,
 )
+from ..crud.crud_payment_summary import get_payment_count, get_payment_summary
 from .events import EventPublisher
 from .paypal_service import PayPalService
+from .provider_gateway import ProviderDeclined, ProviderUnavailable, stripe_gateway
 from ..core.config import settings
 
 
-# Initialize Stripe
-stripe.api_key = settings.stripe_secret_key
-
-
 class PaymentService:
     @staticmethod
-    def process_payment(db: Session, payment_in: PaymentProcess):
+    async def process_payment(db: Session, payment_in: PaymentProcess):
         """Process a new payment through the appropriate payment provider"""
         if payment_in.payment_method == PaymentMethod.PAYPAL:
-            return PayPalService.process_payment(db, payment_in)
+            return await PayPalService.process_payment(db, payment_in)
         elif payment_in.payment_method in [
             PaymentMethod.STRIPE,
             PaymentMethod.CREDIT_CARD,
             PaymentMethod.DEBIT_CARD,
         ]:
-            return PaymentService._process_stripe_payment(db, payment_in)
+            return await PaymentService._process_stripe_payment(db, payment_in)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +55,9 @@ class PaymentService:
             )
 
     @staticmethod
-    def _process_stripe_payment(db: Session, payment_in: PaymentProcess) -> Payment:
+    async def _process_stripe_payment(
+        db: Session, payment_in: PaymentProcess
+    ) -> Payment:
         """Process a new payment through Stripe"""
         try:
             # Create payment record
@@ -65,10 +68,11 @@ class PaymentService:
                 amount=payment_in.amount,
                 payment_method=payment_in.payment_method,
             )
-            payment = create_payment(db, payment_create)
+            payment = await asyncio.to_thread(create_payment, db, payment_create)
 
             # Update status to processing
-            update_payment(
+            await asyncio.to_thread(
+                update_payment,
                 db,
                 payment.payment_id,
                 PaymentUpdate(payment_status=PaymentStatus.PROCESSING),
@@ -76,24 +80,41 @@ class PaymentService:
 
             # Process with Stripe
             try:
-                charge = stripe.Charge.create(
+                charge = await stripe_gateway.create_charge(
                     amount=int(payment_in.amount * 100),  # Convert to cents
                     currency=settings.currency.lower(),
                     source=payment_in.payment_token,
                     description=f"Payment for request {payment_in.request_id}",
+                    idempotency_key=str(payment.payment_id),
+                    # Failed charges never get a transaction_id stored; their
+                    # webhooks find the payment through this instead
+                    metadata={"payment_id": str(payment.payment_id)},
+                )
+
+                # Stage the success event in the outbox; it commits together
+                # with the status change below
+                EventPublisher.publish_payment_processed(
+                    payment_id=str(payment.payment_id),
+                    request_id=str(payment_in.request_id),
+                    amount=str(payment_in.amount),
+                    status="success",
+                    db=db,
                 )
 
                 # Update payment with success status
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(
-                        payment_status=PaymentStatus.SUCCESS, transaction_id=charge.id
+                        payment_status=PaymentStatus.SUCCESS,
+                        transaction_id=charge["id"],
                     ),
                 )
 
                 # Create payment history
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
@@ -102,53 +123,59 @@ class PaymentService:
                     ),
                 )
 
-                # Publish success event
-                EventPublisher.publish_payment_processed(
+                return await asyncio.to_thread(
+                    get_payment_by_id, db, payment.payment_id
+                )
+
+            except ProviderDeclined as e:
+                # Handle card errors
+                EventPublisher.publish_payment_failed(
                     payment_id=str(payment.payment_id),
                     request_id=str(payment_in.request_id),
                     amount=str(payment_in.amount),
-                    status="success",
+                    error_code="card_error",
+                    error_message=e.message,
+                    db=db,
                 )
-
-                return get_payment_by_id(db, payment.payment_id)
-
-            except stripe.error.CardError as e:
-                # Handle card errors
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(payment_status=PaymentStatus.FAILED),
                 )
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
                         status=PaymentStatus.FAILED,
-                        notes=f"Card error: {e.error.message}",
+                        notes=f"Card error: {e.message}",
                     ),
                 )
 
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Payment failed: {e.message}",
+                )
+
+            except ProviderUnavailable as e:
+                # Stripe unreachable, timed out or circuit open
                 EventPublisher.publish_payment_failed(
                     payment_id=str(payment.payment_id),
                     request_id=str(payment_in.request_id),
                     amount=str(payment_in.amount),
-                    error_code="card_error",
-                    error_message=e.error.message,
-                )
-
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Payment failed: {e.error.message}",
+                    error_code="stripe_error",
+                    error_message=str(e),
+                    db=db,
                 )
-
-            except stripe.error.StripeError as e:
-                # Handle other Stripe errors
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(payment_status=PaymentStatus.FAILED),
                 )
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
@@ -157,19 +184,13 @@ class PaymentService:
                     ),
                 )
 
-                EventPublisher.publish_payment_failed(
-                    payment_id=str(payment.payment_id),
-                    request_id=str(payment_in.request_id),
-                    amount=str(payment_in.amount),
-                    error_code="stripe_error",
-                    error_message=str(e),
-                )
-
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Payment processing error",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Payment provider unavailable",
                 )
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -178,29 +199,53 @@ class PaymentService:
 
     @staticmethod
     def get_payment_history(
-        db: Session, user_id: UUID, page: int = 1, page_size: int = 20
+        db: Session,
+        user_id: UUID,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
     ) -> dict:
-        """Get payment history for a user with pagination"""
-        skip = (page - 1) * page_size
-        payments = get_payments_by_user(db, user_id, skip=skip, limit=page_size)
-
-        # Get total count
-        total_count = db.query(Payment).filter(Payment.payer_id == user_id).count()
+        """
+        Get payment history for a user.
+
+        With ``cursor`` the page is read by keyset (newest first) and ``page``
+        is ignored; without it the legacy page/offset paging is used. The total
+        comes from the payment summary read model instead of a COUNT(*).
+        """
+        if cursor:
+            payments = get_payments_by_user_after(db, user_id, cursor, page_size)
+        else:
+            skip = (page - 1) * page_size
+            payments = get_payments_by_user(db, user_id, skip=skip, limit=page_size)
 
         return {
             "payments": payments,
-            "total_count": total_count,
+            "total_count": get_payment_count(db, user_id),
             "page": page,
             "page_size": page_size,
+            "next_cursor": (
+                encode_payment_cursor(payments[-1])
+                if len(payments) == page_size
+                else None
+            ),
         }
 
     @staticmethod
-    def process_refund(
+    def get_payment_summary(db: Session, user_id: UUID) -> dict:
+        """Precomputed totals for a user plus their most recent payments"""
+        summary = get_payment_summary(db, user_id)
+        summary["recent_payments"] = get_payments_by_user_after(
+            db, user_id, limit=settings.payment_summary_recent_count
+        )
+        return summary
+
+    @staticmethod
+    async def process_refund(
         db: Session, payment_id: UUID, refund_in: RefundCreate, admin_id: UUID
     ) -> dict:
         """Process a refund for a payment (admin only)"""
         # Check if payment exists and was successful
-        payment = get_payment_by_id(db, payment_id)
+        payment = await asyncio.to_thread(get_payment_by_id, db, payment_id)
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found"
@@ -220,10 +265,8 @@ class PaymentService:
             )
 
         # Check for existing refunds
-        from ..models.payment import Refund
-
-        existing_refunds = (
-            db.query(Refund).filter(Refund.payment_id == payment_id).all()
+        existing_refunds = await asyncio.to_thread(
+            get_refunds_by_payment, db, payment_id
         )
         total_refunded = sum(
             refund.amount
@@ -238,10 +281,11 @@ class PaymentService:
             )
 
         # Create refund record
-        refund = create_refund(db, refund_in)
+        refund = await asyncio.to_thread(create_refund, db, refund_in)
 
         # Update refund with admin approval
-        update_refund(
+        await asyncio.to_thread(
+            update_refund,
             db,
             refund.refund_id,
             RefundUpdate(status=RefundStatus.APPROVED, approved_by=admin_id),
@@ -250,26 +294,28 @@ class PaymentService:
         # Process refund with Stripe if transaction_id exists
         if payment.transaction_id:
             try:
-                stripe_refund = stripe.Refund.create(
-                    charge=payment.transaction_id,
+                await stripe_gateway.create_refund(
+                    charge_id=payment.transaction_id,
                     amount=int(refund_in.amount * 100),  # Convert to cents
+                    idempotency_key=str(refund.refund_id),
                 )
 
                 # Update refund as completed
-                update_refund(
-                    db,
-                    refund.refund_id,
-                    RefundUpdate(
-                        status=RefundStatus.COMPLETED, completed_at=datetime.utcnow()
-                    ),
-                )
-
-                # Publish refund event
+                # Refund event commits together with the completed refund
                 EventPublisher.publish_payment_refunded(
                     payment_id=str(payment_id),
                     request_id=str(payment.request_id),
                     amount=str(refund_in.amount),
                     refund_reason=refund_in.refund_reason,
+                    db=db,
+                )
+                await asyncio.to_thread(
+                    update_refund,
+                    db,
+                    refund.refund_id,
+                    RefundUpdate(
+                        status=RefundStatus.COMPLETED, completed_at=datetime.utcnow()
+                    ),
                 )
 
                 return {
@@ -278,10 +324,13 @@ class PaymentService:
                     "message": "Refund processed successfully",
                 }
 
-            except stripe.error.StripeError as e:
+            except (ProviderDeclined, ProviderUnavailable) as e:
                 # Update refund as failed
-                update_refund(
-                    db, refund.refund_id, RefundUpdate(status=RefundStatus.REJECTED)
+                await asyncio.to_thread(
+                    update_refund,
+                    db,
+                    refund.refund_id,
+                    RefundUpdate(status=RefundStatus.REJECTED),
                 )
 
                 raise HTTPException(
@@ -290,20 +339,21 @@ class PaymentService:
                 )
         else:
             # Manual refund (no Stripe transaction)
-            update_refund(
-                db,
-                refund.refund_id,
-                RefundUpdate(
-                    status=RefundStatus.COMPLETED, completed_at=datetime.utcnow()
-                ),
-            )
-
-            # Publish refund event
+            # Refund event commits together with the completed refund
             EventPublisher.publish_payment_refunded(
                 payment_id=str(payment_id),
                 request_id=str(payment.request_id),
                 amount=str(refund_in.amount),
                 refund_reason=refund_in.refund_reason,
+                db=db,
+            )
+            await asyncio.to_thread(
+                update_refund,
+                db,
+                refund.refund_id,
+                RefundUpdate(
+                    status=RefundStatus.COMPLETED, completed_at=datetime.utcnow()
+                ),
             )
 
             return {
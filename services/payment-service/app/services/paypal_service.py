@@ -1,5 +1,5 @@
-import paypalrestsdk
 from sqlalchemy.orm import Session
+import asyncio
 from typing import Optional, Dict, Any
 from uuid import UUID
 from decimal import Decimal
@@ -16,20 +16,18 @@ from ..crud.crud_payment import (
     get_payment_by_id,
 )
 from .events import EventPublisher
+from .provider_gateway import ProviderDeclined, ProviderUnavailable, paypal_gateway
 
-# Initialize PayPal SDK
-paypalrestsdk.configure(
-    {
-        "mode": settings.paypal_mode,
-        "client_id": settings.paypal_client_id,
-        "client_secret": settings.paypal_client_secret,
-    }
-)
+# PayPal SDK, still used by the thin /paypal/create-order and /paypal/capture
+# gateway endpoints; configured on first use
+from .sdks import paypalrestsdk
 
 
 class PayPalService:
     @staticmethod
-    def process_payment(db: Session, payment_in: PaymentProcess) -> Dict[str, Any]:
+    async def process_payment(
+        db: Session, payment_in: PaymentProcess
+    ) -> Dict[str, Any]:
         """Process a payment through PayPal - returns approval URL for user redirect"""
         try:
             # Create payment record
@@ -42,57 +40,67 @@ class PayPalService:
                 amount=payment_in.amount,
                 payment_method=payment_in.payment_method,
             )
-            payment = create_payment(db, payment_create)
+            payment = await asyncio.to_thread(create_payment, db, payment_create)
 
             # Update status to processing
-            update_payment(
+            await asyncio.to_thread(
+                update_payment,
                 db,
                 payment.payment_id,
                 PaymentUpdate(payment_status=PaymentStatus.PROCESSING),
             )
 
             # Create PayPal payment
-            paypal_payment = paypalrestsdk.Payment(
-                {
-                    "intent": "sale",
-                    "payer": {"payment_method": "paypal"},
-                    "redirect_urls": {
-                        "return_url": f"{settings.base_url}/api/v1/payments/paypal/execute?payment_id={payment.payment_id}",
-                        "cancel_url": f"{settings.base_url}/api/v1/payments/paypal/cancel?payment_id={payment.payment_id}",
-                    },
-                    "transactions": [
-                        {
-                            "item_list": {
-                                "items": [
-                                    {
-                                        "name": f"Payment for request {payment_in.request_id}",
-                                        "sku": str(payment_in.request_id),
-                                        "price": str(payment_in.amount),
-                                        "currency": settings.currency,
-                                        "quantity": 1,
-                                    }
-                                ]
-                            },
-                            "amount": {
-                                "total": str(payment_in.amount),
-                                "currency": settings.currency,
-                            },
-                            "description": f"Payment for request {payment_in.request_id}",
-                        }
-                    ],
-                }
-            )
+            paypal_payload = {
+                "intent": "sale",
+                "payer": {"payment_method": "paypal"},
+                "redirect_urls": {
+                    "return_url": f"{settings.base_url}/api/v1/payments/paypal/execute?payment_id={payment.payment_id}",
+                    "cancel_url": f"{settings.base_url}/api/v1/payments/paypal/cancel?payment_id={payment.payment_id}",
+                },
+                "transactions": [
+                    {
+                        "item_list": {
+                            "items": [
+                                {
+                                    "name": f"Payment for request {payment_in.request_id}",
+                                    "sku": str(payment_in.request_id),
+                                    "price": str(payment_in.amount),
+                                    "currency": settings.currency,
+                                    "quantity": 1,
+                                }
+                            ]
+                        },
+                        "amount": {
+                            "total": str(payment_in.amount),
+                            "currency": settings.currency,
+                        },
+                        "description": f"Payment for request {payment_in.request_id}",
+                    }
+                ],
+            }
+
+            try:
+                paypal_payment = await paypal_gateway.create_payment(
+                    paypal_payload, request_id=str(payment.payment_id)
+                )
+                paypal_error = None
+            except (ProviderDeclined, ProviderUnavailable) as e:
+                paypal_payment = None
+                paypal_error = e.message
 
-            if paypal_payment.create():
+            if paypal_payment is not None:
                 # Update payment with PayPal payment ID
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
-                    PaymentUpdate(transaction_id=paypal_payment.id),
+                    PaymentUpdate(transaction_id=paypal_payment["id"]),
                 )
 
                 # Create payment history
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
@@ -101,46 +109,41 @@ class PayPalService:
                     ),
                 )
 
-                # Find approval URL
-                approval_url = None
-                for link in paypal_payment.links:
-                    if link.rel == "approval_url":
-                        approval_url = link.href
-                        break
-
                 return {
                     "payment_id": str(payment.payment_id),
-                    "paypal_payment_id": paypal_payment.id,
-                    "approval_url": approval_url,
+                    "paypal_payment_id": paypal_payment["id"],
+                    "approval_url": paypal_gateway.approval_url(paypal_payment),
                     "status": "created",
                 }
             else:
                 # Handle PayPal creation error
-                update_payment(
+                EventPublisher.publish_payment_failed(
+                    payment_id=str(payment.payment_id),
+                    request_id=str(payment_in.request_id),
+                    amount=str(payment_in.amount),
+                    error_code="paypal_error",
+                    error_message=str(paypal_error),
+                    db=db,
+                )
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(payment_status=PaymentStatus.FAILED),
                 )
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
                         status=PaymentStatus.FAILED,
-                        notes=f"PayPal payment creation failed: {paypal_payment.error}",
+                        notes=f"PayPal payment creation failed: {paypal_error}",
                     ),
                 )
 
-                EventPublisher.publish_payment_failed(
-                    payment_id=str(payment.payment_id),
-                    request_id=str(payment_in.request_id),
-                    amount=str(payment_in.amount),
-                    error_code="paypal_error",
-                    error_message=str(paypal_payment.error),
-                )
-
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"PayPal payment creation failed: {paypal_payment.error}",
+                    detail=f"PayPal payment creation failed: {paypal_error}",
                 )
 
         except Exception as e:
@@ -150,23 +153,39 @@ class PayPalService:
             )
 
     @staticmethod
-    def execute_payment(db: Session, payment_id: str, payer_id: str) -> Payment:
+    async def execute_payment(db: Session, payment_id: str, payer_id: str) -> Payment:
         """Execute a PayPal payment after user approval"""
         try:
-            payment = get_payment_by_id(db, UUID(payment_id))
+            payment = await asyncio.to_thread(get_payment_by_id, db, UUID(payment_id))
             if not payment:
                 raise HTTPException(status_code=404, detail="Payment not found")
 
             # Execute the PayPal payment
-            paypal_payment = paypalrestsdk.Payment.find(payment.transaction_id)
-            if paypal_payment.execute({"payer_id": payer_id}):
+            try:
+                await paypal_gateway.execute_payment(payment.transaction_id, payer_id)
+                paypal_error = None
+            except (ProviderDeclined, ProviderUnavailable) as e:
+                paypal_error = e.message
+
+            if paypal_error is None:
+                # Stage the success event; it commits with the status change
+                EventPublisher.publish_payment_processed(
+                    payment_id=str(payment.payment_id),
+                    request_id=str(payment.request_id),
+                    amount=str(payment.amount),
+                    status="success",
+                    db=db,
+                )
+
                 # Update payment status to success
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(payment_status=PaymentStatus.SUCCESS),
                 )
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
@@ -175,42 +194,38 @@ class PayPalService:
                     ),
                 )
 
-                # Publish success event
-                EventPublisher.publish_payment_processed(
+                return await asyncio.to_thread(
+                    get_payment_by_id, db, payment.payment_id
+                )
+            else:
+                # Handle execution error
+                EventPublisher.publish_payment_failed(
                     payment_id=str(payment.payment_id),
                     request_id=str(payment.request_id),
                     amount=str(payment.amount),
-                    status="success",
+                    error_code="paypal_execution_error",
+                    error_message=str(paypal_error),
+                    db=db,
                 )
-
-                return get_payment_by_id(db, payment.payment_id)
-            else:
-                # Handle execution error
-                update_payment(
+                await asyncio.to_thread(
+                    update_payment,
                     db,
                     payment.payment_id,
                     PaymentUpdate(payment_status=PaymentStatus.FAILED),
                 )
-                create_payment_history(
+                await asyncio.to_thread(
+                    create_payment_history,
                     db,
                     PaymentHistoryCreate(
                         payment_id=payment.payment_id,
                         status=PaymentStatus.FAILED,
-                        notes=f"PayPal payment execution failed: {paypal_payment.error}",
+                        notes=f"PayPal payment execution failed: {paypal_error}",
                     ),
                 )
 
-                EventPublisher.publish_payment_failed(
-                    payment_id=str(payment.payment_id),
-                    request_id=str(payment.request_id),
-                    amount=str(payment.amount),
-                    error_code="paypal_execution_error",
-                    error_message=str(paypal_payment.error),
-                )
-
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"PayPal payment execution failed: {paypal_payment.error}",
+                    detail=f"PayPal payment execution failed: {paypal_error}",
                 )
 
         except Exception as e:
@@ -0,0 +1,400 @@
+"""
+Async gateway for outbound payment provider calls (Stripe / PayPal).
+
+Each provider gets its own pooled keep-alive ``httpx.AsyncClient``, its own
+timeouts, a circuit breaker and a bulkhead (bounded concurrency), so a slow or
+failing provider cannot exhaust capacity reserved for the other one.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from ..core.config import settings
+
+
+class ProviderError(Exception):
+    """Base error for provider calls"""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.message = message
+        self.status_code = status_code
+
+
+class ProviderDeclined(ProviderError):
+    """The provider answered but rejected the operation (e.g. card declined)"""
+
+
+class ProviderUnavailable(ProviderError):
+    """The provider could not be reached: timeout, 5xx, open breaker or full bulkhead"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """The call let through gave no verdict (cancelled, unexpected error)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+class Bulkhead:
+    """Caps in-flight calls to one provider; callers wait at most ``max_wait``"""
+
+    def __init__(self, max_concurrency: int, max_wait: float):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class ProviderClient:
+    """Pooled HTTP client for a single provider, guarded by breaker and bulkhead"""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_concurrency: int,
+        bulkhead_wait: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.bulkhead = Bulkhead(max_concurrency, bulkhead_wait)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to the provider.
+
+        5xx answers and transport errors count as breaker failures and raise
+        ``ProviderUnavailable``; 4xx answers are returned to the caller.
+        """
+        # The bulkhead comes first so a half-open probe is only claimed by a
+        # call that actually goes out
+        if not await self.bulkhead.acquire():
+            raise ProviderUnavailable(self.name, "too many concurrent requests")
+        try:
+            if not self.breaker.allow_request():
+                raise ProviderUnavailable(self.name, "circuit open")
+            try:
+                response = await self.http.request(method, path, **kwargs)
+            except httpx.TimeoutException:
+                self.breaker.record_failure()
+                raise ProviderUnavailable(self.name, "request timed out")
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                raise ProviderUnavailable(self.name, f"transport error: {e}")
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+        finally:
+            self.bulkhead.release()
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            raise ProviderUnavailable(
+                self.name,
+                f"provider returned {response.status_code}",
+                status_code=response.status_code,
+            )
+        self.breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        body = response.json()
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+    error = body.get("error")
+    if isinstance(error, dict):
+        return error.get("message") or str(error)
+    return body.get("message") or body.get("error_description") or str(error or body)
+
+
+class StripeGateway:
+    """Stripe REST calls (form-encoded, bearer auth)"""
+
+    def __init__(self, client: ProviderClient, secret_key: str):
+        self.client = client
+        self.secret_key = secret_key
+
+    def _headers(self, idempotency_key: Optional[str] = None) -> Dict[str, str]:
+        headers = {"Authorization": f"Bearer {self.secret_key}"}
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        return headers
+
+    async def _post(
+        self, path: str, data: Dict[str, Any], idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        response = await self.client.request(
+            "POST",
+            path,
+            data={k: v for k, v in data.items() if v is not None},
+            headers=self._headers(idempotency_key),
+        )
+        if response.status_code >= 400:
+            raise ProviderDeclined(
+                self.client.name, _error_message(response), response.status_code
+            )
+        return response.json()
+
+    async def create_charge(
+        self,
+        amount: int,
+        currency: str,
+        source: str,
+        description: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a charge; ``amount`` is in the smallest currency unit.
+        ``metadata`` is echoed back on the charge and its webhook events.
+        """
+        return await self._post(
+            "/v1/charges",
+            {
+                "amount": amount,
+                "currency": currency,
+                "source": source,
+                "description": description,
+                **{f"metadata[{k}]": v for k, v in (metadata or {}).items()},
+            },
+            idempotency_key,
+        )
+
+    async def create_refund(
+        self, charge_id: str, amount: int, idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Refund ``amount`` (smallest currency unit) of a charge"""
+        return await self._post(
+            "/v1/refunds", {"charge": charge_id, "amount": amount}, idempotency_key
+        )
+
+
+class PayPalGateway:
+    """PayPal v1 Payments REST calls with a cached OAuth access token"""
+
+    def __init__(self, client: ProviderClient, client_id: str, client_secret: str):
+        self.client = client
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+
+    async def _get_access_token(self) -> str:
+        if self._access_token and time.monotonic() < self._token_expires_at:
+            return self._access_token
+        response = await self.client.request(
+            "POST",
+            "/v1/oauth2/token",
+            data={"grant_type": "client_credentials"},
+            auth=(self.client_id, self.client_secret),
+        )
+        if response.status_code >= 400:
+            raise ProviderDeclined(
+                self.client.name, _error_message(response), response.status_code
+            )
+        body = response.json()
+        self._access_token = body["access_token"]
+        # Refresh a minute early so in-flight calls never carry an expired token
+        self._token_expires_at = time.monotonic() + int(body.get("expires_in", 0)) - 60
+        return self._access_token
+
+    async def _post(
+        self, path: str, payload: Dict[str, Any], request_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        headers = {"Authorization": f"Bearer {await self._get_access_token()}"}
+        if request_id:
+            headers["PayPal-Request-Id"] = request_id
+        response = await self.client.request(
+            "POST", path, json=payload, headers=headers
+        )
+        if response.status_code == 401:
+            self._access_token = None
+        if response.status_code >= 400:
+            raise ProviderDeclined(
+                self.client.name, _error_message(response), response.status_code
+            )
+        return response.json()
+
+    async def create_payment(
+        self, payload: Dict[str, Any], request_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create a PayPal payment awaiting buyer approval"""
+        return await self._post("/v1/payments/payment", payload, request_id)
+
+    async def execute_payment(
+        self, paypal_payment_id: str, payer_id: str
+    ) -> Dict[str, Any]:
+        """Execute an approved PayPal payment"""
+        return await self._post(
+            f"/v1/payments/payment/{paypal_payment_id}/execute",
+            {"payer_id": payer_id},
+        )
+
+    async def verify_webhook_signature(
+        self, headers: Dict[str, str], webhook_id: str, event: Dict[str, Any]
+    ) -> bool:
+        """Ask PayPal to verify a webhook transmission signature"""
+        result = await self._post(
+            "/v1/notifications/verify-webhook-signature",
+            {
+                "auth_algo": headers.get("paypal-auth-algo"),
+                "cert_url": headers.get("paypal-cert-url"),
+                "transmission_id": headers.get("paypal-transmission-id"),
+                "transmission_sig": headers.get("paypal-transmission-sig"),
+                "transmission_time": headers.get("paypal-transmission-time"),
+                "webhook_id": webhook_id,
+                "webhook_event": event,
+            },
+        )
+        return result.get("verification_status") == "SUCCESS"
+
+    @staticmethod
+    def approval_url(payment: Dict[str, Any]) -> Optional[str]:
+        for link in payment.get("links", []):
+            if link.get("rel") == "approval_url":
+                return link.get("href")
+        return None
+
+
+def _paypal_base_url() -> str:
+    if settings.paypal_api_base:
+        return settings.paypal_api_base
+    if settings.paypal_mode == "live":
+        return "https://api-m.paypal.com"
+    return "https://api-m.sandbox.paypal.com"
+
+
+stripe_gateway = StripeGateway(
+    ProviderClient(
+        name="stripe",
+        base_url=settings.stripe_api_base,
+        timeout=settings.stripe_timeout_seconds,
+        connect_timeout=settings.provider_connect_timeout_seconds,
+        max_connections=settings.stripe_max_connections,
+        max_concurrency=settings.stripe_max_concurrency,
+        bulkhead_wait=settings.provider_bulkhead_wait_seconds,
+        failure_threshold=settings.provider_breaker_failure_threshold,
+        reset_timeout=settings.provider_breaker_reset_seconds,
+    ),
+    secret_key=settings.stripe_secret_key,
+)
+
+paypal_gateway = PayPalGateway(
+    ProviderClient(
+        name="paypal",
+        base_url=_paypal_base_url(),
+        timeout=settings.paypal_timeout_seconds,
+        connect_timeout=settings.provider_connect_timeout_seconds,
+        max_connections=settings.paypal_max_connections,
+        max_concurrency=settings.paypal_max_concurrency,
+        bulkhead_wait=settings.provider_bulkhead_wait_seconds,
+        failure_threshold=settings.provider_breaker_failure_threshold,
+        reset_timeout=settings.provider_breaker_reset_seconds,
+    ),
+    client_id=settings.paypal_client_id,
+    client_secret=settings.paypal_client_secret,
+)
+
+
+async def close_gateways() -> None:
+    """Close pooled provider connections (called on shutdown)"""
+    await stripe_gateway.client.aclose()
+    await paypal_gateway.client.aclose()
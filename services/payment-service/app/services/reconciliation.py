@@ -0,0 +1,530 @@
+"""
+Settlement reconciliation.
+
+Compares ``Payment`` rows against a provider settlement export (Stripe or
+PayPal, CSV or JSON Lines) with a sort-merge join on ``transaction_id``:
+
+- the export is streamed and, unless already ordered, sorted externally in
+  runs of ``reconciliation_sort_chunk_size`` records spilled to temp files;
+- payments are streamed from the database by keyset on
+  ``(transaction_id, payment_id)``;
+- both ordered streams are walked once, so memory is bounded by the sort run
+  size and the DB batch size, not by the number of transactions.
+
+Discrepancies are written to ``reconciliation_discrepancies`` in batches and
+the per-kind counts are stored on the ``reconciliation_runs`` row.
+
+Run nightly as ``python -m app.services.reconciliation --provider stripe
+--file /settlements/stripe.csv``.
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import logging
+import random
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.payment import Payment, PaymentMethod, PaymentStatus
+from ..models.reconciliation import (
+    DiscrepancyKind,
+    ReconciliationDiscrepancy,
+    ReconciliationRun,
+)
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+# Payment methods settled by each provider
+PROVIDER_METHODS = {
+    "stripe": [
+        PaymentMethod.STRIPE.value,
+        PaymentMethod.CREDIT_CARD.value,
+        PaymentMethod.DEBIT_CARD.value,
+    ],
+    "paypal": [PaymentMethod.PAYPAL.value],
+}
+
+# Accepted column names per canonical field, first match wins
+PROVIDER_FIELDS = {
+    "stripe": {
+        "transaction_id": ("source_id", "charge_id", "transaction_id", "id"),
+        "amount": ("gross", "amount"),
+        "currency": ("currency",),
+        "status": ("status",),
+    },
+    "paypal": {
+        "transaction_id": (
+            "Transaction ID",
+            "parent_payment",
+            "transaction_id",
+            "id",
+        ),
+        "amount": ("Gross", "gross", "amount"),
+        "currency": ("Currency", "currency"),
+        "status": ("Status", "status"),
+    },
+}
+
+# Provider status -> ledger PaymentStatus value ("refunded" settles a success)
+PROVIDER_STATUSES = {
+    "succeeded": PaymentStatus.SUCCESS.value,
+    "success": PaymentStatus.SUCCESS.value,
+    "completed": PaymentStatus.SUCCESS.value,
+    "paid": PaymentStatus.SUCCESS.value,
+    "available": PaymentStatus.SUCCESS.value,
+    "refunded": PaymentStatus.SUCCESS.value,
+    "s": PaymentStatus.SUCCESS.value,
+    "failed": PaymentStatus.FAILED.value,
+    "denied": PaymentStatus.FAILED.value,
+    "declined": PaymentStatus.FAILED.value,
+    "d": PaymentStatus.FAILED.value,
+}
+
+
+@dataclass
+class SettlementRecord:
+    transaction_id: str
+    amount: Optional[Decimal]
+    currency: str
+    status: str
+
+
+@dataclass
+class LedgerRecord:
+    transaction_id: str
+    payment_id: object
+    amount: Decimal
+    status: str
+    in_window: bool
+
+
+# --- Settlement export readers ---------------------------------------------
+
+
+def _pick(row: Dict[str, str], names) -> Optional[str]:
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def _to_record(
+    row: Dict[str, str], fields: Dict[str, tuple]
+) -> Optional[SettlementRecord]:
+    transaction_id = _pick(row, fields["transaction_id"])
+    if not transaction_id:
+        return None
+    raw_amount = _pick(row, fields["amount"])
+    try:
+        amount = Decimal(raw_amount).quantize(CENT) if raw_amount else None
+    except InvalidOperation:
+        amount = None
+    return SettlementRecord(
+        transaction_id=transaction_id,
+        amount=amount,
+        currency=(_pick(row, fields["currency"]) or "").upper(),
+        status=(_pick(row, fields["status"]) or "").lower(),
+    )
+
+
+def read_settlement_export(path: str, provider: str) -> Iterator[SettlementRecord]:
+    """
+    Stream records from a settlement export. ``.csv`` files are read with a
+    header row; ``.json``/``.jsonl``/``.ndjson`` files must hold one JSON object
+    per line so they can be streamed. Amounts are in major currency units.
+    """
+    fields = PROVIDER_FIELDS[provider]
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            record = _to_record(row, fields)
+            if record is not None:
+                yield record
+
+
+def _spill(chunk: List[SettlementRecord]):
+    chunk.sort(key=lambda r: r.transaction_id)
+    spill = tempfile.TemporaryFile(mode="w+", newline="", encoding="utf-8")
+    writer = csv.writer(spill)
+    for r in chunk:
+        writer.writerow(
+            [
+                r.transaction_id,
+                "" if r.amount is None else r.amount,
+                r.currency,
+                r.status,
+            ]
+        )
+    spill.seek(0)
+    return spill
+
+
+def _read_spill(spill) -> Iterator[SettlementRecord]:
+    for transaction_id, amount, currency, status in csv.reader(spill):
+        yield SettlementRecord(
+            transaction_id, Decimal(amount) if amount else None, currency, status
+        )
+
+
+def external_sort(
+    records: Iterable[SettlementRecord], chunk_size: int
+) -> Iterator[SettlementRecord]:
+    """Sort by transaction_id holding at most ``chunk_size`` records in memory"""
+    spills, chunk = [], []
+    try:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                spills.append(_spill(chunk))
+                chunk = []
+        if not spills:
+            yield from sorted(chunk, key=lambda r: r.transaction_id)
+            return
+        if chunk:
+            spills.append(_spill(chunk))
+            chunk = []
+        yield from heapq.merge(
+            *(_read_spill(s) for s in spills), key=lambda r: r.transaction_id
+        )
+    finally:
+        for spill in spills:
+            spill.close()
+
+
+def ensure_sorted(records: Iterable[SettlementRecord]) -> Iterator[SettlementRecord]:
+    """Pass through an export that claims to be ordered, failing if it is not"""
+    previous = None
+    for record in records:
+        if previous is not None and record.transaction_id < previous:
+            raise ValueError(
+                f"Settlement export not sorted at {record.transaction_id!r}"
+            )
+        previous = record.transaction_id
+        yield record
+
+
+# --- Ledger side -----------------------------------------------------------
+
+
+def iter_ledger(
+    db: Session,
+    provider: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    batch_size: int,
+) -> Iterator[LedgerRecord]:
+    """
+    Stream the provider's payments ordered by transaction_id (keyset batches
+    on ``(transaction_id, payment_id)``, since several payments can share a
+    transaction_id).
+
+    Every payment with a transaction_id is joined so settlements of older
+    payments still match; ``in_window`` marks the ones that must appear in
+    this export.
+    """
+    order_column = Payment.transaction_id
+    if db.get_bind().dialect.name == "postgresql":
+        # Byte-wise order, matching Python string comparison in the merge;
+        # served by ix_payments_transaction_id_c
+        order_column = Payment.transaction_id.collate("C")
+
+    last = None
+    while True:
+        query = db.query(
+            Payment.transaction_id,
+            Payment.payment_id,
+            Payment.amount,
+            Payment.payment_status,
+            Payment.created_at,
+        ).filter(
+            Payment.transaction_id.isnot(None),
+            Payment.payment_method.in_(PROVIDER_METHODS[provider]),
+        )
+        if last is not None:
+            query = query.filter(tuple_(order_column, Payment.payment_id) > last)
+        rows = (
+            query.order_by(order_column, Payment.payment_id).limit(batch_size).all()
+        )
+        if not rows:
+            return
+        for transaction_id, payment_id, amount, status, created_at in rows:
+            created = created_at
+            if created is not None and created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            in_window = created is not None and (
+                (since is None or created >= since)
+                and (until is None or created < until)
+            )
+            yield LedgerRecord(
+                transaction_id,
+                payment_id,
+                Decimal(amount).quantize(CENT),
+                getattr(status, "value", status),
+                in_window,
+            )
+        last = rows[-1][:2]
+
+
+# --- Merge join ------------------------------------------------------------
+
+
+def _discrepancy(
+    kind: DiscrepancyKind,
+    ledger: Optional[LedgerRecord] = None,
+    settlement: Optional[SettlementRecord] = None,
+) -> Dict[str, object]:
+    return {
+        "kind": kind.value,
+        "transaction_id": (ledger or settlement).transaction_id,
+        "payment_id": ledger.payment_id if ledger else None,
+        "ledger_amount": ledger.amount if ledger else None,
+        "provider_amount": settlement.amount if settlement else None,
+        "ledger_status": ledger.status if ledger else None,
+        "provider_status": settlement.status if settlement else None,
+    }
+
+
+def _compare(ledger: LedgerRecord, settlement: SettlementRecord) -> Optional[Dict]:
+    expected_status = PROVIDER_STATUSES.get(settlement.status)
+    if expected_status is not None and expected_status != ledger.status:
+        return _discrepancy(DiscrepancyKind.STATUS_MISMATCH, ledger, settlement)
+    if settlement.amount is not None and settlement.amount != ledger.amount:
+        return _discrepancy(DiscrepancyKind.AMOUNT_MISMATCH, ledger, settlement)
+    return None
+
+
+def merge_join(
+    ledger: Iterable[LedgerRecord],
+    settlements: Iterable[SettlementRecord],
+    stats: Dict[str, int],
+) -> Iterator[Dict[str, object]]:
+    """
+    Walk two transaction_id-ordered streams once and yield discrepancies.
+    ``stats`` is updated with ledger/provider/matched counts as a side effect.
+    """
+    ledger_iter, settlement_iter = iter(ledger), iter(settlements)
+    current = next(ledger_iter, None)
+    settlement = next(settlement_iter, None)
+    previous_id = None
+    matched_current = False
+
+    while current is not None or settlement is not None:
+        if settlement is not None and settlement.transaction_id == previous_id:
+            stats["provider_count"] += 1
+            yield _discrepancy(
+                DiscrepancyKind.DUPLICATE_SETTLEMENT, settlement=settlement
+            )
+            settlement = next(settlement_iter, None)
+            continue
+
+        if settlement is None or (
+            current is not None and current.transaction_id < settlement.transaction_id
+        ):
+            if current.in_window:
+                stats["ledger_count"] += 1
+            if (
+                not matched_current
+                and current.in_window
+                and current.status == PaymentStatus.SUCCESS.value
+            ):
+                yield _discrepancy(DiscrepancyKind.MISSING_IN_PROVIDER, ledger=current)
+            current = next(ledger_iter, None)
+            matched_current = False
+            continue
+
+        stats["provider_count"] += 1
+        previous_id = settlement.transaction_id
+        if current is not None and current.transaction_id == settlement.transaction_id:
+            stats["matched_count"] += 1
+            matched_current = True
+            issue = _compare(current, settlement)
+            if issue is not None:
+                yield issue
+        else:
+            yield _discrepancy(DiscrepancyKind.MISSING_IN_LEDGER, settlement=settlement)
+        settlement = next(settlement_iter, None)
+
+
+# --- Job -------------------------------------------------------------------
+
+
+class ReconciliationService:
+    @staticmethod
+    def reconcile(
+        db: Session,
+        provider: str,
+        path: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        presorted: bool = False,
+    ) -> ReconciliationRun:
+        """Reconcile one settlement export and return the finished run"""
+        if provider not in PROVIDER_FIELDS:
+            raise ValueError(f"Unsupported provider: {provider}")
+
+        run = ReconciliationRun(provider=provider, source=path, status="running")
+        db.add(run)
+        db.commit()
+
+        stats = {"ledger_count": 0, "provider_count": 0, "matched_count": 0}
+        counts: Dict[str, int] = {}
+        batch: List[ReconciliationDiscrepancy] = []
+        try:
+            settlements = read_settlement_export(path, provider)
+            settlements = (
+                ensure_sorted(settlements)
+                if presorted
+                else external_sort(settlements, settings.reconciliation_sort_chunk_size)
+            )
+            ledger = iter_ledger(
+                db, provider, since, until, settings.reconciliation_db_batch_size
+            )
+            for discrepancy in merge_join(ledger, settlements, stats):
+                counts[discrepancy["kind"]] = counts.get(discrepancy["kind"], 0) + 1
+                batch.append(
+                    ReconciliationDiscrepancy(run_id=run.run_id, **discrepancy)
+                )
+                if len(batch) >= settings.reconciliation_db_batch_size:
+                    db.add_all(batch)
+                    db.commit()
+                    batch = []
+            db.add_all(batch)
+            run.status = "completed"
+        except Exception:
+            db.rollback()
+            run.status = "failed"
+            raise
+        finally:
+            run.ledger_count = stats["ledger_count"]
+            run.provider_count = stats["provider_count"]
+            run.matched_count = stats["matched_count"]
+            run.discrepancy_count = sum(counts.values())
+            run.discrepancy_counts = counts
+            run.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            logger.info(
+                f"[RECONCILIATION] {provider} {run.status}: "
+                f"ledger={run.ledger_count} provider={run.provider_count} "
+                f"matched={run.matched_count} discrepancies={counts}"
+            )
+        return run
+
+
+class FakeSettlementProvider:
+    """
+    Local stand-in for a provider's settlement report, for tests and local
+    runs. Builds an export from ledger payments, optionally corrupting some
+    records so every discrepancy kind can be exercised.
+    """
+
+    def __init__(self, provider: str = "stripe", seed: int = 0):
+        self.provider = provider
+        self.random = random.Random(seed)
+
+    def settlement_rows(
+        self,
+        payments: Iterable[Payment],
+        drop: Iterable[str] = (),
+        amount_changes: Optional[Dict[str, Decimal]] = None,
+        extra: Iterable[str] = (),
+    ) -> List[Dict[str, str]]:
+        drop, amount_changes = set(drop), amount_changes or {}
+        fields = PROVIDER_FIELDS[self.provider]
+        rows = []
+        for p in payments:
+            if p.transaction_id in drop:
+                continue
+            amount = amount_changes.get(p.transaction_id, p.amount)
+            status = getattr(p.payment_status, "value", p.payment_status)
+            rows.append(
+                {
+                    fields["transaction_id"][0]: p.transaction_id,
+                    fields["amount"][0]: str(amount),
+                    fields["currency"][0]: settings.currency,
+                    fields["status"][0]: (
+                        "succeeded" if status == PaymentStatus.SUCCESS.value else status
+                    ),
+                }
+            )
+        for transaction_id in extra:
+            rows.append(
+                {
+                    fields["transaction_id"][0]: transaction_id,
+                    fields["amount"][0]: "1.00",
+                    fields["currency"][0]: settings.currency,
+                    fields["status"][0]: "succeeded",
+                }
+            )
+        # Provider reports are not ordered by transaction id
+        self.random.shuffle(rows)
+        return rows
+
+    def write_export(self, path: str, rows: List[Dict[str, str]]) -> str:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+        return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile a settlement export")
+    parser.add_argument("--provider", choices=sorted(PROVIDER_FIELDS), required=True)
+    parser.add_argument("--file", required=True, help="CSV or JSON Lines export")
+    parser.add_argument(
+        "--window-hours",
+        type=int,
+        default=settings.reconciliation_window_hours,
+        help="Payments created in this window must appear in the export",
+    )
+    parser.add_argument(
+        "--date",
+        help="Settlement day (YYYY-MM-DD, UTC); overrides --window-hours",
+    )
+    parser.add_argument(
+        "--presorted",
+        action="store_true",
+        help="Export is already ordered by transaction id; skip the sort",
+    )
+    args = parser.parse_args(argv)
+
+    from ..db.session import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    if args.date:
+        since = datetime.fromisoformat(args.date).replace(tzinfo=timezone.utc)
+        until = since + timedelta(days=1)
+    else:
+        until = datetime.now(timezone.utc)
+        since = until - timedelta(hours=args.window_hours)
+    db = SessionLocal()
+    try:
+        ReconciliationService.reconcile(
+            db, args.provider, args.file, since, until, presorted=args.presorted
+        )
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
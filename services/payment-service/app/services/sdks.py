@@ -0,0 +1,55 @@
+"""
+Provider SDKs (``stripe``, ``paypalrestsdk``), imported on first use.
+
+Together they add roughly 0.4s to every pod's boot although only the payment
+method flows and the thin gateway endpoints call them; the pooled
+``provider_gateway`` covers the hot paths. The proxies below stand in for
+the modules and import and configure them on first attribute access.
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Optional
+
+from ..core.config import settings
+
+
+class LazySDK:
+    """Module stand-in that imports ``module_name`` on first attribute access"""
+
+    def __init__(self, module_name: str, configure: Optional[Callable] = None):
+        self._module_name = module_name
+        self._configure = configure
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._module_name)
+                    if self._configure is not None:
+                        self._configure(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+
+def _configure_stripe(module) -> None:
+    module.api_key = settings.stripe_secret_key
+
+
+def _configure_paypal(module) -> None:
+    module.configure(
+        {
+            "mode": settings.paypal_mode,
+            "client_id": settings.paypal_client_id,
+            "client_secret": settings.paypal_client_secret,
+        }
+    )
+
+
+stripe = LazySDK("stripe", _configure_stripe)
+paypalrestsdk = LazySDK("paypalrestsdk", _configure_paypal)
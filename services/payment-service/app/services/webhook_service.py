@@ -0,0 +1,558 @@
+"""
+Provider webhook ingestion.
+
+The HTTP endpoints only verify what can be verified cheaply and append the raw
+event to a Redis stream (``settings.webhook_stream``); a pool of workers reads
+the stream through a consumer group and applies payment state transitions in
+batches, one DB transaction per batch. Entries are acknowledged only after the
+batch commits, so a crashed worker's entries are reclaimed by another one.
+
+A webhook can arrive before the transaction that stored its payment's
+transaction_id commits. Such events are not recorded; their entries move to a
+delayed-retry sorted set (``settings.webhook_retry_key``) scored by the time of
+the next attempt, backing off exponentially, and are put back on the stream
+when due. Only once an event is older than ``webhook_retry_max_age_seconds``
+is it recorded as ignored.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud.crud_payment_summary import record_status_change
+from ..metrics import record_consume, record_publish
+from ..models.payment import Payment, PaymentHistory, PaymentStatus
+from ..models.webhook_event import WebhookEvent, WebhookEventStatus, WebhookProvider
+from ..tracing import consume_batch_span, publish_span
+from .events import EventPublisher
+from .provider_gateway import ProviderError, paypal_gateway
+
+logger = logging.getLogger(__name__)
+
+# Provider event type -> resulting payment status
+PAYMENT_TRANSITIONS = {
+    WebhookProvider.STRIPE: {
+        "charge.succeeded": PaymentStatus.SUCCESS,
+        "charge.failed": PaymentStatus.FAILED,
+    },
+    WebhookProvider.PAYPAL: {
+        "PAYMENT.SALE.COMPLETED": PaymentStatus.SUCCESS,
+        "PAYMENT.SALE.DENIED": PaymentStatus.FAILED,
+    },
+}
+
+# Events recorded in payment history without changing the payment status
+INFORMATIONAL_EVENTS = {
+    WebhookProvider.STRIPE: {"charge.refunded"},
+    WebhookProvider.PAYPAL: {"PAYMENT.SALE.REFUNDED"},
+}
+
+PAYPAL_SIGNATURE_HEADERS = (
+    "paypal-auth-algo",
+    "paypal-cert-url",
+    "paypal-transmission-id",
+    "paypal-transmission-sig",
+    "paypal-transmission-time",
+)
+
+
+def verify_stripe_signature(
+    payload: bytes,
+    signature_header: Optional[str],
+    secret: str,
+    tolerance: int,
+    now: Optional[float] = None,
+) -> bool:
+    """Check a ``Stripe-Signature`` header (``t=...,v1=...``) against the body"""
+    if not signature_header:
+        return False
+    timestamp = None
+    signatures = []
+    for part in signature_header.split(","):
+        key, _, value = part.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+    if not timestamp or not signatures:
+        return False
+    try:
+        signed_at = int(timestamp)
+    except ValueError:
+        return False
+    if abs((now if now is not None else time.time()) - signed_at) > tolerance:
+        return False
+
+    expected = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return any(hmac.compare_digest(expected, sig) for sig in signatures)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retry number ``attempts + 1`` of a deferred event"""
+    return min(
+        settings.webhook_retry_base_seconds * 2**attempts,
+        settings.webhook_retry_max_delay_seconds,
+    )
+
+
+def parse_webhook_event(provider: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a provider event to the fields the worker needs"""
+    payment_id = None
+    if provider == WebhookProvider.STRIPE:
+        obj = (event.get("data") or {}).get("object") or {}
+        transaction_id = obj.get("id")
+        # Set by PaymentService on every charge; the only link for failures
+        payment_id = (obj.get("metadata") or {}).get("payment_id")
+    else:
+        resource = event.get("resource") or {}
+        # Sale events reference the payment created by PayPalService
+        transaction_id = resource.get("parent_payment") or resource.get("id")
+    return {
+        "provider": provider,
+        "event_id": event.get("id"),
+        "event_type": event.get("event_type") or event.get("type"),
+        "transaction_id": transaction_id,
+        "payment_id": payment_id,
+    }
+
+
+def _payment_uuid(value: Optional[str]) -> Optional[UUID]:
+    try:
+        return UUID(value) if value else None
+    except ValueError:
+        return None
+
+
+class WebhookQueue:
+    """Durable intake queue on a Redis stream"""
+
+    @staticmethod
+    def enqueue(provider: str, payload: bytes, headers: Dict[str, str]) -> str:
+        """Append a raw webhook to the stream; raises if Redis is unavailable"""
+        r = EventPublisher.get_redis_client()
+        fields = {
+            "provider": provider,
+            "payload": payload.decode("utf-8"),
+            "headers": json.dumps(headers),
+            "received_at": datetime.utcnow().isoformat(),
+        }
+        # The worker continues the intake request's trace
+        with publish_span(settings.webhook_stream, fields, event_type=provider):
+            started = time.perf_counter()
+            message_id = r.xadd(
+                settings.webhook_stream,
+                fields,
+                maxlen=settings.webhook_stream_maxlen,
+                approximate=True,
+            )
+            record_publish(
+                settings.webhook_stream, provider, time.perf_counter() - started
+            )
+        return message_id.decode() if isinstance(message_id, bytes) else message_id
+
+
+class WebhookService:
+    @staticmethod
+    def apply_events(
+        db: Session,
+        events: List[Dict[str, Any]],
+        deferred: Optional[List[Dict[str, Any]]] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """
+        Apply a batch of parsed webhook events in a single transaction.
+
+        Already-processed events (same provider and event ID) are skipped, so
+        provider retries and stream redelivery are harmless. Events for a
+        payment that does not exist yet are left unrecorded and appended to
+        ``deferred`` for a retry, unless they were received longer than
+        ``webhook_retry_max_age_seconds`` ago.
+        """
+        summary = {
+            "applied": 0,
+            "ignored": 0,
+            "duplicate": 0,
+            "invalid": 0,
+            "deferred": 0,
+        }
+        if not events:
+            return summary
+        retry_cutoff = (now or datetime.utcnow()) - timedelta(
+            seconds=settings.webhook_retry_max_age_seconds
+        )
+
+        keys = {(e["provider"], e["event_id"]) for e in events}
+        seen = {
+            (row.provider, row.event_id)
+            for row in db.query(WebhookEvent.provider, WebhookEvent.event_id).filter(
+                WebhookEvent.event_id.in_([event_id for _, event_id in keys])
+            )
+        }
+
+        transaction_ids = {e["transaction_id"] for e in events if e["transaction_id"]}
+        payment_ids = {_payment_uuid(e.get("payment_id")) for e in events} - {None}
+        # Locked (in a stable order) against the synchronous processing path.
+        # Keyed by transaction_id and by payment_id, see _find_payment
+        payments = {}
+        for p in (
+            db.query(Payment)
+            .filter(
+                or_(
+                    Payment.transaction_id.in_(transaction_ids),
+                    Payment.payment_id.in_(payment_ids),
+                )
+            )
+            .order_by(Payment.payment_id)
+            .with_for_update()
+        ):
+            payments[str(p.payment_id)] = p
+            if p.transaction_id:
+                payments[p.transaction_id] = p
+
+        published = []
+        for event in events:
+            key = (event["provider"], event["event_id"])
+            if key in seen:
+                summary["duplicate"] += 1
+                continue
+            seen.add(key)
+
+            status = WebhookService._apply_event(db, event, payments, published)
+            if status is None:
+                received_at = event.get("received_at")
+                if received_at and datetime.fromisoformat(received_at) > retry_cutoff:
+                    # Not recorded, so the retry is not taken for a duplicate
+                    seen.discard(key)
+                    summary["deferred"] += 1
+                    if deferred is not None:
+                        deferred.append(event)
+                    continue
+                status = WebhookEventStatus.IGNORED
+            summary[status.value] += 1
+            db.add(
+                WebhookEvent(
+                    provider=event["provider"],
+                    event_id=event["event_id"],
+                    event_type=event["event_type"] or "",
+                    status=status.value,
+                )
+            )
+
+        # Lifecycle events go through the outbox in the same transaction
+        for event_type, payment in published:
+            if event_type == "PaymentProcessed":
+                EventPublisher.publish_payment_processed(
+                    payment_id=str(payment.payment_id),
+                    request_id=str(payment.request_id),
+                    amount=str(payment.amount),
+                    status="success",
+                    db=db,
+                )
+            else:
+                EventPublisher.publish_payment_failed(
+                    payment_id=str(payment.payment_id),
+                    request_id=str(payment.request_id),
+                    amount=str(payment.amount),
+                    error_code="provider_webhook",
+                    error_message="Provider reported payment failure",
+                    db=db,
+                )
+        db.commit()
+        return summary
+
+    @staticmethod
+    def _find_payment(
+        event: Dict[str, Any], payments: Dict[str, Payment]
+    ) -> Optional[Payment]:
+        payment = payments.get(event["transaction_id"])
+        if payment is None:
+            payment_id = _payment_uuid(event.get("payment_id"))
+            payment = payments.get(str(payment_id)) if payment_id else None
+        return payment
+
+    @staticmethod
+    def _apply_event(
+        db: Session,
+        event: Dict[str, Any],
+        payments: Dict[str, Payment],
+        published: List[Tuple[str, Payment]],
+    ) -> Optional[WebhookEventStatus]:
+        """The event's outcome, or None when its payment is not visible yet"""
+        if event.get("invalid"):
+            return WebhookEventStatus.INVALID
+
+        provider = WebhookProvider(event["provider"])
+        event_type = event["event_type"]
+        new_status = PAYMENT_TRANSITIONS[provider].get(event_type)
+        if new_status is None and event_type not in INFORMATIONAL_EVENTS[provider]:
+            return WebhookEventStatus.IGNORED
+
+        payment = WebhookService._find_payment(event, payments)
+        if payment is None:
+            if event["transaction_id"] or _payment_uuid(event.get("payment_id")):
+                return None
+            return WebhookEventStatus.IGNORED
+
+        if new_status is None:
+            db.add(
+                PaymentHistory(
+                    payment_id=payment.payment_id,
+                    status=payment.payment_status,
+                    notes=f"{provider.value} webhook: {event_type}",
+                )
+            )
+            return WebhookEventStatus.APPLIED
+
+        # Terminal states reached synchronously are not overwritten
+        if payment.payment_status in (
+            new_status,
+            PaymentStatus.SUCCESS,
+            PaymentStatus.CANCELLED,
+        ):
+            return WebhookEventStatus.IGNORED
+
+        record_status_change(db, payment, payment.payment_status, new_status)
+        payment.payment_status = new_status
+        db.add(
+            PaymentHistory(
+                payment_id=payment.payment_id,
+                status=new_status.value,
+                notes=f"{provider.value} webhook: {event_type}",
+            )
+        )
+        published.append(
+            (
+                (
+                    "PaymentProcessed"
+                    if new_status == PaymentStatus.SUCCESS
+                    else "PaymentFailed"
+                ),
+                payment,
+            )
+        )
+        return WebhookEventStatus.APPLIED
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class WebhookWorker:
+    """Consumer-group worker that drains the webhook stream in batches"""
+
+    def __init__(self, consumer_name: str, session_factory=None):
+        self.consumer_name = consumer_name
+        self.session_factory = session_factory
+        self.running = False
+
+    def _get_session(self) -> Session:
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def ensure_group(self, r) -> None:
+        try:
+            r.xgroup_create(
+                settings.webhook_stream,
+                settings.webhook_consumer_group,
+                id="0",
+                mkstream=True,
+            )
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read_batch(self, r) -> List[Tuple[str, Dict[str, str]]]:
+        """Reclaim entries stuck with dead consumers, then read new ones"""
+        claimed = r.xautoclaim(
+            settings.webhook_stream,
+            settings.webhook_consumer_group,
+            self.consumer_name,
+            min_idle_time=settings.webhook_reclaim_idle_ms,
+            start_id="0-0",
+            count=settings.webhook_batch_size,
+        )
+        entries = list(claimed[1]) if claimed else []
+        if not entries:
+            result = r.xreadgroup(
+                settings.webhook_consumer_group,
+                self.consumer_name,
+                {settings.webhook_stream: ">"},
+                count=settings.webhook_batch_size,
+                block=settings.webhook_block_ms,
+            )
+            for _, stream_entries in result or []:
+                entries.extend(stream_entries)
+        return [
+            (
+                _decode(message_id),
+                {_decode(k): _decode(v) for k, v in fields.items()},
+            )
+            for message_id, fields in entries
+            if fields
+        ]
+
+    async def parse_entries(
+        self, entries: List[Tuple[str, Dict[str, str]]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Turn stream entries into parsed events.
+
+        Returns the events plus the IDs that may be acknowledged. Entries whose
+        PayPal verification could not be completed stay pending for a retry.
+        """
+        events, ack_ids = [], []
+        for message_id, fields in entries:
+            provider = fields.get("provider")
+            try:
+                raw = json.loads(fields.get("payload") or "")
+            except ValueError:
+                logger.error(f"Dropping malformed webhook entry {message_id}")
+                ack_ids.append(message_id)
+                continue
+
+            event = parse_webhook_event(provider, raw)
+            if not event["event_id"]:
+                ack_ids.append(message_id)
+                continue
+            event["message_id"] = message_id
+            event["received_at"] = fields.get("received_at")
+
+            if provider == WebhookProvider.PAYPAL:
+                headers = json.loads(fields.get("headers") or "{}")
+                try:
+                    verified = await paypal_gateway.verify_webhook_signature(
+                        headers, settings.paypal_webhook_id, raw
+                    )
+                except ProviderError as e:
+                    logger.warning(f"PayPal verification deferred: {e}")
+                    continue
+                event["invalid"] = not verified
+
+            events.append(event)
+            ack_ids.append(message_id)
+        return events, ack_ids
+
+    def apply(
+        self, events: List[Dict[str, Any]], deferred: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        db = self._get_session()
+        try:
+            return WebhookService.apply_events(db, events, deferred)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def defer(
+        self,
+        r,
+        events: List[Dict[str, Any]],
+        entries: List[Tuple[str, Dict[str, str]]],
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Schedule the entries of deferred events for another attempt. They are
+        acknowledged with the rest of the batch afterwards; a crash in between
+        only delivers the event twice, which the dedupe absorbs.
+        """
+        if not events:
+            return
+        now = time.time() if now is None else now
+        fields_by_id = dict(entries)
+        retries = {}
+        for event in events:
+            fields = dict(fields_by_id[event["message_id"]])
+            attempts = int(fields.get("attempts") or 0)
+            fields["attempts"] = str(attempts + 1)
+            retries[json.dumps(fields, sort_keys=True)] = now + retry_delay(attempts)
+        r.zadd(settings.webhook_retry_key, retries)
+
+    def requeue_due(self, r, now: Optional[float] = None) -> int:
+        """Move deferred entries whose retry time has come back onto the stream"""
+        due = r.zrangebyscore(
+            settings.webhook_retry_key,
+            "-inf",
+            time.time() if now is None else now,
+            start=0,
+            num=settings.webhook_batch_size,
+        )
+        for member in due:
+            # Atomic per entry; two workers racing only add it twice
+            pipe = r.pipeline(transaction=True)
+            pipe.zrem(settings.webhook_retry_key, member)
+            pipe.xadd(
+                settings.webhook_stream,
+                json.loads(_decode(member)),
+                maxlen=settings.webhook_stream_maxlen,
+                approximate=True,
+            )
+            pipe.execute()
+        return len(due)
+
+    async def process_once(self, r) -> int:
+        await asyncio.to_thread(self.requeue_due, r)
+        entries = await asyncio.to_thread(self.read_batch, r)
+        if not entries:
+            return 0
+        deferred: List[Dict[str, Any]] = []
+        with consume_batch_span(
+            settings.webhook_stream, (fields for _, fields in entries)
+        ):
+            events, ack_ids = await self.parse_entries(entries)
+            summary = await asyncio.to_thread(self.apply, events, deferred)
+        await asyncio.to_thread(self.defer, r, deferred, entries)
+        if ack_ids:
+            r.xack(settings.webhook_stream, settings.webhook_consumer_group, *ack_ids)
+        acked = set(ack_ids)
+        for message_id, fields in entries:
+            # Unacknowledged entries stay pending and are counted as errors
+            record_consume(
+                settings.webhook_stream,
+                fields.get("provider"),
+                message_id,
+                ok=message_id in acked,
+            )
+        logger.info(f"[WEBHOOK] {self.consumer_name} processed batch: {summary}")
+        return len(entries)
+
+    async def run(self) -> None:
+        self.running = True
+        r = EventPublisher.get_redis_client()
+        self.ensure_group(r)
+        while self.running:
+            try:
+                await self.process_once(r)
+            except Exception as e:
+                logger.error(f"[WEBHOOK] worker {self.consumer_name} error: {e}")
+                await asyncio.sleep(1)
+
+    def stop(self) -> None:
+        self.running = False
+
+
+def start_webhook_workers() -> List[WebhookWorker]:
+    """Start ``settings.webhook_worker_count`` workers on the running loop"""
+    workers = [
+        WebhookWorker(f"{socket.gethostname()}-webhook-{i}")
+        for i in range(settings.webhook_worker_count)
+    ]
+    for worker in workers:
+        asyncio.create_task(worker.run())
+    return workers
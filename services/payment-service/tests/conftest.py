@@ -22,6 +22,13 @@ def create_test_database():
     # Import all models to ensure they are registered with Base.metadata
     from app.models.payment import Payment, PaymentHistory, Refund
     from app.models.payment_method import UserPaymentMethod, PaymentMethodUsage
+    from app.models.webhook_event import WebhookEvent
+    from app.models.outbox import OutboxEvent
+    from app.models.payment_summary import PaymentSummary
+    from app.models.reconciliation import (
+        ReconciliationDiscrepancy,
+        ReconciliationRun,
+    )
 
     # Create all tables
     Base.metadata.create_all(bind=test_engine)
@@ -71,14 +78,64 @@ def mock_redis():
     class MockRedis:
         def __init__(self):
             self.streams = {}
+            self.sorted_sets = {}
+            self.acked = []
 
-        def xadd(self, stream_name, data):
+        def xadd(self, stream_name, data, **kwargs):
             if stream_name not in self.streams:
                 self.streams[stream_name] = []
             event_id = f"test-{len(self.streams[stream_name])}"
             self.streams[stream_name].append((event_id, data))
             return event_id
 
+        def pipeline(self, transaction=True):
+            redis = self
+
+            class MockPipeline:
+                def __init__(self):
+                    self.commands = []
+
+                def __getattr__(self, name):
+                    def command(*args, **kwargs):
+                        self.commands.append((name, args, kwargs))
+
+                    return command
+
+                def execute(self):
+                    return [
+                        getattr(redis, name)(*a, **kw)
+                        for name, a, kw in self.commands
+                    ]
+
+            return MockPipeline()
+
+        def xack(self, stream_name, group, *ids):
+            self.acked.extend(ids)
+            return len(ids)
+
+        def zadd(self, key, mapping):
+            self.sorted_sets.setdefault(key, {}).update(mapping)
+            return len(mapping)
+
+        def zrangebyscore(self, key, min, max, start=None, num=None):
+            low = float(min)
+            high = float(max)
+            members = sorted(
+                (score, member)
+                for member, score in self.sorted_sets.get(key, {}).items()
+                if low <= score <= high
+            )
+            members = [member for _, member in members]
+            if start is not None:
+                members = members[start : start + num]
+            return members
+
+        def zrem(self, key, *members):
+            removed = 0
+            for member in members:
+                removed += self.sorted_sets.get(key, {}).pop(member, None) is not None
+            return removed
+
         def xread(self, streams, count=10, block=1000):
             # Mock implementation for xread
             result = []
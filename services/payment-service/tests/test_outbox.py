@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.models.outbox import OutboxEvent
+from app.models.payment import PaymentMethod, PaymentStatus
+from app.schemas.payment import PaymentProcess
+from app.services.events import EventPublisher
+from app.services.outbox_relay import OutboxRelay
+from app.services.payment_service import PaymentService
+from app.services.provider_gateway import ProviderDeclined
+
+
+def stage_payment_processed(db_session, payment_id=None):
+    event = EventPublisher.publish_payment_processed(
+        payment_id=payment_id or str(uuid4()),
+        request_id=str(uuid4()),
+        amount="10.00",
+        db=db_session,
+    )
+    db_session.commit()
+    return event
+
+
+class TestOutboxStaging:
+
+    def test_event_is_written_to_outbox_not_redis(self, db_session, mock_redis):
+        event = stage_payment_processed(db_session)
+
+        row = db_session.query(OutboxEvent).one()
+        assert row.event_id == event["event_id"]
+        assert row.stream == "payment_lifecycle"
+        assert row.payload["event_type"] == "PaymentProcessed"
+        assert row.published_at is None
+        assert mock_redis.streams == {}
+
+    def test_rolled_back_transaction_emits_nothing(self, db_session):
+        EventPublisher.publish_payment_failed(
+            payment_id=str(uuid4()),
+            request_id=str(uuid4()),
+            amount="10.00",
+            error_code="card_error",
+            error_message="declined",
+            db=db_session,
+        )
+        db_session.rollback()
+
+        assert db_session.query(OutboxEvent).count() == 0
+
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_declined_payment_commits_failure_event(
+        self, mock_gateway, db_session
+    ):
+        mock_gateway.create_charge = AsyncMock(
+            side_effect=ProviderDeclined("stripe", "Card declined", 402)
+        )
+        payment_in = PaymentProcess(
+            request_id=uuid4(),
+            payer_id=uuid4(),
+            payee_id=uuid4(),
+            amount=Decimal("30.00"),
+            payment_method=PaymentMethod.STRIPE,
+            payment_token="tok_chargeDeclined",
+        )
+
+        with pytest.raises(Exception):
+            await PaymentService.process_payment(db_session, payment_in)
+
+        row = db_session.query(OutboxEvent).one()
+        assert row.event_type == "PaymentFailed"
+        assert row.payload["request_id"] == str(payment_in.request_id)
+        assert row.payload["error_code"] == "card_error"
+
+
+class TestOutboxRelay:
+
+    def test_relay_publishes_in_order_and_marks_sent(self, db_session, mock_redis):
+        events = [stage_payment_processed(db_session) for _ in range(3)]
+        relay = OutboxRelay(session_factory=lambda: db_session, batch_size=2)
+
+        assert relay.relay_batch(db_session, mock_redis) == 2
+        assert relay.relay_batch(db_session, mock_redis) == 1
+        assert relay.relay_batch(db_session, mock_redis) == 0
+
+        published = [fields for _, fields in mock_redis.streams["payment_lifecycle"]]
+        assert [e["event_id"] for e in published] == [e["event_id"] for e in events]
+        assert (
+            db_session.query(OutboxEvent)
+            .filter(OutboxEvent.published_at.is_(None))
+            .count()
+            == 0
+        )
+
+    def test_redis_failure_leaves_rows_pending(self, db_session, mock_redis):
+        stage_payment_processed(db_session)
+        relay = OutboxRelay(session_factory=lambda: db_session)
+
+        failing_pipeline = MagicMock()
+        failing_pipeline.execute.side_effect = ConnectionError("redis down")
+        with patch.object(mock_redis, "pipeline", return_value=failing_pipeline):
+            with pytest.raises(ConnectionError):
+                relay.relay_batch(db_session, mock_redis)
+
+        assert db_session.query(OutboxEvent).one().published_at is None
+        assert relay.relay_batch(db_session, mock_redis) == 1
+        assert len(mock_redis.streams["payment_lifecycle"]) == 1
+
+    def test_purge_removes_old_published_rows(self, db_session):
+        stage_payment_processed(db_session)
+        stage_payment_processed(db_session)
+        old, recent = db_session.query(OutboxEvent).order_by(OutboxEvent.outbox_id)
+        now = datetime.now(timezone.utc)
+        old.published_at = now - timedelta(days=2)
+        recent.published_at = now
+        db_session.commit()
+
+        assert OutboxRelay().purge_published(db_session) == 1
+        assert db_session.query(OutboxEvent).count() == 1
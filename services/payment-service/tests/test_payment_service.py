@@ -1,8 +1,11 @@
+import threading
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from decimal import Decimal
+from fastapi import HTTPException
 from uuid import uuid4
 from app.services.payment_service import PaymentService
+from app.services.provider_gateway import ProviderDeclined, ProviderUnavailable
 from app.models.payment import PaymentStatus, PaymentMethod, RefundStatus
 from app.schemas.payment import PaymentProcess, RefundCreate
 
@@ -32,15 +35,14 @@ class TestPaymentService:
             refund_reason="Customer request",
         )
 
-    @patch("app.services.payment_service.stripe")
-    def test_process_stripe_payment_success(
-        self, mock_stripe, mock_db, sample_payment_process
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_process_stripe_payment_success(
+        self, mock_gateway, mock_db, sample_payment_process
     ):
         """Test successful Stripe payment processing"""
         # Mock Stripe charge
-        mock_charge = Mock()
-        mock_charge.id = "ch_1234567890"
-        mock_stripe.Charge.create.return_value = mock_charge
+        mock_gateway.create_charge = AsyncMock(return_value={"id": "ch_1234567890"})
 
         # Mock database operations
         mock_payment = Mock()
@@ -60,13 +62,47 @@ class TestPaymentService:
             "app.services.payment_service.EventPublisher.publish_payment_processed"
         ):
 
-            result = PaymentService.process_payment(mock_db, sample_payment_process)
+            result = await PaymentService.process_payment(
+                mock_db, sample_payment_process
+            )
 
             assert result.payment_status == PaymentStatus.SUCCESS
             assert result.transaction_id == "ch_1234567890"
+            kwargs = mock_gateway.create_charge.call_args.kwargs
+            assert kwargs["amount"] == 10000
+            assert kwargs["idempotency_key"] == str(mock_payment.payment_id)
+            assert kwargs["metadata"] == {"payment_id": str(mock_payment.payment_id)}
+
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_database_work_runs_off_the_event_loop(
+        self, mock_gateway, mock_db, sample_payment_process
+    ):
+        """Sync CRUD calls must not block the loop serving other requests"""
+        mock_gateway.create_charge = AsyncMock(return_value={"id": "ch_thread"})
+        mock_payment = Mock(payment_id=uuid4())
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def crud(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return mock_payment
+
+        with patch("app.services.payment_service.create_payment", crud), patch(
+            "app.services.payment_service.update_payment", crud
+        ), patch("app.services.payment_service.get_payment_by_id", crud), patch(
+            "app.services.payment_service.create_payment_history", crud
+        ), patch(
+            "app.services.payment_service.EventPublisher.publish_payment_processed"
+        ):
+            await PaymentService.process_payment(mock_db, sample_payment_process)
+
+        assert len(threads) == 5
+        assert loop_thread not in threads
 
+    @pytest.mark.asyncio
     @patch("app.services.payment_service.PayPalService.process_payment")
-    def test_process_paypal_payment_success(self, mock_paypal_service, mock_db):
+    async def test_process_paypal_payment_success(self, mock_paypal_service, mock_db):
         """Test successful PayPal payment processing"""
         # Create PayPal payment request
         paypal_payment_request = PaymentProcess(
@@ -87,13 +123,14 @@ class TestPaymentService:
         }
         mock_paypal_service.return_value = mock_paypal_response
 
-        result = PaymentService.process_payment(mock_db, paypal_payment_request)
+        result = await PaymentService.process_payment(mock_db, paypal_payment_request)
 
         assert result["status"] == "created"
         assert "approval_url" in result
         mock_paypal_service.assert_called_once_with(mock_db, paypal_payment_request)
 
-    def test_process_payment_unsupported_method(self, mock_db):
+    @pytest.mark.asyncio
+    async def test_process_payment_unsupported_method(self, mock_db):
         """Test payment processing with unsupported method"""
         # Create payment request with unsupported method
         unsupported_payment_request = PaymentProcess(
@@ -106,27 +143,64 @@ class TestPaymentService:
         )
 
         with pytest.raises(Exception) as exc_info:
-            PaymentService.process_payment(mock_db, unsupported_payment_request)
+            await PaymentService.process_payment(mock_db, unsupported_payment_request)
 
         assert "Unsupported payment method" in str(exc_info.value)
 
-    @patch("app.services.payment_service.stripe")
-    def test_process_payment_failure(
-        self, mock_stripe, mock_db, sample_payment_process
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_process_payment_failure(
+        self, mock_gateway, mock_db, sample_payment_process
     ):
         """Test payment processing failure"""
-        # Mock Stripe error
-        mock_stripe.error.CardError = Exception
-        mock_stripe.Charge.create.side_effect = Exception("Card declined")
+        # Mock Stripe card decline
+        mock_gateway.create_charge = AsyncMock(
+            side_effect=ProviderDeclined("stripe", "Card declined", 402)
+        )
+
+        mock_payment = Mock()
+        mock_payment.payment_id = uuid4()
 
-        with patch("app.services.payment_service.create_payment"), patch(
-            "app.services.payment_service.update_payment"
-        ), patch("app.services.payment_service.create_payment_history"), patch(
+        with patch(
+            "app.services.payment_service.create_payment", return_value=mock_payment
+        ), patch("app.services.payment_service.update_payment"), patch(
+            "app.services.payment_service.create_payment_history"
+        ), patch(
             "app.services.payment_service.EventPublisher.publish_payment_failed"
         ):
 
-            with pytest.raises(Exception):
-                PaymentService.process_payment(mock_db, sample_payment_process)
+            with pytest.raises(HTTPException) as exc_info:
+                await PaymentService.process_payment(mock_db, sample_payment_process)
+
+            assert exc_info.value.status_code == 400
+            assert "Card declined" in exc_info.value.detail
+
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_process_payment_provider_unavailable(
+        self, mock_gateway, mock_db, sample_payment_process
+    ):
+        """Test payment processing when Stripe is unreachable"""
+        mock_gateway.create_charge = AsyncMock(
+            side_effect=ProviderUnavailable("stripe", "circuit open")
+        )
+
+        mock_payment = Mock()
+        mock_payment.payment_id = uuid4()
+
+        with patch(
+            "app.services.payment_service.create_payment", return_value=mock_payment
+        ), patch("app.services.payment_service.update_payment"), patch(
+            "app.services.payment_service.create_payment_history"
+        ), patch(
+            "app.services.payment_service.EventPublisher.publish_payment_failed"
+        ) as mock_publish_failed:
+
+            with pytest.raises(HTTPException) as exc_info:
+                await PaymentService.process_payment(mock_db, sample_payment_process)
+
+            assert exc_info.value.status_code == 503
+            mock_publish_failed.assert_called_once()
 
     def test_get_payment_history(self, mock_db):
         """Test getting payment history"""
@@ -135,12 +209,11 @@ class TestPaymentService:
         page_size = 20
 
         mock_payments = [Mock(), Mock()]
-        mock_db.query.return_value.filter.return_value.count.return_value = 2
 
         with patch(
             "app.services.payment_service.get_payments_by_user",
             return_value=mock_payments,
-        ):
+        ), patch("app.services.payment_service.get_payment_count", return_value=2):
             result = PaymentService.get_payment_history(
                 mock_db, user_id, page, page_size
             )
@@ -150,8 +223,11 @@ class TestPaymentService:
             assert result["page"] == page
             assert result["page_size"] == page_size
 
-    @patch("app.services.payment_service.stripe")
-    def test_process_refund_success(self, mock_stripe, mock_db, sample_refund_create):
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_process_refund_success(
+        self, mock_gateway, mock_db, sample_refund_create
+    ):
         """Test successful refund processing"""
         # Mock payment
         mock_payment = Mock()
@@ -165,8 +241,7 @@ class TestPaymentService:
         mock_refund.refund_id = uuid4()
 
         # Mock Stripe refund
-        mock_stripe_refund = Mock()
-        mock_stripe.Refund.create.return_value = mock_stripe_refund
+        mock_gateway.create_refund = AsyncMock(return_value={"id": "re_123"})
 
         admin_id = uuid4()
 
@@ -184,7 +259,7 @@ class TestPaymentService:
             # Mock the refund query to return empty list (no existing refunds)
             mock_query.return_value.filter.return_value.all.return_value = []
 
-            result = PaymentService.process_refund(
+            result = await PaymentService.process_refund(
                 mock_db, uuid4(), sample_refund_create, admin_id
             )
 
@@ -1,6 +1,6 @@
 import pytest
 import os
-from unittest.mock import patch, Mock
+from unittest.mock import AsyncMock, patch, Mock
 from decimal import Decimal
 from uuid import uuid4
 from app.services.payment_service import PaymentService
@@ -93,15 +93,14 @@ class TestPaymentServiceWithDatabase:
         retrieved_payment = get_payment_by_id(db_session, payment.payment_id)
         assert retrieved_payment.payment_status == PaymentStatus.SUCCESS
 
-    @patch("app.services.payment_service.stripe")
-    def test_payment_service_with_real_database(
-        self, mock_stripe, db_session, sample_payment_process
+    @pytest.mark.asyncio
+    @patch("app.services.payment_service.stripe_gateway")
+    async def test_payment_service_with_real_database(
+        self, mock_gateway, db_session, sample_payment_process
     ):
         """Test PaymentService using real database operations"""
         # Mock Stripe charge
-        mock_charge = Mock()
-        mock_charge.id = "ch_real_db_test"
-        mock_stripe.Charge.create.return_value = mock_charge
+        mock_gateway.create_charge = AsyncMock(return_value={"id": "ch_real_db_test"})
 
         # Mock external services but use real database
         with patch(
@@ -130,7 +129,9 @@ class TestPaymentServiceWithDatabase:
             mock_update_payment.return_value = real_payment
 
             # Test the service method
-            result = PaymentService.process_payment(db_session, sample_payment_process)
+            result = await PaymentService.process_payment(
+                db_session, sample_payment_process
+            )
 
             # Verify the service worked with real database
             # Note: The service might return pending status initially, so we check for either
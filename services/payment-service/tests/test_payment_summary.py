@@ -0,0 +1,217 @@
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_payment import (
+    create_payment,
+    create_refund,
+    update_payment,
+    update_refund,
+)
+from app.crud.crud_payment_summary import (
+    apply_summary_delta,
+    get_payment_summary,
+    rebuild_payment_summary,
+)
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.payment import Payment, PaymentMethod, PaymentStatus, RefundStatus
+from app.models.payment_summary import PaymentSummary
+from app.schemas.payment import PaymentCreate, PaymentUpdate, RefundCreate, RefundUpdate
+from app.services.payment_service import PaymentService
+
+client = TestClient(app)
+
+
+def make_payment(db_session, payer_id, amount="10.00", method=PaymentMethod.STRIPE):
+    return create_payment(
+        db_session,
+        PaymentCreate(
+            request_id=uuid4(),
+            payer_id=payer_id,
+            payee_id=uuid4(),
+            amount=Decimal(amount),
+            payment_method=method,
+        ),
+    )
+
+
+def set_status(db_session, payment, status):
+    update_payment(db_session, payment.payment_id, PaymentUpdate(payment_status=status))
+
+
+class TestPaymentSummary:
+
+    def test_transitions_update_summary(self, db_session):
+        payer_id = uuid4()
+        first = make_payment(db_session, payer_id, "10.00")
+        second = make_payment(db_session, payer_id, "25.50", PaymentMethod.PAYPAL)
+        set_status(db_session, first, PaymentStatus.PROCESSING)
+        set_status(db_session, first, PaymentStatus.SUCCESS)
+        set_status(db_session, second, PaymentStatus.FAILED)
+
+        summary = get_payment_summary(db_session, payer_id)
+
+        assert summary["total_count"] == 2
+        assert summary["total_amount"] == Decimal("35.50")
+        assert summary["by_status"]["success"] == {
+            "count": 1,
+            "amount": Decimal("10.00"),
+        }
+        assert summary["by_status"]["failed"]["count"] == 1
+        assert set(summary["by_status"]) == {"success", "failed"}
+        assert summary["by_method"]["paypal"]["amount"] == Decimal("25.50")
+
+    def test_completed_refund_is_counted_once(self, db_session):
+        payer_id = uuid4()
+        payment = make_payment(db_session, payer_id, "40.00")
+        refund = create_refund(
+            db_session,
+            RefundCreate(
+                payment_id=payment.payment_id,
+                amount=Decimal("15.00"),
+                refund_reason="Service cancelled",
+            ),
+        )
+        for _ in range(2):
+            update_refund(
+                db_session,
+                refund.refund_id,
+                RefundUpdate(status=RefundStatus.COMPLETED),
+            )
+
+        summary = get_payment_summary(db_session, payer_id)
+
+        assert summary["refunded_count"] == 1
+        assert summary["refunded_amount"] == Decimal("15.00")
+
+    def test_rebuild_matches_incremental(self, db_session):
+        payer_id = uuid4()
+        for amount in ("5.00", "7.25", "12.00"):
+            payment = make_payment(db_session, payer_id, amount)
+            set_status(db_session, payment, PaymentStatus.SUCCESS)
+        incremental = get_payment_summary(db_session, payer_id)
+
+        db_session.query(PaymentSummary).delete()
+        db_session.commit()
+        rebuild_payment_summary(db_session)
+
+        assert get_payment_summary(db_session, payer_id) == incremental
+
+    def test_transition_reads_the_current_status(self, db_session):
+        payer_id = uuid4()
+        payment = make_payment(db_session, payer_id)
+        # db_session still holds the PENDING row another session completes
+        with sessionmaker(bind=db_session.get_bind())() as other:
+            set_status(other, payment, PaymentStatus.SUCCESS)
+
+        set_status(db_session, payment, PaymentStatus.FAILED)
+
+        summary = get_payment_summary(db_session, payer_id)
+        assert summary["by_status"] == {
+            "failed": {"count": 1, "amount": Decimal("10.00")}
+        }
+
+    def test_concurrent_first_payments_share_one_bucket(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'summary.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(bind=engine, tables=[PaymentSummary.__table__])
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        payer_id = uuid4()
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def first_payment():
+            with Session() as db:
+                barrier.wait()
+                try:
+                    apply_summary_delta(
+                        db, payer_id, "total", "all", 1, Decimal("10.00")
+                    )
+                    db.commit()
+                except Exception as exc:
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=first_payment) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        with Session() as db:
+            (row,) = db.query(PaymentSummary).all()
+            assert row.payment_count == 8
+            assert row.amount == Decimal("80.00")
+        engine.dispose()
+
+
+class TestKeysetHistory:
+
+    def test_cursor_walks_every_payment_once(self, db_session):
+        payer_id = uuid4()
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        created = []
+        for i in range(5):
+            payment = make_payment(db_session, payer_id)
+            # Two payments share a timestamp to exercise the payment_id tiebreak
+            payment.created_at = base + timedelta(minutes=min(i, 3))
+            created.append(payment.payment_id)
+        db_session.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = PaymentService.get_payment_history(
+                db_session, payer_id, page_size=2, cursor=cursor
+            )
+            assert page["total_count"] == 5
+            seen.extend(p.payment_id for p in page["payments"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(created)
+        assert len(seen) == 5
+        timestamps = [
+            db_session.get(Payment, payment_id).created_at for payment_id in seen
+        ]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+
+class TestSummaryEndpoints:
+
+    @pytest.fixture(autouse=True)
+    def override_db(self, db_session):
+        app.dependency_overrides[get_db] = lambda: db_session
+        yield
+        app.dependency_overrides.pop(get_db, None)
+
+    def test_summary_endpoint(self, db_session):
+        payer_id = uuid4()
+        payment = make_payment(db_session, payer_id, "20.00")
+        set_status(db_session, payment, PaymentStatus.SUCCESS)
+
+        res = client.get(f"/api/v1/payments/summary?user_id={payer_id}")
+
+        assert res.status_code == 200
+        data = res.json()
+        assert data["total_count"] == 1
+        assert data["by_status"]["success"]["count"] == 1
+        assert [p["payment_id"] for p in data["recent_payments"]] == [
+            str(payment.payment_id)
+        ]
+
+    def test_history_rejects_bad_cursor(self):
+        res = client.get(
+            f"/api/v1/payments/history?user_id={uuid4()}&cursor=not-a-cursor"
+        )
+        assert res.status_code == 400
@@ -1,8 +1,9 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from decimal import Decimal
 from uuid import uuid4
 from app.services.paypal_service import PayPalService
+from app.services.provider_gateway import PayPalGateway, ProviderDeclined
 from app.models.payment import PaymentStatus, PaymentMethod
 from app.schemas.payment import PaymentProcess
 
@@ -24,20 +25,23 @@ class TestPayPalService:
             payment_token="paypal_token",
         )
 
-    @patch("app.services.paypal_service.paypalrestsdk")
-    def test_process_payment_success(
-        self, mock_paypal_sdk, mock_db, sample_paypal_payment_process
+    @pytest.mark.asyncio
+    @patch("app.services.paypal_service.paypal_gateway")
+    async def test_process_payment_success(
+        self, mock_gateway, mock_db, sample_paypal_payment_process
     ):
         """Test successful PayPal payment creation"""
         # Mock PayPal payment creation
-        mock_paypal_payment = Mock()
-        mock_paypal_payment.id = "PAY-123456789"
-        mock_paypal_payment.create.return_value = True
-        mock_paypal_payment.links = [
-            Mock(rel="approval_url", href="https://paypal.com/approve"),
-            Mock(rel="execute", href="https://paypal.com/execute"),
-        ]
-        mock_paypal_sdk.Payment.return_value = mock_paypal_payment
+        mock_gateway.create_payment = AsyncMock(
+            return_value={
+                "id": "PAY-123456789",
+                "links": [
+                    {"rel": "approval_url", "href": "https://paypal.com/approve"},
+                    {"rel": "execute", "href": "https://paypal.com/execute"},
+                ],
+            }
+        )
+        mock_gateway.approval_url = PayPalGateway.approval_url
 
         # Mock database operations
         mock_payment = Mock()
@@ -52,7 +56,7 @@ class TestPayPalService:
             "app.services.paypal_service.get_payment_by_id", return_value=mock_payment
         ):
 
-            result = PayPalService.process_payment(
+            result = await PayPalService.process_payment(
                 mock_db, sample_paypal_payment_process
             )
 
@@ -61,16 +65,16 @@ class TestPayPalService:
             assert "approval_url" in result
             assert result["approval_url"] == "https://paypal.com/approve"
 
-    @patch("app.services.paypal_service.paypalrestsdk")
-    def test_process_payment_failure(
-        self, mock_paypal_sdk, mock_db, sample_paypal_payment_process
+    @pytest.mark.asyncio
+    @patch("app.services.paypal_service.paypal_gateway")
+    async def test_process_payment_failure(
+        self, mock_gateway, mock_db, sample_paypal_payment_process
     ):
         """Test PayPal payment creation failure"""
         # Mock PayPal payment creation failure
-        mock_paypal_payment = Mock()
-        mock_paypal_payment.create.return_value = False
-        mock_paypal_payment.error = "Payment creation failed"
-        mock_paypal_sdk.Payment.return_value = mock_paypal_payment
+        mock_gateway.create_payment = AsyncMock(
+            side_effect=ProviderDeclined("paypal", "Payment creation failed", 400)
+        )
 
         # Mock database operations
         mock_payment = Mock()
@@ -85,12 +89,15 @@ class TestPayPalService:
         ):
 
             with pytest.raises(Exception) as exc_info:
-                PayPalService.process_payment(mock_db, sample_paypal_payment_process)
+                await PayPalService.process_payment(
+                    mock_db, sample_paypal_payment_process
+                )
 
             assert "PayPal payment creation failed" in str(exc_info.value)
 
-    @patch("app.services.paypal_service.paypalrestsdk")
-    def test_execute_payment_success(self, mock_paypal_sdk, mock_db):
+    @pytest.mark.asyncio
+    @patch("app.services.paypal_service.paypal_gateway")
+    async def test_execute_payment_success(self, mock_gateway, mock_db):
         """Test successful PayPal payment execution"""
         payment_id = str(uuid4())
         payer_id = "PAYER123"
@@ -103,9 +110,9 @@ class TestPayPalService:
         mock_payment.transaction_id = "PAY-123456789"
 
         # Mock PayPal payment execution
-        mock_paypal_payment = Mock()
-        mock_paypal_payment.execute.return_value = True
-        mock_paypal_sdk.Payment.find.return_value = mock_paypal_payment
+        mock_gateway.execute_payment = AsyncMock(
+            return_value={"id": "PAY-123456789", "state": "approved"}
+        )
 
         with patch(
             "app.services.paypal_service.get_payment_by_id", return_value=mock_payment
@@ -115,13 +122,16 @@ class TestPayPalService:
             "app.services.paypal_service.EventPublisher.publish_payment_processed"
         ):
 
-            result = PayPalService.execute_payment(mock_db, payment_id, payer_id)
+            result = await PayPalService.execute_payment(mock_db, payment_id, payer_id)
 
             assert result == mock_payment
-            mock_paypal_payment.execute.assert_called_once_with({"payer_id": payer_id})
+            mock_gateway.execute_payment.assert_awaited_once_with(
+                "PAY-123456789", payer_id
+            )
 
-    @patch("app.services.paypal_service.paypalrestsdk")
-    def test_execute_payment_failure(self, mock_paypal_sdk, mock_db):
+    @pytest.mark.asyncio
+    @patch("app.services.paypal_service.paypal_gateway")
+    async def test_execute_payment_failure(self, mock_gateway, mock_db):
         """Test PayPal payment execution failure"""
         payment_id = str(uuid4())
         payer_id = "PAYER123"
@@ -134,10 +144,9 @@ class TestPayPalService:
         mock_payment.transaction_id = "PAY-123456789"
 
         # Mock PayPal payment execution failure
-        mock_paypal_payment = Mock()
-        mock_paypal_payment.execute.return_value = False
-        mock_paypal_payment.error = "Execution failed"
-        mock_paypal_sdk.Payment.find.return_value = mock_paypal_payment
+        mock_gateway.execute_payment = AsyncMock(
+            side_effect=ProviderDeclined("paypal", "Execution failed", 400)
+        )
 
         with patch(
             "app.services.paypal_service.get_payment_by_id", return_value=mock_payment
@@ -148,7 +157,7 @@ class TestPayPalService:
         ):
 
             with pytest.raises(Exception) as exc_info:
-                PayPalService.execute_payment(mock_db, payment_id, payer_id)
+                await PayPalService.execute_payment(mock_db, payment_id, payer_id)
 
             assert "PayPal payment execution failed" in str(exc_info.value)
 
@@ -0,0 +1,244 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.provider_gateway import (
+    CircuitBreaker,
+    PayPalGateway,
+    ProviderClient,
+    ProviderDeclined,
+    ProviderUnavailable,
+    StripeGateway,
+)
+
+
+def make_client(handler, name="stripe", **overrides) -> ProviderClient:
+    options = dict(
+        name=name,
+        base_url="https://provider.test",
+        timeout=1.0,
+        connect_timeout=1.0,
+        max_connections=4,
+        max_concurrency=2,
+        bulkhead_wait=0.05,
+        failure_threshold=2,
+        reset_timeout=30.0,
+        transport=httpx.MockTransport(handler),
+    )
+    options.update(overrides)
+    return ProviderClient(**options)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_half_opens_after_reset(self):
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0]
+        )
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+
+        now[0] = 10.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # Only one probe is let through while half-open
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=5.0, clock=lambda: now[0]
+        )
+        breaker.record_failure()
+        now[0] = 5.0
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestProviderClient:
+
+    @pytest.mark.asyncio
+    async def test_server_errors_open_the_circuit(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={"error": {"message": "down"}})
+
+        client = make_client(handler)
+        for _ in range(2):
+            with pytest.raises(ProviderUnavailable):
+                await client.request("POST", "/v1/charges")
+
+        with pytest.raises(ProviderUnavailable) as exc_info:
+            await client.request("POST", "/v1/charges")
+        assert "circuit open" in str(exc_info.value)
+        assert len(calls) == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_reported_as_unavailable(self):
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        client = make_client(handler)
+        with pytest.raises(ProviderUnavailable) as exc_info:
+            await client.request("GET", "/")
+        assert "timed out" in str(exc_info.value)
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_rejects_excess_concurrency(self):
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200, json={})
+
+        client = make_client(handler, max_concurrency=1)
+        first = asyncio.create_task(client.request("GET", "/"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ProviderUnavailable) as exc_info:
+            await client.request("GET", "/")
+        assert "concurrent" in str(exc_info.value)
+
+        release.set()
+        response = await first
+        assert response.status_code == 200
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_probe_without_verdict_lets_the_next_call_probe(self):
+        release = asyncio.Event()
+        mode = ["fail"]
+
+        async def handler(request):
+            if mode[0] == "fail":
+                return httpx.Response(503, json={})
+            if mode[0] == "hang":
+                await release.wait()
+            if mode[0] == "broken":
+                raise httpx.DecodingError("bad gzip", request=request)
+            return httpx.Response(200, json={})
+
+        now = [0.0]
+        client = make_client(handler, max_concurrency=1, failure_threshold=1)
+        client.breaker._clock = lambda: now[0]
+        with pytest.raises(ProviderUnavailable):
+            await client.request("GET", "/")
+        now[0] = 30.0
+
+        # A call rejected by the full bulkhead never claims the probe
+        mode[0] = "hang"
+        hanging = asyncio.create_task(client.request("GET", "/"))
+        await asyncio.sleep(0)
+        with pytest.raises(ProviderUnavailable) as exc_info:
+            await client.request("GET", "/")
+        assert "concurrent" in str(exc_info.value)
+
+        # Neither does a probe that is cancelled or fails outside the transport
+        hanging.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await hanging
+        mode[0] = "broken"
+        with pytest.raises(httpx.DecodingError):
+            await client.request("GET", "/")
+
+        mode[0] = "ok"
+        response = await client.request("GET", "/")
+        assert response.status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        await client.aclose()
+
+
+class TestStripeGateway:
+
+    @pytest.mark.asyncio
+    async def test_create_charge(self):
+        seen = {}
+
+        def handler(request):
+            seen["path"] = request.url.path
+            seen["auth"] = request.headers["Authorization"]
+            seen["idempotency"] = request.headers.get("Idempotency-Key")
+            seen["body"] = request.content.decode()
+            return httpx.Response(200, json={"id": "ch_123", "status": "succeeded"})
+
+        gateway = StripeGateway(make_client(handler), secret_key="sk_test_1")
+        charge = await gateway.create_charge(
+            amount=1299,
+            currency="usd",
+            source="tok_visa",
+            idempotency_key="pay-1",
+            metadata={"payment_id": "pay-1"},
+        )
+
+        assert charge["id"] == "ch_123"
+        assert seen["path"] == "/v1/charges"
+        assert seen["auth"] == "Bearer sk_test_1"
+        assert seen["idempotency"] == "pay-1"
+        assert "amount=1299" in seen["body"]
+        assert "description" not in seen["body"]
+        assert "metadata%5Bpayment_id%5D=pay-1" in seen["body"]
+        await gateway.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_card_error_is_declined(self):
+        def handler(request):
+            return httpx.Response(
+                402,
+                json={"error": {"type": "card_error", "message": "Card declined"}},
+            )
+
+        gateway = StripeGateway(make_client(handler), secret_key="sk_test_1")
+        with pytest.raises(ProviderDeclined) as exc_info:
+            await gateway.create_charge(amount=100, currency="usd", source="tok")
+        assert exc_info.value.message == "Card declined"
+        assert exc_info.value.status_code == 402
+        # Declines are answers, not outages: the breaker stays closed
+        assert gateway.client.breaker.state == CircuitBreaker.CLOSED
+        await gateway.client.aclose()
+
+
+class TestPayPalGateway:
+
+    @pytest.mark.asyncio
+    async def test_access_token_is_cached(self):
+        token_requests = []
+
+        def handler(request):
+            if request.url.path == "/v1/oauth2/token":
+                token_requests.append(request)
+                return httpx.Response(
+                    200, json={"access_token": "A21", "expires_in": 3600}
+                )
+            assert request.headers["Authorization"] == "Bearer A21"
+            return httpx.Response(
+                201,
+                json={
+                    "id": "PAY-1",
+                    "links": [{"rel": "approval_url", "href": "https://pp/approve"}],
+                },
+            )
+
+        gateway = PayPalGateway(
+            make_client(handler, name="paypal"), client_id="id", client_secret="s"
+        )
+        first = await gateway.create_payment({"intent": "sale"})
+        await gateway.execute_payment("PAY-1", "PAYER")
+
+        assert first["id"] == "PAY-1"
+        assert PayPalGateway.approval_url(first) == "https://pp/approve"
+        assert len(token_requests) == 1
+        await gateway.client.aclose()
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.models.reconciliation import DiscrepancyKind, ReconciliationDiscrepancy
+from app.services import reconciliation
+from app.services.reconciliation import (
+    FakeSettlementProvider,
+    ReconciliationService,
+    SettlementRecord,
+    external_sort,
+    iter_ledger,
+    read_settlement_export,
+)
+
+
+def add_payment(db_session, transaction_id, amount="10.00", status="success"):
+    payment = Payment(
+        request_id=uuid4(),
+        payer_id=uuid4(),
+        payee_id=uuid4(),
+        amount=Decimal(amount),
+        payment_method=PaymentMethod.STRIPE.value,
+        payment_status=status,
+        transaction_id=transaction_id,
+    )
+    db_session.add(payment)
+    return payment
+
+
+def kinds(db_session, run):
+    return {
+        (d.kind, d.transaction_id)
+        for d in db_session.query(ReconciliationDiscrepancy).filter(
+            ReconciliationDiscrepancy.run_id == run.run_id
+        )
+    }
+
+
+class TestSettlementStreaming:
+
+    def test_external_sort_spills_and_merges(self):
+        ids = [f"ch_{i:04d}" for i in range(250)]
+        shuffled = ids[::7] + [i for i in ids if i not in ids[::7]]
+        records = (
+            SettlementRecord(i, Decimal("1.00"), "USD", "succeeded") for i in shuffled
+        )
+
+        with patch(
+            "app.services.reconciliation._spill",
+            wraps=reconciliation._spill,
+        ) as spill:
+            result = [r.transaction_id for r in external_sort(records, chunk_size=40)]
+
+        assert result == ids
+        assert spill.call_count == 7
+
+    @pytest.mark.parametrize("extension", ["csv", "jsonl"])
+    def test_paypal_export_formats(self, tmp_path, extension):
+        provider = FakeSettlementProvider("paypal")
+        path = str(tmp_path / f"paypal.{extension}")
+        provider.write_export(
+            path,
+            [
+                {
+                    "Transaction ID": "PAY-1",
+                    "Gross": "12.5",
+                    "Currency": "usd",
+                    "Status": "S",
+                }
+            ],
+        )
+
+        (record,) = read_settlement_export(path, "paypal")
+
+        assert record.transaction_id == "PAY-1"
+        assert record.amount == Decimal("12.50")
+        assert record.currency == "USD"
+        assert record.status == "s"
+
+
+class TestReconciliation:
+
+    @pytest.mark.parametrize("presorted", [False, True])
+    def test_detects_every_discrepancy_kind(self, db_session, tmp_path, presorted):
+        payments = [
+            add_payment(db_session, "ch_ok"),
+            add_payment(db_session, "ch_missing"),
+            add_payment(db_session, "ch_amount", "20.00"),
+            add_payment(db_session, "ch_status", status="processing"),
+            add_payment(db_session, "ch_pending_unsettled", status="processing"),
+        ]
+        db_session.commit()
+
+        provider = FakeSettlementProvider("stripe")
+        rows = provider.settlement_rows(
+            payments,
+            drop=["ch_missing", "ch_pending_unsettled"],
+            amount_changes={"ch_amount": Decimal("19.00")},
+            extra=["ch_unknown"],
+        )
+        status_row = next(r for r in rows if r["source_id"] == "ch_status")
+        status_row["status"] = "succeeded"
+        duplicate_id = rows[0]["source_id"]
+        rows.append(dict(rows[0]))
+        if presorted:
+            rows.sort(key=lambda r: r["source_id"])
+        path = provider.write_export(str(tmp_path / "stripe.csv"), rows)
+
+        run = ReconciliationService.reconcile(
+            db_session,
+            "stripe",
+            path,
+            since=datetime.now(timezone.utc) - timedelta(days=1),
+            presorted=presorted,
+        )
+
+        assert kinds(db_session, run) == {
+            (DiscrepancyKind.MISSING_IN_PROVIDER.value, "ch_missing"),
+            (DiscrepancyKind.MISSING_IN_LEDGER.value, "ch_unknown"),
+            (DiscrepancyKind.AMOUNT_MISMATCH.value, "ch_amount"),
+            (DiscrepancyKind.STATUS_MISMATCH.value, "ch_status"),
+            (DiscrepancyKind.DUPLICATE_SETTLEMENT.value, duplicate_id),
+        }
+        assert run.status == "completed"
+        assert run.ledger_count == 5
+        assert run.provider_count == 5
+        assert run.matched_count == 3
+        assert run.discrepancy_counts[DiscrepancyKind.AMOUNT_MISMATCH.value] == 1
+
+    def test_old_payments_match_but_are_not_required(self, db_session, tmp_path):
+        old = add_payment(db_session, "ch_old")
+        old.created_at = datetime.now(timezone.utc) - timedelta(days=30)
+        settled = add_payment(db_session, "ch_settled_late")
+        settled.created_at = old.created_at
+        db_session.commit()
+
+        provider = FakeSettlementProvider("stripe")
+        path = provider.write_export(
+            str(tmp_path / "stripe.jsonl"),
+            provider.settlement_rows([settled]),
+        )
+
+        run = ReconciliationService.reconcile(
+            db_session,
+            "stripe",
+            path,
+            since=datetime.now(timezone.utc) - timedelta(days=1),
+        )
+
+        assert run.matched_count == 1
+        assert run.ledger_count == 0
+        assert run.discrepancy_count == 0
+
+    def test_unsorted_presorted_export_fails_run(self, db_session, tmp_path):
+        provider = FakeSettlementProvider("stripe")
+        path = provider.write_export(
+            str(tmp_path / "stripe.csv"),
+            [
+                {
+                    "source_id": "ch_b",
+                    "gross": "1.00",
+                    "currency": "USD",
+                    "status": "succeeded",
+                },
+                {
+                    "source_id": "ch_a",
+                    "gross": "1.00",
+                    "currency": "USD",
+                    "status": "succeeded",
+                },
+            ],
+        )
+
+        with pytest.raises(ValueError):
+            ReconciliationService.reconcile(db_session, "stripe", path, presorted=True)
+
+    def test_ledger_batches_keep_shared_transaction_ids(self, db_session):
+        shared = [add_payment(db_session, "ch_shared") for _ in range(3)]
+        later = add_payment(db_session, "ch_zzz")
+        db_session.commit()
+
+        records = list(iter_ledger(db_session, "stripe", None, None, batch_size=2))
+
+        assert [r.transaction_id for r in records] == ["ch_shared"] * 3 + ["ch_zzz"]
+        assert {r.payment_id for r in records} == {
+            p.payment_id for p in shared + [later]
+        }
+
+    def test_keyset_index_uses_byte_order_on_postgres(self):
+        index = next(
+            i for i in Payment.__table__.indexes
+            if i.name == "ix_payments_transaction_id_c"
+        )
+
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+        assert 'transaction_id COLLATE "C"' in ddl
+        assert ddl.rstrip().endswith("payment_id)")
@@ -0,0 +1,309 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.crud.crud_payment import create_payment, get_payment_by_id, update_payment
+from app.main import app
+from app.models.payment import PaymentHistory, PaymentMethod, PaymentStatus
+from app.models.outbox import OutboxEvent
+from app.models.webhook_event import WebhookEvent
+from app.schemas.payment import PaymentCreate, PaymentUpdate
+from app.services.provider_gateway import ProviderUnavailable
+from app.services.webhook_service import (
+    WebhookService,
+    WebhookWorker,
+    parse_webhook_event,
+    retry_delay,
+    verify_stripe_signature,
+)
+
+client = TestClient(app)
+
+
+def sign(payload: bytes, secret: str, timestamp: int) -> str:
+    digest = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def stripe_event(
+    event_type: str, charge_id: str, event_id: str = None, payment_id=None
+) -> dict:
+    charge = {"id": charge_id, "object": "charge"}
+    if payment_id:
+        charge["metadata"] = {"payment_id": str(payment_id)}
+    return {
+        "id": event_id or f"evt_{uuid4().hex}",
+        "type": event_type,
+        "data": {"object": charge},
+    }
+
+
+def received(event: dict, age_seconds: float = 0) -> dict:
+    """``event`` as the worker sees it, queued ``age_seconds`` ago"""
+    queued_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    return {**event, "received_at": queued_at.isoformat()}
+
+
+def make_payment(db_session, transaction_id: str, status=PaymentStatus.PROCESSING):
+    payment = create_payment(
+        db_session,
+        PaymentCreate(
+            request_id=uuid4(),
+            payer_id=uuid4(),
+            payee_id=uuid4(),
+            amount=Decimal("25.00"),
+            payment_method=PaymentMethod.STRIPE,
+        ),
+    )
+    update_payment(
+        db_session,
+        payment.payment_id,
+        PaymentUpdate(payment_status=status, transaction_id=transaction_id),
+    )
+    return payment
+
+
+class TestStripeSignature:
+
+    def test_valid_signature(self):
+        payload = b'{"id": "evt_1"}'
+        now = int(time.time())
+        header = sign(payload, "whsec_test", now)
+        assert verify_stripe_signature(payload, header, "whsec_test", 300, now=now)
+
+    def test_tampered_payload_is_rejected(self):
+        now = int(time.time())
+        header = sign(b'{"id": "evt_1"}', "whsec_test", now)
+        assert not verify_stripe_signature(
+            b'{"id": "evt_2"}', header, "whsec_test", 300, now=now
+        )
+
+    def test_stale_timestamp_is_rejected(self):
+        payload = b"{}"
+        header = sign(payload, "whsec_test", 1000)
+        assert not verify_stripe_signature(payload, header, "whsec_test", 300, now=2000)
+
+    def test_missing_header_is_rejected(self):
+        assert not verify_stripe_signature(b"{}", None, "whsec_test", 300)
+
+
+class TestWebhookIntake:
+
+    def test_stripe_webhook_is_queued(self, mock_redis):
+        payload = json.dumps(stripe_event("charge.succeeded", "ch_1")).encode()
+        header = sign(payload, settings.stripe_webhook_secret, int(time.time()))
+
+        res = client.post(
+            "/api/v1/webhooks/stripe",
+            content=payload,
+            headers={"Stripe-Signature": header},
+        )
+
+        assert res.status_code == 200
+        assert res.json()["received"] is True
+        _, fields = mock_redis.streams[settings.webhook_stream][0]
+        assert fields["provider"] == "stripe"
+        assert fields["payload"] == payload.decode()
+
+    def test_stripe_webhook_bad_signature(self, mock_redis):
+        res = client.post(
+            "/api/v1/webhooks/stripe",
+            content=b"{}",
+            headers={"Stripe-Signature": "t=1,v1=deadbeef"},
+        )
+        assert res.status_code == 400
+        assert settings.webhook_stream not in mock_redis.streams
+
+    def test_paypal_webhook_requires_transmission_headers(self, mock_redis):
+        res = client.post("/api/v1/webhooks/paypal", content=b"{}")
+        assert res.status_code == 400
+
+    def test_queue_outage_asks_provider_to_retry(self, mock_redis):
+        payload = b"{}"
+        header = sign(payload, settings.stripe_webhook_secret, int(time.time()))
+        with patch(
+            "app.services.webhook_service.EventPublisher.get_redis_client",
+            side_effect=ConnectionError("redis down"),
+        ):
+            res = client.post(
+                "/api/v1/webhooks/stripe",
+                content=payload,
+                headers={"Stripe-Signature": header},
+            )
+        assert res.status_code == 503
+
+
+class TestWebhookService:
+
+    def test_charge_succeeded_applies_transition(self, db_session, mock_redis):
+        payment = make_payment(db_session, "ch_success")
+        event = parse_webhook_event(
+            "stripe", stripe_event("charge.succeeded", "ch_success")
+        )
+
+        summary = WebhookService.apply_events(db_session, [event])
+
+        assert summary["applied"] == 1
+        db_session.expire_all()
+        assert (
+            get_payment_by_id(db_session, payment.payment_id).payment_status
+            == PaymentStatus.SUCCESS
+        )
+        history = (
+            db_session.query(PaymentHistory)
+            .filter(PaymentHistory.payment_id == payment.payment_id)
+            .all()
+        )
+        assert [h.status for h in history] == ["success"]
+        outbox = db_session.query(OutboxEvent).all()
+        assert [row.event_type for row in outbox] == ["PaymentProcessed"]
+        assert "payment_lifecycle" not in mock_redis.streams
+
+    def test_failed_charge_matches_by_payment_id(self, db_session, mock_redis):
+        # Declined charges never get their ID stored as the transaction_id
+        payment = make_payment(db_session, None)
+        event = parse_webhook_event(
+            "stripe",
+            stripe_event("charge.failed", "ch_declined", payment_id=payment.payment_id),
+        )
+
+        summary = WebhookService.apply_events(db_session, [event])
+
+        assert summary["applied"] == 1
+        db_session.expire_all()
+        assert (
+            get_payment_by_id(db_session, payment.payment_id).payment_status
+            == PaymentStatus.FAILED
+        )
+
+    def test_batch_is_idempotent(self, db_session, mock_redis):
+        make_payment(db_session, "ch_failed")
+        event = parse_webhook_event(
+            "stripe", stripe_event("charge.failed", "ch_failed", "evt_fixed")
+        )
+
+        first = WebhookService.apply_events(db_session, [event, dict(event)])
+        second = WebhookService.apply_events(db_session, [event])
+
+        assert first["applied"] == 1
+        assert first["duplicate"] == 1
+        assert second["duplicate"] == 1
+        assert db_session.query(WebhookEvent).count() == 1
+        assert db_session.query(OutboxEvent).count() == 1
+
+    def test_unknown_payment_and_terminal_state_are_ignored(
+        self, db_session, mock_redis
+    ):
+        make_payment(db_session, "ch_done", status=PaymentStatus.SUCCESS)
+        too_old = settings.webhook_retry_max_age_seconds + 60
+        events = [
+            parse_webhook_event("stripe", stripe_event("charge.failed", "ch_done")),
+            received(
+                parse_webhook_event(
+                    "stripe", stripe_event("charge.succeeded", "ch_unknown")
+                ),
+                too_old,
+            ),
+        ]
+
+        summary = WebhookService.apply_events(db_session, events)
+
+        assert summary["ignored"] == 2
+        assert db_session.query(OutboxEvent).count() == 0
+
+    def test_event_before_payment_commit_is_deferred(self, db_session, mock_redis):
+        event = received(
+            parse_webhook_event(
+                "stripe", stripe_event("charge.succeeded", "ch_late", "evt_late")
+            )
+        )
+        deferred = []
+
+        first = WebhookService.apply_events(db_session, [event], deferred)
+
+        assert first["deferred"] == 1
+        assert deferred == [event]
+        assert db_session.query(WebhookEvent).count() == 0
+
+        payment = make_payment(db_session, "ch_late")
+        second = WebhookService.apply_events(db_session, [event])
+
+        assert second["applied"] == 1
+        db_session.expire_all()
+        assert (
+            get_payment_by_id(db_session, payment.payment_id).payment_status
+            == PaymentStatus.SUCCESS
+        )
+
+
+class TestWebhookWorker:
+
+    @pytest.mark.asyncio
+    async def test_paypal_verification(self):
+        event = {
+            "id": "WH-1",
+            "event_type": "PAYMENT.SALE.COMPLETED",
+            "resource": {"id": "SALE-1", "parent_payment": "PAY-1"},
+        }
+        entries = [
+            ("1-0", {"provider": "paypal", "payload": json.dumps(event)}),
+            ("2-0", {"provider": "paypal", "payload": "not json"}),
+        ]
+        worker = WebhookWorker("test")
+
+        with patch(
+            "app.services.webhook_service.paypal_gateway.verify_webhook_signature",
+            AsyncMock(return_value=False),
+        ):
+            events, ack_ids = await worker.parse_entries(entries)
+
+        assert ack_ids == ["1-0", "2-0"]
+        assert events[0]["transaction_id"] == "PAY-1"
+        assert events[0]["invalid"] is True
+
+    def test_deferred_entry_returns_to_stream_when_due(self, mock_redis):
+        fields = {"provider": "stripe", "payload": "{}", "attempts": "2"}
+        worker = WebhookWorker("test")
+
+        worker.defer(mock_redis, [{"message_id": "1-0"}], [("1-0", fields)], now=1000)
+
+        assert worker.requeue_due(mock_redis, now=1000 + retry_delay(2) - 1) == 0
+        assert worker.requeue_due(mock_redis, now=1000 + retry_delay(2)) == 1
+        assert mock_redis.sorted_sets[settings.webhook_retry_key] == {}
+        _, requeued = mock_redis.streams[settings.webhook_stream][-1]
+        assert requeued == {**fields, "attempts": "3"}
+
+    def test_retry_delay_backs_off_up_to_the_cap(self):
+        assert retry_delay(0) == settings.webhook_retry_base_seconds
+        assert retry_delay(1) == 2 * settings.webhook_retry_base_seconds
+        assert retry_delay(50) == settings.webhook_retry_max_delay_seconds
+
+    @pytest.mark.asyncio
+    async def test_unverifiable_paypal_entry_stays_pending(self):
+        entries = [
+            (
+                "1-0",
+                {"provider": "paypal", "payload": json.dumps({"id": "WH-2"})},
+            )
+        ]
+        worker = WebhookWorker("test")
+
+        with patch(
+            "app.services.webhook_service.paypal_gateway.verify_webhook_signature",
+            AsyncMock(side_effect=ProviderUnavailable("paypal", "circuit open")),
+        ):
+            events, ack_ids = await worker.parse_entries(entries)
+
+        assert events == []
+        assert ack_ids == []
@@ -0,0 +1,55 @@
+"""Create rating_summaries table
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-01-02 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('rating_summaries',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('score_1', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('score_2', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('score_3', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('score_4', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('score_5', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_ratings_rated_user_id', 'ratings', ['rated_user_id'])
+
+    # 从现有评分回填摘要
+    op.execute(
+        """
+        INSERT INTO rating_summaries
+            (user_id, rating_count, rating_sum, score_1, score_2, score_3, score_4, score_5)
+        SELECT rated_user_id,
+               COUNT(*),
+               SUM(rating_score),
+               COUNT(*) FILTER (WHERE rating_score = 1),
+               COUNT(*) FILTER (WHERE rating_score = 2),
+               COUNT(*) FILTER (WHERE rating_score = 3),
+               COUNT(*) FILTER (WHERE rating_score = 4),
+               COUNT(*) FILTER (WHERE rating_score = 5)
+        FROM ratings
+        GROUP BY rated_user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ratings_rated_user_id', table_name='ratings')
+    op.drop_table('rating_summaries')
@@ -0,0 +1,37 @@
+"""Create reputation_scores table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-03 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reputation_scores',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('decayed_count', sa.Float(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('last_rated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_reputation_scores_score_user_id', 'reputation_scores', ['score', 'user_id'])
+    op.create_index('ix_rating_summaries_updated_at', 'rating_summaries', ['updated_at'])
+    # 表由服务启动后的第一次全量计算填充
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rating_summaries_updated_at', table_name='rating_summaries')
+    op.drop_index('ix_reputation_scores_score_user_id', table_name='reputation_scores')
+    op.drop_table('reputation_scores')
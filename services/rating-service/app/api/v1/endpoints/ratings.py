@@ -4,13 +4,19 @@ from typing import List, Optional, Union
 from uuid import UUID
 import os
 
-from ....db.session import get_db
+from ....db.session import get_db, get_read_db
 from ....crud.crud_rating import rating
+from ....crud.crud_reputation import reputation
 from ....schemas.rating import (
     RatingResponse, 
     RatingCreateFrontend, 
     RatingUpdateFrontend,
     RatingSummary,
+    RatingSummaryBatchRequest,
+    RatingSummaryBatchResponse,
+    RatingImportRequest,
+    RatingImportResponse,
+    ReputationResponse,
     CanRateResponse
 )
 
@@ -27,7 +33,7 @@ def get_id_type():
 
 @router.get("/", response_model=List[RatingResponse])
 def get_ratings(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     user_id: Optional[Union[str, UUID]] = Query(None),
@@ -59,17 +65,9 @@ def create_rating(
     # 转换为内部格式
     rating_create = rating_data.to_rating_create()
     
-    # 检查是否可以评分
-    if not rating.can_rate_user(
-        db=db,
-        rater_user_id=rater_user_id,
-        rated_user_id=rating_create.rated_user_id,
-        service_request_id=rating_create.service_request_id
-    ):
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot rate this user for this service request"
-        )
+    # 自评在内存中判断；重复评分由唯一约束在插入时拒绝，不再预先查询
+    if str(rater_user_id) == str(rating_create.rated_user_id):
+        raise HTTPException(status_code=400, detail="Cannot rate yourself")
     
     # 创建评分
     new_rating = rating.create(
@@ -77,13 +75,50 @@ def create_rating(
         obj_in=rating_create,
         rater_user_id=rater_user_id
     )
+    if new_rating is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Already rated this service request"
+        )
     return new_rating
 
 
+@router.post("/import", response_model=RatingImportResponse)
+def import_ratings(
+    request: RatingImportRequest,
+    db: Session = Depends(get_db)
+):
+    """批量导入评分（历史数据回填），重复评分和自评被跳过"""
+    imported, skipped = rating.import_ratings(db=db, items=request.ratings)
+    return RatingImportResponse(imported=imported, skipped=skipped)
+
+
+@router.post("/summaries", response_model=RatingSummaryBatchResponse)
+def get_rating_summaries(
+    request: RatingSummaryBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    批量获取用户评分摘要（列表页一次请求，不做聚合查询）。
+    未命中的摘要会写入 Redis 缓存，所以只从主库读取：副本的延迟数据不能进缓存。
+    """
+    summaries = rating.get_rating_summaries(db=db, user_ids=request.user_ids)
+    return {"summaries": summaries}
+
+
+@router.get("/reputation/top", response_model=List[ReputationResponse])
+def get_top_reputation(
+    db: Session = Depends(get_read_db),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """信誉分最高的用户"""
+    return reputation.get_top(db=db, limit=limit)
+
+
 @router.get("/{rating_id}", response_model=RatingResponse)
 def get_rating(
     rating_id: Union[str, UUID],
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """获取特定评分"""
     rating_obj = rating.get(db=db, id=rating_id)
@@ -147,13 +182,25 @@ def delete_rating(
 @router.get("/users/{user_id}/summary", response_model=RatingSummary)
 def get_user_rating_summary(
     user_id: Union[str, UUID],
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """获取用户评分摘要"""
     summary = rating.get_user_rating_summary(db=db, user_id=user_id)
     return summary
 
 
+@router.get("/users/{user_id}/reputation", response_model=ReputationResponse)
+def get_user_reputation(
+    user_id: Union[str, UUID],
+    db: Session = Depends(get_read_db)
+):
+    """获取用户信誉分"""
+    reputation_obj = reputation.get(db=db, user_id=user_id)
+    if not reputation_obj:
+        raise HTTPException(status_code=404, detail="Reputation not computed yet")
+    return reputation_obj
+
+
 @router.get("/can_rate/{rated_user_id}/{service_request_id}", response_model=CanRateResponse)
 def can_rate_user(
     rated_user_id: Union[str, UUID],
@@ -163,26 +210,15 @@ def can_rate_user(
     rater_user_id: Union[str, UUID] = Query(..., description="评分者用户ID")
 ):
     """检查是否可以评分"""
+    if str(rater_user_id) == str(rated_user_id):
+        return CanRateResponse(can_rate=False, reason="Cannot rate yourself")
+
+    # 自评已排除，剩下唯一的拒绝原因是已经评过分，一次 EXISTS 查询即可
     can_rate = rating.can_rate_user(
         db=db,
         rater_user_id=rater_user_id,
         rated_user_id=rated_user_id,
         service_request_id=service_request_id
     )
-    
-    reason = None
-    if not can_rate:
-        # 检查具体原因
-        existing_rating = rating.get_rating_by_request_and_rater(
-            db=db,
-            rater_user_id=rater_user_id,
-            service_request_id=service_request_id
-        )
-        if existing_rating:
-            reason = "Already rated this service request"
-        elif rater_user_id == rated_user_id:
-            reason = "Cannot rate yourself"
-        else:
-            reason = "Cannot rate this user for this service request"
-    
+    reason = None if can_rate else "Already rated this service request"
     return CanRateResponse(can_rate=can_rate, reason=reason)
@@ -1,28 +1,114 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, or_, func, exists
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+from collections import Counter
 
-from ..models.rating import Rating
-from ..schemas.rating import RatingCreate, RatingUpdate
+from ..models.rating import Rating, UserRatingSummary
+from ..schemas.rating import RatingCreate, RatingUpdate, RatingImportItem
+from ..services.summary_cache import summary_cache
+from ..metrics import instrument_crud
+
+
+def _empty_summary(user_id) -> Dict[str, Any]:
+    return {
+        'user_id': str(user_id),
+        'average_rating': 0.0,
+        'total_ratings': 0,
+        'rating_distribution': {}
+    }
+
+
+def _summary_to_dict(row: UserRatingSummary) -> Dict[str, Any]:
+    # 分布的键用字符串，和缓存中 JSON 反序列化后的形状保持一致
+    return {
+        'user_id': str(row.user_id),
+        'average_rating': row.average_rating,
+        'total_ratings': row.rating_count or 0,
+        'rating_distribution': {
+            str(score): count for score, count in row.rating_distribution.items()
+        }
+    }
+
+
+# 单条 INSERT 的行数上限，避免超出数据库的绑定参数个数限制
+IMPORT_CHUNK_SIZE = 500
 
 
 class CRUDRating:
-    def create(self, db: Session, *, obj_in: RatingCreate, rater_user_id: UUID) -> Rating:
-        """创建评分"""
-        db_obj = Rating(
-            rating_score=obj_in.rating_score,
-            comment=obj_in.comment,
-            rated_user_id=obj_in.rated_user_id,
-            rater_user_id=rater_user_id,
-            service_request_id=obj_in.service_request_id,
-            data=obj_in.data or {}
+    def insert_ignoring_duplicates(self, db: Session, rows: List[Dict[str, Any]]) -> List[Rating]:
+        """
+        INSERT ... ON CONFLICT (rater_user_id, service_request_id) DO NOTHING RETURNING *。
+        已存在（或同一批次中重复）的评分被跳过，只返回真正插入的行，不提交。
+        """
+        if not rows:
+            return []
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = (
+            insert(Rating)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["rater_user_id", "service_request_id"])
+            .returning(Rating)
         )
-        db.add(db_obj)
+        return list(db.scalars(stmt, execution_options={"populate_existing": True}))
+
+    def create(self, db: Session, *, obj_in: RatingCreate, rater_user_id: UUID) -> Optional[Rating]:
+        """创建评分；该评分者已对该服务请求评过分时返回 None"""
+        created = self.insert_ignoring_duplicates(db, [{
+            "rating_score": obj_in.rating_score,
+            "comment": obj_in.comment,
+            "rated_user_id": obj_in.rated_user_id,
+            "rater_user_id": rater_user_id,
+            "service_request_id": obj_in.service_request_id,
+            "data": obj_in.data or {},
+        }])
+        if not created:
+            db.rollback()
+            return None
+
+        db_obj = created[0]
+        self.apply_summary_delta(db, user_id=db_obj.rated_user_id, score=db_obj.rating_score, delta=1)
+        # RETURNING 已带回所有列；脱离会话后提交不会使其过期，返回时无需再 SELECT 一次
+        db.expunge(db_obj)
         db.commit()
-        db.refresh(db_obj)
+        summary_cache.invalidate([db_obj.rated_user_id])
         return db_obj
 
+    def import_ratings(self, db: Session, *, items: List[RatingImportItem]) -> Tuple[int, int]:
+        """
+        批量导入评分（历史数据回填），与 create 走同一条 INSERT ... ON CONFLICT 路径。
+        自评和重复评分被跳过。每个 (被评分用户, 分值) 只更新一次摘要，整批一次提交。
+        返回 (导入数, 跳过数)。
+        """
+        rows = []
+        for item in items:
+            if str(item.rater_user_id) == str(item.rated_user_id):
+                continue
+            row = {
+                "rating_score": item.rating_score,
+                "comment": item.comment,
+                "rated_user_id": item.rated_user_id,
+                "rater_user_id": item.rater_user_id,
+                "service_request_id": item.service_request_id,
+                "data": item.data or {},
+                # 多行 VALUES 要求每行列一致，未给出原始时间的行用数据库当前时间
+                "created_at": item.created_at if item.created_at is not None else func.now(),
+            }
+            rows.append(row)
+
+        created: List[Rating] = []
+        for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+            created.extend(self.insert_ignoring_duplicates(db, rows[start:start + IMPORT_CHUNK_SIZE]))
+
+        deltas = Counter((obj.rated_user_id, obj.rating_score) for obj in created)
+        for (rated_user_id, score), count in deltas.items():
+            self.apply_summary_delta(db, user_id=rated_user_id, score=score, delta=count)
+        db.commit()
+        summary_cache.invalidate({rated_user_id for rated_user_id, _ in deltas})
+        return len(created), len(items) - len(created)
+
     def get(self, db: Session, *, id: UUID) -> Optional[Rating]:
         """根据ID获取评分"""
         return db.query(Rating).filter(Rating.id == id).first()
@@ -57,6 +143,7 @@ class CRUDRating:
     def update(self, db: Session, *, db_obj: Rating, obj_in: RatingUpdate) -> Rating:
         """更新评分"""
         update_data = obj_in.dict(exclude_unset=True)
+        old_score = db_obj.rating_score
         
         for field, value in update_data.items():
             if field == 'data' and value is not None:
@@ -68,7 +155,14 @@ class CRUDRating:
                 setattr(db_obj, field, value)
                 
         db.add(db_obj)
+        score_changed = db_obj.rating_score != old_score
+        if score_changed:
+            db.flush()
+            self.apply_summary_delta(db, user_id=db_obj.rated_user_id, score=old_score, delta=-1)
+            self.apply_summary_delta(db, user_id=db_obj.rated_user_id, score=db_obj.rating_score, delta=1)
         db.commit()
+        if score_changed:
+            summary_cache.invalidate([db_obj.rated_user_id])
         db.refresh(db_obj)
         return db_obj
 
@@ -76,32 +170,108 @@ class CRUDRating:
         """删除评分"""
         obj = db.query(Rating).filter(Rating.id == id).first()
         if obj:
+            self.apply_summary_delta(db, user_id=obj.rated_user_id, score=obj.rating_score, delta=-1)
             db.delete(obj)
             db.commit()
+            summary_cache.invalidate([obj.rated_user_id])
         return obj
 
+    def apply_summary_delta(self, db: Session, *, user_id: UUID, score: int, delta: int) -> None:
+        """
+        在调用方的事务中增减一个用户的评分摘要（不提交）。
+        计数在 SQL 中累加，并发写入不会丢失更新。
+        """
+        score_column = getattr(UserRatingSummary, f"score_{score}")
+        updated = db.query(UserRatingSummary).filter(
+            UserRatingSummary.user_id == user_id
+        ).update(
+            {
+                UserRatingSummary.rating_count: UserRatingSummary.rating_count + delta,
+                UserRatingSummary.rating_sum: UserRatingSummary.rating_sum + delta * score,
+                score_column: score_column + delta,
+            },
+            synchronize_session=False
+        )
+        if updated or delta < 0:
+            # 减少时摘要行必然已存在（迁移时已回填），缺失只能靠 rebuild 修复
+            return
+
+        savepoint = db.begin_nested()
+        try:
+            db.add(UserRatingSummary(
+                user_id=user_id,
+                rating_count=delta,
+                rating_sum=delta * score,
+                **{f"score_{s}": delta if s == score else 0 for s in range(1, 6)}
+            ))
+            savepoint.commit()
+        except IntegrityError:
+            # 另一个事务刚为该用户插入了摘要行，改为累加
+            savepoint.rollback()
+            self.apply_summary_delta(db, user_id=user_id, score=score, delta=delta)
+
     def get_user_rating_summary(self, db: Session, *, user_id: UUID) -> Dict[str, Any]:
         """获取用户评分摘要"""
-        # 获取平均评分和总数量
-        result = db.query(
-            func.avg(Rating.rating_score).label('average_rating'),
-            func.count(Rating.id).label('total_ratings')
-        ).filter(Rating.rated_user_id == user_id).first()
-        
-        # 获取评分分布
-        distribution = db.query(
+        summary = self.get_rating_summaries(db, user_ids=[user_id])[0]
+        return {**summary, 'user_id': user_id}
+
+    def get_rating_summaries(self, db: Session, *, user_ids: Iterable[UUID]) -> List[Dict[str, Any]]:
+        """
+        批量获取评分摘要，顺序与 user_ids 一致。
+        先查 Redis，未命中的用户一次 IN 查询 rating_summaries，没有评分的用户返回空摘要。
+        """
+        user_ids = list(user_ids)
+        keys = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        summaries = summary_cache.get_many(keys)
+
+        missing = [key for key in keys if key not in summaries]
+        if missing:
+            rows = db.query(UserRatingSummary).filter(
+                UserRatingSummary.user_id.in_(missing)
+            ).all()
+            loaded = {key: _empty_summary(key) for key in missing}
+            loaded.update({str(row.user_id): _summary_to_dict(row) for row in rows})
+            summary_cache.set_many(loaded)
+            summaries.update(loaded)
+
+        return [summaries[str(user_id)] for user_id in user_ids]
+
+    def rebuild_rating_summaries(self, db: Session, *, user_id: Optional[UUID] = None) -> int:
+        """
+        从 ratings 表重新计算评分摘要（回填或修复）。
+        只重建一个用户，或在 user_id 为 None 时重建全部。返回写入的摘要行数。
+        """
+        delete_query = db.query(UserRatingSummary)
+        query = db.query(
+            Rating.rated_user_id,
             Rating.rating_score,
-            func.count(Rating.id).label('count')
-        ).filter(Rating.rated_user_id == user_id).group_by(Rating.rating_score).all()
-        
-        rating_distribution = {str(score): count for score, count in distribution}
-        
-        return {
-            'user_id': user_id,
-            'average_rating': float(result.average_rating) if result.average_rating else 0.0,
-            'total_ratings': result.total_ratings or 0,
-            'rating_distribution': rating_distribution
-        }
+            func.count(Rating.id)
+        )
+        if user_id is not None:
+            delete_query = delete_query.filter(UserRatingSummary.user_id == user_id)
+            query = query.filter(Rating.rated_user_id == user_id)
+        # 旧摘要的用户也要失效缓存，其中可能有评分已被全部删除的用户
+        stale_user_ids = [row[0] for row in delete_query.with_entities(UserRatingSummary.user_id).all()]
+        delete_query.delete(synchronize_session=False)
+
+        rows: Dict[Any, UserRatingSummary] = {}
+        for rated_user_id, score, count in query.group_by(Rating.rated_user_id, Rating.rating_score).all():
+            row = rows.get(rated_user_id)
+            if row is None:
+                row = rows[rated_user_id] = UserRatingSummary(
+                    user_id=rated_user_id,
+                    rating_count=0,
+                    rating_sum=0,
+                    **{f"score_{s}": 0 for s in range(1, 6)}
+                )
+            row.rating_count += count
+            row.rating_sum += score * count
+            setattr(row, f"score_{score}", count)
+
+        db.add_all(rows.values())
+        db.commit()
+        summary_cache.invalidate(set(stale_user_ids) | set(rows))
+        return len(rows)
 
     def can_rate_user(
         self, 
@@ -111,24 +281,20 @@ class CRUDRating:
         rated_user_id: UUID, 
         service_request_id: UUID
     ) -> bool:
-        """检查用户是否可以评分"""
-        # 检查是否已经评分过
-        existing_rating = db.query(Rating).filter(
-            and_(
-                Rating.rater_user_id == rater_user_id,
-                Rating.service_request_id == service_request_id
-            )
-        ).first()
-        
-        # 检查是否给自己评分
-        if rater_user_id == rated_user_id:
+        """检查用户是否可以评分（创建评分时不需要先调用，唯一约束会拒绝重复评分）"""
+        # 检查是否给自己评分，不需要查询数据库
+        if str(rater_user_id) == str(rated_user_id):
             return False
-            
+
         # 如果已经评分过，不能再次评分
-        if existing_rating:
-            return False
-            
-        return True
+        return not db.query(
+            exists().where(
+                and_(
+                    Rating.rater_user_id == rater_user_id,
+                    Rating.service_request_id == service_request_id
+                )
+            )
+        ).scalar()
 
     def get_rating_by_request_and_rater(
         self, 
@@ -147,3 +313,6 @@ class CRUDRating:
 
 
 rating = CRUDRating()
+
+
+instrument_crud(__name__)
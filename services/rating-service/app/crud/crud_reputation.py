@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+
+from ..models.rating import UserReputation
+from ..metrics import instrument_crud
+
+
+class CRUDReputation:
+    def get(self, db: Session, *, user_id: UUID) -> Optional[UserReputation]:
+        """获取用户信誉分"""
+        return db.query(UserReputation).filter(UserReputation.user_id == user_id).first()
+
+    def get_top(self, db: Session, *, limit: int = 20) -> List[UserReputation]:
+        """信誉分排行榜，按 (score, user_id) 索引倒序扫描"""
+        return db.query(UserReputation).order_by(
+            UserReputation.score.desc(),
+            UserReputation.user_id.desc()
+        ).limit(limit).all()
+
+
+reputation = CRUDReputation()
+
+
+instrument_crud(__name__)
@@ -0,0 +1,28 @@
+"""
+rating-service-migrate Job 的入口：每次发布只执行一次数据库迁移，
+而不是在每个 Pod 启动时处理表结构。
+
+    python -m app.db.migrate
+
+等价于在服务根目录执行 ``alembic upgrade head``。
+"""
+
+import time
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parents[2]
+
+
+def migrate(revision: str = "head") -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(SERVICE_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVICE_ROOT / "alembic"))
+    command.upgrade(config, revision)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    migrate()
+    print(f"[MIGRATE] schema up to date in {time.perf_counter() - started:.2f}s")
@@ -1,12 +1,24 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from fastapi import Depends
+from sqlalchemy.orm import Session, sessionmaker
 from .base import Base
+from .engine import ReplicaRouter, build_engine, read_only
 
 from ..core.config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = build_engine(settings.database_url)
+# 只读接口经 get_read_db 读副本；写入后的短暂窗口内同一调用方仍读主库
+replica_router = ReplicaRouter(
+    lambda: build_engine(settings.replica_database_url, name="replica")
+    if settings.replica_database_url
+    else None
+)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=replica_router.session_class,
+)
 
 def get_db():
     db = SessionLocal()
@@ -16,7 +28,6 @@ def get_db():
         db.close()
 
 
-
-
-
-
+def get_read_db(db: Session = Depends(get_db)):
+    """只读接口使用的会话（配置了副本时从副本读取）"""
+    return read_only(db)
@@ -1,13 +1,22 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.v1.endpoints import ratings
 from .core.config import settings
+from .db.engine import db_context_middleware
+from .metrics import install_metrics
+from .responses import ORJSONResponse, install_compression
+from .tracing import install_tracing
 
 app = FastAPI(
     title="Rating Service",
     version="1.0.0",
-    description="评分服务微服务，支持用户对服务提供者进行评分和评论"
+    description="评分服务微服务，支持用户对服务提供者进行评分和评论",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -19,9 +28,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 写后读：按调用方记录最近的写入，窗口内的读取留在主库
+app.middleware("http")(db_context_middleware)
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "rating-service")
+
 # Include routers
 app.include_router(ratings.router, prefix="/api/v1/ratings", tags=["ratings"])
 
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
 
 @app.get("/health")
 async def health_check():
@@ -41,6 +64,7 @@ async def info():
         "features": [
             "Rating CRUD operations",
             "Rating summary statistics",
+            "Bayesian time-decayed reputation scores",
             "Rating permission validation",
             "Frontend field mapping compatibility"
         ],
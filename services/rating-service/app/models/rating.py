@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, JSON
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from ..db.base import Base
@@ -34,7 +34,72 @@ class Rating(Base):
     __table_args__ = (
         CheckConstraint('rating_score >= 1 AND rating_score <= 5', name='check_rating_score_range'),
         UniqueConstraint('rater_user_id', 'service_request_id', name='unique_rating_per_request'),
+        Index('ix_ratings_rated_user_id', 'rated_user_id'),
     )
 
     def __repr__(self):
         return f"<Rating(id={self.id}, rating_score={self.rating_score}, rated_user_id={self.rated_user_id})>"
+
+
+class UserRatingSummary(Base):
+    """按被评分用户预先聚合的评分摘要，随评分的增删改增量维护"""
+    __tablename__ = "rating_summaries"
+
+    if os.getenv("TESTING") == "true" or "sqlite" in os.getenv("DATABASE_URL", ""):
+        user_id = Column(String(36), primary_key=True)
+    else:
+        user_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    score_1 = Column(Integer, nullable=False, default=0)
+    score_2 = Column(Integer, nullable=False, default=0)
+    score_3 = Column(Integer, nullable=False, default=0)
+    score_4 = Column(Integer, nullable=False, default=0)
+    score_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # 信誉引擎按 updated_at 找出上次计算之后评分有变化的用户
+    __table_args__ = (
+        Index('ix_rating_summaries_updated_at', 'updated_at'),
+    )
+
+    @property
+    def average_rating(self) -> float:
+        if not self.rating_count:
+            return 0.0
+        return self.rating_sum / self.rating_count
+
+    @property
+    def rating_distribution(self) -> dict:
+        """与旧的 GROUP BY 结果一致：只包含出现过的分值"""
+        counts = {score: getattr(self, f"score_{score}") or 0 for score in range(1, 6)}
+        return {score: count for score, count in counts.items() if count}
+
+    def __repr__(self):
+        return f"<UserRatingSummary(user_id={self.user_id}, rating_count={self.rating_count})>"
+
+
+class UserReputation(Base):
+    """批量计算的信誉分：贝叶斯平滑 + 按时间指数衰减的加权平均分"""
+    __tablename__ = "reputation_scores"
+
+    if os.getenv("TESTING") == "true" or "sqlite" in os.getenv("DATABASE_URL", ""):
+        user_id = Column(String(36), primary_key=True)
+    else:
+        user_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    score = Column(Float, nullable=False)
+    # 衰减后的评分权重之和，可理解为“有效评分数”
+    decayed_count = Column(Float, nullable=False)
+    rating_count = Column(Integer, nullable=False)
+    last_rated_at = Column(DateTime(timezone=True))
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    # 排行榜按 (score, user_id) 倒序读取，直接走索引
+    __table_args__ = (
+        Index('ix_reputation_scores_score_user_id', 'score', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f"<UserReputation(user_id={self.user_id}, score={self.score})>"
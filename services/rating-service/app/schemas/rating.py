@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from uuid import UUID
 import os
@@ -60,6 +60,46 @@ class RatingSummary(BaseModel):
     rating_distribution: Dict[int, int] = Field(default_factory=dict)
 
 
+class RatingImportItem(RatingBase):
+    """批量导入中的一条评分（历史数据可带原始创建时间）"""
+    rater_user_id: Union[str, UUID] = Field(..., description="评分者用户ID")
+    created_at: Optional[datetime] = Field(None, description="原始评分时间，缺省为导入时间")
+
+
+class RatingImportRequest(BaseModel):
+    """批量导入评分的请求体"""
+    ratings: List[RatingImportItem] = Field(..., min_length=1, max_length=5000)
+
+
+class RatingImportResponse(BaseModel):
+    """批量导入结果：重复评分和自评计入 skipped"""
+    imported: int
+    skipped: int
+
+
+class RatingSummaryBatchRequest(BaseModel):
+    """批量获取评分摘要的请求体"""
+    user_ids: List[Union[str, UUID]] = Field(..., min_length=1, max_length=200, description="被评分用户ID列表")
+
+
+class RatingSummaryBatchResponse(BaseModel):
+    """批量评分摘要，顺序与请求中的 user_ids 一致"""
+    summaries: List[RatingSummary]
+
+
+class ReputationResponse(BaseModel):
+    """用户信誉分（贝叶斯平滑、按时间衰减）"""
+    user_id: Union[str, UUID]
+    score: float = Field(..., ge=0, le=5)
+    decayed_count: float = Field(..., ge=0, description="衰减后的有效评分数")
+    rating_count: int = Field(..., ge=0)
+    last_rated_at: Optional[datetime] = None
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class CanRateResponse(BaseModel):
     """是否可以评分的响应"""
     can_rate: bool
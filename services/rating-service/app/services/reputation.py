@@ -0,0 +1,289 @@
+"""
+信誉分批量计算。
+
+原始平均分会让只有一条 5 星评分的用户排在五百条 4.9 星的用户前面，也不区分新旧评分。
+信誉分对每条评分按年龄做指数衰减（半衰期 ``reputation_half_life_days``），再用全站平均分作为
+先验做贝叶斯平滑：
+
+    score = (C * m + Σ w_i * r_i) / (C + Σ w_i),  w_i = 0.5 ** (age_i / half_life)
+
+其中 C 是先验权重（``reputation_prior_weight``，相当于 C 条平均分的虚拟评分），m 是全站平均分。
+评分很少或很旧的用户会被拉向 m，有效评分越多越接近自己的加权平均。
+
+计算在 numpy 中按列向量化完成，结果写入带 (score, user_id) 索引的 reputation_scores 表，
+排行榜读取时只是一次索引扫描。
+
+引擎不在服务副本里运行，而是由 CronJob 定期执行 ``python -m app.services.reputation``，
+同一时刻只有一个实例写 reputation_scores。每次运行增量重算 rating_summaries.updated_at
+在上次写入（reputation_scores.computed_at 的最大值）之后变化过的用户；衰减会让所有分数
+随时间变化，所以最早的 computed_at 超过 ``reputation_full_refresh_seconds`` 时改为全量重算。
+全量重算按 ``chunk_size`` 个用户分块读取评分，内存占用与评分总数无关。
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from ..core.config import settings
+from ..models.rating import Rating, UserRatingSummary, UserReputation
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+# 没有任何评分时使用的先验均值（1-5 分的中点）
+DEFAULT_PRIOR_MEAN = 3.0
+# 增量扫描的水位线往前多看一点，覆盖在上次运行前开始、运行后才提交的事务
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _epoch_seconds(value) -> float:
+    value = _as_datetime(value)
+    if value is None:
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def compute_reputation(
+    user_index: np.ndarray,
+    scores: np.ndarray,
+    rated_at: np.ndarray,
+    now: float,
+    prior_mean: float,
+    prior_weight: float,
+    half_life_days: float,
+):
+    """
+    按用户聚合一批评分。``user_index`` 是每条评分所属用户的下标（0..n-1），
+    ``rated_at`` 是评分时间的 epoch 秒。返回每个用户的 (score, decayed_count)。
+    """
+    rated_at = np.where(np.isnan(rated_at), now, rated_at)
+    age_days = np.maximum(now - rated_at, 0.0) / SECONDS_PER_DAY
+    weights = np.exp2(-age_days / half_life_days)
+
+    users = int(user_index.max()) + 1 if user_index.size else 0
+    decayed_count = np.bincount(user_index, weights=weights, minlength=users)
+    decayed_sum = np.bincount(user_index, weights=weights * scores, minlength=users)
+    score = (prior_weight * prior_mean + decayed_sum) / (prior_weight + decayed_count)
+    return score, decayed_count
+
+
+class ReputationEngine:
+    """批量计算并保存信誉分"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        half_life_days: Optional[float] = None,
+        prior_weight: Optional[float] = None,
+        full_refresh_interval: Optional[float] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.half_life_days = half_life_days or settings.reputation_half_life_days
+        self.prior_weight = (
+            settings.reputation_prior_weight if prior_weight is None else prior_weight
+        )
+        self.full_refresh_interval = (
+            full_refresh_interval or settings.reputation_full_refresh_seconds
+        )
+        self.chunk_size = chunk_size or settings.reputation_chunk_size
+        self.prior_mean: Optional[float] = None
+
+    def _get_session(self):
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    @staticmethod
+    def _db_now(db) -> datetime:
+        return _as_datetime(db.query(func.now()).scalar())
+
+    @staticmethod
+    def global_mean(db) -> float:
+        """全站平均分，由评分摘要汇总，不扫描 ratings 表"""
+        total_sum, total_count = db.query(
+            func.coalesce(func.sum(UserRatingSummary.rating_sum), 0),
+            func.coalesce(func.sum(UserRatingSummary.rating_count), 0),
+        ).one()
+        if not total_count:
+            return DEFAULT_PRIOR_MEAN
+        return float(total_sum) / float(total_count)
+
+    def recompute(self, db, user_ids: List, now: Optional[datetime] = None) -> int:
+        """
+        重算并写入指定用户的信誉分，只读取这些用户的评分。
+        已没有评分的用户会被移出 reputation_scores。返回写入的行数。
+        """
+        if not user_ids:
+            return 0
+        now = now or self._db_now(db)
+        if self.prior_mean is None:
+            self.prior_mean = self.global_mean(db)
+
+        rows = (
+            db.query(Rating.rated_user_id, Rating.rating_score, Rating.created_at)
+            .filter(Rating.rated_user_id.in_(user_ids))
+            .all()
+        )
+        db.query(UserReputation).filter(UserReputation.user_id.in_(user_ids)).delete(
+            synchronize_session=False
+        )
+
+        if rows:
+            rated_user_ids, scores, rated_at = zip(*rows)
+            user_keys, user_index = np.unique(
+                np.array([str(u) for u in rated_user_ids], dtype=object), return_inverse=True
+            )
+            rated_at = np.array([_epoch_seconds(t) for t in rated_at], dtype=np.float64)
+            score, decayed_count = compute_reputation(
+                user_index,
+                np.array(scores, dtype=np.float64),
+                rated_at,
+                _epoch_seconds(now),
+                self.prior_mean,
+                self.prior_weight,
+                self.half_life_days,
+            )
+            rating_count = np.bincount(user_index, minlength=len(user_keys))
+            last_rated = np.full(len(user_keys), -np.inf)
+            np.maximum.at(last_rated, user_index, np.nan_to_num(rated_at, nan=-np.inf))
+
+            # 写回时沿用数据库返回的 user_id 对象（UUID 或字符串）
+            original_ids = {}
+            for rated_user_id in rated_user_ids:
+                original_ids.setdefault(str(rated_user_id), rated_user_id)
+
+            db.execute(
+                insert(UserReputation),
+                [
+                    {
+                        "user_id": original_ids[key],
+                        "score": float(score[i]),
+                        "decayed_count": float(decayed_count[i]),
+                        "rating_count": int(rating_count[i]),
+                        "last_rated_at": (
+                            datetime.fromtimestamp(last_rated[i], tz=timezone.utc)
+                            if np.isfinite(last_rated[i])
+                            else None
+                        ),
+                        "computed_at": now,
+                    }
+                    for i, key in enumerate(user_keys)
+                ],
+            )
+            written = len(user_keys)
+        else:
+            written = 0
+
+        db.commit()
+        return written
+
+    @staticmethod
+    def changed_user_ids(db, since: datetime) -> List:
+        """评分摘要在 since 之后变化过的用户（走 updated_at 索引）"""
+        return [
+            row[0]
+            for row in db.query(UserRatingSummary.user_id)
+            .filter(UserRatingSummary.updated_at >= since)
+            .all()
+        ]
+
+    def rated_user_chunks(self, db) -> Iterator[List]:
+        """按 user_id 键集分页，逐块返回有评分的用户"""
+        last = None
+        while True:
+            query = db.query(UserRatingSummary.user_id).filter(
+                UserRatingSummary.rating_count > 0
+            )
+            if last is not None:
+                query = query.filter(UserRatingSummary.user_id > last)
+            chunk = [
+                row[0]
+                for row in query.order_by(UserRatingSummary.user_id)
+                .limit(self.chunk_size)
+                .all()
+            ]
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1]
+
+    @staticmethod
+    def computed_range(db):
+        """reputation_scores 中最早和最晚的 computed_at（表为空时都是 None）"""
+        oldest, newest = db.query(
+            func.min(UserReputation.computed_at), func.max(UserReputation.computed_at)
+        ).one()
+        return _as_datetime(oldest), _as_datetime(newest)
+
+    def refresh(self, full: Optional[bool] = None) -> int:
+        """
+        运行一次。full 为 None 时，表为空或上次全量重算已超过
+        ``full_refresh_interval`` 则全量重算，否则只重算变化过的用户。
+        """
+        db = self._get_session()
+        try:
+            started_at = self._db_now(db)
+            oldest, newest = self.computed_range(db)
+            if full is None:
+                full = (
+                    oldest is None
+                    or _epoch_seconds(started_at) - _epoch_seconds(oldest)
+                    >= self.full_refresh_interval
+                )
+            if full:
+                self.prior_mean = self.global_mean(db)
+                written = sum(
+                    self.recompute(db, chunk, started_at)
+                    for chunk in self.rated_user_chunks(db)
+                )
+                # 移除已没有评分的用户
+                rated = select(UserRatingSummary.user_id).where(
+                    UserRatingSummary.rating_count > 0
+                )
+                db.query(UserReputation).filter(
+                    UserReputation.user_id.not_in(rated)
+                ).delete(synchronize_session=False)
+                db.commit()
+            else:
+                changed = self.changed_user_ids(db, newest - WATERMARK_OVERLAP)
+                written = sum(
+                    self.recompute(db, changed[start:start + self.chunk_size], started_at)
+                    for start in range(0, len(changed), self.chunk_size)
+                )
+            return written
+        finally:
+            db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="重算信誉分")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="全量重算所有用户（默认按上次全量重算的时间自动决定）",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    written = ReputationEngine().refresh(full=True if args.full else None)
+    logger.info(f"[REPUTATION] recomputed {written} reputation scores")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
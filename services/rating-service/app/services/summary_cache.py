@@ -0,0 +1,84 @@
+"""
+评分摘要的 Redis 二级缓存。
+
+rating_summaries 表已经把每个用户的摘要预先聚合好，这里再把序列化后的摘要
+放进 Redis，批量读取时一次 MGET 即可，未命中的用户才回到数据库做一次 IN 查询。
+评分的增删改在提交后删除对应的键。Redis 不可用时所有操作都静默降级为直接读库。
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import redis
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rating_summary:"
+
+
+class SummaryCache:
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = (
+            settings.summary_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self._client = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get_redis_client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.redis_url,
+                socket_connect_timeout=0.2,
+                socket_timeout=0.2,
+            )
+        return self._client
+
+    @staticmethod
+    def key(user_id) -> str:
+        return f"{KEY_PREFIX}{user_id}"
+
+    def get_many(self, user_ids: List[str]) -> Dict[str, dict]:
+        """返回命中的摘要；未命中或 Redis 出错的用户不在结果里"""
+        if not self.enabled or not user_ids:
+            return {}
+        try:
+            values = self.get_redis_client().mget([self.key(u) for u in user_ids])
+        except Exception as e:
+            logger.warning(f"Rating summary cache read failed: {e}")
+            return {}
+        return {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, values)
+            if value is not None
+        }
+
+    def set_many(self, summaries: Dict[str, dict]) -> None:
+        if not self.enabled or not summaries:
+            return
+        try:
+            pipe = self.get_redis_client().pipeline()
+            for user_id, summary in summaries.items():
+                pipe.set(self.key(user_id), json.dumps(summary), ex=self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Rating summary cache write failed: {e}")
+
+    def invalidate(self, user_ids: Iterable) -> None:
+        if not self.enabled:
+            return
+        keys = [self.key(u) for u in user_ids]
+        if not keys:
+            return
+        try:
+            self.get_redis_client().delete(*keys)
+        except Exception as e:
+            logger.warning(f"Rating summary cache invalidation failed: {e}")
+
+
+summary_cache = SummaryCache()
@@ -216,3 +216,96 @@ def test_user_rating_summary(client: TestClient, sample_user_ids):
 
 
 
+
+def test_create_rating_skips_existence_precheck(client: TestClient, db, sample_user_ids):
+    """测试创建评分不再预先查询重复评分，重复由唯一约束拒绝"""
+    from sqlalchemy import event
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    engine = db.get_bind().engine
+    rating_data = {
+        "rated_user_id": str(sample_user_ids["rated_id"]),
+        "service_request_id": str(sample_user_ids["service_request_id"]),
+        "rating": 4
+    }
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.post(
+            f"/api/v1/ratings/?rater_user_id={sample_user_ids['rater_id']}",
+            json=rating_data
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    assert not any(s.lstrip().upper().startswith("SELECT") and "FROM ratings" in s for s in statements)
+    assert any("ON CONFLICT" in s.upper() for s in statements)
+
+    duplicate = client.post(
+        f"/api/v1/ratings/?rater_user_id={sample_user_ids['rater_id']}",
+        json=rating_data
+    )
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Already rated this service request"
+
+def test_cannot_rate_yourself(client: TestClient, sample_user_ids):
+    """测试不能给自己评分"""
+    response = client.post(
+        f"/api/v1/ratings/?rater_user_id={sample_user_ids['rater_id']}",
+        json={
+            "rated_user_id": str(sample_user_ids["rater_id"]),
+            "service_request_id": str(sample_user_ids["service_request_id"]),
+            "rating": 5
+        }
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot rate yourself"
+
+    can_rate = client.get(
+        f"/api/v1/ratings/can_rate/{sample_user_ids['rater_id']}/{sample_user_ids['service_request_id']}?rater_user_id={sample_user_ids['rater_id']}"
+    )
+    assert can_rate.json() == {"can_rate": False, "reason": "Cannot rate yourself"}
+
+def test_import_ratings(client: TestClient, sample_user_ids):
+    """测试批量导入评分：重复和自评被跳过，摘要同步更新"""
+    rated_id = str(sample_user_ids["rated_id"])
+    duplicate = {
+        "rater_user_id": str(uuid4()),
+        "rated_user_id": rated_id,
+        "service_request_id": str(uuid4()),
+        "rating_score": 2
+    }
+    items = [
+        {
+            "rater_user_id": str(uuid4()),
+            "rated_user_id": rated_id,
+            "service_request_id": str(uuid4()),
+            "rating_score": 5,
+            "created_at": "2023-05-01T12:00:00"
+        },
+        duplicate,
+        dict(duplicate, rating_score=3),
+        {
+            "rater_user_id": rated_id,
+            "rated_user_id": rated_id,
+            "service_request_id": str(uuid4()),
+            "rating_score": 5
+        }
+    ]
+
+    response = client.post("/api/v1/ratings/import", json={"ratings": items})
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2, "skipped": 2}
+
+    # 再导入一次全部被跳过
+    again = client.post("/api/v1/ratings/import", json={"ratings": items})
+    assert again.json() == {"imported": 0, "skipped": 4}
+
+    summary = client.get(f"/api/v1/ratings/users/{rated_id}/summary").json()
+    assert summary["total_ratings"] == 2
+    assert summary["average_rating"] == 3.5
+
+    imported = client.get(f"/api/v1/ratings/?rated_user_id={rated_id}").json()
+    assert sorted(r["created_at"][:10] for r in imported)[0] == "2023-05-01"
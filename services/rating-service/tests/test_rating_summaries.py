@@ -0,0 +1,181 @@
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.crud.crud_rating import rating
+from app.models.rating import UserRatingSummary
+from app.services.summary_cache import summary_cache
+
+
+class FakeRedis:
+    """只实现摘要缓存用到的命令"""
+
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(summary_cache, "_client", redis_client)
+    monkeypatch.setattr(summary_cache, "ttl_seconds", 300)
+    return redis_client
+
+
+def create_rating(client, rater_id, rated_id, score):
+    response = client.post(
+        f"/api/v1/ratings/?rater_user_id={rater_id}",
+        json={
+            "rated_user_id": str(rated_id),
+            "service_request_id": str(uuid4()),
+            "rating": score,
+        }
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def summary_row(db, user_id):
+    db.expire_all()
+    return db.query(UserRatingSummary).filter(UserRatingSummary.user_id == str(user_id)).first()
+
+
+def test_summary_maintained_on_create_update_delete(client: TestClient, db, fake_redis):
+    rater_id, rated_id = str(uuid4()), str(uuid4())
+    first = create_rating(client, rater_id, rated_id, 5)
+    second = create_rating(client, rater_id, rated_id, 2)
+
+    row = summary_row(db, rated_id)
+    assert (row.rating_count, row.rating_sum, row.score_5, row.score_2) == (2, 7, 1, 1)
+
+    client.patch(f"/api/v1/ratings/{second}?rater_user_id={rater_id}", json={"rating": 4})
+    row = summary_row(db, rated_id)
+    assert (row.rating_count, row.rating_sum, row.score_2, row.score_4) == (2, 9, 0, 1)
+
+    client.delete(f"/api/v1/ratings/{first}?rater_user_id={rater_id}")
+    row = summary_row(db, rated_id)
+    assert (row.rating_count, row.rating_sum, row.score_5) == (1, 4, 0)
+
+    response = client.get(f"/api/v1/ratings/users/{rated_id}/summary")
+    assert response.json()["average_rating"] == 4.0
+    assert response.json()["rating_distribution"] == {"4": 1}
+
+
+def test_rebuild_matches_incremental_summary(client: TestClient, db, fake_redis):
+    rater_id, rated_id = str(uuid4()), str(uuid4())
+    for score in (1, 3, 3, 5):
+        create_rating(client, rater_id, rated_id, score)
+    before = rating.get_rating_summaries(db, user_ids=[rated_id])
+
+    assert rating.rebuild_rating_summaries(db, user_id=rated_id) == 1
+
+    assert rating.get_rating_summaries(db, user_ids=[rated_id]) == before
+    assert before[0]["rating_distribution"] == {"1": 1, "3": 2, "5": 1}
+
+
+def test_bulk_summaries_keep_request_order(client: TestClient, fake_redis):
+    rater_id = str(uuid4())
+    rated = [str(uuid4()) for _ in range(3)]
+    create_rating(client, rater_id, rated[0], 5)
+    create_rating(client, rater_id, rated[2], 3)
+    create_rating(client, rater_id, rated[2], 4)
+    unrated = str(uuid4())
+
+    response = client.post(
+        "/api/v1/ratings/summaries",
+        json={"user_ids": [rated[2], unrated, rated[0], rated[2]]}
+    )
+
+    assert response.status_code == 200
+    summaries = response.json()["summaries"]
+    assert [s["user_id"] for s in summaries] == [rated[2], unrated, rated[0], rated[2]]
+    assert [s["total_ratings"] for s in summaries] == [2, 0, 1, 2]
+    assert summaries[0]["average_rating"] == 3.5
+
+
+def test_bulk_summaries_fill_the_cache_from_the_primary(
+    client: TestClient, fake_redis, monkeypatch
+):
+    sessions = []
+
+    def spy(db, *, user_ids):
+        sessions.append(dict(db.info))
+        return []
+
+    monkeypatch.setattr(rating, "get_rating_summaries", spy)
+
+    response = client.post("/api/v1/ratings/summaries", json={"user_ids": [str(uuid4())]})
+
+    assert response.status_code == 200
+    assert not sessions[0].get("read_only")
+
+
+def test_bulk_summaries_rejects_empty_and_oversized_batches(client: TestClient):
+    assert client.post("/api/v1/ratings/summaries", json={"user_ids": []}).status_code == 422
+    too_many = [str(uuid4()) for _ in range(201)]
+    assert client.post("/api/v1/ratings/summaries", json={"user_ids": too_many}).status_code == 422
+
+
+def test_cached_summaries_skip_the_database(client: TestClient, db, fake_redis):
+    rater_id, rated_id = str(uuid4()), str(uuid4())
+    create_rating(client, rater_id, rated_id, 4)
+    rating.get_rating_summaries(db, user_ids=[rated_id])
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        summaries = rating.get_rating_summaries(db, user_ids=[rated_id])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert statements == []
+    assert summaries[0]["total_ratings"] == 1
+
+
+def test_writes_invalidate_cached_summary(client: TestClient, fake_redis):
+    rater_id, rated_id = str(uuid4()), str(uuid4())
+    rating_id = create_rating(client, rater_id, rated_id, 2)
+    client.post("/api/v1/ratings/summaries", json={"user_ids": [rated_id]})
+    assert summary_cache.key(rated_id) in fake_redis.store
+
+    client.patch(f"/api/v1/ratings/{rating_id}?rater_user_id={rater_id}", json={"rating": 5})
+
+    assert summary_cache.key(rated_id) not in fake_redis.store
+    response = client.post("/api/v1/ratings/summaries", json={"user_ids": [rated_id]})
+    assert response.json()["summaries"][0]["average_rating"] == 5.0
+
+
+def test_summaries_fall_back_to_database_when_redis_is_down(client: TestClient, monkeypatch):
+    monkeypatch.setattr(summary_cache, "_client", BrokenRedis())
+    monkeypatch.setattr(summary_cache, "ttl_seconds", 300)
+    rater_id, rated_id = str(uuid4()), str(uuid4())
+    create_rating(client, rater_id, rated_id, 3)
+
+    response = client.post("/api/v1/ratings/summaries", json={"user_ids": [rated_id]})
+
+    assert response.status_code == 200
+    assert response.json()["summaries"][0]["total_ratings"] == 1
@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+
+from app.crud.crud_rating import rating
+from app.models.rating import Rating, UserRatingSummary, UserReputation
+from app.schemas.rating import RatingCreate
+from app.services.reputation import ReputationEngine, compute_reputation
+
+NOW = 1_700_000_000.0
+DAY = 86400.0
+
+
+def add_rating(db, rated_id, score, created_at=None):
+    obj = rating.create(
+        db,
+        obj_in=RatingCreate(
+            rating_score=score,
+            rated_user_id=rated_id,
+            service_request_id=str(uuid4()),
+        ),
+        rater_user_id=str(uuid4()),
+    )
+    if created_at is not None:
+        db.query(Rating).filter(Rating.id == obj.id).update({Rating.created_at: created_at})
+        db.commit()
+    return obj
+
+
+@pytest.fixture
+def engine(db):
+    return ReputationEngine(
+        session_factory=lambda: db,
+        half_life_days=30,
+        prior_weight=5,
+    )
+
+
+def test_bayesian_prior_outranks_single_perfect_rating():
+    # 用户 0：一条 5 星；用户 1：500 条平均 4.9 星
+    scores = np.array([5.0] + [5.0] * 450 + [4.0] * 50)
+    user_index = np.array([0] + [1] * 500)
+    rated_at = np.full(scores.size, NOW)
+
+    score, decayed_count = compute_reputation(
+        user_index, scores, rated_at, NOW, prior_mean=4.0, prior_weight=5, half_life_days=30
+    )
+
+    assert score[1] > score[0]
+    assert score[0] == pytest.approx((5 * 4.0 + 5.0) / 6)
+    assert decayed_count.tolist() == [1.0, 500.0]
+
+
+def test_older_ratings_weigh_less():
+    # 两个用户都有一条 1 星和一条 5 星，区别只是哪条更新
+    scores = np.array([1.0, 5.0, 1.0, 5.0])
+    user_index = np.array([0, 0, 1, 1])
+    rated_at = np.array([NOW - 90 * DAY, NOW, NOW, NOW - 90 * DAY])
+
+    score, decayed_count = compute_reputation(
+        user_index, scores, rated_at, NOW, prior_mean=3.0, prior_weight=0, half_life_days=30
+    )
+
+    assert score[0] > 4.5 and score[1] < 1.5
+    assert decayed_count[0] == pytest.approx(1.125)
+
+
+def test_full_refresh_writes_scores_and_ranks_by_index(client: TestClient, db, engine):
+    veteran, newcomer, struggling = str(uuid4()), str(uuid4()), str(uuid4())
+    for _ in range(20):
+        add_rating(db, veteran, 5)
+        add_rating(db, struggling, 2)
+    add_rating(db, veteran, 4)
+    add_rating(db, newcomer, 5)
+
+    written = engine.refresh()
+
+    assert written >= 2
+    top = client.get("/api/v1/ratings/reputation/top?limit=100").json()
+    order = [entry["user_id"] for entry in top]
+    assert order.index(veteran) < order.index(newcomer) < order.index(struggling)
+    response = client.get(f"/api/v1/ratings/users/{veteran}/reputation")
+    assert response.status_code == 200
+    assert response.json()["rating_count"] == 21
+
+
+def test_incremental_refresh_only_touches_changed_users(db, engine):
+    unchanged, changed = str(uuid4()), str(uuid4())
+    add_rating(db, unchanged, 3)
+    add_rating(db, changed, 3)
+    engine.refresh()
+
+    # 上次运行在 55 分钟前，摘要的变化都早于它
+    hour_ago = datetime.utcnow() - timedelta(hours=1)
+    db.query(UserRatingSummary).update({UserRatingSummary.updated_at: hour_ago}, synchronize_session=False)
+    db.query(UserReputation).update(
+        {UserReputation.computed_at: hour_ago + timedelta(minutes=5)}, synchronize_session=False
+    )
+    db.commit()
+    add_rating(db, changed, 5)
+
+    assert engine.refresh() == 1
+
+    db.expire_all()
+    by_user = {r.user_id: r for r in db.query(UserReputation).filter(
+        UserReputation.user_id.in_([unchanged, changed])
+    )}
+    assert by_user[changed].rating_count == 2
+    assert by_user[changed].computed_at > by_user[unchanged].computed_at
+
+
+def test_full_refresh_streams_users_in_chunks(db):
+    users = [str(uuid4()) for _ in range(5)]
+    for user_id in users:
+        add_rating(db, user_id, 4)
+    chunked = ReputationEngine(session_factory=lambda: db, chunk_size=2)
+    chunked.refresh(full=True)
+    gone = users.pop()
+    db.query(Rating).filter(Rating.rated_user_id == gone).delete()
+    db.query(UserRatingSummary).filter(UserRatingSummary.user_id == gone).delete()
+    db.commit()
+
+    with patch.object(
+        ReputationEngine, "recompute", autospec=True, side_effect=ReputationEngine.recompute
+    ) as recompute:
+        chunked.refresh(full=True)
+
+    assert all(len(call.args[2]) <= 2 for call in recompute.call_args_list)
+    written = db.query(UserReputation.user_id).filter(UserReputation.user_id.in_(users + [gone]))
+    assert {row[0] for row in written} == set(users)
+
+
+def test_full_refresh_runs_when_the_last_one_is_stale(db, engine):
+    db.query(UserReputation).delete()
+    add_rating(db, str(uuid4()), 4)
+    # 表为空时先全量重算
+    with patch.object(ReputationEngine, "rated_user_chunks", autospec=True, return_value=[]) as full:
+        engine.refresh()
+        assert full.call_count == 1
+
+    add_rating(db, str(uuid4()), 4)
+    engine.refresh(full=True)
+    with patch.object(ReputationEngine, "rated_user_chunks", autospec=True, return_value=[]) as full:
+        engine.refresh()
+        assert full.call_count == 0
+
+    db.query(UserReputation).update(
+        {UserReputation.computed_at: datetime.utcnow() - timedelta(days=1)}, synchronize_session=False
+    )
+    db.commit()
+    with patch.object(ReputationEngine, "rated_user_chunks", autospec=True, return_value=[]) as full:
+        engine.refresh()
+        assert full.call_count == 1
+
+
+def test_users_without_ratings_are_removed(db, engine):
+    rated_id = str(uuid4())
+    rating_id = add_rating(db, rated_id, 4).id
+    engine.refresh()
+    rating.remove(db, id=rating_id)
+
+    engine.recompute(db, [rated_id])
+
+    assert db.query(UserReputation).filter(UserReputation.user_id == rated_id).first() is None
+
+
+def test_reputation_not_computed_returns_404(client: TestClient):
+    response = client.get(f"/api/v1/ratings/users/{uuid4()}/reputation")
+    assert response.status_code == 404
@@ -0,0 +1,87 @@
+"""Initial request-service schema
+
+The schema ``create_all`` built before Alembic was adopted; databases
+created that way are stamped at this revision. Model changes made before
+then are applied by 001a.
+
+Revision ID: 001
+Revises: 
+Create Date: 2024-06-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+service_type = sa.Enum('TRANSPORTATION', 'ERRANDS', 'OTHER', name='servicetype')
+service_request_status = sa.Enum(
+    'PENDING', 'ACCEPTED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED',
+    name='servicerequeststatus',
+)
+payment_status = sa.Enum('UNPAID', 'PAID', 'PAYMENT_FAILED', name='paymentstatus')
+assignment_status = sa.Enum(
+    'ASSIGNED', 'ACCEPTED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED',
+    name='assignmentstatus',
+)
+
+
+def upgrade() -> None:
+    op.create_table('service_requests',
+    sa.Column('request_id', sa.String(length=36), nullable=False),
+    sa.Column('requester_id', sa.String(length=36), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('service_type', service_type, nullable=False),
+    sa.Column('pickup_latitude', sa.Float(), nullable=False),
+    sa.Column('pickup_longitude', sa.Float(), nullable=False),
+    sa.Column('destination_latitude', sa.Float(), nullable=True),
+    sa.Column('destination_longitude', sa.Float(), nullable=True),
+    sa.Column('offered_amount', sa.Float(), nullable=True),
+    sa.Column('status', service_request_status, nullable=True),
+    sa.Column('payment_status', payment_status, nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('request_id')
+    )
+    op.create_table('service_assignments',
+    sa.Column('assignment_id', sa.String(length=36), nullable=False),
+    sa.Column('request_id', sa.String(length=36), nullable=False),
+    sa.Column('provider_id', sa.String(length=36), nullable=False),
+    sa.Column('status', assignment_status, nullable=True),
+    sa.Column('provider_notes', sa.Text(), nullable=True),
+    sa.Column('completion_notes', sa.Text(), nullable=True),
+    sa.Column('estimated_completion_time', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['request_id'], ['service_requests.request_id']),
+    sa.PrimaryKeyConstraint('assignment_id')
+    )
+    op.create_table('ratings',
+    sa.Column('rating_id', sa.String(length=36), nullable=False),
+    sa.Column('assignment_id', sa.String(length=36), nullable=False),
+    sa.Column('rater_id', sa.String(length=36), nullable=False),
+    sa.Column('ratee_id', sa.String(length=36), nullable=False),
+    sa.Column('rating_score', sa.Integer(), nullable=False),
+    sa.Column('review_text', sa.Text(), nullable=True),
+    sa.Column('is_provider_rating', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assignment_id'], ['service_assignments.assignment_id']),
+    sa.PrimaryKeyConstraint('rating_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ratings')
+    op.drop_table('service_assignments')
+    op.drop_table('service_requests')
+    bind = op.get_bind()
+    for enum_type in (
+        assignment_status, payment_status, service_request_status, service_type
+    ):
+        enum_type.drop(bind, checkfirst=True)
@@ -0,0 +1,78 @@
+"""EXPIRED request status and one assignment per request
+
+Model changes made before Alembic was adopted, which databases stamped at
+001 never received.
+
+Revision ID: 001a
+Revises: 001
+Create Date: 2024-06-10 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '001a'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def _deduplicate_assignments() -> None:
+    """
+    Keep the earliest assignment of each request (the accept that won) and
+    move the ratings of the others onto it, so the unique constraint can be
+    created.
+    """
+    bind = op.get_bind()
+    duplicated = bind.execute(
+        sa.text(
+            "SELECT request_id FROM service_assignments "
+            "GROUP BY request_id HAVING COUNT(*) > 1"
+        )
+    ).scalars().all()
+    for request_id in duplicated:
+        keep, *others = bind.execute(
+            sa.text(
+                "SELECT assignment_id FROM service_assignments "
+                "WHERE request_id = :request_id "
+                "ORDER BY created_at, assignment_id"
+            ),
+            {"request_id": request_id},
+        ).scalars().all()
+        others_in = sa.bindparam("others", expanding=True)
+        bind.execute(
+            sa.text(
+                "UPDATE ratings SET assignment_id = :keep "
+                "WHERE assignment_id IN :others"
+            ).bindparams(others_in),
+            {"keep": keep, "others": others},
+        )
+        bind.execute(
+            sa.text(
+                "DELETE FROM service_assignments WHERE assignment_id IN :others"
+            ).bindparams(others_in),
+            {"others": others},
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # A new enum value cannot be used in the transaction that adds it
+        with op.get_context().autocommit_block():
+            op.execute(
+                "ALTER TYPE servicerequeststatus ADD VALUE IF NOT EXISTS 'EXPIRED'"
+            )
+    _deduplicate_assignments()
+    with op.batch_alter_table('service_assignments') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_service_assignments_request_id', ['request_id']
+        )
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value; EXPIRED stays in the type
+    with op.batch_alter_table('service_assignments') as batch_op:
+        batch_op.drop_constraint(
+            'uq_service_assignments_request_id', type_='unique'
+        )
@@ -0,0 +1,100 @@
+"""Composite and partial indexes for hot-path queries
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-06-15 00:00:00.000000
+
+Each index is named after the query it serves; tests/test_query_plans.py
+fails if one of those queries falls back to a sequential scan. On
+PostgreSQL the indexes are built CONCURRENTLY so the tables stay writable.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001a'
+branch_labels = None
+depends_on = None
+
+PENDING_ONLY = sa.text("status = 'PENDING'")
+
+
+def _concurrently() -> dict:
+    if op.get_bind().dialect.name == 'postgresql':
+        return {'postgresql_concurrently': True}
+    return {}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        options = _concurrently()
+        # count_user_active_requests
+        op.create_index(
+            'ix_service_requests_requester_status',
+            'service_requests',
+            ['requester_id', 'status'],
+            **options,
+        )
+        # get_user_requests (newest first, scanned backwards)
+        op.create_index(
+            'ix_service_requests_requester_created_at',
+            'service_requests',
+            ['requester_id', 'created_at'],
+            **options,
+        )
+        # get_available_requests and expiry: pending rows only, oldest first.
+        # Replaces the (status, created_at) index, which also carried every
+        # terminal request. Only databases that create_all built while the
+        # model declared that index have it.
+        op.create_index(
+            'ix_service_requests_pending_created_at',
+            'service_requests',
+            ['created_at'],
+            postgresql_where=PENDING_ONLY,
+            sqlite_where=PENDING_ONLY,
+            **options,
+        )
+        op.drop_index(
+            'ix_service_requests_status_created_at',
+            table_name='service_requests',
+            if_exists=True,
+            **options,
+        )
+        # get_provider_assignments (newest first, scanned backwards)
+        op.create_index(
+            'ix_service_assignments_provider_created_at',
+            'service_assignments',
+            ['provider_id', 'created_at'],
+            **options,
+        )
+        # check_existing_rating; the leading column serves get_assignment_ratings
+        op.create_index(
+            'ix_ratings_assignment_rater',
+            'ratings',
+            ['assignment_id', 'rater_id', 'is_provider_rating'],
+            **options,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ratings_assignment_rater', table_name='ratings')
+    op.drop_index(
+        'ix_service_assignments_provider_created_at',
+        table_name='service_assignments',
+    )
+    op.create_index(
+        'ix_service_requests_status_created_at',
+        'service_requests',
+        ['status', 'created_at'],
+    )
+    op.drop_index(
+        'ix_service_requests_pending_created_at', table_name='service_requests'
+    )
+    op.drop_index(
+        'ix_service_requests_requester_created_at', table_name='service_requests'
+    )
+    op.drop_index(
+        'ix_service_requests_requester_status', table_name='service_requests'
+    )
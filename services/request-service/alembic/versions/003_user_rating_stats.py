@@ -0,0 +1,59 @@
+"""User rating stats table and ratings-received index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-07-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_rating_stats',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('score_1', sa.Integer(), nullable=False),
+    sa.Column('score_2', sa.Integer(), nullable=False),
+    sa.Column('score_3', sa.Integer(), nullable=False),
+    sa.Column('score_4', sa.Integer(), nullable=False),
+    sa.Column('score_5', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(
+        'ix_ratings_ratee_created_at', 'ratings', ['ratee_id', 'created_at']
+    )
+    # Backfill from existing ratings
+    op.execute(
+        """
+        INSERT INTO user_rating_stats (
+            user_id, rating_count, rating_sum,
+            score_1, score_2, score_3, score_4, score_5, updated_at
+        )
+        SELECT
+            ratee_id,
+            COUNT(*),
+            SUM(rating_score),
+            SUM(CASE WHEN rating_score = 1 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating_score = 2 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating_score = 3 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating_score = 4 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating_score = 5 THEN 1 ELSE 0 END),
+            CURRENT_TIMESTAMP
+        FROM ratings
+        GROUP BY ratee_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ratings_ratee_created_at', table_name='ratings')
+    op.drop_table('user_rating_stats')
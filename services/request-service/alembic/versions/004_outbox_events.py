@@ -0,0 +1,39 @@
+"""Transactional outbox table
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-07-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+    sa.Column('outbox_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('event_id', sa.String(length=36), nullable=False),
+    sa.Column('stream', sa.String(length=100), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('published_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('outbox_id'),
+    sa.UniqueConstraint('event_id')
+    )
+    op.create_index(
+        'ix_outbox_events_published_at_outbox_id',
+        'outbox_events',
+        ['published_at', 'outbox_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_published_at_outbox_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.api.deps import get_current_user_id
 from app.schemas.service_request import (
     AvailableRequestOut,
@@ -17,15 +17,18 @@ from app.crud.crud_service_request import ServiceAssignmentCRUD, ServiceRequestC
 
 router = APIRouter()
 
+# These handlers drive the synchronous RequestService/CRUD layer, so they are
+# plain ``def`` and run in the threadpool instead of blocking the event loop.
+
 
 @router.get("/available-requests", response_model=AvailableRequestsList)
-async def get_available_requests(
+def get_available_requests(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     latitude: Optional[float] = Query(None, ge=-90, le=90),
     longitude: Optional[float] = Query(None, ge=-180, le=180),
     current_user_id: uuid.UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get available requests for providers"""
     requests = RequestService.get_available_requests_for_provider(
@@ -40,7 +43,7 @@ async def get_available_requests(
 
 
 @router.post("/requests/{request_id}/accept", response_model=ServiceAssignmentOut, status_code=status.HTTP_201_CREATED)
-async def accept_request(
+def accept_request(
     request_id: str,
     body: dict = Body(None),
     current_user_id: uuid.UUID = Depends(get_current_user_id),
@@ -60,7 +63,7 @@ async def accept_request(
 
 
 @router.patch("/requests/{request_id}/status", response_model=ServiceAssignmentOut)
-async def update_request_status(
+def update_request_status(
     request_id: str,
     body: dict = Body(...),
     current_user_id: uuid.UUID = Depends(get_current_user_id),
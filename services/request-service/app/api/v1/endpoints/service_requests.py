@@ -1,15 +1,19 @@
 import uuid
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_current_user_id
-from app.crud.crud_service_request import service_request_crud
+from app.crud.crud_service_request import rating_crud, service_request_crud
 from app.db.base import get_db
+from app.db.session import get_read_db
+from app.responses import parse_fields, trusted_response
+from app.services.dispatch import dispatch_engine
 from app.schemas.service_request import (
     ServiceRequestCreate,
     ServiceRequestResponse,
     ServiceRequestUpdate,
+    UserRatingStatsResponse,
 )
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 # Manual mapping functions removed - now using Pydantic aliases directly
@@ -33,24 +37,35 @@ def create_service_request(
     - offeredAmount -> offered_amount
     """
     try:
-        return service_request_crud.create_service_request(
+        service_request = service_request_crud.create_service_request(
             db=db, request_data=request_data, requester_id=str(current_user_id)
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    dispatch_engine.submit(service_request.request_id)
+    return service_request
 
 
 @router.get("/requests", response_model=List[ServiceRequestResponse])
 def list_service_requests(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. requestId,title"
+    ),
+    db: Session = Depends(get_read_db),
     current_user_id: uuid.UUID = Depends(get_current_user_id),
 ):
     """List service requests for the current user"""
-    return service_request_crud.get_user_requests(
-        db=db, requester_id=str(current_user_id), skip=skip, limit=limit
+    selected = parse_fields(ServiceRequestResponse, fields)
+    requests = service_request_crud.get_user_requests(
+        db=db,
+        requester_id=str(current_user_id),
+        skip=skip,
+        limit=limit,
+        fields=selected,
     )
+    return trusted_response(ServiceRequestResponse, requests, fields=selected)
 
 
 @router.get("/requests/{request_id}", response_model=ServiceRequestResponse)
@@ -140,15 +155,20 @@ def delete_service_request(
 def get_available_requests_for_frontend(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. requestId,title"
+    ),
+    db: Session = Depends(get_read_db),
     current_user_id: uuid.UUID = Depends(get_current_user_id),
 ):
     """Get available service requests for providers (frontend compatibility endpoint)"""
     # This endpoint should redirect to the providers endpoint
     # For now, we'll implement a basic version that gets all pending requests
-    return service_request_crud.get_available_requests(
-        db=db, provider_id=current_user_id, skip=skip, limit=limit
+    selected = parse_fields(ServiceRequestResponse, fields)
+    requests = service_request_crud.get_available_requests(
+        db=db, provider_id=current_user_id, skip=skip, limit=limit, fields=selected
     )
+    return trusted_response(ServiceRequestResponse, requests, fields=selected)
 
 
 @router.post("/requests/{request_id}/accept", response_model=dict)
@@ -195,3 +215,9 @@ def patch_service_request(
     """Patch a service request (frontend compatibility - same as PUT)"""
     # Redirect to the existing PUT endpoint
     return update_service_request(request_id, request_data, db, current_user_id)
+
+
+@router.get("/users/{user_id}/rating-stats", response_model=UserRatingStatsResponse)
+def get_user_rating_stats(user_id: str, db: Session = Depends(get_read_db)):
+    """Rating count, average and per-score histogram for a user (one row read)"""
+    return rating_crud.get_user_rating_stats(db=db, user_id=user_id)
@@ -12,6 +12,39 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 MAX_REQUESTS_PER_USER = int(os.getenv("MAX_REQUESTS_PER_USER", "5"))
 SERVICE_RADIUS_MILES = float(os.getenv("SERVICE_RADIUS_MILES", "2.0"))
 REQUEST_EXPIRY_HOURS = int(os.getenv("REQUEST_EXPIRY_HOURS", "24"))
+REQUEST_EXPIRY_ENABLED = os.getenv("REQUEST_EXPIRY_ENABLED", "true").lower() == "true"
+REQUEST_EXPIRY_BATCH_SIZE = int(os.getenv("REQUEST_EXPIRY_BATCH_SIZE", "500"))
+REQUEST_EXPIRY_INTERVAL_SECONDS = float(
+    os.getenv("REQUEST_EXPIRY_INTERVAL_SECONDS", "60")
+)
+
+# Transactional outbox (outbox_events table -> relay -> Redis streams)
+OUTBOX_RELAY_ENABLED = os.getenv("OUTBOX_RELAY_ENABLED", "true").lower() == "true"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "0.5"))
+OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", "24"))
+
+# Dispatch configuration
+DISPATCH_ENABLED = os.getenv("DISPATCH_ENABLED", "true").lower() == "true"
+DISPATCH_TOP_K = int(os.getenv("DISPATCH_TOP_K", "5"))
+DISPATCH_MAX_WAVES = int(os.getenv("DISPATCH_MAX_WAVES", "3"))
+DISPATCH_OFFER_TIMEOUT_SECONDS = float(os.getenv("DISPATCH_OFFER_TIMEOUT_SECONDS", "30"))
+DISPATCH_POLL_INTERVAL_SECONDS = float(os.getenv("DISPATCH_POLL_INTERVAL_SECONDS", "1.0"))
+DISPATCH_RATING_WEIGHT = float(os.getenv("DISPATCH_RATING_WEIGHT", "0.6"))
+DISPATCH_DISTANCE_WEIGHT = float(os.getenv("DISPATCH_DISTANCE_WEIGHT", "0.4"))
+# Rating assumed for providers nobody has rated yet (1-5 scale)
+DISPATCH_DEFAULT_RATING = float(os.getenv("DISPATCH_DEFAULT_RATING", "3.0"))
+PROVIDER_SNAPSHOT_REFRESH_SECONDS = float(
+    os.getenv("PROVIDER_SNAPSHOT_REFRESH_SECONDS", "60")
+)
+# Only offer to providers whose weekly schedule covers the current hour.
+# Schedules are in the providers' local time; the offset maps UTC onto it.
+DISPATCH_CHECK_AVAILABILITY = (
+    os.getenv("DISPATCH_CHECK_AVAILABILITY", "false").lower() == "true"
+)
+DISPATCH_SCHEDULE_UTC_OFFSET_HOURS = float(
+    os.getenv("DISPATCH_SCHEDULE_UTC_OFFSET_HOURS", "0")
+)
 
 # JWT configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -41,5 +74,23 @@ class Settings:
     MAX_REQUESTS_PER_USER: int = MAX_REQUESTS_PER_USER
     SERVICE_RADIUS_MILES: float = SERVICE_RADIUS_MILES
     REQUEST_EXPIRY_HOURS: int = REQUEST_EXPIRY_HOURS
+    REQUEST_EXPIRY_ENABLED: bool = REQUEST_EXPIRY_ENABLED
+    REQUEST_EXPIRY_BATCH_SIZE: int = REQUEST_EXPIRY_BATCH_SIZE
+    REQUEST_EXPIRY_INTERVAL_SECONDS: float = REQUEST_EXPIRY_INTERVAL_SECONDS
+    OUTBOX_RELAY_ENABLED: bool = OUTBOX_RELAY_ENABLED
+    OUTBOX_BATCH_SIZE: int = OUTBOX_BATCH_SIZE
+    OUTBOX_POLL_INTERVAL_SECONDS: float = OUTBOX_POLL_INTERVAL_SECONDS
+    OUTBOX_RETENTION_HOURS: int = OUTBOX_RETENTION_HOURS
+    DISPATCH_ENABLED: bool = DISPATCH_ENABLED
+    DISPATCH_TOP_K: int = DISPATCH_TOP_K
+    DISPATCH_MAX_WAVES: int = DISPATCH_MAX_WAVES
+    DISPATCH_OFFER_TIMEOUT_SECONDS: float = DISPATCH_OFFER_TIMEOUT_SECONDS
+    DISPATCH_POLL_INTERVAL_SECONDS: float = DISPATCH_POLL_INTERVAL_SECONDS
+    DISPATCH_RATING_WEIGHT: float = DISPATCH_RATING_WEIGHT
+    DISPATCH_DISTANCE_WEIGHT: float = DISPATCH_DISTANCE_WEIGHT
+    DISPATCH_DEFAULT_RATING: float = DISPATCH_DEFAULT_RATING
+    PROVIDER_SNAPSHOT_REFRESH_SECONDS: float = PROVIDER_SNAPSHOT_REFRESH_SECONDS
+    DISPATCH_CHECK_AVAILABILITY: bool = DISPATCH_CHECK_AVAILABILITY
+    DISPATCH_SCHEDULE_UTC_OFFSET_HOURS: float = DISPATCH_SCHEDULE_UTC_OFFSET_HOURS
 
 settings = Settings()
\ No newline at end of file
@@ -3,6 +3,8 @@ import uuid
 from typing import Any, Dict, Optional, Union, List
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app.metrics import instrument_crud
+from app.responses import load_fields
 
 
 class ServiceRequestCRUD:
@@ -120,31 +122,93 @@ class ServiceRequestCRUD:
 
     @staticmethod
     def update_request_status(db, request_id, status):
+        """Flushed, not committed: the caller commits it with its other changes"""
         from app.models.service_request import ServiceRequest
         import datetime
         sr = db.query(ServiceRequest).filter(ServiceRequest.request_id == str(request_id)).first()
         if sr:
             sr.status = status
             sr.updated_at = datetime.datetime.utcnow()
-            db.commit(); db.refresh(sr)
+            db.flush(); db.refresh(sr)
         return sr
 
     @staticmethod
-    def get_available_requests(db, provider_id, skip, limit):
+    def get_available_requests(db, provider_id, skip, limit, fields=None):
+        """Pending requests of other users, oldest first; ``fields`` limits the columns read"""
         from app.models.service_request import ServiceRequest, ServiceRequestStatus
         return (
             db.query(ServiceRequest)
+            .options(*load_fields(ServiceRequest, fields))
             .filter(
                 ServiceRequest.status == ServiceRequestStatus.PENDING,
                 ServiceRequest.requester_id != str(provider_id),
-            ).offset(skip).limit(limit).all()
+            )
+            .order_by(ServiceRequest.created_at)
+            .offset(skip).limit(limit).all()
         )
 
     @staticmethod
-    def get_user_requests(db, requester_id, skip, limit):
+    def expire_pending_requests(db, cutoff, batch_size):
+        """
+        Expire up to ``batch_size`` pending requests created before ``cutoff``,
+        oldest first, in one UPDATE ... RETURNING (served by the partial
+        pending index). Rows locked by a concurrent accept are skipped and
+        picked up by the next batch if still pending. Their
+        RequestStatusChanged events are staged in the outbox in the same
+        transaction.
+        Returns ``[(request_id, requester_id), ...]`` for the expired rows.
+        """
+        from app.models.service_request import ServiceRequest, ServiceRequestStatus
+        from app.services.events import EventPublisher
+        from sqlalchemy import select, update
+        import datetime
+
+        stale = (
+            select(ServiceRequest.request_id)
+            .where(
+                ServiceRequest.status == ServiceRequestStatus.PENDING,
+                ServiceRequest.created_at < cutoff,
+            )
+            .order_by(ServiceRequest.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        expired = db.execute(
+            update(ServiceRequest)
+            .where(
+                ServiceRequest.request_id.in_(stale.scalar_subquery()),
+                ServiceRequest.status == ServiceRequestStatus.PENDING,
+            )
+            .values(
+                status=ServiceRequestStatus.EXPIRED,
+                updated_at=datetime.datetime.utcnow(),
+            )
+            .returning(ServiceRequest.request_id, ServiceRequest.requester_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        EventPublisher.publish_events(
+            "service_lifecycle",
+            [
+                EventPublisher.build_request_status_changed(
+                    request_id=str(row.request_id),
+                    old_status=ServiceRequestStatus.PENDING.value,
+                    new_status=ServiceRequestStatus.EXPIRED.value,
+                    requester_id=str(row.requester_id),
+                )
+                for row in expired
+            ],
+            db=db,
+        )
+        db.commit()
+        return [(row.request_id, row.requester_id) for row in expired]
+
+    @staticmethod
+    def get_user_requests(db, requester_id, skip, limit, fields=None):
+        """A requester's requests, newest first; ``fields`` limits the columns read"""
         from app.models.service_request import ServiceRequest
         return (
             db.query(ServiceRequest)
+            .options(*load_fields(ServiceRequest, fields))
             .filter(ServiceRequest.requester_id == str(requester_id))
             .order_by(ServiceRequest.created_at.desc())
             .offset(skip).limit(limit).all()
@@ -209,6 +273,78 @@ class ServiceAssignmentCRUD:
         )
         db.add(sa); db.commit(); db.refresh(sa); return sa
 
+    @staticmethod
+    def accept_request(db, request_id, provider_id, assignment_data):
+        """
+        Atomically claim a pending request for a provider.
+
+        One conditional UPDATE flips the request to accepted only while it is
+        still pending (and not the provider's own request); the assignment and
+        the RequestStatusChanged outbox event are inserted in the same
+        transaction. Returns ``(assignment, requester_id)`` or ``None`` when
+        the request could not be claimed, in which case the transaction has
+        been rolled back.
+        """
+        from app.models.service_request import (
+            ServiceRequest,
+            ServiceRequestStatus,
+            ServiceAssignment,
+            AssignmentStatus,
+        )
+        from app.services.events import EventPublisher
+        from sqlalchemy import update
+        from sqlalchemy.exc import IntegrityError
+        import datetime
+
+        now = datetime.datetime.utcnow()
+        claimed = db.execute(
+            update(ServiceRequest)
+            .where(
+                ServiceRequest.request_id == str(request_id),
+                ServiceRequest.status == ServiceRequestStatus.PENDING,
+                ServiceRequest.requester_id != str(provider_id),
+            )
+            .values(status=ServiceRequestStatus.ACCEPTED, updated_at=now)
+            .returning(ServiceRequest.requester_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if claimed is None:
+            db.rollback()
+            return None
+
+        ect = getattr(assignment_data, 'estimated_completion_time', None)
+        if isinstance(ect, str):
+            try:
+                ect = datetime.datetime.fromisoformat(ect.replace('Z', '+00:00'))
+            except Exception:
+                ect = None
+        sa = ServiceAssignment(
+            assignment_id=str(uuid.uuid4()),
+            request_id=str(request_id),
+            provider_id=str(provider_id),
+            status=AssignmentStatus.ASSIGNED,
+            provider_notes=getattr(assignment_data, 'provider_notes', None),
+            estimated_completion_time=ect,
+            created_at=now,
+            completed_at=None,
+        )
+        db.add(sa)
+        EventPublisher.publish_request_status_changed(
+            request_id=str(request_id),
+            old_status=ServiceRequestStatus.PENDING.value,
+            new_status=ServiceRequestStatus.ACCEPTED.value,
+            requester_id=str(claimed.requester_id),
+            provider_id=str(provider_id),
+            db=db,
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another assignment for this request won the unique constraint
+            db.rollback()
+            return None
+        return sa, claimed.requester_id
+
     @staticmethod
     def get_assignment_by_request(db, request_id):
         from app.models.service_request import ServiceAssignment
@@ -221,6 +357,7 @@ class ServiceAssignmentCRUD:
 
     @staticmethod
     def update_assignment(db, assignment_id, update_data):
+        """Flushed, not committed: the caller commits it with its other changes"""
         from app.models.service_request import ServiceAssignment, AssignmentStatus
         import datetime
         sa = db.query(ServiceAssignment).filter(ServiceAssignment.assignment_id == str(assignment_id)).first()
@@ -241,7 +378,7 @@ class ServiceAssignmentCRUD:
                 sa.estimated_completion_time = ect
             if sa.status == AssignmentStatus.COMPLETED:
                 sa.completed_at = datetime.datetime.utcnow()
-            db.commit(); db.refresh(sa)
+            db.flush(); db.refresh(sa)
         return sa
 
     @staticmethod
@@ -270,7 +407,111 @@ class RatingCRUD:
             is_provider_rating=int(rating_data.is_provider_rating),
             created_at=datetime.datetime.utcnow(),
         )
-        db.add(rating); db.commit(); db.refresh(rating); return rating
+        db.add(rating)
+        RatingCRUD.apply_rating_to_stats(db, rating.ratee_id, rating.rating_score)
+        db.commit(); db.refresh(rating); return rating
+
+    @staticmethod
+    def apply_rating_to_stats(db, user_id, rating_score):
+        """
+        Add one rating to a user's ``user_rating_stats`` row in the caller's
+        transaction (no commit). The increment is done in SQL so concurrent
+        ratings for the same user do not lose updates; a concurrent first
+        insert is absorbed by retrying the increment.
+        """
+        from app.models.service_request import UserRatingStats
+        from sqlalchemy import update
+        from sqlalchemy.exc import IntegrityError
+        import datetime
+
+        score_column = getattr(UserRatingStats, f"score_{int(rating_score)}")
+        increment = (
+            update(UserRatingStats)
+            .where(UserRatingStats.user_id == str(user_id))
+            .values(
+                {
+                    UserRatingStats.rating_count: UserRatingStats.rating_count + 1,
+                    UserRatingStats.rating_sum: UserRatingStats.rating_sum
+                    + int(rating_score),
+                    score_column: score_column + 1,
+                    UserRatingStats.updated_at: datetime.datetime.utcnow(),
+                }
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(increment).rowcount:
+            return
+        # Flush pending work first so a failed insert only undoes the stats row
+        db.flush()
+        try:
+            with db.begin_nested():
+                stats = UserRatingStats(
+                    user_id=str(user_id),
+                    rating_count=1,
+                    rating_sum=int(rating_score),
+                    **{f"score_{score}": 0 for score in range(1, 6)},
+                )
+                setattr(stats, f"score_{int(rating_score)}", 1)
+                db.add(stats)
+        except IntegrityError:
+            db.execute(increment)
+
+    @staticmethod
+    def get_user_rating_stats(db, user_id):
+        """Count, average and per-score histogram from the stats row"""
+        from app.models.service_request import UserRatingStats
+        stats = db.get(UserRatingStats, str(user_id))
+        if stats is None:
+            return {
+                "user_id": str(user_id),
+                "rating_count": 0,
+                "average_rating": 0.0,
+                "distribution": {score: 0 for score in range(1, 6)},
+            }
+        return {
+            "user_id": stats.user_id,
+            "rating_count": stats.rating_count,
+            "average_rating": round(stats.average_rating, 2),
+            "distribution": stats.distribution,
+        }
+
+    @staticmethod
+    def rebuild_user_rating_stats(db, user_id=None):
+        """
+        Recompute stats rows from the ratings table (backfill or repair) for
+        one user, or every user when ``user_id`` is None. Returns the number
+        of rows written.
+        """
+        from app.models.service_request import Rating, UserRatingStats
+        from sqlalchemy import case
+
+        delete_query = db.query(UserRatingStats)
+        ratings = db.query(
+            Rating.ratee_id,
+            func.count(Rating.rating_id),
+            func.sum(Rating.rating_score),
+            *(
+                func.sum(case((Rating.rating_score == score, 1), else_=0))
+                for score in range(1, 6)
+            ),
+        )
+        if user_id is not None:
+            delete_query = delete_query.filter(UserRatingStats.user_id == str(user_id))
+            ratings = ratings.filter(Rating.ratee_id == str(user_id))
+        delete_query.delete(synchronize_session=False)
+
+        rows = ratings.group_by(Rating.ratee_id).all()
+        db.add_all(
+            UserRatingStats(
+                user_id=ratee_id,
+                rating_count=count,
+                rating_sum=total,
+                **{f"score_{score}": scores[score - 1] for score in range(1, 6)},
+            )
+            for ratee_id, count, total, *scores in rows
+        )
+        db.commit()
+        return len(rows)
 
     @staticmethod
     def check_existing_rating(db, assignment_id, rater_id, is_provider_rating):
@@ -295,6 +536,7 @@ class RatingCRUD:
         return (
             db.query(Rating)
             .filter(Rating.ratee_id == str(user_id))
+            .order_by(Rating.created_at.desc())
             .offset(skip).limit(limit).all()
         )
 
@@ -305,15 +547,14 @@ class RatingCRUD:
 
     @staticmethod
     def calculate_average_rating(db, user_id):
-        from app.models.service_request import Rating
-        avg = (
-            db.query(func.avg(Rating.rating_score))
-            .filter(Rating.ratee_id == str(user_id))
-            .scalar()
-        )
-        return float(avg) if avg is not None else 0.0
+        from app.models.service_request import UserRatingStats
+        stats = db.get(UserRatingStats, str(user_id))
+        return float(stats.average_rating) if stats is not None else 0.0
 
 
 service_request_crud = ServiceRequestCRUD()
 service_assignment_crud = ServiceAssignmentCRUD()
 rating_crud = RatingCRUD()
+
+
+instrument_crud(__name__)
@@ -1,18 +1,29 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from .engine import ReplicaRouter, build_engine
+
 # Get database URL from environment variable or use SQLite for testing
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+engine = build_engine(DATABASE_URL)
+
+# Optional read replica for the browse endpoints (see session.get_read_db)
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+replica_router = ReplicaRouter(
+    lambda: build_engine(REPLICA_DATABASE_URL, name="replica")
+    if REPLICA_DATABASE_URL
+    else None
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=replica_router.session_class,
+)
 
 # Create Base class
 Base = declarative_base()
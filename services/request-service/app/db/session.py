@@ -1,4 +1,8 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
 from .base import SessionLocal
+from .engine import read_only
 
 
 def get_db():
@@ -7,3 +11,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(db: Session = Depends(get_db)):
+    """Session for read-only endpoints, served by the replica when configured"""
+    return read_only(db)
@@ -1,24 +1,67 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import os
 
 from app.api.v1.endpoints import service_requests, providers
 from app.core.config import settings
-from app.db.base import Base, engine
+from app.services.dispatch import dispatch_engine
+from app.services.outbox_relay import start_outbox_relay
+from app.services.request_expiry import start_request_expiry
+from app.db.engine import db_context_middleware
+from app.db.migrate import migrate
 from fastapi import FastAPI
-
-# Create tables only if not in testing environment
-if os.getenv("TESTING") != "true":
-    Base.metadata.create_all(bind=engine)
+from fastapi.concurrency import run_in_threadpool
+from app.metrics import install_metrics
+from app.responses import ORJSONResponse, install_compression
+from app.tracing import install_tracing
 
 app = FastAPI(
     title="Request Service",
     description="Service for managing service requests",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Scope the read-your-writes window of replica reads to the caller
+app.middleware("http")(db_context_middleware)
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "request-service")
+
 # Include routers
 app.include_router(service_requests.router, prefix="/api/v1", tags=["service_requests"])
 app.include_router(providers.router, prefix="/api/v1/providers", tags=["providers"])
 
+expiry_schedulers = []
+outbox_relays = []
+
+
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
+    if settings.DISPATCH_ENABLED:
+        dispatch_engine.start()
+    if settings.REQUEST_EXPIRY_ENABLED:
+        expiry_schedulers.append(start_request_expiry())
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relays.append(start_outbox_relay())
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    dispatch_engine.stop()
+    for worker in expiry_schedulers + outbox_relays:
+        worker.stop()
+
 
 @app.get("/")
 async def root():
@@ -38,6 +81,9 @@ async def info():
         "features": [
             "Service request lifecycle",
             "Provider matching",
+            "Provider dispatch",
+            "Stale request expiry",
+            "Transactional event outbox",
         ],
         "configuration": {},
     }
@@ -1,6 +1,18 @@
 # --- Basic SQLAlchemy models and enums for request-service ---
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey, Float, Text
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Float,
+    Text,
+    Index,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -14,6 +26,7 @@ class ServiceRequestStatus(enum.Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
+    EXPIRED = "expired"
 
 
 class AssignmentStatus(enum.Enum):
@@ -54,6 +67,20 @@ class ServiceRequest(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # count_user_active_requests
+        Index("ix_service_requests_requester_status", "requester_id", "status"),
+        # get_user_requests, newest first (scanned backwards)
+        Index("ix_service_requests_requester_created_at", "requester_id", "created_at"),
+        # Pending rows only: the available-request feed and expiry, oldest first
+        Index(
+            "ix_service_requests_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
+
 
 class ServiceAssignment(Base):
     __tablename__ = "service_assignments"
@@ -73,6 +100,15 @@ class ServiceAssignment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # At most one assignment per request, even when providers accept at once
+        UniqueConstraint("request_id", name="uq_service_assignments_request_id"),
+        # get_provider_assignments, newest first (scanned backwards)
+        Index(
+            "ix_service_assignments_provider_created_at", "provider_id", "created_at"
+        ),
+    )
+
 
 class Rating(Base):
     __tablename__ = "ratings"
@@ -88,7 +124,47 @@ class Rating(Base):
     is_provider_rating = Column(Integer, default=0)  # 0=False, 1=True
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # check_existing_rating; the leading column serves get_assignment_ratings
+        Index(
+            "ix_ratings_assignment_rater",
+            "assignment_id",
+            "rater_id",
+            "is_provider_rating",
+        ),
+        # get_user_ratings_received, newest first (scanned backwards)
+        Index("ix_ratings_ratee_created_at", "ratee_id", "created_at"),
+    )
+
     @property
     def is_provider_rating_bool(self) -> bool:
         """Return is_provider_rating as boolean"""
         return bool(self.is_provider_rating)
+
+
+class UserRatingStats(Base):
+    """
+    Running totals of the ratings a user has received, maintained in the
+    same transaction as each rating insert so averages and histograms are
+    a single-row read.
+    """
+
+    __tablename__ = "user_rating_stats"
+
+    user_id = Column(String(36), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    score_1 = Column(Integer, nullable=False, default=0)
+    score_2 = Column(Integer, nullable=False, default=0)
+    score_3 = Column(Integer, nullable=False, default=0)
+    score_4 = Column(Integer, nullable=False, default=0)
+    score_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    @property
+    def distribution(self) -> dict:
+        return {score: getattr(self, f"score_{score}") for score in range(1, 6)}
@@ -1,6 +1,6 @@
 # --- Basic Pydantic schemas for request-service ---
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -32,7 +32,8 @@ class ServiceRequestUpdate(BaseModel):
 
 
 class ServiceRequestResponse(BaseModel):
-    id: int
+    # service_requests is keyed by request_id; there is no integer id column
+    id: Optional[int] = None
     request_id: str = Field(alias="requestId")
     requester_id: str = Field(alias="requesterId")
     title: str
@@ -154,6 +155,15 @@ class RatingOut(RatingResponse):
     pass
 
 
+class UserRatingStatsResponse(BaseModel):
+    user_id: str = Field(alias="userId")
+    rating_count: int = Field(alias="ratingCount")
+    average_rating: float = Field(alias="averageRating")
+    distribution: Dict[int, int]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class StatusUpdateRequest(BaseModel):
     status: str
     notes: Optional[str]
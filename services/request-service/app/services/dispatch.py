@@ -0,0 +1,388 @@
+"""
+Provider dispatch.
+
+New service requests are pushed to providers instead of waiting to be found
+by ``get_available_requests``. The engine keeps an in-memory snapshot of every
+provider profile (refreshed from user-service) as parallel numpy arrays, so
+ranking a request is one vectorized pass: distance from each provider's base
+to the pickup point, a service-radius and availability mask, and a weighted
+score of rating and closeness. Weekly availability comes along as a 168-bit
+bitmap per provider (three uint64 words), so "free at this hour" is one
+shift-and-mask over the column.
+
+The best ``DISPATCH_TOP_K`` candidates are offered the job (a RequestOffered
+event) and given ``DISPATCH_OFFER_TIMEOUT_SECONDS`` to accept through the
+normal accept endpoint. If nobody does, the next wave goes to the following
+candidates, up to ``DISPATCH_MAX_WAVES``. Unmatched requests stay PENDING and
+visible to the pull path.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+import numpy as np
+
+from app.core.config import (
+    DISPATCH_CHECK_AVAILABILITY,
+    DISPATCH_DEFAULT_RATING,
+    DISPATCH_DISTANCE_WEIGHT,
+    DISPATCH_MAX_WAVES,
+    DISPATCH_OFFER_TIMEOUT_SECONDS,
+    DISPATCH_POLL_INTERVAL_SECONDS,
+    DISPATCH_RATING_WEIGHT,
+    DISPATCH_SCHEDULE_UTC_OFFSET_HOURS,
+    DISPATCH_TOP_K,
+    PROVIDER_SNAPSHOT_REFRESH_SECONDS,
+    USER_SERVICE_URL,
+)
+from app.models.service_request import ServiceRequest, ServiceRequestStatus
+from app.services.events import EventPublisher
+from app.tracing import client_span, inject_headers
+
+logger = logging.getLogger(__name__)
+
+# Same earth radius as RequestService._calculate_distance
+EARTH_RADIUS_MILES = 3956.0
+MAX_RATING = 5.0
+HOURS_PER_WEEK = 7 * 24
+BITMAP_WORDS = 3  # 168 hourly slots in three 64-bit words
+ALWAYS_AVAILABLE = (1 << HOURS_PER_WEEK) - 1
+
+
+def parse_availability_bitmap(value: Optional[str]) -> int:
+    """
+    Weekly bitmap from the user-service hex form; providers without a
+    published schedule count as available at every hour.
+    """
+    if not value:
+        return ALWAYS_AVAILABLE
+    try:
+        return int(value, 16) & ALWAYS_AVAILABLE
+    except ValueError:
+        return ALWAYS_AVAILABLE
+
+
+def hour_of_week(moment: datetime) -> int:
+    """Slot index (Monday 00:00 = 0) of a naive datetime"""
+    return moment.weekday() * 24 + moment.hour
+
+
+@dataclass
+class Candidate:
+    provider_id: str
+    distance_miles: float
+    score: float
+
+
+class ProviderSnapshot:
+    """Column-oriented copy of the provider profiles dispatch scores on"""
+
+    def __init__(self, records: Iterable[dict] = ()):
+        self.load(records)
+
+    def load(self, records: Iterable[dict]) -> None:
+        records = list(records)
+        self.provider_ids = [str(r["user_id"]) for r in records]
+        self._index = {pid: i for i, pid in enumerate(self.provider_ids)}
+
+        def column(name, default):
+            values = [r.get(name) for r in records]
+            return np.array(
+                [default if v is None else v for v in values], dtype=np.float64
+            )
+
+        self.latitude = np.radians(column("latitude", np.nan))
+        self.longitude = np.radians(column("longitude", np.nan))
+        self.radius_miles = column("service_radius_miles", 0.0)
+        rating = column("average_rating", 0.0)
+        rated = column("total_ratings", 0) > 0
+        self.rating = np.where(rated, rating, DISPATCH_DEFAULT_RATING)
+        self.available = np.array(
+            [bool(r.get("is_available")) for r in records], dtype=bool
+        ) & ~np.isnan(self.latitude) & ~np.isnan(self.longitude)
+        mask = (1 << 64) - 1
+        self.schedule = np.array(
+            [
+                [(bitmap >> (64 * w)) & mask for w in range(BITMAP_WORDS)]
+                for bitmap in (
+                    parse_availability_bitmap(r.get("availability_bitmap"))
+                    for r in records
+                )
+            ],
+            dtype=np.uint64,
+        ).reshape(len(records), BITMAP_WORDS)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.provider_ids)
+
+    def distances_from(self, latitude: float, longitude: float) -> np.ndarray:
+        """Haversine distance in miles from every provider base to a point"""
+        lat, lng = np.radians(latitude), np.radians(longitude)
+        a = (
+            np.sin((self.latitude - lat) / 2) ** 2
+            + np.cos(lat)
+            * np.cos(self.latitude)
+            * np.sin((self.longitude - lng) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def available_at(self, slot: int) -> np.ndarray:
+        """Whether each provider's schedule covers hour-of-week ``slot``"""
+        slot %= HOURS_PER_WEEK
+        word = self.schedule[:, slot // 64]
+        return ((word >> np.uint64(slot % 64)) & np.uint64(1)).astype(bool)
+
+    def rank(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int,
+        exclude: Iterable[str] = (),
+        slot: Optional[int] = None,
+    ) -> List[Candidate]:
+        """
+        Best ``limit`` providers able to serve a pickup point, best first.
+
+        A provider is eligible when available, located, not excluded and
+        within their own service radius of the pickup, and, when an
+        hour-of-week ``slot`` is given, scheduled for it. Score is the weighted
+        sum of normalized rating and closeness (1 at the base, 0 at the edge
+        of the radius).
+        """
+        if not self.provider_ids or limit <= 0:
+            return []
+
+        distance = self.distances_from(latitude, longitude)
+        with np.errstate(invalid="ignore"):
+            eligible = self.available & (distance <= self.radius_miles)
+        if slot is not None:
+            eligible &= self.available_at(slot)
+        for provider_id in exclude:
+            index = self._index.get(str(provider_id))
+            if index is not None:
+                eligible[index] = False
+
+        candidates = np.flatnonzero(eligible)
+        if candidates.size == 0:
+            return []
+
+        radius = np.maximum(self.radius_miles[candidates], 1e-9)
+        score = DISPATCH_RATING_WEIGHT * (
+            self.rating[candidates] / MAX_RATING
+        ) + DISPATCH_DISTANCE_WEIGHT * (1.0 - distance[candidates] / radius)
+
+        # Partial sort: only the top ``limit`` need ordering
+        if candidates.size > limit:
+            top = np.argpartition(-score, limit - 1)[:limit]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-score[top], kind="stable")]
+
+        return [
+            Candidate(
+                provider_id=self.provider_ids[candidates[i]],
+                distance_miles=round(float(distance[candidates[i]]), 2),
+                score=round(float(score[i]), 4),
+            )
+            for i in top
+        ]
+
+
+class DispatchEngine:
+    """Offers new requests to ranked providers in timed waves"""
+
+    def __init__(
+        self,
+        snapshot: Optional[ProviderSnapshot] = None,
+        session_factory=None,
+        top_k: Optional[int] = None,
+        max_waves: Optional[int] = None,
+        offer_timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+        check_availability: Optional[bool] = None,
+    ):
+        self.snapshot = snapshot or ProviderSnapshot()
+        self.session_factory = session_factory
+        self.top_k = top_k or DISPATCH_TOP_K
+        self.max_waves = max_waves or DISPATCH_MAX_WAVES
+        self.offer_timeout = (
+            offer_timeout
+            if offer_timeout is not None
+            else DISPATCH_OFFER_TIMEOUT_SECONDS
+        )
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else DISPATCH_POLL_INTERVAL_SECONDS
+        )
+        self.refresh_interval = refresh_interval or PROVIDER_SNAPSHOT_REFRESH_SECONDS
+        self.check_availability = (
+            check_availability
+            if check_availability is not None
+            else DISPATCH_CHECK_AVAILABILITY
+        )
+        # request_id -> provider ids offered so far, while dispatch is running
+        self.offers: Dict[str, List[str]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+
+    def _get_session(self):
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    async def refresh_snapshot(self) -> int:
+        """Reload the provider snapshot from user-service"""
+        url = f"{USER_SERVICE_URL}/api/v1/profiles/providers/snapshot"
+        with client_span("GET", url):
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(url, headers=inject_headers())
+                response.raise_for_status()
+        # Build aside and swap, so a ranking never sees a half-loaded snapshot
+        self.snapshot = ProviderSnapshot(response.json()["providers"])
+        return len(self.snapshot)
+
+    async def run_refresh(self) -> None:
+        """Refresh periodically; on failure keep dispatching on the old snapshot"""
+        while self.running:
+            try:
+                count = await self.refresh_snapshot()
+                logger.info(f"[DISPATCH] provider snapshot refreshed: {count}")
+            except Exception as e:
+                logger.error(f"[DISPATCH] snapshot refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def _load_request(self, request_id: str) -> Optional[dict]:
+        db = self._get_session()
+        try:
+            request = (
+                db.query(ServiceRequest)
+                .filter(ServiceRequest.request_id == str(request_id))
+                .first()
+            )
+            if not request:
+                return None
+            return {
+                "requester_id": str(request.requester_id),
+                "latitude": float(request.pickup_latitude),
+                "longitude": float(request.pickup_longitude),
+                "status": request.status,
+            }
+        finally:
+            db.close()
+
+    def _get_status(self, request_id: str) -> Optional[ServiceRequestStatus]:
+        db = self._get_session()
+        try:
+            row = (
+                db.query(ServiceRequest.status)
+                .filter(ServiceRequest.request_id == str(request_id))
+                .first()
+            )
+            return row[0] if row else None
+        finally:
+            db.close()
+
+    async def _wait_for_accept(self, request_id: str) -> ServiceRequestStatus:
+        """Poll the request until it leaves PENDING or the offer times out"""
+        deadline = time.monotonic() + self.offer_timeout
+        while True:
+            status = await asyncio.to_thread(self._get_status, request_id)
+            if status != ServiceRequestStatus.PENDING:
+                return status
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return status
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    def current_slot(self) -> Optional[int]:
+        """Hour-of-week providers must be scheduled for, if checked at all"""
+        if not self.check_availability:
+            return None
+        local = datetime.utcnow() + timedelta(
+            hours=DISPATCH_SCHEDULE_UTC_OFFSET_HOURS
+        )
+        return hour_of_week(local)
+
+    async def dispatch(self, request_id: str) -> Optional[ServiceRequestStatus]:
+        """
+        Run the offer waves for one request. Returns the status the request
+        left PENDING with, or None if every wave timed out (or nobody was
+        eligible) and the request is left to the pull path.
+        """
+        request = await asyncio.to_thread(self._load_request, request_id)
+        if not request:
+            return None
+        if request["status"] != ServiceRequestStatus.PENDING:
+            return request["status"]
+
+        offered: List[str] = []
+        self.offers[request_id] = offered
+        try:
+            for wave in range(1, self.max_waves + 1):
+                candidates = self.snapshot.rank(
+                    request["latitude"],
+                    request["longitude"],
+                    self.top_k,
+                    exclude=[request["requester_id"], *offered],
+                    slot=self.current_slot(),
+                )
+                if not candidates:
+                    break
+                provider_ids = [c.provider_id for c in candidates]
+                offered.extend(provider_ids)
+                expires_at = datetime.utcnow() + timedelta(seconds=self.offer_timeout)
+                EventPublisher.publish_request_offered(
+                    request_id=request_id,
+                    requester_id=request["requester_id"],
+                    provider_ids=provider_ids,
+                    wave=wave,
+                    expires_at=expires_at.isoformat(),
+                    distances_miles=[c.distance_miles for c in candidates],
+                )
+
+                status = await self._wait_for_accept(request_id)
+                if status != ServiceRequestStatus.PENDING:
+                    return status
+            return None
+        finally:
+            self.offers.pop(request_id, None)
+
+    async def _dispatch_logged(self, request_id: str) -> None:
+        try:
+            await self.dispatch(request_id)
+        except Exception as e:
+            logger.error(f"[DISPATCH] request {request_id} failed: {e}")
+
+    def submit(self, request_id: str) -> bool:
+        """
+        Schedule dispatch for a new request. Safe to call from sync endpoints
+        running in the threadpool; a no-op while the engine is not started.
+        """
+        if not self.running or self.loop is None:
+            return False
+        asyncio.run_coroutine_threadsafe(
+            self._dispatch_logged(str(request_id)), self.loop
+        )
+        return True
+
+    def start(self) -> None:
+        """Start snapshot refreshes on the running loop"""
+        self.loop = asyncio.get_running_loop()
+        self.running = True
+        asyncio.create_task(self.run_refresh())
+
+    def stop(self) -> None:
+        self.running = False
+
+
+dispatch_engine = DispatchEngine()
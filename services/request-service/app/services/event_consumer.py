@@ -10,6 +10,8 @@ from app.core.config import REDIS_URL
 from app.crud.crud_service_request import ServiceRequestCRUD
 from app.models.service_request import PaymentStatus
 from app.db.session import SessionLocal
+from app.metrics import record_consume
+from app.tracing import consume_span
 
 logger = logging.getLogger(__name__)
 
@@ -119,9 +121,14 @@ class EventConsumer:
                                     logger.debug(f"Unhandled stream: {stream_name}")
 
                             # 在新线程中处理事件
-                            event_thread = threading.Thread(target=process_event_sync)
-                            event_thread.start()
-                            event_thread.join()
+                            with consume_span(
+                                stream_name, event_data, event_data.get("event_type")
+                            ):
+                                event_thread = threading.Thread(
+                                    target=process_event_sync
+                                )
+                                event_thread.start()
+                                event_thread.join()
 
                             # Update stream position
                             self.streams[stream_name] = (
@@ -129,11 +136,15 @@ class EventConsumer:
                                 if isinstance(message_id, bytes)
                                 else message_id
                             )
+                            record_consume(
+                                stream_name, event_data.get("event_type"), message_id
+                            )
 
                         except Exception as e:
                             logger.error(
                                 f"Error processing message from {stream_name}: {e}"
                             )
+                            record_consume(stream_name, None, message_id, ok=False)
                             continue
 
             except Exception as e:
@@ -243,6 +254,7 @@ class EventConsumer:
                             ServiceRequestCRUD.update_request_status(
                                 db=db, request_id=request.request_id, status="cancelled"
                             )
+                    db.commit()
 
                     logger.info(
                         f"Cancelled active requests for user {user_id} due to status: {new_status}"
@@ -1,15 +1,24 @@
 import redis
 import json
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import uuid
+from sqlalchemy.orm import Session
 from app.core.config import REDIS_URL
+from app.metrics import record_publish, record_publish_batch
+from app.models.outbox import OutboxEvent
+from app.tracing import publish_span
 
 
 class EventPublisher:
     """
     Publishes events to Redis streams for other services to consume.
     Based on the PRD requirements for event-driven architecture.
+
+    Events describing a state change are passed the caller's ``db`` session:
+    they are then written to the outbox in that transaction and delivered by
+    the outbox relay once it commits, instead of being sent to Redis directly.
     """
 
     @staticmethod
@@ -18,37 +27,117 @@ class EventPublisher:
         return redis.from_url(REDIS_URL)
 
     @staticmethod
-    def _publish_event(stream_name: str, event_data: Dict[str, Any]) -> str:
+    def _to_redis_fields(event_data: Dict[str, Any]) -> Dict[str, str]:
+        """Ensure all values are strings for Redis"""
+        redis_data = {}
+        for key, value in event_data.items():
+            if isinstance(value, (dict, list)):
+                redis_data[key] = json.dumps(value)
+            else:
+                redis_data[key] = str(value)
+        return redis_data
+
+    @staticmethod
+    def _stage_events(
+        db: Session, stream_name: str, events: List[Dict[str, Any]]
+    ) -> None:
+        """Add ``events`` to the outbox in the caller's transaction (no commit)"""
+        for event_data in events:
+            event_type = event_data.get("event_type")
+            trace_fields: Dict[str, str] = {}
+            with publish_span(stream_name, trace_fields, event_type=event_type):
+                db.add(
+                    OutboxEvent(
+                        event_id=event_data["event_id"],
+                        stream=stream_name,
+                        event_type=event_type,
+                        payload={
+                            **EventPublisher._to_redis_fields(event_data),
+                            **trace_fields,
+                        },
+                    )
+                )
+
+    @staticmethod
+    def _publish_event(
+        stream_name: str, event_data: Dict[str, Any], db: Optional[Session] = None
+    ) -> str:
         """
         Internal method to publish events to Redis stream
 
         Args:
             stream_name: The Redis stream name
             event_data: The event payload
+            db: Stage the event in this session's outbox instead
 
         Returns:
-            Event ID from Redis
+            Event ID from Redis (the event's own ID when staged)
         """
-        try:
-            redis_client = EventPublisher.get_redis_client()
+        if db is not None:
+            EventPublisher._stage_events(db, stream_name, [event_data])
+            return event_data["event_id"]
+        event_type = event_data.get("event_type")
+        trace_fields: Dict[str, str] = {}
+        with publish_span(stream_name, trace_fields, event_type=event_type):
+            started = time.perf_counter()
+            try:
+                redis_client = EventPublisher.get_redis_client()
+
+                # Add to Redis stream
+                event_id = redis_client.xadd(
+                    stream_name,
+                    {**EventPublisher._to_redis_fields(event_data), **trace_fields},
+                )
+                redis_client.close()
+                record_publish(stream_name, event_type, time.perf_counter() - started)
 
-            # Ensure all values are strings for Redis
-            redis_data = {}
-            for key, value in event_data.items():
-                if isinstance(value, (dict, list)):
-                    redis_data[key] = json.dumps(value)
-                else:
-                    redis_data[key] = str(value)
+                return (
+                    event_id.decode() if isinstance(event_id, bytes) else str(event_id)
+                )
+            except Exception as e:
+                record_publish(
+                    stream_name, event_type, time.perf_counter() - started, ok=False
+                )
+                print(f"Failed to publish event to {stream_name}: {e}")
+                # Don't re-raise the exception, just log it
+                return None
 
-            # Add to Redis stream
-            event_id = redis_client.xadd(stream_name, redis_data)
-            redis_client.close()
+    @staticmethod
+    def publish_events(
+        stream_name: str, events: List[Dict[str, Any]], db: Optional[Session] = None
+    ) -> int:
+        """
+        Publish many events to one stream in a single pipeline round trip, or
+        stage them all in ``db``'s outbox.
 
-            return event_id.decode() if isinstance(event_id, bytes) else str(event_id)
-        except Exception as e:
-            print(f"Failed to publish event to {stream_name}: {e}")
-            # Don't re-raise the exception, just log it
-            return None
+        Returns the number of events sent or staged (0 on failure, which is
+        logged and swallowed like ``_publish_event``).
+        """
+        if not events:
+            return 0
+        if db is not None:
+            EventPublisher._stage_events(db, stream_name, events)
+            return len(events)
+        sent = [(stream_name, event.get("event_type")) for event in events]
+        trace_fields: Dict[str, str] = {}
+        with publish_span(stream_name, trace_fields):
+            started = time.perf_counter()
+            try:
+                redis_client = EventPublisher.get_redis_client()
+                pipe = redis_client.pipeline(transaction=False)
+                for event_data in events:
+                    pipe.xadd(
+                        stream_name,
+                        {**EventPublisher._to_redis_fields(event_data), **trace_fields},
+                    )
+                pipe.execute()
+                redis_client.close()
+                record_publish_batch(sent, time.perf_counter() - started)
+                return len(events)
+            except Exception as e:
+                record_publish_batch(sent, time.perf_counter() - started, ok=False)
+                print(f"Failed to publish {len(events)} events to {stream_name}: {e}")
+                return 0
 
     @staticmethod
     def publish_service_request_created(
@@ -56,6 +145,7 @@ class EventPublisher:
         requester_id: str,
         service_type: str,
         location: Dict[str, float],
+        db: Optional[Session] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -82,7 +172,7 @@ class EventPublisher:
             "data": json.dumps(payload),
         }
 
-        EventPublisher._publish_event("service_lifecycle", event_data)
+        EventPublisher._publish_event("service_lifecycle", event_data, db=db)
         return event_data
 
     @staticmethod
@@ -92,6 +182,7 @@ class EventPublisher:
         requester_id: str,
         provider_id: str,
         completion_time: Optional[str] = None,
+        db: Optional[Session] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -123,7 +214,7 @@ class EventPublisher:
             "data": json.dumps(payload),
         }
 
-        EventPublisher._publish_event("service_lifecycle", event_data)
+        EventPublisher._publish_event("service_lifecycle", event_data, db=db)
         return event_data
 
     @staticmethod
@@ -133,6 +224,7 @@ class EventPublisher:
         rater_id: str,
         ratee_id: str,
         rating_score: int,
+        db: Optional[Session] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -161,7 +253,7 @@ class EventPublisher:
             "data": json.dumps(payload),
         }
 
-        EventPublisher._publish_event("service_lifecycle", event_data)
+        EventPublisher._publish_event("service_lifecycle", event_data, db=db)
         return event_data
 
     @staticmethod
@@ -171,6 +263,7 @@ class EventPublisher:
         new_status: str,
         requester_id: str,
         provider_id: Optional[str] = None,
+        db: Optional[Session] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -183,6 +276,22 @@ class EventPublisher:
             requester_id: UUID of the requester
             provider_id: UUID of the provider (if applicable)
         """
+        event_data = EventPublisher.build_request_status_changed(
+            request_id, old_status, new_status, requester_id, provider_id, **kwargs
+        )
+        EventPublisher._publish_event("service_lifecycle", event_data, db=db)
+        return event_data
+
+    @staticmethod
+    def build_request_status_changed(
+        request_id: str,
+        old_status: str,
+        new_status: str,
+        requester_id: str,
+        provider_id: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Build a RequestStatusChanged event without sending it"""
         payload = {
             "request_id": request_id,
             "old_status": old_status,
@@ -193,12 +302,47 @@ class EventPublisher:
             **kwargs,
         }
 
-        event_data = {
+        return {
             "event_type": "RequestStatusChanged",
             "event_id": str(uuid.uuid4()),
             "data": json.dumps(payload),
         }
 
+    @staticmethod
+    def publish_request_offered(
+        request_id: str,
+        requester_id: str,
+        provider_ids: List[str],
+        wave: int,
+        expires_at: str,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Publish RequestOffered event (one dispatch wave)
+
+        Args:
+            request_id: UUID of the service request
+            requester_id: UUID of the requester
+            provider_ids: UUIDs of the providers offered the job, best first
+            wave: 1-based dispatch wave number
+            expires_at: ISO timestamp when this wave's offer times out
+        """
+        payload = {
+            "request_id": request_id,
+            "requester_id": requester_id,
+            "provider_ids": provider_ids,
+            "wave": wave,
+            "expires_at": expires_at,
+            "timestamp": datetime.utcnow().isoformat(),
+            **kwargs,
+        }
+
+        event_data = {
+            "event_type": "RequestOffered",
+            "event_id": str(uuid.uuid4()),
+            "data": json.dumps(payload),
+        }
+
         EventPublisher._publish_event("service_lifecycle", event_data)
         return event_data
 
@@ -209,6 +353,7 @@ class EventPublisher:
         amount: float,
         assignment_id: Optional[str] = None,
         provider_id: Optional[str] = None,
+        db: Optional[Session] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
@@ -239,5 +384,5 @@ class EventPublisher:
             "data": json.dumps(payload),
         }
 
-        EventPublisher._publish_event("payment_lifecycle", event_data)
+        EventPublisher._publish_event("payment_lifecycle", event_data, db=db)
         return event_data
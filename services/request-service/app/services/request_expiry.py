@@ -0,0 +1,90 @@
+"""
+Stale request expiry.
+
+A PENDING request that nobody accepts within ``REQUEST_EXPIRY_HOURS`` is moved
+to EXPIRED, which keeps the pending set scanned by ``get_available_requests``
+and counted by ``count_user_active_requests`` bounded. Overdue rows are found
+through the partial index on pending ``created_at`` and expired in batches
+with one UPDATE ... RETURNING each; the RequestStatusChanged events for a batch
+are staged in the outbox in the same transaction.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import (
+    REQUEST_EXPIRY_BATCH_SIZE,
+    REQUEST_EXPIRY_HOURS,
+    REQUEST_EXPIRY_INTERVAL_SECONDS,
+)
+from app.crud.crud_service_request import ServiceRequestCRUD
+
+logger = logging.getLogger(__name__)
+
+
+class RequestExpiryScheduler:
+    """Periodically expires overdue pending requests"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        expiry_hours: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or REQUEST_EXPIRY_BATCH_SIZE
+        self.interval = interval or REQUEST_EXPIRY_INTERVAL_SECONDS
+        self.expiry_hours = expiry_hours or REQUEST_EXPIRY_HOURS
+        self.running = False
+
+    def _get_session(self):
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def expire_batch(self, db, now: Optional[datetime] = None) -> int:
+        """Expire one batch (events included); returns the batch size"""
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=self.expiry_hours)
+        expired = ServiceRequestCRUD.expire_pending_requests(
+            db, cutoff, self.batch_size
+        )
+        return len(expired)
+
+    def expire_once(self, now: Optional[datetime] = None) -> int:
+        """Drain every overdue request, batch by batch"""
+        db = self._get_session()
+        try:
+            total = 0
+            while True:
+                expired = self.expire_batch(db, now)
+                total += expired
+                if expired < self.batch_size:
+                    return total
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        self.running = True
+        while self.running:
+            try:
+                expired = await asyncio.to_thread(self.expire_once)
+                if expired:
+                    logger.info(f"[EXPIRY] expired {expired} pending requests")
+            except Exception as e:
+                logger.error(f"[EXPIRY] expiry error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        self.running = False
+
+
+def start_request_expiry() -> RequestExpiryScheduler:
+    """Start the scheduler on the running loop"""
+    scheduler = RequestExpiryScheduler()
+    asyncio.create_task(scheduler.run())
+    return scheduler
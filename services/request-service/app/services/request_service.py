@@ -60,64 +60,48 @@ class RequestService:
         provider_id: uuid.UUID,
         assignment_data: ServiceAssignmentCreate,
     ) -> ServiceAssignment:
-        """Assign a provider to a service request"""
+        """
+        Assign a provider to a service request.
+
+        The claim is a single conditional UPDATE plus the assignment insert in
+        one transaction, so concurrent accepts cannot both succeed; the
+        RequestStatusChanged event is committed with it through the outbox.
+        The request is only read again to explain a rejected claim.
+        """
+        accepted = ServiceAssignmentCRUD.accept_request(
+            db, request_id, provider_id, assignment_data
+        )
+        if accepted is None:
+            RequestService._raise_accept_rejected(db, request_id, provider_id)
+        assignment, _ = accepted
+        return assignment
 
-        # Get the request
+    @staticmethod
+    def _raise_accept_rejected(
+        db: Session, request_id: uuid.UUID, provider_id: uuid.UUID
+    ) -> None:
+        """Raise the HTTP error explaining why a request could not be claimed"""
         service_request = ServiceRequestCRUD.get_service_request(db, request_id)
         if not service_request:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Service request not found",
             )
-
-        # Check if request is available
         if service_request.status != ServiceRequestStatus.PENDING:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Service request is no longer available",
             )
-
-        # Check if provider is trying to assign to their own request
         if service_request.requester_id == str(provider_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot assign to your own request",
             )
-
-        # Check if assignment already exists
-        existing_assignment = ServiceAssignmentCRUD.get_assignment_by_request(
-            db, request_id
-        )
-        if existing_assignment:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Request already has an assignment",
-            )
-
-        # Create assignment
-        assignment = ServiceAssignmentCRUD.create_assignment(
-            db, assignment_data, provider_id
-        )
-
-        # Update request status to accepted
-        ServiceRequestCRUD.update_request_status(
-            db, request_id, ServiceRequestStatus.ACCEPTED
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request already has an assignment",
         )
 
-        # Publish status change event
-        try:
-            EventPublisher.publish_request_status_changed(
-                request_id=str(request_id),
-                old_status="pending",
-                new_status="accepted",
-                requester_id=str(service_request.requester_id),
-                provider_id=str(provider_id),
-            )
-        except Exception as e:
-            print(f"Failed to publish status change event: {e}")
-
-        return assignment
-
     @staticmethod
     def update_assignment_status(
         db: Session,
@@ -171,41 +155,37 @@ class RequestService:
                 detail=f"Invalid status transition from {current_status} to {new_status}",
             )
 
-        # Update assignment
-        update_data = ServiceAssignmentUpdate(
-            status=new_status,
-            provider_notes=status_data.notes,
-            estimated_completion_time=None,
-            completion_notes=None,
-        )
-        assignment = ServiceAssignmentCRUD.update_assignment(
-            db, assignment_id, update_data
-        )
-
-        # Update request status accordingly
-        request_status_map = {
-            "accepted": ServiceRequestStatus.ACCEPTED,
-            "in_progress": ServiceRequestStatus.IN_PROGRESS,
-            "completed": ServiceRequestStatus.COMPLETED,
-            "cancelled": ServiceRequestStatus.CANCELLED,
-        }
-
-        if new_status in request_status_map:
-            ServiceRequestCRUD.update_request_status(
-                db, assignment.request_id, request_status_map[new_status]
+        # The assignment, the request status and the outbox events commit in
+        # one transaction; nothing is kept if any step fails
+        try:
+            # Update assignment
+            update_data = ServiceAssignmentUpdate(
+                status=new_status,
+                provider_notes=status_data.notes,
+                estimated_completion_time=None,
+                completion_notes=None,
+            )
+            assignment = ServiceAssignmentCRUD.update_assignment(
+                db, assignment_id, update_data
             )
 
-        # Publish events
-        try:
+            # Update request status accordingly
+            request_status_map = {
+                "accepted": ServiceRequestStatus.ACCEPTED,
+                "in_progress": ServiceRequestStatus.IN_PROGRESS,
+                "completed": ServiceRequestStatus.COMPLETED,
+                "cancelled": ServiceRequestStatus.CANCELLED,
+            }
+
+            # Stage the events in the outbox
             EventPublisher.publish_request_status_changed(
                 request_id=str(assignment.request_id),
                 old_status=current_status,
                 new_status=new_status,
                 requester_id=str(service_request.requester_id),
                 provider_id=str(assignment.provider_id),
+                db=db,
             )
-
-            # If completed, publish ServiceCompleted event
             if new_status == "completed":
                 EventPublisher.publish_service_completed(
                     request_id=str(assignment.request_id),
@@ -217,10 +197,22 @@ class RequestService:
                         if assignment.completed_at
                         else None
                     ),
+                    db=db,
+                )
+
+            if not ServiceRequestCRUD.update_request_status(
+                db, assignment.request_id, request_status_map[new_status]
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Service request not found",
                 )
-        except Exception as e:
-            print(f"Failed to publish events: {e}")
 
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(assignment)
         return assignment
 
     @staticmethod
@@ -279,6 +271,12 @@ class RequestService:
                     detail="Invalid ratee_id for requester rating",
                 )
 
+        if not 1 <= rating_data.rating_score <= 5:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Rating score must be between 1 and 5",
+            )
+
         # Check if rating already exists
         existing_rating = RatingCRUD.check_existing_rating(
             db, rating_data.assignment_id, rater_id, rating_data.is_provider_rating
@@ -10,8 +10,10 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from app.main import app
-from app.db.base import Base
+from app.db.base_class import Base
+from app.models import outbox, service_request  # noqa: F401  (registers the models)
 from app.db.session import get_db
+from app.db.base import get_db as base_get_db
 
 # Test database configuration: use in-memory mock DB for testing
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -36,8 +38,9 @@ def override_get_db():
         db.close()
 
 
-# Override the dependency
+# Override the dependency (service_requests endpoints import it from db.base)
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[base_get_db] = override_get_db
 
 
 @pytest.fixture
@@ -54,8 +57,16 @@ def db_session():
         yield db
     finally:
         # Clean up after each test
-        from app.models.service_request import Rating, ServiceAssignment, ServiceRequest
-
+        from app.models.outbox import OutboxEvent
+        from app.models.service_request import (
+            Rating,
+            ServiceAssignment,
+            ServiceRequest,
+            UserRatingStats,
+        )
+
+        db.query(OutboxEvent).delete()
+        db.query(UserRatingStats).delete()
         db.query(Rating).delete()
         db.query(ServiceAssignment).delete()
         db.query(ServiceRequest).delete()
@@ -78,6 +89,21 @@ def mock_redis():
             self.streams[stream_name].append((event_id, data))
             return event_id
 
+        def pipeline(self, transaction=True):
+            redis = self
+
+            class MockPipeline:
+                def __init__(self):
+                    self.commands = []
+
+                def xadd(self, *args, **kwargs):
+                    self.commands.append((args, kwargs))
+
+                def execute(self):
+                    return [redis.xadd(*a, **kw) for a, kw in self.commands]
+
+            return MockPipeline()
+
         def close(self):
             pass
 
@@ -0,0 +1,143 @@
+import json
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_service_request import ServiceAssignmentCRUD
+from app.db.base_class import Base
+from app.models.outbox import OutboxEvent
+from app.models.service_request import (
+    ServiceAssignment,
+    ServiceRequest,
+    ServiceRequestStatus,
+    ServiceType,
+)
+from app.schemas.service_request import ServiceAssignmentCreate
+from app.services.request_service import RequestService
+
+
+def make_request(db, requester_id=None):
+    service_request = ServiceRequest(
+        requester_id=str(requester_id or uuid.uuid4()),
+        title="Groceries",
+        service_type=ServiceType.ERRANDS,
+        pickup_latitude=34.05,
+        pickup_longitude=-118.24,
+    )
+    db.add(service_request)
+    db.commit()
+    return service_request
+
+
+def assignment_in(request_id, notes="On my way"):
+    return ServiceAssignmentCreate(
+        requestId=str(request_id),
+        providerNotes=notes,
+        estimatedCompletionTime=None,
+    )
+
+
+class TestAtomicAccept:
+
+    def test_accept_claims_request_and_stages_event(self, db_session, mock_redis):
+        service_request = make_request(db_session)
+        provider_id = uuid.uuid4()
+
+        assignment = RequestService.assign_provider_to_request(
+            db_session,
+            service_request.request_id,
+            provider_id,
+            assignment_in(service_request.request_id),
+        )
+
+        db_session.expire_all()
+        assert assignment.provider_id == str(provider_id)
+        assert assignment.provider_notes == "On my way"
+        assert (
+            db_session.get(ServiceRequest, service_request.request_id).status
+            == ServiceRequestStatus.ACCEPTED
+        )
+        (event,) = db_session.query(OutboxEvent).all()
+        assert event.event_type == "RequestStatusChanged"
+        assert json.loads(event.payload["data"])["new_status"] == "accepted"
+        assert mock_redis.streams == {}
+
+    @pytest.mark.parametrize(
+        "case, status_code, detail",
+        [
+            ("missing", 404, "Service request not found"),
+            ("taken", 400, "Service request is no longer available"),
+            ("own", 400, "Cannot assign to your own request"),
+            ("orphan_assignment", 400, "Request already has an assignment"),
+        ],
+    )
+    def test_rejected_accepts(self, db_session, case, status_code, detail):
+        requester_id = uuid.uuid4()
+        service_request = make_request(db_session, requester_id)
+        request_id = service_request.request_id
+        provider_id = uuid.uuid4()
+        if case == "missing":
+            request_id = str(uuid.uuid4())
+        elif case == "taken":
+            service_request.status = ServiceRequestStatus.ACCEPTED
+            db_session.commit()
+        elif case == "own":
+            provider_id = requester_id
+        elif case == "orphan_assignment":
+            db_session.add(
+                ServiceAssignment(request_id=request_id, provider_id=str(uuid.uuid4()))
+            )
+            db_session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            RequestService.assign_provider_to_request(
+                db_session, request_id, provider_id, assignment_in(request_id)
+            )
+
+        assert exc_info.value.status_code == status_code
+        assert exc_info.value.detail == detail
+        assert db_session.query(OutboxEvent).count() == 0
+        if case == "orphan_assignment":
+            # The claim was rolled back together with the failed insert
+            db_session.expire_all()
+            assert (
+                db_session.get(ServiceRequest, request_id).status
+                == ServiceRequestStatus.PENDING
+            )
+
+    def test_concurrent_accepts_yield_one_assignment(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'accept.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session() as db:
+            request_id = make_request(db).request_id
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def accept():
+            with Session() as db:
+                barrier.wait()
+                results.append(
+                    ServiceAssignmentCRUD.accept_request(
+                        db, request_id, uuid.uuid4(), assignment_in(request_id)
+                    )
+                )
+
+        threads = [threading.Thread(target=accept) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len([r for r in results if r is not None]) == 1
+        with Session() as db:
+            assert db.query(ServiceAssignment).count() == 1
+        engine.dispose()
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.service_request import (
+    ServiceRequest,
+    ServiceRequestStatus,
+    ServiceType,
+)
+from app.services.dispatch import DispatchEngine, ProviderSnapshot, hour_of_week
+from app.services.request_service import RequestService
+
+PICKUP = (34.05, -118.24)
+
+
+def provider(
+    latitude=PICKUP[0],
+    longitude=PICKUP[1],
+    radius=5.0,
+    rating=4.0,
+    total_ratings=10,
+    available=True,
+    user_id=None,
+):
+    return {
+        "user_id": user_id or str(uuid.uuid4()),
+        "service_radius_miles": radius,
+        "is_available": available,
+        "latitude": latitude,
+        "longitude": longitude,
+        "average_rating": rating,
+        "total_ratings": total_ratings,
+    }
+
+
+def make_request(db, requester_id=None):
+    service_request = ServiceRequest(
+        requester_id=str(requester_id or uuid.uuid4()),
+        title="Groceries",
+        service_type=ServiceType.ERRANDS,
+        pickup_latitude=PICKUP[0],
+        pickup_longitude=PICKUP[1],
+    )
+    db.add(service_request)
+    db.commit()
+    return service_request
+
+
+def offers(mock_redis):
+    return [
+        json.loads(fields["data"])
+        for _, fields in mock_redis.streams.get("service_lifecycle", [])
+        if fields["event_type"] == "RequestOffered"
+    ]
+
+
+class TestProviderSnapshot:
+
+    def test_filters_ineligible_providers(self):
+        eligible = provider()
+        requester = provider()
+        snapshot = ProviderSnapshot(
+            [
+                eligible,
+                requester,
+                provider(available=False),
+                provider(latitude=None, longitude=None),
+                # ~7 miles north, outside a 5 mile radius
+                provider(latitude=PICKUP[0] + 0.1),
+            ]
+        )
+
+        ranked = snapshot.rank(*PICKUP, limit=10, exclude=[requester["user_id"]])
+
+        assert [c.provider_id for c in ranked] == [eligible["user_id"]]
+        assert ranked[0].distance_miles == 0.0
+
+    def test_orders_by_rating_and_distance(self):
+        near_low = provider(rating=3.0)
+        far_high = provider(latitude=PICKUP[0] + 0.02, rating=5.0)
+        near_high = provider(rating=5.0)
+        snapshot = ProviderSnapshot([near_low, far_high, near_high])
+
+        ranked = snapshot.rank(*PICKUP, limit=2)
+
+        assert [c.provider_id for c in ranked] == [
+            near_high["user_id"],
+            far_high["user_id"],
+        ]
+        assert ranked[0].score > ranked[1].score
+
+    def test_unrated_providers_get_default_rating(self):
+        unrated = provider(rating=0.0, total_ratings=0)
+        poorly_rated = provider(rating=1.0, total_ratings=3)
+        snapshot = ProviderSnapshot([poorly_rated, unrated])
+
+        ranked = snapshot.rank(*PICKUP, limit=2)
+
+        assert ranked[0].provider_id == unrated["user_id"]
+
+    def test_matches_scalar_haversine(self):
+        rng = random.Random(7)
+        records = [
+            provider(
+                latitude=PICKUP[0] + rng.uniform(-0.2, 0.2),
+                longitude=PICKUP[1] + rng.uniform(-0.2, 0.2),
+                radius=rng.uniform(1, 20),
+                rating=rng.uniform(1, 5),
+            )
+            for _ in range(5000)
+        ]
+        snapshot = ProviderSnapshot(records)
+
+        ranked = snapshot.rank(*PICKUP, limit=50)
+
+        expected = sum(
+            RequestService._calculate_distance(
+                r["latitude"], r["longitude"], *PICKUP
+            )
+            <= r["service_radius_miles"]
+            for r in records
+        )
+        assert len(ranked) == min(50, expected)
+        scores = [c.score for c in ranked]
+        assert scores == sorted(scores, reverse=True)
+        by_id = {r["user_id"]: r for r in records}
+        for c in ranked[:5]:
+            r = by_id[c.provider_id]
+            assert c.distance_miles == pytest.approx(
+                RequestService._calculate_distance(
+                    r["latitude"], r["longitude"], *PICKUP
+                ),
+                abs=0.01,
+            )
+
+    def test_empty_snapshot(self):
+        assert ProviderSnapshot().rank(*PICKUP, limit=5) == []
+
+
+class TestDispatchEngine:
+
+    def engine(self, db_session, records, **kwargs):
+        options = {"top_k": 1, "max_waves": 2, "offer_timeout": 0.05}
+        options.update(kwargs)
+        return DispatchEngine(
+            snapshot=ProviderSnapshot(records),
+            session_factory=sessionmaker(bind=db_session.get_bind()),
+            poll_interval=0.01,
+            **options,
+        )
+
+    @pytest.mark.asyncio
+    async def test_offers_in_waves_until_exhausted(self, db_session, mock_redis):
+        service_request = make_request(db_session)
+        best, second, third = (
+            provider(rating=5.0),
+            provider(rating=4.0),
+            provider(rating=3.0),
+        )
+        engine = self.engine(db_session, [third, second, best])
+
+        status = await engine.dispatch(service_request.request_id)
+
+        assert status is None
+        waves = offers(mock_redis)
+        assert [w["wave"] for w in waves] == [1, 2]
+        assert [w["provider_ids"] for w in waves] == [
+            [best["user_id"]],
+            [second["user_id"]],
+        ]
+        assert engine.offers == {}
+
+    @pytest.mark.asyncio
+    async def test_stops_when_request_is_accepted(self, db_session, mock_redis):
+        service_request = make_request(db_session)
+        engine = self.engine(
+            db_session, [provider(), provider()], offer_timeout=5.0
+        )
+
+        task = asyncio.create_task(engine.dispatch(service_request.request_id))
+        await asyncio.sleep(0.05)
+        service_request.status = ServiceRequestStatus.ACCEPTED
+        db_session.commit()
+        status = await asyncio.wait_for(task, timeout=1.0)
+
+        assert status == ServiceRequestStatus.ACCEPTED
+        assert len(offers(mock_redis)) == 1
+
+    @pytest.mark.asyncio
+    async def test_requester_is_never_offered_their_own_request(
+        self, db_session, mock_redis
+    ):
+        requester_id = str(uuid.uuid4())
+        service_request = make_request(db_session, requester_id)
+        engine = self.engine(db_session, [provider(user_id=requester_id)])
+
+        status = await engine.dispatch(service_request.request_id)
+
+        assert status is None
+        assert offers(mock_redis) == []
+
+    @pytest.mark.asyncio
+    async def test_skips_requests_no_longer_pending(self, db_session, mock_redis):
+        service_request = make_request(db_session)
+        service_request.status = ServiceRequestStatus.CANCELLED
+        db_session.commit()
+        engine = self.engine(db_session, [provider()])
+
+        status = await engine.dispatch(service_request.request_id)
+
+        assert status == ServiceRequestStatus.CANCELLED
+        assert offers(mock_redis) == []
+
+    def test_submit_is_noop_until_started(self, db_session):
+        engine = self.engine(db_session, [])
+        assert engine.submit(str(uuid.uuid4())) is False
+
+    @pytest.mark.asyncio
+    async def test_refresh_snapshot_from_user_service(
+        self, db_session, monkeypatch
+    ):
+        records = [provider(), provider(available=False)]
+
+        def handler(request):
+            assert request.url.path == "/api/v1/profiles/providers/snapshot"
+            return httpx.Response(200, json={"providers": records})
+
+        real_client = httpx.AsyncClient
+        monkeypatch.setattr(
+            httpx,
+            "AsyncClient",
+            lambda **kwargs: real_client(
+                transport=httpx.MockTransport(handler), **kwargs
+            ),
+        )
+        engine = self.engine(db_session, [])
+
+        count = await engine.refresh_snapshot()
+
+        assert count == 2
+        ranked = engine.snapshot.rank(*PICKUP, limit=5)
+        assert [c.provider_id for c in ranked] == [records[0]["user_id"]]
+
+
+class TestAvailabilityBitmap:
+
+    def test_rank_filters_on_hour_of_week(self):
+        # Tuesday 09:00 is slot 33; Sunday 23:00 (slot 167) lands in the last word
+        tuesday_morning = provider()
+        tuesday_morning["availability_bitmap"] = f"{1 << 33:042x}"
+        sunday_night = provider()
+        sunday_night["availability_bitmap"] = f"{1 << 167:042x}"
+        no_schedule = provider()
+        snapshot = ProviderSnapshot([tuesday_morning, sunday_night, no_schedule])
+
+        def ranked_at(slot):
+            return {c.provider_id for c in snapshot.rank(*PICKUP, limit=5, slot=slot)}
+
+        assert ranked_at(33) == {tuesday_morning["user_id"], no_schedule["user_id"]}
+        assert ranked_at(167) == {sunday_night["user_id"], no_schedule["user_id"]}
+        assert ranked_at(None) == {
+            tuesday_morning["user_id"],
+            sunday_night["user_id"],
+            no_schedule["user_id"],
+        }
+
+    def test_hour_of_week(self):
+        assert hour_of_week(datetime(2024, 1, 2, 9, 30)) == 33  # a Tuesday
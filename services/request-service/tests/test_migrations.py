@@ -0,0 +1,158 @@
+"""
+Upgrades from the pre-Alembic baseline (revision 001, the schema
+``create_all`` used to build) with data already in the tables.
+
+SQLite is used by default. Point ``MIGRATION_DATABASE_URL`` at an empty
+scratch PostgreSQL database to run them against real enum types.
+"""
+
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_service_request import ServiceRequestCRUD
+from app.models.service_request import (
+    ServiceRequest,
+    ServiceRequestStatus,
+    ServiceType,
+)
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def alembic_config() -> Config:
+    config = Config(str(SERVICE_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVICE_ROOT / "alembic"))
+    return config
+
+
+def run_alembic(engine, action: str, revision: str) -> None:
+    with engine.connect() as connection:
+        config = alembic_config()
+        config.attributes["connection"] = connection
+        getattr(command, action)(config, revision)
+        connection.commit()
+
+
+@pytest.fixture
+def baseline_engine():
+    url = os.getenv("MIGRATION_DATABASE_URL")
+    path = None
+    if not url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    run_alembic(engine, "upgrade", "001")
+    yield engine
+    run_alembic(engine, "downgrade", "base")
+    engine.dispose()
+    if path:
+        os.remove(path)
+
+
+def test_duplicate_assignments_are_merged_before_the_unique_constraint(
+    baseline_engine,
+):
+    request_id = str(uuid.uuid4())
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    now = datetime.utcnow()
+    with baseline_engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO service_requests (request_id, requester_id, "
+                "service_type, pickup_latitude, pickup_longitude, status) "
+                "VALUES (:id, :requester, 'ERRANDS', 0, 0, 'ACCEPTED')"
+            ),
+            {"id": request_id, "requester": str(uuid.uuid4())},
+        )
+        for assignment_id, created_at in (
+            (second, now),
+            (first, now - timedelta(minutes=1)),
+        ):
+            connection.execute(
+                text(
+                    "INSERT INTO service_assignments (assignment_id, request_id, "
+                    "provider_id, created_at) VALUES (:id, :request_id, :provider, "
+                    ":created_at)"
+                ),
+                {
+                    "id": assignment_id,
+                    "request_id": request_id,
+                    "provider": str(uuid.uuid4()),
+                    "created_at": created_at,
+                },
+            )
+        connection.execute(
+            text(
+                "INSERT INTO ratings (rating_id, assignment_id, rater_id, ratee_id, "
+                "rating_score) VALUES (:id, :assignment_id, 'a', 'b', 5)"
+            ),
+            {"id": str(uuid.uuid4()), "assignment_id": second},
+        )
+
+    run_alembic(baseline_engine, "upgrade", "head")
+
+    with baseline_engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT assignment_id FROM service_assignments")
+        ).scalars().all() == [first]
+        assert connection.execute(
+            text("SELECT assignment_id FROM ratings")
+        ).scalars().all() == [first]
+    unique = inspect(baseline_engine).get_unique_constraints("service_assignments")
+    assert [c["name"] for c in unique] == ["uq_service_assignments_request_id"]
+
+
+def test_expiry_runs_on_an_upgraded_baseline(baseline_engine):
+    run_alembic(baseline_engine, "upgrade", "head")
+    db = sessionmaker(bind=baseline_engine)()
+    db.add(
+        ServiceRequest(
+            requester_id=str(uuid.uuid4()),
+            service_type=ServiceType.ERRANDS,
+            pickup_latitude=0,
+            pickup_longitude=0,
+            created_at=datetime.utcnow() - timedelta(days=2),
+        )
+    )
+    db.commit()
+
+    expired = ServiceRequestCRUD.expire_pending_requests(
+        db, datetime.utcnow() - timedelta(days=1), 10
+    )
+
+    assert len(expired) == 1
+    assert db.query(ServiceRequest).one().status == ServiceRequestStatus.EXPIRED
+    db.close()
+
+
+def test_migrate_stamps_a_create_all_database(baseline_engine, monkeypatch):
+    from app.core.config import settings
+    from app.db.migrate import migrate
+
+    with baseline_engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+    monkeypatch.setattr(
+        settings,
+        "DATABASE_URL",
+        baseline_engine.url.render_as_string(hide_password=False),
+    )
+
+    migrate()
+
+    tables = inspect(baseline_engine).get_table_names()
+    assert "user_rating_stats" in tables
+    with baseline_engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT version_num FROM alembic_version")
+        ).scalar() == ScriptDirectory.from_config(alembic_config()).get_current_head()
@@ -0,0 +1,162 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models.outbox import OutboxEvent
+from app.models.service_request import (
+    AssignmentStatus,
+    ServiceAssignment,
+    ServiceRequest,
+    ServiceType,
+)
+from app.schemas.service_request import StatusUpdateRequest
+from app.services.events import EventPublisher
+from app.services.outbox_relay import OutboxRelay
+from app.services.request_service import RequestService
+
+
+def stage_status_changed(db_session, request_id=None):
+    event = EventPublisher.publish_request_status_changed(
+        request_id=request_id or str(uuid.uuid4()),
+        old_status="pending",
+        new_status="accepted",
+        requester_id=str(uuid.uuid4()),
+        db=db_session,
+    )
+    db_session.commit()
+    return event
+
+
+def make_assignment(db, status=AssignmentStatus.IN_PROGRESS):
+    service_request = ServiceRequest(
+        requester_id=str(uuid.uuid4()),
+        title="Groceries",
+        service_type=ServiceType.ERRANDS,
+        pickup_latitude=34.05,
+        pickup_longitude=-118.24,
+    )
+    db.add(service_request)
+    db.flush()
+    assignment = ServiceAssignment(
+        request_id=service_request.request_id,
+        provider_id=str(uuid.uuid4()),
+        status=status,
+    )
+    db.add(assignment)
+    db.commit()
+    return assignment
+
+
+class TestOutboxStaging:
+
+    def test_event_is_written_to_outbox_not_redis(self, db_session, mock_redis):
+        event = stage_status_changed(db_session)
+
+        row = db_session.query(OutboxEvent).one()
+        assert row.event_id == event["event_id"]
+        assert row.stream == "service_lifecycle"
+        assert row.payload["event_type"] == "RequestStatusChanged"
+        assert row.payload["data"] == event["data"]
+        assert row.published_at is None
+        assert mock_redis.streams == {}
+
+    def test_rolled_back_transaction_emits_nothing(self, db_session):
+        EventPublisher.publish_service_completed(
+            request_id=str(uuid.uuid4()),
+            assignment_id=str(uuid.uuid4()),
+            requester_id=str(uuid.uuid4()),
+            provider_id=str(uuid.uuid4()),
+            db=db_session,
+        )
+        db_session.rollback()
+
+        assert db_session.query(OutboxEvent).count() == 0
+
+    def test_completion_stages_both_events(self, db_session, mock_redis):
+        assignment = make_assignment(db_session)
+
+        RequestService.update_assignment_status(
+            db_session,
+            assignment.assignment_id,
+            StatusUpdateRequest(status="completed", notes="Done"),
+            uuid.UUID(assignment.provider_id),
+        )
+
+        rows = db_session.query(OutboxEvent).order_by(OutboxEvent.outbox_id).all()
+        assert [row.event_type for row in rows] == [
+            "RequestStatusChanged",
+            "ServiceCompleted",
+        ]
+        assert json.loads(rows[0].payload["data"])["new_status"] == "completed"
+        assert mock_redis.streams == {}
+
+    def test_failed_completion_leaves_nothing_behind(self, db_session, mock_redis):
+        assignment = make_assignment(db_session)
+        assignment_id = assignment.assignment_id
+
+        with patch(
+            "app.services.request_service.ServiceRequestCRUD.update_request_status",
+            side_effect=RuntimeError("db went away"),
+        ):
+            with pytest.raises(RuntimeError):
+                RequestService.update_assignment_status(
+                    db_session,
+                    assignment_id,
+                    StatusUpdateRequest(status="completed", notes="Done"),
+                    uuid.UUID(assignment.provider_id),
+                )
+
+        db_session.expire_all()
+        stored = db_session.get(ServiceAssignment, assignment_id)
+        assert stored.status == AssignmentStatus.IN_PROGRESS
+        assert stored.completed_at is None
+        assert db_session.query(OutboxEvent).count() == 0
+
+
+class TestOutboxRelay:
+
+    def test_relay_publishes_in_order_and_marks_sent(self, db_session, mock_redis):
+        events = [stage_status_changed(db_session) for _ in range(3)]
+        relay = OutboxRelay(session_factory=lambda: db_session, batch_size=2)
+
+        assert relay.relay_batch(db_session, mock_redis) == 2
+        assert relay.relay_batch(db_session, mock_redis) == 1
+        assert relay.relay_batch(db_session, mock_redis) == 0
+
+        published = [fields for _, fields in mock_redis.streams["service_lifecycle"]]
+        assert [e["event_id"] for e in published] == [e["event_id"] for e in events]
+        assert (
+            db_session.query(OutboxEvent)
+            .filter(OutboxEvent.published_at.is_(None))
+            .count()
+            == 0
+        )
+
+    def test_redis_failure_leaves_rows_pending(self, db_session, mock_redis):
+        stage_status_changed(db_session)
+        relay = OutboxRelay(session_factory=lambda: db_session)
+
+        failing_pipeline = MagicMock()
+        failing_pipeline.execute.side_effect = ConnectionError("redis down")
+        with patch.object(mock_redis, "pipeline", return_value=failing_pipeline):
+            with pytest.raises(ConnectionError):
+                relay.relay_batch(db_session, mock_redis)
+
+        assert db_session.query(OutboxEvent).one().published_at is None
+        assert relay.relay_batch(db_session, mock_redis) == 1
+        assert len(mock_redis.streams["service_lifecycle"]) == 1
+
+    def test_purge_removes_old_published_rows(self, db_session):
+        stage_status_changed(db_session)
+        stage_status_changed(db_session)
+        old, recent = db_session.query(OutboxEvent).order_by(OutboxEvent.outbox_id)
+        now = datetime.utcnow()
+        old.published_at = now - timedelta(days=2)
+        recent.published_at = now
+        db_session.commit()
+
+        assert OutboxRelay().purge_published(db_session) == 1
+        assert db_session.query(OutboxEvent).count() == 1
@@ -0,0 +1,237 @@
+"""
+Query plan regression tests.
+
+The Alembic migrations are applied to a fresh database, the hot-path CRUD
+calls are run while the SQL they emit is recorded, and every recorded
+statement is EXPLAINed. A statement that reads a table without an index
+fails its test, so a dropped index or a rewritten filter shows up here
+before it shows up as production latency.
+
+SQLite is used by default. Point ``EXPLAIN_DATABASE_URL`` at a scratch
+PostgreSQL database to check the real planner; sequential scans are
+disabled there, so any Seq Scan left in a plan means no index could serve
+the query.
+"""
+
+import json
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_service_request import (
+    RatingCRUD,
+    ServiceAssignmentCRUD,
+    ServiceRequestCRUD,
+)
+from app.db.base_class import Base
+from app.models.service_request import (
+    Rating,
+    ServiceAssignment,
+    ServiceRequest,
+    ServiceRequestStatus,
+    ServiceType,
+)
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+REQUESTER_ID = str(uuid.uuid4())
+PROVIDER_ID = str(uuid.uuid4())
+
+
+def alembic_config(connection) -> Config:
+    config = Config(str(SERVICE_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVICE_ROOT / "alembic"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def run_migrations(engine, revision: str, downgrade: bool = False) -> None:
+    with engine.connect() as connection:
+        config = alembic_config(connection)
+        if downgrade:
+            command.downgrade(config, revision)
+        else:
+            command.upgrade(config, revision)
+        connection.commit()
+
+
+@pytest.fixture(scope="module")
+def migrated_engine():
+    url = os.getenv("EXPLAIN_DATABASE_URL")
+    path = None
+    if not url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    run_migrations(engine, "head")
+    yield engine
+    run_migrations(engine, "base", downgrade=True)
+    engine.dispose()
+    if path:
+        os.remove(path)
+
+
+@pytest.fixture(scope="module")
+def seeded_session(migrated_engine):
+    db = sessionmaker(bind=migrated_engine)()
+    now = datetime.utcnow()
+    requests = [
+        ServiceRequest(
+            request_id=str(uuid.uuid4()),
+            requester_id=REQUESTER_ID if i % 2 else str(uuid.uuid4()),
+            title=f"Request {i}",
+            service_type=ServiceType.ERRANDS,
+            pickup_latitude=34.05,
+            pickup_longitude=-118.24,
+            status=ServiceRequestStatus.PENDING if i % 3 else ServiceRequestStatus.COMPLETED,
+            created_at=now - timedelta(hours=i),
+        )
+        for i in range(30)
+    ]
+    db.add_all(requests)
+    db.flush()
+    assignments = [
+        ServiceAssignment(
+            assignment_id=str(uuid.uuid4()),
+            request_id=request.request_id,
+            provider_id=PROVIDER_ID,
+            created_at=request.created_at,
+        )
+        for request in requests[::3]
+    ]
+    db.add_all(assignments)
+    db.flush()
+    db.add_all(
+        Rating(
+            rating_id=str(uuid.uuid4()),
+            assignment_id=assignment.assignment_id,
+            rater_id=REQUESTER_ID,
+            ratee_id=PROVIDER_ID,
+            rating_score=5,
+            is_provider_rating=0,
+        )
+        for assignment in assignments
+    )
+    db.commit()
+    yield db, assignments[0].assignment_id
+    db.close()
+
+
+@contextmanager
+def recorded_statements(engine):
+    """Collect the reads and writes-with-filters a block sends to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _postgres_seq_scans(plan: dict) -> list:
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(f"Seq Scan on {plan.get('Relation Name')}")
+    for child in plan.get("Plans", []):
+        scans.extend(_postgres_seq_scans(child))
+    return scans
+
+
+def sequential_scans(engine, statement, parameters) -> list:
+    """Table reads in the statement's plan that use no index"""
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.exec_driver_sql("SET enable_seqscan = off")
+            row = connection.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            ).scalar()
+            plan = row if isinstance(row, list) else json.loads(row)
+            return _postgres_seq_scans(plan[0]["Plan"])
+
+        rows = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).fetchall()
+        details = [row[-1] for row in rows]
+        return [d for d in details if d.startswith("SCAN ") and " USING " not in d]
+
+
+HOT_QUERIES = {
+    "count_user_active_requests": lambda db, _: (
+        ServiceRequestCRUD.count_user_active_requests(db, REQUESTER_ID)
+    ),
+    "get_available_requests": lambda db, _: (
+        ServiceRequestCRUD.get_available_requests(db, PROVIDER_ID, 0, 20)
+    ),
+    "get_user_requests": lambda db, _: (
+        ServiceRequestCRUD.get_user_requests(db, REQUESTER_ID, 0, 20)
+    ),
+    "expire_pending_requests": lambda db, _: (
+        ServiceRequestCRUD.expire_pending_requests(
+            db, datetime.utcnow() - timedelta(days=365), 10
+        )
+    ),
+    "get_provider_assignments": lambda db, _: (
+        ServiceAssignmentCRUD.get_provider_assignments(db, PROVIDER_ID, 0, 20)
+    ),
+    "get_assignment_by_request": lambda db, _: (
+        ServiceAssignmentCRUD.get_assignment_by_request(db, str(uuid.uuid4()))
+    ),
+    "check_existing_rating": lambda db, assignment_id: (
+        RatingCRUD.check_existing_rating(db, assignment_id, REQUESTER_ID, False)
+    ),
+    "get_assignment_ratings": lambda db, assignment_id: (
+        RatingCRUD.get_assignment_ratings(db, assignment_id)
+    ),
+    "get_user_ratings_received": lambda db, _: (
+        RatingCRUD.get_user_ratings_received(db, PROVIDER_ID, 0, 20)
+    ),
+    "get_user_rating_stats": lambda db, _: (
+        RatingCRUD.get_user_rating_stats(db, PROVIDER_ID)
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(name, migrated_engine, seeded_session):
+    db, assignment_id = seeded_session
+
+    with recorded_statements(migrated_engine) as statements:
+        HOT_QUERIES[name](db, assignment_id)
+    db.rollback()
+
+    assert statements, f"{name} issued no SQL"
+    for statement, parameters in statements:
+        scans = sequential_scans(migrated_engine, statement, parameters)
+        assert not scans, f"{name} regressed to {scans}:\n{statement}"
+
+
+def test_migrations_match_model_indexes(migrated_engine):
+    inspector = inspect(migrated_engine)
+    for table in Base.metadata.sorted_tables:
+        migrated = {index["name"] for index in inspector.get_indexes(table.name)}
+        declared = {index.name for index in table.indexes}
+        assert migrated == declared, table.name
+
+
+def test_harness_flags_unindexed_filter(migrated_engine):
+    # review_text has no index, so this must be reported
+    scans = sequential_scans(
+        migrated_engine,
+        "SELECT rating_id FROM ratings WHERE review_text = 'x'",
+        (),
+    )
+    assert scans
@@ -0,0 +1,145 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud.crud_service_request import RatingCRUD
+from app.models.service_request import (
+    AssignmentStatus,
+    Rating,
+    ServiceAssignment,
+    ServiceRequest,
+    ServiceType,
+    UserRatingStats,
+)
+from app.schemas.service_request import RatingCreate
+from app.services.request_service import RequestService
+
+
+def make_assignment(db, requester_id, provider_id):
+    service_request = ServiceRequest(
+        requester_id=requester_id,
+        title="Groceries",
+        service_type=ServiceType.ERRANDS,
+        pickup_latitude=34.05,
+        pickup_longitude=-118.24,
+    )
+    db.add(service_request)
+    db.flush()
+    assignment = ServiceAssignment(
+        request_id=service_request.request_id,
+        provider_id=provider_id,
+        status=AssignmentStatus.COMPLETED,
+    )
+    db.add(assignment)
+    db.commit()
+    return assignment
+
+
+def rating_in(assignment_id, ratee_id, score):
+    return RatingCreate(
+        assignmentId=assignment_id,
+        rateeId=ratee_id,
+        ratingScore=score,
+        reviewText=None,
+        isProviderRating=True,
+    )
+
+
+class TestUserRatingStats:
+
+    def test_create_rating_updates_stats_in_same_transaction(self, db_session):
+        provider_id = str(uuid.uuid4())
+        for score in (5, 4, 5):
+            requester_id = str(uuid.uuid4())
+            assignment = make_assignment(db_session, requester_id, provider_id)
+            RatingCRUD.create_rating(
+                db_session,
+                rating_in(assignment.assignment_id, provider_id, score),
+                requester_id,
+            )
+
+        stats = RatingCRUD.get_user_rating_stats(db_session, provider_id)
+
+        assert stats["rating_count"] == 3
+        assert stats["average_rating"] == 4.67
+        assert stats["distribution"] == {1: 0, 2: 0, 3: 0, 4: 1, 5: 2}
+        assert RatingCRUD.calculate_average_rating(
+            db_session, provider_id
+        ) == pytest.approx(14 / 3)
+
+    def test_user_without_ratings(self, db_session):
+        stats = RatingCRUD.get_user_rating_stats(db_session, uuid.uuid4())
+
+        assert stats["rating_count"] == 0
+        assert stats["average_rating"] == 0.0
+        assert RatingCRUD.calculate_average_rating(db_session, uuid.uuid4()) == 0.0
+
+    def test_rebuild_matches_incremental(self, db_session):
+        provider_id = str(uuid.uuid4())
+        for score in (1, 3, 3, 5):
+            requester_id = str(uuid.uuid4())
+            assignment = make_assignment(db_session, requester_id, provider_id)
+            RatingCRUD.create_rating(
+                db_session,
+                rating_in(assignment.assignment_id, provider_id, score),
+                requester_id,
+            )
+        incremental = RatingCRUD.get_user_rating_stats(db_session, provider_id)
+
+        db_session.query(UserRatingStats).delete()
+        db_session.commit()
+        assert RatingCRUD.rebuild_user_rating_stats(db_session, provider_id) == 1
+        db_session.expire_all()
+
+        assert RatingCRUD.get_user_rating_stats(db_session, provider_id) == incremental
+
+    def test_ratings_received_newest_first(self, db_session):
+        provider_id = str(uuid.uuid4())
+        assignment = make_assignment(db_session, str(uuid.uuid4()), provider_id)
+        for day in (1, 3, 2):
+            db_session.add(
+                Rating(
+                    assignment_id=assignment.assignment_id,
+                    rater_id=str(uuid.uuid4()),
+                    ratee_id=provider_id,
+                    rating_score=4,
+                    created_at=datetime(2024, 1, day),
+                )
+            )
+        db_session.commit()
+
+        ratings = RatingCRUD.get_user_ratings_received(db_session, provider_id, 0, 10)
+
+        assert [r.created_at.day for r in ratings] == [3, 2, 1]
+
+    def test_out_of_range_score_is_rejected(self, db_session):
+        requester_id, provider_id = str(uuid.uuid4()), str(uuid.uuid4())
+        assignment = make_assignment(db_session, requester_id, provider_id)
+
+        with pytest.raises(HTTPException) as exc:
+            RequestService.create_rating(
+                db_session,
+                rating_in(assignment.assignment_id, provider_id, 6),
+                requester_id,
+            )
+
+        assert exc.value.status_code == 400
+        assert db_session.get(UserRatingStats, provider_id) is None
+
+    def test_stats_endpoint(self, client, db_session):
+        provider_id = str(uuid.uuid4())
+        requester_id = str(uuid.uuid4())
+        assignment = make_assignment(db_session, requester_id, provider_id)
+        RatingCRUD.create_rating(
+            db_session, rating_in(assignment.assignment_id, provider_id, 4), requester_id
+        )
+
+        res = client.get(f"/api/v1/users/{provider_id}/rating-stats")
+
+        assert res.status_code == 200
+        body = res.json()
+        assert body["ratingCount"] == 1
+        assert body["averageRating"] == 4.0
+        assert body["distribution"]["4"] == 1
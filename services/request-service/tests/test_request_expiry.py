@@ -0,0 +1,128 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_service_request import ServiceRequestCRUD
+from app.models.outbox import OutboxEvent
+from app.models.service_request import (
+    ServiceRequest,
+    ServiceRequestStatus,
+    ServiceType,
+)
+from app.services.outbox_relay import OutboxRelay
+from app.services.request_expiry import RequestExpiryScheduler
+
+NOW = datetime(2024, 1, 2, 12, 0, 0)
+
+
+def make_request(db, age_hours, status=ServiceRequestStatus.PENDING):
+    service_request = ServiceRequest(
+        requester_id=str(uuid.uuid4()),
+        title="Groceries",
+        service_type=ServiceType.ERRANDS,
+        pickup_latitude=34.05,
+        pickup_longitude=-118.24,
+        status=status,
+        created_at=NOW - timedelta(hours=age_hours),
+    )
+    db.add(service_request)
+    db.commit()
+    return service_request
+
+
+def status_events(mock_redis):
+    return [
+        json.loads(fields["data"])
+        for _, fields in mock_redis.streams.get("service_lifecycle", [])
+        if fields["event_type"] == "RequestStatusChanged"
+    ]
+
+
+def scheduler_for(db_session, **kwargs):
+    return RequestExpiryScheduler(
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        expiry_hours=24,
+        **kwargs,
+    )
+
+
+class TestExpirePendingRequests:
+
+    def test_expires_only_overdue_pending_requests(self, db_session):
+        overdue = make_request(db_session, age_hours=30)
+        fresh = make_request(db_session, age_hours=2)
+        accepted = make_request(
+            db_session, age_hours=30, status=ServiceRequestStatus.ACCEPTED
+        )
+
+        expired = ServiceRequestCRUD.expire_pending_requests(
+            db_session, NOW - timedelta(hours=24), batch_size=10
+        )
+
+        assert expired == [(overdue.request_id, overdue.requester_id)]
+        db_session.expire_all()
+        assert overdue.status == ServiceRequestStatus.EXPIRED
+        assert fresh.status == ServiceRequestStatus.PENDING
+        assert accepted.status == ServiceRequestStatus.ACCEPTED
+
+    def test_batch_takes_oldest_first(self, db_session):
+        oldest = make_request(db_session, age_hours=50)
+        make_request(db_session, age_hours=40)
+
+        expired = ServiceRequestCRUD.expire_pending_requests(
+            db_session, NOW - timedelta(hours=24), batch_size=1
+        )
+
+        assert [request_id for request_id, _ in expired] == [oldest.request_id]
+
+    def test_expired_requests_leave_the_active_set(self, db_session):
+        overdue = make_request(db_session, age_hours=30)
+
+        ServiceRequestCRUD.expire_pending_requests(
+            db_session, NOW - timedelta(hours=24), batch_size=10
+        )
+
+        assert ServiceRequestCRUD.count_user_active_requests(
+            db_session, overdue.requester_id
+        ) == 0
+        assert ServiceRequestCRUD.get_available_requests(
+            db_session, uuid.uuid4(), 0, 100
+        ) == []
+
+
+class TestRequestExpiryScheduler:
+
+    def test_drains_in_batches_and_stages_events(self, db_session, mock_redis):
+        overdue = [make_request(db_session, age_hours=25 + i) for i in range(5)]
+        make_request(db_session, age_hours=1)
+        scheduler = scheduler_for(db_session, batch_size=2)
+
+        with patch.object(
+            ServiceRequestCRUD,
+            "expire_pending_requests",
+            wraps=ServiceRequestCRUD.expire_pending_requests,
+        ) as expire:
+            total = scheduler.expire_once(now=NOW)
+
+        assert total == 5
+        # 2 + 2 + 1: the short batch ends the drain
+        assert expire.call_count == 3
+        assert status_events(mock_redis) == []
+        relay = OutboxRelay(session_factory=sessionmaker(bind=db_session.get_bind()))
+        relay.relay_once()
+        events = status_events(mock_redis)
+        assert sorted(e["request_id"] for e in events) == sorted(
+            r.request_id for r in overdue
+        )
+        assert {(e["old_status"], e["new_status"]) for e in events} == {
+            ("pending", "expired")
+        }
+
+    def test_nothing_overdue_stages_nothing(self, db_session):
+        make_request(db_session, age_hours=1)
+
+        assert scheduler_for(db_session).expire_once(now=NOW) == 0
+        assert db_session.query(OutboxEvent).count() == 0
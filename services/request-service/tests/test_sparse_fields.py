@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+
+from app.api.deps import get_current_user_id
+from app.crud.crud_service_request import ServiceRequestCRUD
+from app.main import app
+from app.models.service_request import ServiceRequest, ServiceType
+from app.schemas.service_request import ServiceRequestResponse
+
+REQUESTER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def requester(db_session):
+    db_session.add(
+        ServiceRequest(
+            requester_id=str(REQUESTER_ID),
+            title="Groceries",
+            description="Milk, eggs and bread " * 20,
+            service_type=ServiceType.ERRANDS,
+            pickup_latitude=34.05,
+            pickup_longitude=-118.24,
+            offered_amount=15.0,
+        )
+    )
+    db_session.commit()
+    app.dependency_overrides[get_current_user_id] = lambda: REQUESTER_ID
+    yield REQUESTER_ID
+    del app.dependency_overrides[get_current_user_id]
+
+
+def test_list_returns_full_rows_by_default(client, db_session, requester):
+    response = client.get("/api/v1/requests")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        ServiceRequestResponse.model_validate(row).model_dump(
+            mode="json", by_alias=True
+        )
+        for row in db_session.query(ServiceRequest).all()
+    ]
+
+
+def test_list_returns_only_requested_fields(client, requester):
+    response = client.get("/api/v1/requests?fields=requestId,title,status")
+
+    assert response.status_code == 200
+    [row] = response.json()
+    assert set(row) == {"requestId", "title", "status"}
+    assert row["status"] == "pending"
+
+
+def test_unknown_field_is_rejected(client, requester):
+    response = client.get("/api/v1/requests?fields=title,secret")
+
+    assert response.status_code == 400
+
+
+def test_crud_reads_only_selected_columns(db_session, requester):
+    [row] = ServiceRequestCRUD.get_user_requests(
+        db_session, requester, 0, 10, fields=("request_id", "title")
+    )
+
+    assert set(row.__dict__) - {"_sa_instance_state"} == {"request_id", "title"}
@@ -5,6 +5,7 @@ from app.models.dispute import Dispute
 from app.schemas.dispute import DisputeCreate, DisputeUpdate
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
+from app.metrics import instrument_crud
 
 
 class DisputeCRUD:
@@ -56,3 +57,6 @@ class DisputeCRUD:
 
 
 dispute_crud = DisputeCRUD()
+
+
+instrument_crud(__name__)
@@ -4,6 +4,7 @@ from app.models.metric import PlatformMetric
 from app.schemas.metric import PlatformMetricCreate
 from sqlalchemy import and_, desc
 from sqlalchemy.orm import Session
+from app.metrics import instrument_crud
 
 
 class PlatformMetricCRUD:
@@ -27,3 +28,4 @@ class PlatformMetricCRUD:
 platform_metric_crud = PlatformMetricCRUD()
 
 
+instrument_crud(__name__)
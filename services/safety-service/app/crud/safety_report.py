@@ -4,6 +4,7 @@ from app.models.safety_report import SafetyReport
 from app.schemas.safety_report import SafetyReportCreate, SafetyReportUpdate
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
+from app.metrics import instrument_crud
 
 
 class SafetyReportCRUD:
@@ -53,3 +54,4 @@ class SafetyReportCRUD:
 safety_report_crud = SafetyReportCRUD()
 
 
+instrument_crud(__name__)
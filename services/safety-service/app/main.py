@@ -1,21 +1,46 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import os
 
 # ensure models are imported
 import app.db.init_db
 from app.api.v1.endpoints import disputes, metrics, safety
-from app.db.base import Base, engine
+from app.db.migrate import migrate
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from app.metrics import install_metrics
+from app.responses import ORJSONResponse, install_compression
+from app.tracing import install_tracing
 
-if os.getenv("TESTING") != "true":
-    Base.metadata.create_all(bind=engine)
+app = FastAPI(
+    title="Safety & Dispute Service",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="Safety & Dispute Service", version="1.0.0")
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "safety-service")
 
 app.include_router(disputes.router, prefix="/api/v1", tags=["disputes"])
 app.include_router(safety.router, prefix="/api/v1", tags=["safety"])
 app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
 
 
+@app.on_event("startup")
+async def startup_event():
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
 @app.get("/")
 async def root():
     return {"message": "Safety & Dispute Service is running"}
@@ -0,0 +1,322 @@
+"""
+Prometheus instrumentation shared by the services.
+
+Like ``app/db/engine.py`` this module is kept identical in every service's
+``app/metrics.py``; change them together.
+
+``install_metrics(app)`` adds the HTTP middleware and the ``/metrics``
+endpoint. The other series are fed from the hot paths:
+
+- request latency and request/response sizes per route template
+- statement time per engine and CRUD function, from the engine factory's
+  query hooks; CRUD modules opt in with ``instrument_crud(__name__)``
+- the pool counters from ``pool_metrics()``, read at scrape time
+- events published and consumed per stream and type, publish latency, and
+  consumer lag derived from the stream entry IDs
+"""
+
+import functools
+import inspect
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.responses import Response
+
+from .db.engine import on_query, pool_metrics
+
+METRICS_PATH = "/metrics"
+UNMATCHED_ROUTE = "unmatched"
+NO_CRUD_FUNCTION = "other"
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+STATEMENT_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_BYTES = Histogram(
+    "http_request_size_bytes",
+    "HTTP request body size (Content-Length)",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size (Content-Length)",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time",
+    ["engine", "function", "statement"],
+    buckets=QUERY_BUCKETS,
+)
+
+EVENTS_PUBLISHED = Counter(
+    "events_published_total",
+    "Events sent to Redis streams",
+    ["stream", "event_type", "outcome"],
+)
+EVENT_PUBLISH_SECONDS = Histogram(
+    "event_publish_duration_seconds",
+    "Time to send an event (or a pipelined batch) to a stream",
+    ["stream"],
+    buckets=QUERY_BUCKETS,
+)
+EVENTS_CONSUMED = Counter(
+    "events_consumed_total",
+    "Stream events handled by this service's consumers",
+    ["stream", "event_type", "outcome"],
+)
+STREAM_LAG_SECONDS = Gauge(
+    "event_consumer_lag_seconds",
+    "Age of the stream entry a consumer handled last",
+    ["stream"],
+)
+
+# The CRUD function whose statements are running; see instrument_crud
+_crud_function: ContextVar[Optional[str]] = ContextVar("crud_function", default=None)
+
+
+def _route_label(request) -> str:
+    # The router stores the matched route in the shared scope
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+def _content_length(headers) -> Optional[int]:
+    value = headers.get("content-length")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def metrics_middleware(request, call_next):
+    """HTTP middleware recording latency and sizes per route template"""
+    if request.url.path == METRICS_PATH:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    status = 500
+    response = None
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        method, route = request.method, _route_label(request)
+        HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(
+            time.perf_counter() - started
+        )
+        HTTP_REQUEST_BYTES.labels(method, route).observe(
+            _content_length(request.headers) or 0
+        )
+        # Streaming responses have no length up front and are left out
+        size = _content_length(response.headers) if response is not None else None
+        if size is not None:
+            HTTP_RESPONSE_BYTES.labels(method, route).observe(size)
+
+
+def metrics_endpoint() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+def install_metrics(app) -> None:
+    """Add the metrics middleware and the ``/metrics`` endpoint to ``app``"""
+    app.middleware("http")(metrics_middleware)
+    app.add_api_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
+
+
+def _statement_verb(statement: str) -> str:
+    verb = statement.lstrip()[:6].upper()
+    return verb if verb in STATEMENT_VERBS else "OTHER"
+
+
+@on_query
+def _observe_query(engine_name: str, statement: str, seconds: float) -> None:
+    DB_QUERY_SECONDS.labels(
+        engine_name,
+        _crud_function.get() or NO_CRUD_FUNCTION,
+        _statement_verb(statement),
+    ).observe(seconds)
+
+
+def crud_function(label: str) -> Callable:
+    """Decorator attributing the statements ``fn`` runs to ``label``"""
+
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                token = _crud_function.set(label)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _crud_function.reset(token)
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                token = _crud_function.set(label)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    _crud_function.reset(token)
+
+        wrapper.__crud_function__ = label
+        return wrapper
+
+    return decorate
+
+
+def _wrap(fn: Callable, label: str) -> Callable:
+    if hasattr(fn, "__crud_function__"):
+        return fn
+    return crud_function(label)(fn)
+
+
+def instrument_crud(module_name: str) -> None:
+    """
+    Label the statements run by the public functions and CRUD class methods
+    defined in ``module_name``, as ``<module>.<function>`` or
+    ``<module>.<Class>.<method>``.
+
+    Call it at the bottom of the CRUD module so ``from ... import`` callers
+    pick up the wrapped functions.
+    """
+    module = sys.modules[module_name]
+    prefix = module_name.rsplit(".", 1)[-1]
+    for name, obj in list(vars(module).items()):
+        if name.startswith("_") or getattr(obj, "__module__", None) != module_name:
+            continue
+        if inspect.isfunction(obj):
+            setattr(module, name, _wrap(obj, f"{prefix}.{name}"))
+        elif inspect.isclass(obj):
+            for attr, value in list(vars(obj).items()):
+                if attr.startswith("_"):
+                    continue
+                label = f"{prefix}.{name}.{attr}"
+                if isinstance(value, staticmethod):
+                    setattr(obj, attr, staticmethod(_wrap(value.__func__, label)))
+                elif isinstance(value, classmethod):
+                    setattr(obj, attr, classmethod(_wrap(value.__func__, label)))
+                elif inspect.isfunction(value):
+                    setattr(obj, attr, _wrap(value, label))
+
+
+def entry_age(message_id: Any) -> Optional[float]:
+    """Seconds since Redis added the stream entry ``<ms>-<seq>``"""
+    if isinstance(message_id, bytes):
+        message_id = message_id.decode()
+    try:
+        added_ms = int(str(message_id).split("-", 1)[0])
+    except ValueError:
+        return None
+    return max(0.0, time.time() - added_ms / 1000.0)
+
+
+def record_publish(
+    stream: str, event_type: Optional[str], seconds: float, ok: bool = True
+) -> None:
+    """Count one event sent to ``stream`` and the time it took"""
+    record_publish_batch([(stream, event_type)], seconds, ok)
+
+
+def record_publish_batch(
+    events: Iterable[Tuple[str, Optional[str]]], seconds: float, ok: bool = True
+) -> None:
+    """Count ``(stream, event_type)`` pairs sent in one pipelined round trip"""
+    outcome = "ok" if ok else "error"
+    streams = set()
+    for stream, event_type in events:
+        EVENTS_PUBLISHED.labels(stream, event_type or "unknown", outcome).inc()
+        streams.add(stream)
+    for stream in streams:
+        EVENT_PUBLISH_SECONDS.labels(stream).observe(seconds)
+
+
+def record_consume(
+    stream: str,
+    event_type: Optional[str],
+    message_id: Any = None,
+    ok: bool = True,
+) -> None:
+    """Count one handled stream entry and update the stream's consumer lag"""
+    EVENTS_CONSUMED.labels(
+        stream, event_type or "unknown", "ok" if ok else "error"
+    ).inc()
+    if message_id is not None:
+        age = entry_age(message_id)
+        if age is not None:
+            STREAM_LAG_SECONDS.labels(stream).set(age)
+
+
+class PoolCollector:
+    """Exposes ``pool_metrics()`` at scrape time, one series per engine"""
+
+    GAUGES = (
+        ("pool_size", "db_pool_size", "Persistent connections in the pool"),
+        ("checked_out", "db_pool_checked_out", "Connections in use"),
+        ("overflow", "db_pool_overflow", "Overflow connections in use"),
+        ("wait_seconds_max", "db_pool_wait_seconds_max", "Longest checkout wait"),
+    )
+    COUNTERS = (
+        ("checkouts", "db_pool_checkouts", "Connection checkouts"),
+        ("connects", "db_pool_connects", "New DBAPI connections"),
+        ("timeouts", "db_pool_timeouts", "Checkouts that timed out"),
+        ("wait_seconds_total", "db_pool_wait_seconds", "Checkout wait time"),
+        ("slow_queries", "db_slow_queries", "Statements over DB_SLOW_QUERY_MS"),
+    )
+
+    def collect(self):
+        snapshots = pool_metrics()
+        for key, name, documentation in self.GAUGES:
+            family = GaugeMetricFamily(name, documentation, labels=["engine"])
+            for engine, snapshot in snapshots.items():
+                family.add_metric([engine], snapshot[key])
+            yield family
+        for key, name, documentation in self.COUNTERS:
+            family = CounterMetricFamily(name, documentation, labels=["engine"])
+            for engine, snapshot in snapshots.items():
+                family.add_metric([engine], snapshot[key])
+            yield family
+
+
+REGISTRY.register(PoolCollector())
@@ -0,0 +1,254 @@
+"""
+Distributed tracing shared by the services.
+
+Like ``app/metrics.py`` this module is kept identical in every service's
+``app/tracing.py``; change them together.
+
+W3C trace context (``traceparent`` / ``tracestate``) is carried
+
+- over HTTP: ``tracing_middleware`` continues the caller's trace, and
+  ``inject_headers()`` adds the current context to outgoing requests
+  (inside a ``client_span``);
+- over Redis streams: ``publish_span`` adds ``traceparent`` and
+  ``tracestate`` fields to the event it wraps, and ``consume_span`` /
+  ``consume_batch_span`` continue the trace on the consumer side.
+
+Spans go to an OTLP/HTTP collector when ``OTEL_EXPORTER_OTLP_ENDPOINT`` is
+set, and to ``OTEL_TRACES_FILE`` as OTLP/JSON lines (what the collector's
+``otlpjsonfile`` receiver reads) when that is set. Without either they are
+still created, so the context keeps propagating, but nothing is exported.
+``OTEL_SERVICE_NAME`` and ``OTEL_TRACES_SAMPLER`` work as usual.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+from urllib.parse import urlsplit
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.trace import Link, SpanKind, Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import (
+    TraceContextTextMapPropagator,
+)
+
+logger = logging.getLogger(__name__)
+
+TRACE_FIELDS = ("traceparent", "tracestate")
+OTLP_ID_FIELDS = ("traceId", "spanId", "parentSpanId")
+
+# Events always carry plain W3C fields, whatever OTEL_PROPAGATORS says
+_event_propagator = TraceContextTextMapPropagator()
+
+_setup_lock = threading.Lock()
+_configured = False
+
+
+class OTLPJsonFileExporter(SpanExporter):
+    """Appends each exported batch to ``path`` as one OTLP/JSON line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> SpanExportResult:
+        from google.protobuf.json_format import MessageToDict
+        from opentelemetry.exporter.otlp.proto.common.trace_encoder import (
+            encode_spans,
+        )
+
+        document = MessageToDict(encode_spans(spans), use_integers_for_enums=True)
+        line = json.dumps(_hex_ids(document), separators=(",", ":"))
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Writing spans to {self.path} failed: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _hex_ids(value: Any) -> Any:
+    # OTLP/JSON spells trace and span IDs in hex, not protobuf's base64
+    if isinstance(value, dict):
+        return {
+            key: (
+                base64.b64decode(item).hex()
+                if key in OTLP_ID_FIELDS and isinstance(item, str)
+                else _hex_ids(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_hex_ids(item) for item in value]
+    return value
+
+
+def setup_tracing(service_name: str) -> None:
+    """Install the tracer provider and exporters once per process"""
+    global _configured
+    with _setup_lock:
+        if _configured:
+            return
+        resource = Resource.create(
+            {SERVICE_NAME: os.getenv("OTEL_SERVICE_NAME", service_name)}
+        )
+        provider = TracerProvider(resource=resource)
+        if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        traces_file = os.getenv("OTEL_TRACES_FILE")
+        if traces_file:
+            provider.add_span_processor(
+                BatchSpanProcessor(OTLPJsonFileExporter(traces_file))
+            )
+        # The provider flushes its processors at interpreter exit
+        trace.set_tracer_provider(provider)
+        _configured = True
+
+
+def tracer():
+    return trace.get_tracer("app")
+
+
+async def tracing_middleware(request, call_next):
+    """HTTP middleware running each request in a server span"""
+    parent = propagate.extract(request.headers)
+    with tracer().start_as_current_span(
+        request.method,
+        context=parent,
+        kind=SpanKind.SERVER,
+        attributes={
+            "http.request.method": request.method,
+            "url.path": request.url.path,
+        },
+    ) as span:
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", None)
+        if route:
+            span.update_name(f"{request.method} {route}")
+            span.set_attribute("http.route", route)
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_status(Status(StatusCode.ERROR))
+        return response
+
+
+def install_tracing(app, service_name: str) -> None:
+    """Set up tracing for ``service_name`` and add the middleware to ``app``"""
+    setup_tracing(service_name)
+    app.middleware("http")(tracing_middleware)
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """``headers`` plus the current trace context, for an outgoing request"""
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+@contextmanager
+def client_span(method: str, url: str) -> Iterator[Any]:
+    """Span around an outgoing request; send ``inject_headers()`` from inside it"""
+    parts = urlsplit(url)
+    with tracer().start_as_current_span(
+        f"{method} {parts.path or '/'}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "http.request.method": method,
+            "url.full": url,
+            "server.address": parts.hostname or "",
+        },
+    ) as span:
+        yield span
+
+
+def _carrier(fields: Mapping[Any, Any]) -> Dict[str, str]:
+    carrier = {}
+    for key in TRACE_FIELDS:
+        value = fields.get(key, fields.get(key.encode()))
+        if isinstance(value, bytes):
+            value = value.decode()
+        if value:
+            carrier[key] = str(value)
+    return carrier
+
+
+@contextmanager
+def publish_span(
+    stream: str, *events: Dict[str, Any], event_type: Optional[str] = None
+) -> Iterator[Any]:
+    """
+    Producer span for sending ``events`` to ``stream``; each event gets the
+    span's ``traceparent`` / ``tracestate`` fields so consumers continue it.
+    """
+    attributes = {"messaging.system": "redis", "messaging.destination.name": stream}
+    if event_type:
+        attributes["event.type"] = event_type
+    with tracer().start_as_current_span(
+        f"publish {stream}", kind=SpanKind.PRODUCER, attributes=attributes
+    ) as span:
+        carrier: Dict[str, str] = {}
+        _event_propagator.inject(carrier)
+        for event in events:
+            event.update(carrier)
+        yield span
+
+
+@contextmanager
+def consume_span(
+    stream: str, fields: Mapping[Any, Any], event_type: Optional[str] = None
+) -> Iterator[Any]:
+    """Consumer span for one stream entry, continuing the publisher's trace"""
+    attributes = {"messaging.system": "redis", "messaging.destination.name": stream}
+    if event_type:
+        attributes["event.type"] = event_type
+    with tracer().start_as_current_span(
+        f"process {stream}",
+        context=_event_propagator.extract(_carrier(fields)),
+        kind=SpanKind.CONSUMER,
+        attributes=attributes,
+    ) as span:
+        yield span
+
+
+@contextmanager
+def consume_batch_span(
+    stream: str, entries: Iterable[Mapping[Any, Any]]
+) -> Iterator[Any]:
+    """Consumer span for a batch, linked to each entry's publisher"""
+    links = []
+    count = 0
+    for fields in entries:
+        count += 1
+        context = trace.get_current_span(_event_propagator.extract(_carrier(fields)))
+        span_context = context.get_span_context()
+        if span_context.is_valid:
+            links.append(Link(span_context))
+    with tracer().start_as_current_span(
+        f"process {stream}",
+        kind=SpanKind.CONSUMER,
+        links=links,
+        attributes={
+            "messaging.system": "redis",
+            "messaging.destination.name": stream,
+            "messaging.batch.message_count": count,
+        },
+    ) as span:
+        yield span
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+对比两次压测结果，发现回归时以非零状态退出
+
+用法:
+    python shared/benchmarks/compare.py BASELINE.json CURRENT.json [--threshold 10]
+
+任何一步的 p50/p95/p99 比基线慢超过 --threshold 百分比（默认 10），或错误数
+多于基线，都算回归。两次结果的 config 不同时会给出提示，对比结果仅供参考。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from report import compare, load_result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="对比两次压测结果")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="允许变慢的百分比"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = load_result(args.baseline)
+    current = load_result(args.current)
+    if baseline["config"] != current["config"]:
+        print(
+            f"注意：压测配置不同\n  基线 {baseline['config']}\n  当前 {current['config']}"
+        )
+
+    rows = compare(baseline, current, args.threshold)
+    print(
+        f"基线 {(baseline['commit'] or '?')[:12]} → 当前 {(current['commit'] or '?')[:12]}"
+    )
+    print(f"{'step':<16}{'metric':<9}{'baseline':>11}{'current':>11}{'change':>9}")
+    for row in rows:
+        change = "" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        flag = "  ← 回归" if row["regression"] else ""
+        print(
+            f"{row['step']:<16}{row['metric']:<9}{row['baseline']:>11}"
+            f"{row['current']:>11}{change:>9}{flag}"
+        )
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} 项超过阈值 {args.threshold:.0f}%")
+        return 1
+    print("没有回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+压测结果：分位数统计、JSON 结果文件和两次结果的回归对比
+
+结果文件结构::
+
+    {
+      "schema": 1,
+      "commit": "<git rev>", "dirty": false, "created_at": "...",
+      "config": {"concurrency": 8, "iterations": 200, ...},
+      "throughput_per_second": 12.3,
+      "steps": {"login": {"count": 200, "errors": 0, "p50_ms": ..., ...}}
+    }
+"""
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+SCHEMA_VERSION = 1
+PERCENTILES = (50, 95, 99)
+COMPARED_PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """线性插值分位数（与 numpy 默认一致）；样本为空时返回 NaN"""
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: Sequence[float], errors: int = 0) -> Dict[str, Any]:
+    """一步的统计；耗时以秒输入，以毫秒输出"""
+    summary: Dict[str, Any] = {"count": len(samples), "errors": errors}
+    if samples:
+        summary["mean_ms"] = round(sum(samples) / len(samples) * 1000, 3)
+        summary["max_ms"] = round(max(samples) * 1000, 3)
+        for pct in PERCENTILES:
+            summary[f"p{pct}_ms"] = round(percentile(samples, pct) * 1000, 3)
+    return summary
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_result(recorder, steps: Sequence[str], config: Dict[str, Any]) -> dict:
+    """把 ``scenario.Recorder`` 整理成可写入文件的结果"""
+    wall = recorder.wall_seconds
+    return {
+        "schema": SCHEMA_VERSION,
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "machine": platform.machine()},
+        "config": config,
+        "iterations_completed": recorder.iterations,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(recorder.iterations / wall, 3) if wall else 0,
+        "last_error": recorder.last_error,
+        "steps": {
+            step: summarize(
+                recorder.samples.get(step, []), recorder.errors.get(step, 0)
+            )
+            for step in steps
+        },
+    }
+
+
+def write_result(result: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+
+
+def load_result(path: Path) -> dict:
+    result = json.loads(Path(path).read_text())
+    if result.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: 不支持的结果版本 {result.get('schema')}")
+    return result
+
+
+def format_table(result: dict) -> str:
+    lines = [
+        f"{'step':<16}{'count':>7}{'errors':>8}"
+        + "".join(f"{f'p{pct}(ms)':>11}" for pct in PERCENTILES)
+    ]
+    for step, summary in result["steps"].items():
+        lines.append(
+            f"{step:<16}{summary['count']:>7}{summary['errors']:>8}"
+            + "".join(
+                f"{summary.get(f'p{pct}_ms', math.nan):>11.1f}" for pct in PERCENTILES
+            )
+        )
+    lines.append(
+        f"吞吐 {result['throughput_per_second']:.2f} 轮/秒，"
+        f"{result['iterations_completed']} 轮，耗时 {result['wall_seconds']:.1f}s"
+    )
+    return "\n".join(lines)
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float) -> List[dict]:
+    """
+    逐步对比两次结果的分位数。某个分位数比基线慢超过 ``threshold_pct``，
+    或出现基线没有的错误，就记为回归。
+    """
+    rows = []
+    for step, now in current["steps"].items():
+        before = baseline["steps"].get(step)
+        if before is None:
+            continue
+        for key in COMPARED_PERCENTILES:
+            if key not in before or key not in now:
+                continue
+            change = (now[key] - before[key]) / before[key] * 100 if before[key] else 0
+            rows.append(
+                {
+                    "step": step,
+                    "metric": key,
+                    "baseline": before[key],
+                    "current": now[key],
+                    "change_pct": round(change, 1),
+                    "regression": change > threshold_pct,
+                }
+            )
+        if now["errors"] > before["errors"]:
+            rows.append(
+                {
+                    "step": step,
+                    "metric": "errors",
+                    "baseline": before["errors"],
+                    "current": now["errors"],
+                    "change_pct": None,
+                    "regression": True,
+                }
+            )
+    return rows
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+端到端压测：启动认证、请求、支付、评分服务，按配置的并发跑完整业务流程，
+输出每一步的 p50/p95/p99，并把结果写成 JSON 供提交间对比
+
+用法（在 services/ 目录下）:
+    python shared/benchmarks/run_benchmark.py [选项]
+
+选项:
+    --concurrency N     虚拟用户数（默认 8）
+    --iterations N      计时的流程轮数（默认 200）
+    --warmup N          不计时的预热轮数（默认 20）
+    --workers N         每个服务的 uvicorn worker 数（默认 1）
+    --database-url URL  带 {service} 占位符的数据库 URL，默认每个服务一个临时 SQLite
+    --redis-url URL     使用真实 Redis，默认进程内 fakeredis
+    --log-dir DIR       保留服务日志的目录，默认压测结束后删除
+    --output PATH       结果文件，默认 shared/benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from report import build_result, format_table, write_result
+from scenario import STEPS, run_scenario
+from stack import SERVICES, start_stack
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="端到端业务流程压测")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--database-url")
+    parser.add_argument("--redis-url")
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="单个请求超时（秒）"
+    )
+    parser.add_argument("--log-dir", type=Path)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    if args.database_url and "{service}" not in args.database_url:
+        # 请求服务和评分服务各有一张 alembic_version 表，不能共用一个库
+        parser.error("--database-url 需要包含 {service} 占位符，每个服务一个库")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    stack = start_stack(
+        list(SERVICES),
+        database_url=args.database_url,
+        redis_url=args.redis_url,
+        workers=args.workers,
+        log_dir=args.log_dir,
+    )
+    try:
+        recorder = asyncio.run(
+            run_scenario(
+                stack.urls,
+                concurrency=args.concurrency,
+                iterations=args.iterations,
+                warmup=args.warmup,
+                timeout=args.timeout,
+            )
+        )
+    finally:
+        stack.stop()
+
+    config = {
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "workers": args.workers,
+        "database": "postgres" if args.database_url else "sqlite",
+        "redis": "redis" if args.redis_url else "fakeredis",
+    }
+    result = build_result(recorder, STEPS, config)
+    output = args.output or RESULTS_DIR / f"{(result['commit'] or 'unknown')[:12]}.json"
+    write_result(result, output)
+
+    print(format_table(result))
+    if result["last_error"]:
+        print(f"最后一次错误: {result['last_error']}")
+    print(f"结果已写入 {output}")
+    return 1 if any(step["errors"] for step in result["steps"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
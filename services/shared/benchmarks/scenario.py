@@ -0,0 +1,223 @@
+"""
+压测场景：一次完整的互助流程
+
+注册 → 登录 → 发布请求 → 服务者接单 → 确认指派 → 开始服务 → 完成 → 支付 → 评分
+
+每个并发槽位是一个虚拟用户：启动时注册一个服务者账号（不计时），之后每轮
+用新的求助者账号走完整个流程，每一步记录一次耗时。任何一步失败，该轮其余
+步骤跳过并记一次错误。
+"""
+
+import asyncio
+import base64
+import json
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+STEPS = (
+    "register",
+    "login",
+    "create_request",
+    "accept",
+    "confirm",
+    "start",
+    "complete",
+    "pay",
+    "rate",
+)
+
+PASSWORD = "bench-Passw0rd"
+
+
+class StepFailed(Exception):
+    def __init__(self, step: str, response: httpx.Response):
+        super().__init__(f"{step}: HTTP {response.status_code} {response.text[:200]}")
+        self.step = step
+
+
+class Recorder:
+    """按步骤收集耗时（秒）和错误数"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.last_error: Optional[str] = None
+        self.iterations = 0
+        # 计时轮次的起止时刻，用于计算吞吐
+        self.first_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_started is None or self.last_finished is None:
+            return 0.0
+        return self.last_finished - self.first_started
+
+
+def _user_id(token: str) -> str:
+    # 只取 sub，不校验签名；签名由被测服务校验
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["sub"]
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, urls: Dict[str, str], recorder):
+        self.client = client
+        self.urls = urls
+        self.recorder = recorder
+        self.provider_token: Optional[str] = None
+        self.provider_id: Optional[str] = None
+
+    async def _call(
+        self, step: Optional[str], method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise StepFailed(step or "setup", response)
+        if step:
+            self.recorder.samples[step].append(elapsed)
+        return response
+
+    async def _account(self, timed: bool) -> str:
+        email = f"bench-{uuid.uuid4().hex}@example.com"
+        auth = self.urls["auth"]
+        credentials = {"email": email, "password": PASSWORD}
+        await self._call(
+            "register" if timed else None,
+            "POST",
+            f"{auth}/api/v1/auth/register",
+            json={**credentials, "full_name": "Bench User"},
+        )
+        response = await self._call(
+            "login" if timed else None,
+            "POST",
+            f"{auth}/api/v1/auth/login",
+            json=credentials,
+        )
+        return response.json()["access_token"]
+
+    async def setup(self) -> None:
+        self.provider_token = await self._account(timed=False)
+        self.provider_id = _user_id(self.provider_token)
+
+    async def iteration(self) -> None:
+        token = await self._account(timed=True)
+        requester_id = _user_id(token)
+        as_requester = {"Authorization": f"Bearer {token}"}
+        as_provider = {"Authorization": f"Bearer {self.provider_token}"}
+        requests_url = f"{self.urls['request']}/api/v1"
+
+        response = await self._call(
+            "create_request",
+            "POST",
+            f"{requests_url}/requests",
+            headers=as_requester,
+            json={
+                "title": "Grocery pickup",
+                "description": "Weekly groceries from the village shop",
+                "serviceType": "errands",
+                "pickupLatitude": 40.7128,
+                "pickupLongitude": -74.006,
+                "offeredAmount": 25.0,
+            },
+        )
+        request_id = response.json()["requestId"]
+
+        await self._call(
+            "accept",
+            "POST",
+            f"{requests_url}/providers/requests/{request_id}/accept",
+            headers=as_provider,
+            json={"notes": "On my way"},
+        )
+        # 指派状态：assigned → accepted → in_progress → completed
+        for step, status in (
+            ("confirm", "accepted"),
+            ("start", "in_progress"),
+            ("complete", "completed"),
+        ):
+            await self._call(
+                step,
+                "PATCH",
+                f"{requests_url}/providers/requests/{request_id}/status",
+                headers=as_provider,
+                json={"status": status},
+            )
+
+        await self._call(
+            "pay",
+            "POST",
+            f"{self.urls['payment']}/api/v1/payments/process",
+            json={
+                "request_id": request_id,
+                "payer_id": requester_id,
+                "payee_id": self.provider_id,
+                "amount": "25.00",
+                "payment_method": "stripe",
+                "payment_token": "tok_visa",
+            },
+        )
+        await self._call(
+            "rate",
+            "POST",
+            f"{self.urls['rating']}/api/v1/ratings/",
+            params={"rater_user_id": requester_id},
+            json={
+                "rated_user_id": self.provider_id,
+                "service_request_id": request_id,
+                "rating": 5,
+                "comment": "Quick and friendly",
+            },
+        )
+
+
+async def run_scenario(
+    urls: Dict[str, str],
+    concurrency: int,
+    iterations: int,
+    warmup: int = 0,
+    timeout: float = 30.0,
+) -> Recorder:
+    """
+    ``concurrency`` 个虚拟用户共跑 ``iterations`` 轮；前 ``warmup`` 轮不计入
+    结果（预热连接池和数据库缓存）。
+    """
+    limits = httpx.Limits(max_connections=concurrency * 4)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        warm = Recorder()
+        measured = Recorder()
+        users = [VirtualUser(client, urls, warm) for _ in range(concurrency)]
+        await asyncio.gather(*(user.setup() for user in users))
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for n in range(warmup + iterations):
+            queue.put_nowait(n)
+
+        async def worker(user: VirtualUser) -> None:
+            while True:
+                try:
+                    n = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                recorder = user.recorder = warm if n < warmup else measured
+                started = time.perf_counter()
+                if recorder.first_started is None:
+                    recorder.first_started = started
+                try:
+                    await user.iteration()
+                    recorder.iterations += 1
+                except (StepFailed, httpx.HTTPError) as e:
+                    step = getattr(e, "step", "transport")
+                    recorder.errors[step] += 1
+                    recorder.last_error = str(e)
+                recorder.last_finished = time.perf_counter()
+
+        await asyncio.gather(*(worker(user) for user in users))
+        return measured
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+列表接口序列化压测：100 行的列表响应分别走三条路径，比较耗时
+
+- ``validated-json``：逐行 ``model_validate``，再经 ``response_model`` 校验，
+  标准库 json 编码（改动前的做法）
+- ``validated-orjson``：同上，只把编码换成 ``ORJSONResponse``（现在所有服务的
+  ``default_response_class``）
+- ``trusted-orjson``：``trusted_response`` 直接从 ORM 行取字段，不做校验
+
+三条路径的 JSON 结果会先比对一致，再计时。行是内存中的 ORM 对象，不含数据库
+读取时间，只衡量序列化部分。
+
+用法（在 services/ 目录下，每次只能加载一个服务的 ``app`` 包）:
+    python shared/benchmarks/serialization_benchmark.py --service content-service
+    python shared/benchmarks/serialization_benchmark.py --service notification-service
+
+选项:
+    --rows N        每个响应的行数（默认 100）
+    --requests N    每条路径的请求次数（默认 300）
+    --output PATH   把结果写成 JSON
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from report import percentile
+
+SERVICES_ROOT = Path(__file__).resolve().parents[2]
+PATHS = ("validated-json", "validated-orjson", "trusted-orjson")
+
+BODY = "Road to the market is open again after the repairs. " * 20
+
+
+def _news_article(i: int) -> dict:
+    return {
+        "article_id": str(uuid.uuid4()),
+        "title": f"Village news {i}",
+        "content": BODY,
+        "author_id": str(uuid.uuid4()),
+        "image_url": f"https://cdn.example.com/news/{i}.jpg",
+        "is_featured": i % 10 == 0,
+        "is_active": True,
+        "publish_date": date(2024, 5, 1) + timedelta(days=i % 28),
+        "expiry_date": None,
+        "created_at": datetime(2024, 5, 1, 8, 30) + timedelta(minutes=i),
+        "updated_at": datetime(2024, 5, 2, 9, 15) + timedelta(minutes=i),
+    }
+
+
+def _video(i: int) -> dict:
+    return {
+        "video_id": str(uuid.uuid4()),
+        "title": f"How-to {i}",
+        "description": BODY[:300],
+        "video_url": f"https://cdn.example.com/videos/{i}.mp4",
+        "thumbnail_url": f"https://cdn.example.com/videos/{i}.jpg",
+        "video_type": "tutorial",
+        "is_featured": False,
+        "is_active": True,
+        "publish_date": date(2024, 5, 1),
+        "expiry_date": None,
+        "created_at": datetime(2024, 5, 1, 8, 30) + timedelta(minutes=i),
+        "updated_at": datetime(2024, 5, 2, 9, 15) + timedelta(minutes=i),
+    }
+
+
+def _message(i: int) -> dict:
+    return {
+        "message_id": str(uuid.uuid4()),
+        "sender_id": str(uuid.uuid4()),
+        "recipient_id": str(uuid.uuid4()),
+        "service_request_id": str(uuid.uuid4()),
+        "message_type": "direct",
+        "content": BODY[:400],
+        "is_read": i % 2 == 0,
+        "read_at": None,
+        "created_at": datetime(2024, 5, 1, 8, 30) + timedelta(minutes=i),
+    }
+
+
+def _notification(i: int) -> dict:
+    return {
+        "notification_id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "notification_type": "service_request_created",
+        "title": f"New request nearby {i}",
+        "content": BODY[:200],
+        "related_id": str(uuid.uuid4()),
+        "delivery_method": "in_app",
+        "delivery_status": "sent",
+        "is_read": False,
+        "read_at": None,
+        "created_at": datetime(2024, 5, 1, 8, 30) + timedelta(minutes=i),
+    }
+
+
+# 服务 -> [(名称, ORM 模型, 响应模型, 行数据)]
+CASES: Dict[str, List[tuple]] = {
+    "content-service": [
+        (
+            "news_articles",
+            "app.models.news_article:NewsArticle",
+            "app.schemas.news_article:NewsArticleResponse",
+            _news_article,
+        ),
+        (
+            "videos",
+            "app.models.video:Video",
+            "app.schemas.video:VideoResponse",
+            _video,
+        ),
+    ],
+    "notification-service": [
+        (
+            "messages",
+            "app.models.message:Message",
+            "app.schemas.message:MessageResponse",
+            _message,
+        ),
+        (
+            "notifications",
+            "app.models.notification:Notification",
+            "app.schemas.notification:NotificationResponse",
+            _notification,
+        ),
+    ],
+}
+
+
+def _load(path: str):
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _bench_app(schema, rows):
+    from typing import List as ListOf
+
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    from app.responses import ORJSONResponse, trusted_response
+
+    app = FastAPI()
+
+    @app.get(
+        "/validated-json",
+        response_model=ListOf[schema],
+        response_class=JSONResponse,
+    )
+    async def validated_json():
+        return [schema.model_validate(row) for row in rows]
+
+    @app.get(
+        "/validated-orjson",
+        response_model=ListOf[schema],
+        response_class=ORJSONResponse,
+    )
+    async def validated_orjson():
+        return [schema.model_validate(row) for row in rows]
+
+    @app.get("/trusted-orjson", response_model=ListOf[schema])
+    async def trusted_orjson():
+        return trusted_response(schema, rows)
+
+    return app
+
+
+async def _run_case(schema, rows, requests: int) -> Dict[str, dict]:
+    import httpx
+
+    app = _bench_app(schema, rows)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        bodies = {path: (await c.get(f"/{path}")).json() for path in PATHS}
+        if (
+            not bodies["validated-json"]
+            == bodies["validated-orjson"]
+            == bodies["trusted-orjson"]
+        ):
+            raise AssertionError(f"{schema.__name__}: 三条路径的输出不一致")
+
+        results = {}
+        for path in PATHS:
+            samples = []
+            size = 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await c.get(f"/{path}")
+                samples.append(time.perf_counter() - started)
+                size = len(response.content)
+            results[path] = {
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                "bytes": size,
+            }
+        return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="列表接口序列化压测")
+    parser.add_argument("--service", choices=sorted(CASES), required=True)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    # 与测试相同：UUID 列按字符串存取，不需要数据库驱动
+    os.environ.setdefault("TESTING", "true")
+    sys.path.insert(0, str(SERVICES_ROOT / args.service))
+
+    summary = {}
+    for name, model_path, schema_path, make_row in CASES[args.service]:
+        model, schema = _load(model_path), _load(schema_path)
+        rows = [model(**make_row(i)) for i in range(args.rows)]
+        results = asyncio.run(_run_case(schema, rows, args.requests))
+        baseline = results["validated-json"]["p50_ms"]
+        print(f"{name}（{args.rows} 行，{results['trusted-orjson']['bytes']} 字节）")
+        for path in PATHS:
+            p50 = results[path]["p50_ms"]
+            print(
+                f"  {path:<18} p50 {p50:8.3f}ms  p95 {results[path]['p95_ms']:8.3f}ms"
+                f"  {baseline / p50:5.2f}x"
+            )
+        summary[name] = results
+
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
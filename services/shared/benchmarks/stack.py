@@ -0,0 +1,256 @@
+"""
+压测环境：在本机启动被测服务及其依赖
+
+每个服务的顶层包都叫 ``app``，无法在同一个解释器里同时导入，所以每个服务
+各起一个 uvicorn 子进程。依赖在压测进程内提供：
+
+- Redis：fakeredis 的 TCP 服务器（或 ``--redis-url`` 指向的真实 Redis）
+- Stripe：只实现 ``POST /v1/charges`` 的桩服务，支付服务经 ``STRIPE_API_BASE``
+  调用它，走的仍是 ``provider_gateway`` 的连接池和熔断路径
+- 数据库：默认每个服务一个临时 SQLite 文件；``--database-url`` 可给出带
+  ``{service}`` 占位符的 Postgres URL，每个服务一个库
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+SERVICES_ROOT = Path(__file__).resolve().parents[2]
+
+# 所有服务共用的 JWT 密钥：认证服务签发的令牌要能被其他服务校验
+SECRET_KEY = "benchmark-secret-key"
+
+# SQLite 上用模型建表；Postgres 上优先走服务自己的迁移入口
+CREATE_ALL = (
+    "import {models}; from {base} import Base; from {session} import engine; "
+    "Base.metadata.create_all(bind=engine)"
+)
+
+
+@dataclass
+class ServiceSpec:
+    """被测服务：目录、建表所需的模块和额外环境变量"""
+
+    name: str
+    models: str
+    base: str
+    session: str
+    has_migrate: bool = False
+    env: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def root(self) -> Path:
+        return SERVICES_ROOT / self.name
+
+
+SERVICES: Dict[str, ServiceSpec] = {
+    "auth": ServiceSpec(
+        "auth-service", "app.models.user", "app.db.base", "app.db.session"
+    ),
+    "request": ServiceSpec(
+        "request-service",
+        "app.models.service_request",
+        "app.db.base_class",
+        "app.db.base",
+        has_migrate=True,
+        # 派单依赖用户服务的服务者快照，压测环境不启动用户服务
+        env={"DISPATCH_ENABLED": "false", "MAX_REQUESTS_PER_USER": "1000"},
+    ),
+    "payment": ServiceSpec(
+        "payment-service", "app.models", "app.db.base", "app.db.session"
+    ),
+    "rating": ServiceSpec(
+        "rating-service",
+        "app.models.rating",
+        "app.db.base",
+        "app.db.session",
+        has_migrate=True,
+    ),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _StripeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.path != "/v1/charges":
+            self.send_error(404)
+            return
+        body = json.dumps(
+            {"id": f"ch_bench_{uuid.uuid4().hex[:16]}", "status": "succeeded"}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_in_thread(server) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+@dataclass
+class Stack:
+    """启动好的服务：名称 -> 基础 URL"""
+
+    urls: Dict[str, str]
+    processes: List[subprocess.Popen]
+    servers: list
+    workdir: tempfile.TemporaryDirectory
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.workdir.cleanup()
+
+
+def _database_url(spec: ServiceSpec, template: Optional[str], workdir: str) -> str:
+    if template:
+        return template.format(service=spec.name.replace("-", "_"))
+    return f"sqlite:///{workdir}/{spec.name}.db"
+
+
+def _prepare_schema(spec: ServiceSpec, env: Dict[str, str]) -> None:
+    if spec.has_migrate and not env["DATABASE_URL"].startswith("sqlite"):
+        cmd = [sys.executable, "-m", "app.db.migrate"]
+    else:
+        snippet = CREATE_ALL.format(
+            models=spec.models, base=spec.base, session=spec.session
+        )
+        cmd = [sys.executable, "-c", snippet]
+    subprocess.run(cmd, cwd=spec.root, env=env, check=True, capture_output=True)
+
+
+def _log_tail(path: Path, lines: int = 20) -> str:
+    try:
+        return "\n".join(path.read_text(errors="replace").splitlines()[-lines:])
+    except OSError:
+        return ""
+
+
+def _wait_healthy(
+    url: str, process: subprocess.Popen, log: Path, timeout: float
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"{url} 启动失败，退出码 {process.returncode}\n{_log_tail(log)}"
+            )
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} 在 {timeout:.0f}s 内未就绪\n{_log_tail(log)}")
+
+
+def start_stack(
+    services: List[str],
+    database_url: Optional[str] = None,
+    redis_url: Optional[str] = None,
+    workers: int = 1,
+    log_dir: Optional[Path] = None,
+    boot_timeout: float = 60.0,
+) -> Stack:
+    """
+    启动 ``services``，返回就绪的 ``Stack``；调用方负责 ``stop()``。
+
+    服务日志写到 ``log_dir``（默认临时目录，随 ``stop()`` 删除），启动失败时
+    输出末尾几行。
+    """
+    workdir = tempfile.TemporaryDirectory(prefix="bench-")
+    log_dir = Path(log_dir or workdir.name)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    servers = []
+    processes: List[subprocess.Popen] = []
+
+    if redis_url is None:
+        from fakeredis import TcpFakeServer
+
+        port = free_port()
+        redis_server = TcpFakeServer(("127.0.0.1", port))
+        _serve_in_thread(redis_server)
+        servers.append(redis_server)
+        redis_url = f"redis://127.0.0.1:{port}/0"
+
+    stripe_server = ThreadingHTTPServer(("127.0.0.1", free_port()), _StripeHandler)
+    _serve_in_thread(stripe_server)
+    servers.append(stripe_server)
+    stripe_url = f"http://127.0.0.1:{stripe_server.server_address[1]}"
+
+    stack = Stack({}, processes, servers, workdir)
+    try:
+        for key in services:
+            spec = SERVICES[key]
+            env = dict(
+                os.environ,
+                PYTHONPATH=str(spec.root),
+                DATABASE_URL=_database_url(spec, database_url, workdir.name),
+                REDIS_URL=redis_url,
+                SECRET_KEY=SECRET_KEY,
+                STRIPE_API_BASE=stripe_url,
+                **spec.env,
+            )
+            _prepare_schema(spec, env)
+            port = free_port()
+            cmd = [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ]
+            log = open(log_dir / f"{spec.name}.log", "wb")
+            process = subprocess.Popen(
+                cmd, cwd=spec.root, env=env, stdout=log, stderr=subprocess.STDOUT
+            )
+            log.close()
+            processes.append(process)
+            stack.urls[key] = f"http://127.0.0.1:{port}"
+        for key, process in zip(services, processes):
+            log = log_dir / f"{SERVICES[key].name}.log"
+            _wait_healthy(stack.urls[key], process, log, boot_timeout)
+    except BaseException:
+        stack.stop()
+        raise
+    return stack
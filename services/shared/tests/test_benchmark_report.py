@@ -0,0 +1,50 @@
+"""
+压测结果统计与回归对比测试
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from report import compare, percentile, summarize  # noqa: E402
+
+
+def _result(**steps):
+    return {"steps": steps}
+
+
+def test_percentile_interpolates_between_samples():
+    samples = [0.4, 0.1, 0.3, 0.2]
+
+    assert percentile(samples, 50) == pytest.approx(0.25)
+    assert percentile(samples, 100) == pytest.approx(0.4)
+    assert percentile([0.7], 99) == pytest.approx(0.7)
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.010, 0.020, 0.030], errors=1)
+
+    assert summary["count"] == 3
+    assert summary["errors"] == 1
+    assert summary["p50_ms"] == pytest.approx(20.0)
+    assert summary["max_ms"] == pytest.approx(30.0)
+    assert "p99_ms" not in summarize([])
+
+
+def test_compare_flags_slower_percentiles_and_new_errors():
+    baseline = _result(
+        login={"errors": 0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0}
+    )
+    current = _result(
+        login={"errors": 2, "p50_ms": 10.5, "p95_ms": 25.0, "p99_ms": 30.0}
+    )
+
+    rows = compare(baseline, current, threshold_pct=10)
+
+    flagged = {row["metric"] for row in rows if row["regression"]}
+    assert flagged == {"p95_ms", "errors"}
+    p50 = next(row for row in rows if row["metric"] == "p50_ms")
+    assert p50["change_pct"] == 5.0
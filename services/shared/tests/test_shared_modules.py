@@ -0,0 +1,36 @@
+"""
+各服务逐字复制的公共模块一致性测试
+
+这些模块在每个服务的 app/ 下各有一份（服务独立打包，不能互相导入），
+改动时必须同步修改所有副本；这里确保副本之间不会悄悄分叉。
+"""
+
+from pathlib import Path
+
+import pytest
+
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+
+SHARED_MODULES = [
+    "app/db/engine.py",
+    "app/metrics.py",
+    "app/tracing.py",
+    "app/responses.py",
+]
+
+
+@pytest.mark.parametrize("module", SHARED_MODULES)
+def test_copies_are_identical(module):
+    copies = {
+        path.parents[len(Path(module).parts) - 1].name: path.read_bytes()
+        for path in sorted(SERVICES_DIR.glob(f"*/{module}"))
+    }
+    assert len(copies) > 1, f"没有找到 {module} 的副本"
+
+    reference_service, reference = next(iter(copies.items()))
+    drifted = sorted(
+        service for service, content in copies.items() if content != reference
+    )
+    assert not drifted, (
+        f"{module} 与 {reference_service} 中的副本不一致: {', '.join(drifted)}"
+    )
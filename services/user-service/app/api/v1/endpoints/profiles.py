@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
 import json
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from datetime import datetime, timezone
 import uuid
 
-from app.db.base import get_db
-from app.crud.profile import ProfileCRUD
-from app.crud.user import UserCRUD
+from app.db.base import get_async_db
+from app.crud.profile import AsyncProfileCRUD
+from app.crud.user import AsyncUserCRUD
 from app.schemas.profile import (
     UserProfileResponse,
     UserProfileUpdate,
     ProviderProfileResponse,
     ProviderProfileCreate,
     ProviderProfileUpdate,
+    ProviderSnapshotResponse,
+    ProviderSearchResponse,
+    ProfileBatchResponse,
     ModeSwitch,
 )
+from app.schemas.user import UserBatchRequest
+from app.services.profile_cache import PROFILE_BATCH_MAX_IDS
+from app.services.availability import parse_day, parse_time
 # 移除手动映射函数，现在使用Pydantic的alias功能
 
 
@@ -24,12 +31,12 @@ router = APIRouter()
 @router.get("/me", response_model=UserProfileResponse)
 async def get_my_profile(
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get current user's profile"""
     try:
         user_id = uuid.UUID(current_user_id)
-        profile = ProfileCRUD.get_user_profile(db, user_id)
+        profile = await AsyncProfileCRUD.get_user_profile(db, user_id)
         if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
@@ -48,12 +55,14 @@ async def get_my_profile(
 async def update_my_profile(
     profile_update: UserProfileUpdate,
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update current user's profile with automatic field mapping."""
     try:
         user_id = uuid.UUID(current_user_id)
-        updated_profile = ProfileCRUD.update_user_profile(db, user_id, profile_update)
+        updated_profile = await AsyncProfileCRUD.update_user_profile(
+            db, user_id, profile_update
+        )
         if not updated_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
@@ -69,18 +78,22 @@ async def update_my_profile(
 async def switch_user_mode(
     mode_switch: ModeSwitch,
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Switch user's default mode between NIN and LAH"""
     try:
         user_id = uuid.UUID(current_user_id)
-        updated_user = UserCRUD.update_user_mode(db, user_id, mode_switch.default_mode)
+        updated_user = await AsyncUserCRUD.update_user_mode(
+            db, user_id, mode_switch.default_mode
+        )
         if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
         profile_update = UserProfileUpdate(default_mode=mode_switch.default_mode)
-        updated_profile = ProfileCRUD.update_user_profile(db, user_id, profile_update)
+        updated_profile = await AsyncProfileCRUD.update_user_profile(
+            db, user_id, profile_update
+        )
         if not updated_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
@@ -95,12 +108,12 @@ async def switch_user_mode(
 @router.get("/provider", response_model=Optional[ProviderProfileResponse])
 async def get_my_provider_profile(
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get current user's provider profile"""
     try:
         user_id = uuid.UUID(current_user_id)
-        provider_profile = ProfileCRUD.get_provider_profile(db, user_id)
+        provider_profile = await AsyncProfileCRUD.get_provider_profile(db, user_id)
         return provider_profile
     except ValueError:
         raise HTTPException(
@@ -112,19 +125,21 @@ async def get_my_provider_profile(
 async def create_provider_profile(
     provider_data: ProviderProfileCreate,
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create provider profile for current user"""
     try:
         user_id = uuid.UUID(current_user_id)
-        existing_profile = ProfileCRUD.get_provider_profile(db, user_id)
+        existing_profile = await AsyncProfileCRUD.get_provider_profile(db, user_id)
         if existing_profile:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Provider profile already exists",
             )
         provider_data.user_id = user_id
-        provider_profile = ProfileCRUD.create_provider_profile(db, provider_data)
+        provider_profile = await AsyncProfileCRUD.create_provider_profile(
+            db, provider_data
+        )
         return provider_profile
     except ValueError:
         raise HTTPException(
@@ -136,7 +151,7 @@ async def create_provider_profile(
 async def update_provider_profile(
     provider_update: ProviderProfileUpdate,
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update current user's provider profile with automatic field mapping.
 
@@ -147,7 +162,7 @@ async def update_provider_profile(
     """
     try:
         user_id = uuid.UUID(current_user_id)
-        updated_profile = ProfileCRUD.update_provider_profile(
+        updated_profile = await AsyncProfileCRUD.update_provider_profile(
             db, user_id, provider_update
         )
         if not updated_profile:
@@ -160,3 +175,85 @@ async def update_provider_profile(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format"
         )
+
+
+@router.get("/providers/snapshot", response_model=ProviderSnapshotResponse)
+async def get_provider_snapshot(db: AsyncSession = Depends(get_async_db)):
+    """All provider profiles in compact form, for the request-service dispatch snapshot"""
+    return {
+        "providers": await AsyncProfileCRUD.get_provider_snapshot(db),
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+
+@router.get("/providers/search", response_model=ProviderSearchResponse)
+async def search_providers(
+    service: Optional[str] = None,
+    day: Optional[str] = Query(None, description="mon..sun or 0-6 (0 = Monday)"),
+    start: Optional[str] = Query(None, description="HH:MM, provider local time"),
+    end: Optional[str] = Query(None, description="HH:MM, defaults to start"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_miles: float = Query(5.0, gt=0, le=500),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Available providers by service, weekly time slot and distance, nearest first"""
+    day_of_week = parse_day(day) if day is not None else None
+    start_minute = parse_time(start) if start is not None else None
+    end_minute = parse_time(end) if end is not None else None
+    if (
+        (day is not None and day_of_week is None)
+        or (start is not None and start_minute is None)
+        or (end is not None and end_minute is None)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid day or time"
+        )
+    if (day_of_week is None) != (start_minute is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="day and start must be given together",
+        )
+    if end_minute is not None and start_minute is not None and end_minute <= start_minute:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="end must be after start"
+        )
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude and longitude must be given together",
+        )
+
+    return {
+        "providers": await AsyncProfileCRUD.search_providers(
+            db,
+            service=service,
+            day_of_week=day_of_week,
+            start_minute=start_minute,
+            end_minute=end_minute,
+            latitude=latitude,
+            longitude=longitude,
+            radius_miles=radius_miles if latitude is not None else None,
+            limit=limit,
+        )
+    }
+
+
+@router.post("/batch", response_model=ProfileBatchResponse)
+async def get_profiles_batch(
+    request: UserBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Look up many user profiles at once (one IN query for cache misses), in request order"""
+    user_ids = list(dict.fromkeys(request.user_ids))
+    if len(user_ids) > PROFILE_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {PROFILE_BATCH_MAX_IDS} user ids per request",
+        )
+    found = await AsyncProfileCRUD.get_user_profiles_cached(db, user_ids)
+    return {
+        "profiles": [found[u] for u in user_ids if u in found],
+        "missing": [u for u in user_ids if u not in found],
+    }
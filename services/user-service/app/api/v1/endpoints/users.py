@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
-from app.db.base import get_db
-from app.crud.user import UserCRUD
-from app.crud.profile import ProfileCRUD
-from app.schemas.user import UserResponse, UserUpdate
+from app.db.base import get_async_db
+from app.crud.user import AsyncUserCRUD
+from app.crud.profile import AsyncProfileCRUD
+from app.schemas.user import (
+    UserResponse,
+    UserUpdate,
+    UserBatchRequest,
+    UserBatchResponse,
+)
 from app.schemas.profile import UserProfileUpdate
+from app.services.profile_cache import PROFILE_BATCH_MAX_IDS
 
 router = APIRouter()
 
@@ -14,12 +20,12 @@ router = APIRouter()
 @router.get("/me", response_model=UserResponse)
 async def get_my_user_info(
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",  # Mock user ID for testing
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get current user's basic information"""
     try:
         user_id = uuid.UUID(current_user_id)
-        user = UserCRUD.get_user(db, user_id)
+        user = await AsyncUserCRUD.get_user(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -35,7 +41,7 @@ async def get_my_user_info(
 async def patch_my_user_info(
     user_update: UserUpdate,
     current_user_id: str = "123e4567-e89b-12d3-a456-426614174000",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Patch current user's basic info with automatic field mapping.
 
@@ -49,14 +55,14 @@ async def patch_my_user_info(
         # Update user fields
         updated_user = None
         if any([user_update.full_name is not None, user_update.default_mode is not None]):
-            updated_user = UserCRUD.update_user(db, user_id, user_update)
+            updated_user = await AsyncUserCRUD.update_user(db, user_id, user_update)
             if not updated_user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
                 )
         else:
             # No user fields to update; fetch for response consistency if exists
-            updated_user = UserCRUD.get_user(db, user_id)
+            updated_user = await AsyncUserCRUD.get_user(db, user_id)
             if not updated_user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -65,7 +71,7 @@ async def patch_my_user_info(
         # Delegate phone update to profile if present
         if user_update.phone_number is not None:
             profile_update = UserProfileUpdate(phone_number=user_update.phone_number)
-            ProfileCRUD.update_user_profile(db, user_id, profile_update)
+            await AsyncProfileCRUD.update_user_profile(db, user_id, profile_update)
 
         return updated_user
     except ValueError:
@@ -77,7 +83,7 @@ async def patch_my_user_info(
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     body: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a user; requires password.
 
@@ -99,7 +105,7 @@ async def create_user(
     default_mode = body.get("default_mode")
     is_active = body.get("is_active")
 
-    user = UserCRUD.create_user(
+    user = await AsyncUserCRUD.create_user(
         db,
         email=email,
         password=password,
@@ -110,11 +116,30 @@ async def create_user(
     return user
 
 
+@router.post("/batch", response_model=UserBatchResponse)
+async def get_users_batch(
+    request: UserBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Look up many users at once (one IN query for cache misses), in request order"""
+    user_ids = list(dict.fromkeys(request.user_ids))
+    if len(user_ids) > PROFILE_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {PROFILE_BATCH_MAX_IDS} user ids per request",
+        )
+    found = await AsyncUserCRUD.get_users_cached(db, user_ids)
+    return {
+        "users": [found[u] for u in user_ids if u in found],
+        "missing": [u for u in user_ids if u not in found],
+    }
+
+
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: str,
     body: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         uid = uuid.UUID(user_id)
@@ -129,7 +154,7 @@ async def update_user(
         if is_active is not None:
             user_update.is_active = bool(is_active)
 
-        updated = UserCRUD.update_user(db, uid, user_update)
+        updated = await AsyncUserCRUD.update_user(db, uid, user_update)
         if not updated:
             raise HTTPException(status_code=404, detail="User not found")
         return updated
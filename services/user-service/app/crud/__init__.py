@@ -1,3 +1,3 @@
 # User Service CRUD
-from .profile import ProfileCRUD
-from .user import UserCRUD
+from .profile import AsyncProfileCRUD, ProfileCRUD
+from .user import AsyncUserCRUD, UserCRUD
@@ -1,13 +1,34 @@
+from sqlalchemy import and_, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+import math
 import uuid
-from ..models.profile import UserProfile, ProviderProfile
+from ..models.profile import (
+    UserProfile,
+    ProviderProfile,
+    ProviderAvailability,
+    ProviderService,
+)
 from ..schemas.profile import (
     UserProfileCreate,
     UserProfileUpdate,
+    UserProfileResponse,
     ProviderProfileCreate,
     ProviderProfileUpdate,
 )
+from ..services.profile_cache import profile_cache
+from ..services.availability import (
+    bitmap_to_hex,
+    parse_schedule,
+    parse_services,
+    schedule_bitmap,
+)
+from ..metrics import instrument_crud
+
+EARTH_RADIUS_MILES = 3956.0
+MILES_PER_DEGREE_LATITUDE = 69.0
 
 
 class ProfileCRUD:
@@ -17,6 +38,29 @@ class ProfileCRUD:
         """Get user profile by user_id"""
         return db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
 
+    @staticmethod
+    def get_user_profiles(
+        db: Session, user_ids: List[uuid.UUID]
+    ) -> List[UserProfile]:
+        """Profiles for many users in one IN query (missing users are skipped)"""
+        if not user_ids:
+            return []
+        return db.query(UserProfile).filter(UserProfile.user_id.in_(user_ids)).all()
+
+    @staticmethod
+    def get_user_profiles_cached(
+        db: Session, user_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, dict]:
+        """
+        Serialized profiles keyed by user_id, read through the profile cache;
+        only cache misses reach the database, in a single query.
+        """
+
+        def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, dict]:
+            return _profile_entries(ProfileCRUD.get_user_profiles(db, missing))
+
+        return profile_cache.get_many("profile", user_ids, load)
+
     @staticmethod
     def create_user_profile(db: Session, profile: UserProfileCreate) -> UserProfile:
         """Create a new user profile"""
@@ -31,6 +75,16 @@ class ProfileCRUD:
         db: Session, user_id: uuid.UUID, profile_update: UserProfileUpdate
     ) -> Optional[UserProfile]:
         """Update user profile"""
+        db_profile = ProfileCRUD._update_user_profile(db, user_id, profile_update)
+        if db_profile is not None:
+            profile_cache.invalidate([user_id])
+        return db_profile
+
+    @staticmethod
+    def _update_user_profile(
+        db: Session, user_id: uuid.UUID, profile_update: UserProfileUpdate
+    ) -> Optional[UserProfile]:
+        """Update and commit; the caller invalidates the cache"""
         db_profile = (
             db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
         )
@@ -61,6 +115,7 @@ class ProfileCRUD:
         """Create a new provider profile"""
         db_profile = ProviderProfile(**profile.dict())
         db.add(db_profile)
+        ProfileCRUD.sync_provider_index(db, db_profile)
         db.commit()
         db.refresh(db_profile)
         return db_profile
@@ -80,32 +135,393 @@ class ProfileCRUD:
         for field, value in update_data.items():
             setattr(db_profile, field, value)
 
+        if {"availability_schedule", "services_offered"} & update_data.keys():
+            ProfileCRUD.sync_provider_index(db, db_profile)
         db.commit()
         db.refresh(db_profile)
         return db_profile
 
+    @staticmethod
+    def sync_provider_index(db: Session, db_profile: ProviderProfile) -> None:
+        """
+        Rewrite a provider's rows in the availability interval table and the
+        service inverted index from the profile's JSON fields (no commit)
+        """
+        user_id = db_profile.user_id
+        db.query(ProviderAvailability).filter(
+            ProviderAvailability.user_id == user_id
+        ).delete(synchronize_session=False)
+        db.query(ProviderService).filter(ProviderService.user_id == user_id).delete(
+            synchronize_session=False
+        )
+        db.add_all(
+            ProviderAvailability(
+                user_id=user_id, day_of_week=day, start_minute=start, end_minute=end
+            )
+            for day, start, end in parse_schedule(db_profile.availability_schedule)
+        )
+        db.add_all(
+            ProviderService(user_id=user_id, service=service[:50])
+            for service in parse_services(db_profile.services_offered)
+        )
+
+    @staticmethod
+    def reindex_providers(db: Session) -> int:
+        """Rebuild the availability and service indexes for every provider"""
+        db.query(ProviderAvailability).delete(synchronize_session=False)
+        db.query(ProviderService).delete(synchronize_session=False)
+        profiles = db.query(ProviderProfile).all()
+        for db_profile in profiles:
+            ProfileCRUD.sync_provider_index(db, db_profile)
+        db.commit()
+        return len(profiles)
+
+    @staticmethod
+    def get_availability_bitmaps(db: Session) -> Dict[uuid.UUID, int]:
+        """168-bit weekly bitmap per provider that has a schedule"""
+        intervals: Dict[uuid.UUID, List[Tuple[int, int, int]]] = {}
+        rows = db.query(
+            ProviderAvailability.user_id,
+            ProviderAvailability.day_of_week,
+            ProviderAvailability.start_minute,
+            ProviderAvailability.end_minute,
+        ).all()
+        for user_id, day, start, end in rows:
+            intervals.setdefault(user_id, []).append((day, start, end))
+        return {
+            user_id: schedule_bitmap(user_intervals)
+            for user_id, user_intervals in intervals.items()
+        }
+
+    @staticmethod
+    def search_providers(
+        db: Session,
+        *,
+        service: Optional[str] = None,
+        day_of_week: Optional[int] = None,
+        start_minute: Optional[int] = None,
+        end_minute: Optional[int] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_miles: Optional[float] = None,
+        limit: int = 50,
+    ) -> List[dict]:
+        """
+        Available providers matching a service, a weekly time window and a
+        distance, nearest (then best rated) first.
+
+        The service goes through the provider_services primary key, the time
+        window through the (day, start, end) interval index and the distance
+        through a bounding box on the base coordinates, so only plausible
+        rows come back; exact distances are then computed for those.
+        """
+        query = (
+            db.query(
+                ProviderProfile.user_id,
+                ProviderProfile.service_radius_miles,
+                ProviderProfile.hourly_rate,
+                ProviderProfile.base_latitude,
+                ProviderProfile.base_longitude,
+                UserProfile.average_rating,
+                UserProfile.total_ratings,
+            )
+            .outerjoin(UserProfile, UserProfile.user_id == ProviderProfile.user_id)
+            .filter(func.lower(ProviderProfile.is_available) == "true")
+        )
+        if service:
+            query = query.join(
+                ProviderService,
+                and_(
+                    ProviderService.user_id == ProviderProfile.user_id,
+                    ProviderService.service == service.strip().lower(),
+                ),
+            )
+        if day_of_week is not None and start_minute is not None:
+            window_end = end_minute if end_minute is not None else start_minute + 1
+            query = query.filter(
+                exists().where(
+                    ProviderAvailability.user_id == ProviderProfile.user_id,
+                    ProviderAvailability.day_of_week == day_of_week,
+                    ProviderAvailability.start_minute <= start_minute,
+                    ProviderAvailability.end_minute >= window_end,
+                )
+            )
+        located = latitude is not None and longitude is not None and radius_miles
+        if located:
+            lat_delta = radius_miles / MILES_PER_DEGREE_LATITUDE
+            lng_delta = radius_miles / (
+                MILES_PER_DEGREE_LATITUDE * max(math.cos(math.radians(latitude)), 0.01)
+            )
+            query = query.filter(
+                ProviderProfile.base_latitude.between(
+                    latitude - lat_delta, latitude + lat_delta
+                ),
+                ProviderProfile.base_longitude.between(
+                    longitude - lng_delta, longitude + lng_delta
+                ),
+            )
+        else:
+            # Without distances the order is by rating alone, so the database
+            # can pick the best rated providers before the limit applies
+            query = query.order_by(
+                func.coalesce(UserProfile.average_rating, 0).desc()
+            ).limit(limit)
+
+        results = []
+        for row in query.all():
+            distance = None
+            if located:
+                distance = _haversine_miles(
+                    latitude,
+                    longitude,
+                    float(row.base_latitude),
+                    float(row.base_longitude),
+                )
+                if distance > radius_miles:
+                    continue
+            results.append(
+                {
+                    "user_id": row.user_id,
+                    "distance_miles": (
+                        round(distance, 2) if distance is not None else None
+                    ),
+                    "service_radius_miles": float(row.service_radius_miles or 0),
+                    "hourly_rate": (
+                        float(row.hourly_rate) if row.hourly_rate is not None else None
+                    ),
+                    "average_rating": float(row.average_rating or 0),
+                    "total_ratings": int(row.total_ratings or 0),
+                }
+            )
+        results.sort(
+            key=lambda r: (
+                r["distance_miles"] if r["distance_miles"] is not None else 0.0,
+                -r["average_rating"],
+            )
+        )
+        return results[:limit]
+
+    @staticmethod
+    def get_provider_snapshot(db: Session) -> List[dict]:
+        """
+        One row per provider profile with the fields dispatch scores on.
+        A single outer join, so the whole fleet comes back in one query;
+        weekly availability bitmaps come from one pass over the interval table.
+        """
+        rows = (
+            db.query(
+                ProviderProfile.user_id,
+                ProviderProfile.service_radius_miles,
+                ProviderProfile.is_available,
+                ProviderProfile.base_latitude,
+                ProviderProfile.base_longitude,
+                UserProfile.average_rating,
+                UserProfile.total_ratings,
+            )
+            .outerjoin(UserProfile, UserProfile.user_id == ProviderProfile.user_id)
+            .all()
+        )
+        bitmaps = ProfileCRUD.get_availability_bitmaps(db)
+        return [
+            {
+                "user_id": row.user_id,
+                "service_radius_miles": float(row.service_radius_miles or 0),
+                "is_available": str(row.is_available).lower() == "true",
+                "latitude": (
+                    float(row.base_latitude) if row.base_latitude is not None else None
+                ),
+                "longitude": (
+                    float(row.base_longitude)
+                    if row.base_longitude is not None
+                    else None
+                ),
+                "average_rating": float(row.average_rating or 0),
+                "total_ratings": int(row.total_ratings or 0),
+                "availability_bitmap": (
+                    bitmap_to_hex(bitmaps[row.user_id])
+                    if row.user_id in bitmaps
+                    else None
+                ),
+            }
+            for row in rows
+        ]
+
     @staticmethod
     def update_rating(
         db: Session, user_id: uuid.UUID, new_rating: float
     ) -> Optional[UserProfile]:
-        """Update user's average rating and total ratings count"""
-        db_profile = (
-            db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-        )
-        if not db_profile:
+        """Add one rating to the user's totals and return the updated profile"""
+        updated = ProfileCRUD._add_ratings(db, user_id, new_rating, 1)
+        db.commit()
+        profile_cache.invalidate([user_id])
+        if not updated:
             return None
+        return ProfileCRUD.get_user_profile(db, user_id)
 
-        # Calculate new average
-        # 取实际值，避免 Column 类型
-        avg = float(getattr(db_profile, "average_rating", 0) or 0)
-        total = int(getattr(db_profile, "total_ratings", 0) or 0)
-        current_total = avg * total
-        new_total_ratings = total + 1
-        new_average = (current_total + new_rating) / new_total_ratings
+    @staticmethod
+    def apply_rating_totals(
+        db: Session, totals: Dict[uuid.UUID, Tuple[float, int]]
+    ) -> int:
+        """
+        Apply coalesced ratings ``{user_id: (rating_sum, rating_count)}`` with
+        one UPDATE per user and a single commit. Returns the number of
+        profiles found.
+        """
+        updated = 0
+        for user_id, (rating_sum, rating_count) in totals.items():
+            updated += ProfileCRUD._add_ratings(db, user_id, rating_sum, rating_count)
+        db.commit()
+        profile_cache.invalidate(totals.keys())
+        return updated
 
-        setattr(db_profile, "average_rating", round(float(new_average), 2))
-        setattr(db_profile, "total_ratings", new_total_ratings)
+    @staticmethod
+    def _add_ratings(
+        db: Session, user_id: uuid.UUID, rating_sum: float, rating_count: int
+    ) -> int:
+        """
+        Add to a profile's rating totals in one UPDATE (no commit).
 
-        db.commit()
-        db.refresh(db_profile)
+        The new values are computed by the database from the row's current
+        ones, so concurrent updates cannot overwrite each other. The exact
+        sum is stored and the average re-derived from it, so rounding never
+        compounds. Profiles from before ``rating_sum`` existed are seeded
+        from their stored average.
+        """
+        current_sum = func.coalesce(
+            UserProfile.rating_sum,
+            func.coalesce(UserProfile.average_rating, 0)
+            * func.coalesce(UserProfile.total_ratings, 0),
+        )
+        new_sum = current_sum + Decimal(str(rating_sum))
+        new_count = func.coalesce(UserProfile.total_ratings, 0) + rating_count
+        return (
+            db.query(UserProfile)
+            .filter(UserProfile.user_id == user_id)
+            .update(
+                {
+                    UserProfile.rating_sum: new_sum,
+                    UserProfile.total_ratings: new_count,
+                    # * 1.0 keeps the division non-integer on every backend
+                    UserProfile.average_rating: func.round(
+                        new_sum * 1.0 / new_count, 2
+                    ),
+                },
+                synchronize_session=False,
+            )
+        )
+
+
+class AsyncProfileCRUD:
+    """
+    ProfileCRUD for AsyncSession. Point reads and cached batch reads are
+    native async queries; writes and the search/snapshot scans run the
+    ProfileCRUD implementation on the session's async connection (run_sync),
+    so index sync stays in one place. run_sync runs on the event loop, so
+    cache I/O happens outside it, through the profile cache's async methods.
+    """
+
+    @staticmethod
+    async def get_user_profile(
+        db: AsyncSession, user_id: uuid.UUID
+    ) -> Optional[UserProfile]:
+        """Get user profile by user_id"""
+        return await db.scalar(
+            select(UserProfile).where(UserProfile.user_id == user_id)
+        )
+
+    @staticmethod
+    async def get_user_profiles(
+        db: AsyncSession, user_ids: List[uuid.UUID]
+    ) -> List[UserProfile]:
+        """Profiles for many users in one IN query (missing users are skipped)"""
+        if not user_ids:
+            return []
+        return list(
+            await db.scalars(
+                select(UserProfile).where(UserProfile.user_id.in_(user_ids))
+            )
+        )
+
+    @staticmethod
+    async def get_user_profiles_cached(
+        db: AsyncSession, user_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, dict]:
+        """Serialized profiles keyed by user_id, read through the profile cache"""
+
+        async def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, dict]:
+            return _profile_entries(
+                await AsyncProfileCRUD.get_user_profiles(db, missing)
+            )
+
+        return await profile_cache.aget_many("profile", user_ids, load)
+
+    @staticmethod
+    async def update_user_profile(
+        db: AsyncSession, user_id: uuid.UUID, profile_update: UserProfileUpdate
+    ) -> Optional[UserProfile]:
+        """Update user profile"""
+        db_profile = await db.run_sync(
+            ProfileCRUD._update_user_profile, user_id, profile_update
+        )
+        if db_profile is not None:
+            await profile_cache.ainvalidate([user_id])
         return db_profile
+
+    @staticmethod
+    async def get_provider_profile(
+        db: AsyncSession, user_id: uuid.UUID
+    ) -> Optional[ProviderProfile]:
+        """Get provider profile by user_id"""
+        return await db.scalar(
+            select(ProviderProfile).where(ProviderProfile.user_id == user_id)
+        )
+
+    @staticmethod
+    async def create_provider_profile(
+        db: AsyncSession, profile: ProviderProfileCreate
+    ) -> ProviderProfile:
+        """Create a new provider profile"""
+        return await db.run_sync(ProfileCRUD.create_provider_profile, profile)
+
+    @staticmethod
+    async def update_provider_profile(
+        db: AsyncSession, user_id: uuid.UUID, profile_update: ProviderProfileUpdate
+    ) -> Optional[ProviderProfile]:
+        """Update provider profile"""
+        return await db.run_sync(
+            ProfileCRUD.update_provider_profile, user_id, profile_update
+        )
+
+    @staticmethod
+    async def search_providers(db: AsyncSession, **filters) -> List[dict]:
+        """See ProfileCRUD.search_providers"""
+        return await db.run_sync(
+            lambda sync_db: ProfileCRUD.search_providers(sync_db, **filters)
+        )
+
+    @staticmethod
+    async def get_provider_snapshot(db: AsyncSession) -> List[dict]:
+        """See ProfileCRUD.get_provider_snapshot"""
+        return await db.run_sync(ProfileCRUD.get_provider_snapshot)
+
+
+def _profile_entries(profiles: List[UserProfile]) -> Dict[uuid.UUID, dict]:
+    """Profiles as cached: the API response, keyed by user_id"""
+    return {
+        profile.user_id: UserProfileResponse.model_validate(profile).model_dump(
+            mode="json", by_alias=True
+        )
+        for profile in profiles
+    }
+
+
+def _haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+instrument_crud(__name__)
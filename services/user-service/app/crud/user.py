@@ -1,9 +1,14 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
 import uuid
 from ..models.user import User
-from ..schemas.user import UserUpdate
+from ..schemas.user import UserUpdate, UserResponse
+from ..services.profile_cache import profile_cache
 from passlib.hash import bcrypt
+from ..metrics import instrument_crud
 
 
 class UserCRUD:
@@ -13,6 +18,24 @@ class UserCRUD:
         """Get user by user_id"""
         return db.query(User).filter(User.user_id == user_id).first()
 
+    @staticmethod
+    def get_users(db: Session, user_ids: List[uuid.UUID]) -> List[User]:
+        """Users for many ids in one IN query (missing users are skipped)"""
+        if not user_ids:
+            return []
+        return db.query(User).filter(User.user_id.in_(user_ids)).all()
+
+    @staticmethod
+    def get_users_cached(
+        db: Session, user_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, dict]:
+        """Serialized users keyed by user_id, read through the profile cache"""
+
+        def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, dict]:
+            return _user_entries(UserCRUD.get_users(db, missing))
+
+        return profile_cache.get_many("user", user_ids, load)
+
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get user by email"""
@@ -21,6 +44,14 @@ class UserCRUD:
     @staticmethod
     def update_user_mode(db: Session, user_id: uuid.UUID, mode: str) -> Optional[User]:
         """Update user's default mode"""
+        db_user = UserCRUD._update_user_mode(db, user_id, mode)
+        if db_user is not None:
+            profile_cache.invalidate([user_id])
+        return db_user
+
+    @staticmethod
+    def _update_user_mode(db: Session, user_id: uuid.UUID, mode: str) -> Optional[User]:
+        """Update and commit; the caller invalidates the cache"""
         db_user = db.query(User).filter(User.user_id == user_id).first()
         if not db_user:
             return None
@@ -33,6 +64,14 @@ class UserCRUD:
     @staticmethod
     def update_user(db: Session, user_id: uuid.UUID, update: UserUpdate) -> Optional[User]:
         """General user update supporting partial fields."""
+        db_user = UserCRUD._update_user(db, user_id, update)
+        if db_user is not None:
+            profile_cache.invalidate([user_id])
+        return db_user
+
+    @staticmethod
+    def _update_user(db: Session, user_id: uuid.UUID, update: UserUpdate) -> Optional[User]:
+        """Update and commit; the caller invalidates the cache"""
         db_user = db.query(User).filter(User.user_id == user_id).first()
         if not db_user:
             return None
@@ -68,3 +107,97 @@ class UserCRUD:
         db.commit()
         db.refresh(db_user)
         return db_user
+
+
+class AsyncUserCRUD:
+    """
+    UserCRUD for AsyncSession. Point reads and cached batch reads are native
+    async queries; writes run the UserCRUD implementation on the session's
+    async connection (run_sync), then invalidate the cache through its async
+    methods so the Redis calls stay off the event loop.
+    """
+
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
+        """Get user by user_id"""
+        return await db.scalar(select(User).where(User.user_id == user_id))
+
+    @staticmethod
+    async def get_users(db: AsyncSession, user_ids: List[uuid.UUID]) -> List[User]:
+        """Users for many ids in one IN query (missing users are skipped)"""
+        if not user_ids:
+            return []
+        return list(await db.scalars(select(User).where(User.user_id.in_(user_ids))))
+
+    @staticmethod
+    async def get_users_cached(
+        db: AsyncSession, user_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, dict]:
+        """Serialized users keyed by user_id, read through the profile cache"""
+
+        async def load(missing: List[uuid.UUID]) -> Dict[uuid.UUID, dict]:
+            return _user_entries(await AsyncUserCRUD.get_users(db, missing))
+
+        return await profile_cache.aget_many("user", user_ids, load)
+
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await db.scalar(select(User).where(User.email == email))
+
+    @staticmethod
+    async def update_user_mode(
+        db: AsyncSession, user_id: uuid.UUID, mode: str
+    ) -> Optional[User]:
+        """Update user's default mode"""
+        db_user = await db.run_sync(UserCRUD._update_user_mode, user_id, mode)
+        if db_user is not None:
+            await profile_cache.ainvalidate([user_id])
+        return db_user
+
+    @staticmethod
+    async def update_user(
+        db: AsyncSession, user_id: uuid.UUID, update: UserUpdate
+    ) -> Optional[User]:
+        """General user update supporting partial fields."""
+        db_user = await db.run_sync(UserCRUD._update_user, user_id, update)
+        if db_user is not None:
+            await profile_cache.ainvalidate([user_id])
+        return db_user
+
+    @staticmethod
+    async def create_user(
+        db: AsyncSession,
+        *,
+        email: str,
+        password: str,
+        full_name: Optional[str] = None,
+        default_mode: Optional[str] = None,
+        is_active: Optional[bool] = None,
+    ) -> User:
+        """Create user with hashed password (hashed off the event loop)."""
+        password_hash = await asyncio.to_thread(bcrypt.hash, password)
+        db_user = User(
+            email=email,
+            password_hash=password_hash,
+            full_name=full_name,
+            default_mode=default_mode or "NIN",
+            is_active=True if is_active is None else bool(is_active),
+        )
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+
+def _user_entries(users: List[User]) -> Dict[uuid.UUID, dict]:
+    """Users as cached: the API response, keyed by user_id"""
+    return {
+        user.user_id: UserResponse.model_validate(user).model_dump(
+            mode="json", by_alias=True
+        )
+        for user in users
+    }
+
+
+instrument_crud(__name__)
@@ -0,0 +1,60 @@
+"""
+Schema setup for the user-service-migrate Job, run once per rollout instead of
+in every pod:
+
+    python -m app.db.migrate
+
+user-service has no Alembic history yet: missing tables are created from the
+models, and the columns added since are added to existing tables here, each
+step guarded so the Job can run any number of times. When the provider search
+index tables are first created they are filled from the provider profiles.
+"""
+
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registers the models)
+from app.db.base import Base, engine
+from app.models.profile import ProviderAvailability
+
+
+def add_rating_sum(connection) -> bool:
+    """
+    Add ``user_profiles.rating_sum`` and backfill it from the stored average.
+    The average is rounded to two places, so the backfilled sum is as exact
+    as the data allows; new ratings are added to it exactly.
+    """
+    columns = {c["name"] for c in inspect(connection).get_columns("user_profiles")}
+    if "rating_sum" in columns:
+        return False
+    connection.execute(
+        text("ALTER TABLE user_profiles ADD COLUMN rating_sum NUMERIC(12, 2)")
+    )
+    connection.execute(
+        text(
+            "UPDATE user_profiles SET rating_sum = "
+            "COALESCE(average_rating, 0) * COALESCE(total_ratings, 0)"
+        )
+    )
+    return True
+
+
+def migrate(bind=engine) -> None:
+    with bind.begin() as connection:
+        existing = set(inspect(connection).get_table_names())
+        Base.metadata.create_all(bind=connection)
+        add_rating_sum(connection)
+    if ProviderAvailability.__tablename__ not in existing:
+        # The provider search index is new: fill it from the profiles
+        from app.crud.profile import ProfileCRUD
+
+        with Session(bind=bind) as db:
+            ProfileCRUD.reindex_providers(db)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    migrate()
+    print(f"[MIGRATE] schema up to date in {time.perf_counter() - started:.2f}s")
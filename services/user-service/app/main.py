@@ -1,11 +1,29 @@
 import asyncio
+import os
+import time
+
+BOOT_STARTED = time.perf_counter()
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
 from .api.v1.endpoints import profiles, users
+from .db.base import dispose_async_engine
+from .db.migrate import migrate
 from .services.event_consumer import EventConsumer
+from .metrics import install_metrics
+from .responses import ORJSONResponse, install_compression
+from .tracing import install_tracing
+
+app = FastAPI(
+    title="User Service",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="User Service", version="1.0.0")
+install_compression(app)
+install_metrics(app)
+install_tracing(app, "user-service")
 
 # Include routers
 app.include_router(profiles.router, prefix="/api/v1/profiles", tags=["profiles"])
@@ -16,8 +34,21 @@ app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 @app.on_event("startup")
 async def startup_event():
     """Start the event consumer to listen for UserRegistered events"""
+    started = time.perf_counter()
+    if os.getenv("DB_MIGRATE_ON_STARTUP") == "true":
+        # Local development only; deployments run the migrate Job
+        await run_in_threadpool(migrate)
     consumer = EventConsumer()
     asyncio.create_task(consumer.start_consuming())
+    print(
+        f"[BOOT] imports {(started - BOOT_STARTED) * 1000:.0f}ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await dispose_async_engine()
 
 
 @app.get("/health")
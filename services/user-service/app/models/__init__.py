@@ -1,3 +1,8 @@
 # User Service Models
-from .profile import UserProfile, ProviderProfile
+from .profile import (
+    UserProfile,
+    ProviderProfile,
+    ProviderAvailability,
+    ProviderService,
+)
 from .user import User
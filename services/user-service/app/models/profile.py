@@ -5,6 +5,7 @@ from sqlalchemy import (
     Numeric,
     Integer,
     ForeignKey,
+    Index,
     TIMESTAMP,
     func,
 )
@@ -25,6 +26,8 @@ class UserProfile(Base):
     bio = Column(Text)
     average_rating = Column(Numeric(3, 2), default=0.00)
     total_ratings = Column(Integer, default=0)
+    # Exact sum of received ratings; average_rating is derived from it
+    rating_sum = Column(Numeric(12, 2), default=0)
     default_mode = Column(user_mode, default="NIN")
     phone_number = Column(String(20))
     profile_picture_url = Column(String(500))
@@ -40,6 +43,9 @@ class ProviderProfile(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
     service_radius_miles = Column(Numeric(4, 2), default=2.0)
+    # Centre of the service radius, used by request-service dispatch
+    base_latitude = Column(Numeric(10, 8))
+    base_longitude = Column(Numeric(11, 8))
     vehicle_description = Column(String(500))
     services_offered = Column(Text)  # JSON array as text
     hourly_rate = Column(Numeric(8, 2))
@@ -49,3 +55,37 @@ class ProviderProfile(Base):
     updated_at = Column(
         TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class ProviderAvailability(Base):
+    """
+    One weekly availability interval of a provider, normalized from
+    ``ProviderProfile.availability_schedule`` (minutes since local midnight)
+    """
+
+    __tablename__ = "provider_availability"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    day_of_week = Column(Integer, nullable=False)  # 0 = Monday
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # "available on <day> from <start> to <end>" is a range scan here
+        Index(
+            "ix_provider_availability_day_start_end",
+            "day_of_week",
+            "start_minute",
+            "end_minute",
+        ),
+    )
+
+
+class ProviderService(Base):
+    """Service type -> provider inverted index, from ``services_offered``"""
+
+    __tablename__ = "provider_services"
+
+    service = Column(String(50), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True, index=True)
@@ -62,6 +62,12 @@ class ProviderProfileBase(BaseModel):
     hourly_rate: Optional[Decimal] = Field(alias="hourlyRate", default=None, ge=0)
     availability_schedule: Optional[str] = Field(alias="availability", default=None)  # JSON string
     is_available: Optional[str] = Field(alias="isAvailable", default="true")
+    base_latitude: Optional[Decimal] = Field(
+        alias="baseLatitude", default=None, ge=-90, le=90
+    )
+    base_longitude: Optional[Decimal] = Field(
+        alias="baseLongitude", default=None, ge=-180, le=180
+    )
 
     class Config:
         populate_by_name = True  # 支持两种字段名
@@ -99,6 +105,44 @@ class ProviderProfileResponse(ProviderProfileBase):
         by_alias = True  # 响应时使用别名
 
 
+class ProviderSnapshotEntry(BaseModel):
+    """Compact provider row for the request-service dispatch snapshot"""
+
+    user_id: uuid.UUID
+    service_radius_miles: float
+    is_available: bool
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    average_rating: float = 0.0
+    total_ratings: int = 0
+    # 168-bit weekly availability (bit day*24+hour, Monday 00:00 first) as
+    # 42 hex digits; None when the provider has not published a schedule
+    availability_bitmap: Optional[str] = None
+
+
+class ProviderSnapshotResponse(BaseModel):
+    providers: List[ProviderSnapshotEntry]
+    generated_at: datetime
+
+
+class ProviderSearchResult(BaseModel):
+    user_id: uuid.UUID
+    distance_miles: Optional[float] = None
+    service_radius_miles: float
+    hourly_rate: Optional[float] = None
+    average_rating: float = 0.0
+    total_ratings: int = 0
+
+
+class ProviderSearchResponse(BaseModel):
+    providers: List[ProviderSearchResult]
+
+
+class ProfileBatchResponse(BaseModel):
+    profiles: List[UserProfileResponse]
+    missing: List[uuid.UUID] = []
+
+
 class ModeSwitch(BaseModel):
     default_mode: UserMode = Field(alias="defaultMode")
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import datetime
 import uuid
 import sys
@@ -33,6 +33,7 @@ class UserResponse(UserBase):
 
     class Config:
         from_attributes = True
+        populate_by_name = True  # ORM 对象按字段名读取
         by_alias = True  # 响应时使用别名
 
 
@@ -44,3 +45,17 @@ class UserUpdate(BaseModel):
 
     class Config:
         populate_by_name = True  # 支持两种字段名
+
+
+class UserBatchRequest(BaseModel):
+    """Ids for a batch lookup (users or profiles)"""
+
+    user_ids: List[uuid.UUID] = Field(alias="userIds", min_length=1)
+
+    class Config:
+        populate_by_name = True
+
+
+class UserBatchResponse(BaseModel):
+    users: List[UserResponse]
+    missing: List[uuid.UUID] = []
@@ -0,0 +1,157 @@
+"""
+Provider availability normalization.
+
+Provider profiles keep the schedule and the offered services as the JSON
+text clients send (``{"mon": "9-18", "tue": "9-12,13-18"}`` and
+``["transportation", "errands"]``). These helpers turn them into rows for
+the ``provider_availability`` weekly-interval table and the
+``provider_services`` inverted index, and into a 168-bit weekly bitmap
+(one bit per hour of the week, Monday 00:00 first) for consumers that
+filter availability in memory.
+
+Times are minutes since midnight of the provider's local day. A range that
+ends before it starts (``"22-2"``) runs past midnight into the next day.
+Unparseable entries are skipped rather than rejected, so a malformed
+schedule never blocks a profile update.
+"""
+
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+HOURS_PER_WEEK = 7 * 24
+
+DAY_INDEX = {
+    "mon": 0, "monday": 0,
+    "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+
+# (day_of_week, start_minute, end_minute) with 0 <= start < end <= 1440
+Interval = Tuple[int, int, int]
+
+
+def parse_day(value: Any) -> Optional[int]:
+    """Day of week (0 = Monday) from a name, abbreviation or 0-6 number"""
+    if isinstance(value, int):
+        return value if 0 <= value <= 6 else None
+    text = str(value).strip().lower()
+    if text.isdigit():
+        return parse_day(int(text))
+    return DAY_INDEX.get(text)
+
+
+def parse_time(value: str) -> Optional[int]:
+    """Minutes since midnight from ``"9"``, ``"09:30"`` or ``"24"``"""
+    text = str(value).strip().lower()
+    if not text:
+        return None
+    hours, _, minutes = text.partition(":")
+    try:
+        hour, minute = int(hours), int(minutes or 0)
+    except ValueError:
+        return None
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or (hour == 24 and minute):
+        return None
+    return hour * 60 + minute
+
+
+def _parse_ranges(day: int, value: Any) -> List[Interval]:
+    if isinstance(value, (list, tuple)):
+        parts = [str(v) for v in value]
+    else:
+        parts = str(value).split(",")
+
+    intervals: List[Interval] = []
+    for part in parts:
+        start_text, sep, end_text = part.partition("-")
+        if not sep:
+            continue
+        start, end = parse_time(start_text), parse_time(end_text)
+        if start is None or end is None or start == end:
+            continue
+        if start < end:
+            intervals.append((day, start, end))
+        else:
+            # Overnight: the rest of this day, then the start of the next
+            if start < MINUTES_PER_DAY:
+                intervals.append((day, start, MINUTES_PER_DAY))
+            if end > 0:
+                intervals.append(((day + 1) % 7, 0, end))
+    return intervals
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals on the same day"""
+    merged: List[Interval] = []
+    for day, start, end in sorted(intervals):
+        if merged and merged[-1][0] == day and start <= merged[-1][2]:
+            previous = merged[-1]
+            merged[-1] = (day, previous[1], max(previous[2], end))
+        else:
+            merged.append((day, start, end))
+    return merged
+
+
+def parse_schedule(raw: Optional[str]) -> List[Interval]:
+    """Weekly intervals from the ``availability_schedule`` JSON text"""
+    if not raw:
+        return []
+    try:
+        schedule = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(schedule, dict):
+        return []
+
+    intervals: List[Interval] = []
+    for day_name, value in schedule.items():
+        day = parse_day(day_name)
+        if day is None or value in (None, "", False):
+            continue
+        intervals.extend(_parse_ranges(day, value))
+    return merge_intervals(intervals)
+
+
+def parse_services(raw: Optional[str]) -> List[str]:
+    """Normalized service names from the ``services_offered`` JSON text"""
+    if not raw:
+        return []
+    try:
+        services = json.loads(raw)
+    except (TypeError, ValueError):
+        services = raw.split(",")
+    if isinstance(services, str):
+        services = [services]
+    if not isinstance(services, list):
+        return []
+    names = (str(s).strip().lower() for s in services if s is not None)
+    return sorted({name for name in names if name})
+
+
+def hour_of_week(day: int, minute: int) -> int:
+    return day * 24 + minute // 60
+
+
+def schedule_bitmap(intervals: Iterable[Interval]) -> int:
+    """
+    168-bit weekly bitmap: bit ``day * 24 + hour`` is set when the provider
+    is available at the top of that hour.
+    """
+    bitmap = 0
+    for day, start, end in intervals:
+        first_hour = -(-start // 60)  # first whole hour at or after start
+        for hour in range(first_hour, 24):
+            if hour * 60 >= end:
+                break
+            bitmap |= 1 << hour_of_week(day, hour * 60)
+    return bitmap
+
+
+def bitmap_to_hex(bitmap: int) -> str:
+    """Fixed-width (42 hex digit) form used on the wire"""
+    return f"{bitmap:042x}"
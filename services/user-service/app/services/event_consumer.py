@@ -1,23 +1,92 @@
 import json
 import asyncio
-from typing import Dict, Any, cast, Iterable, Tuple
+import time
+from typing import Dict, Any, Optional, cast, Iterable, Tuple
 import os
 import uuid
 from ..db.base import SessionLocal
 from ..crud.profile import ProfileCRUD
+from ..metrics import record_consume
 from ..schemas.profile import UserProfileCreate
+from ..tracing import consume_span
+from .profile_cache import profile_cache
 
 try:
     import redis
 except ImportError:
     redis = None
 
+# RatingCreated events are summed per user for up to this long (or this many
+# events) and applied with one UPDATE per user
+RATING_COALESCE_WINDOW_SECONDS = float(
+    os.getenv("RATING_COALESCE_WINDOW_SECONDS", "1.0")
+)
+RATING_COALESCE_MAX_EVENTS = int(os.getenv("RATING_COALESCE_MAX_EVENTS", "500"))
+
+
+def parse_rating_event(event_data: Dict[str, str]) -> Optional[Tuple[uuid.UUID, float]]:
+    """
+    ``(rated_user_id, rating)`` from a RatingCreated event, or None if it is
+    malformed. Accepts the flat shape (``rated_user_id``/``rating``) and the
+    request-service shape (``ratee_id``/``rating_score`` inside ``data``).
+    """
+    fields = dict(event_data)
+    if "data" in fields:
+        try:
+            fields.update(json.loads(fields["data"]))
+        except (TypeError, ValueError):
+            return None
+    rated_user_id = fields.get("rated_user_id") or fields.get("ratee_id")
+    rating_value = fields.get("rating") or fields.get("rating_score")
+    if not rated_user_id or not rating_value:
+        return None
+    try:
+        return uuid.UUID(str(rated_user_id)), float(rating_value)
+    except ValueError:
+        return None
+
+
+class RatingBatch:
+    """Per-user rating totals accumulated from RatingCreated events"""
+
+    def __init__(self):
+        self.totals: Dict[uuid.UUID, Tuple[float, int]] = {}
+        self.events = 0
+        self.started_at: Optional[float] = None
+
+    def add(self, user_id: uuid.UUID, rating: float, count: int = 1) -> None:
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        rating_sum, rating_count = self.totals.get(user_id, (0.0, 0))
+        self.totals[user_id] = (rating_sum + rating, rating_count + count)
+        self.events += count
+
+    def __len__(self) -> int:
+        return self.events
+
+    def remaining(self, window: float) -> float:
+        """Seconds until the batch window closes (0 when empty or due)"""
+        if self.started_at is None:
+            return 0.0
+        return max(0.0, window - (time.monotonic() - self.started_at))
+
+    def due(self, window: float, max_events: int) -> bool:
+        return bool(self.events) and (
+            self.events >= max_events or self.remaining(window) == 0.0
+        )
+
+    def drain(self) -> Dict[uuid.UUID, Tuple[float, int]]:
+        totals = self.totals
+        self.totals, self.events, self.started_at = {}, 0, None
+        return totals
+
 
 class EventConsumer:
     """Event consumer for handling UserRegistered and RatingCreated events"""
 
     def __init__(self):
         self.redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+        self.rating_batch = RatingBatch()
 
     def get_redis_client(self):
         if redis is None:
@@ -25,7 +94,7 @@ class EventConsumer:
         return redis.Redis.from_url(self.redis_url)
 
     async def start_consuming(self):
-        """Start consuming events from Redis streams (user_lifecycle, service_lifecycle)"""
+        """Start consuming events from Redis streams (user_lifecycle, service_lifecycle, user_cache)"""
         try:
             r = self.get_redis_client()
             print("[EVENT CONSUMER] Starting to consume events...")
@@ -33,16 +102,34 @@ class EventConsumer:
             last_ids: Dict[bytes, bytes] = {
                 b"user_lifecycle": b"0",
                 b"service_lifecycle": b"0",
+                b"user_cache": b"0",
             }
             processed_event_ids = set()  # 幂等处理
             while True:
                 try:
+                    # While ratings are pending, block no longer than the
+                    # time left in their window
+                    block_ms = 1000
+                    if len(self.rating_batch):
+                        block_ms = max(
+                            1,
+                            int(
+                                self.rating_batch.remaining(
+                                    RATING_COALESCE_WINDOW_SECONDS
+                                )
+                                * 1000
+                            ),
+                        )
                     loop = asyncio.get_running_loop()
                     raw = await loop.run_in_executor(
                         None,
-                        lambda: r.xread(cast(Any, last_ids), count=10, block=1000),  # type: ignore
+                        lambda: r.xread(
+                            cast(Any, last_ids),
+                            count=RATING_COALESCE_MAX_EVENTS,
+                            block=block_ms,
+                        ),  # type: ignore
                     )
-                    messages = cast(Iterable[Tuple[bytes, Any]], raw)
+                    messages = cast(Iterable[Tuple[bytes, Any]], raw or [])
 
                     for stream_name, stream_messages in messages:
                         name = stream_name.decode()
@@ -56,11 +143,22 @@ class EventConsumer:
                                     f"[EVENT CONSUMER] Duplicate event skipped: {event_id}"
                                 )
                                 continue
-                            await self.process_event(name, event_data)
+                            event_type = event_data.get("event_type")
+                            with consume_span(name, event_data, event_type):
+                                if event_type == "RatingCreated":
+                                    self.queue_rating(event_data)
+                                else:
+                                    await self.process_event(name, event_data)
                             last_ids[stream_name] = message_id
+                            record_consume(name, event_type, message_id)
                             if event_id:
                                 processed_event_ids.add(event_id)
 
+                    if self.rating_batch.due(
+                        RATING_COALESCE_WINDOW_SECONDS, RATING_COALESCE_MAX_EVENTS
+                    ):
+                        await loop.run_in_executor(None, self.flush_ratings)
+
                 except Exception as e:
                     print(f"[EVENT CONSUMER][ERROR] Error reading events: {e}")
                     await asyncio.sleep(5)
@@ -81,6 +179,12 @@ class EventConsumer:
                 await self.handle_user_registered(event_data)
             elif event_type == "RatingCreated":
                 await self.handle_rating_created(event_data)
+            elif event_type in (
+                "ProfileCacheInvalidated",
+                "ProfileUpdated",
+                "ModeChanged",
+            ):
+                self.handle_profile_changed(event_data)
             else:
                 print(f"[EVENT CONSUMER] Unknown event type: {event_type}")
 
@@ -116,18 +220,25 @@ class EventConsumer:
         except Exception as e:
             print(f"[EVENT CONSUMER][ERROR] Error handling UserRegistered: {e}")
 
+    def handle_profile_changed(self, event_data: Dict[str, str]) -> None:
+        """Drop this replica's cached copies of the users an event names"""
+        user_ids = [
+            u
+            for u in (event_data.get("user_ids") or event_data.get("user_id") or "").split(",")
+            if u
+        ]
+        profile_cache.invalidate_local(user_ids)
+
     async def handle_rating_created(self, event_data: Dict[str, str]):
-        """Handle RatingCreated event by updating average rating"""
+        """Handle a single RatingCreated event by updating average rating"""
         try:
-            rated_user_id = event_data.get("rated_user_id")
-            rating_value = event_data.get("rating")
-            if not rated_user_id or not rating_value:
+            parsed = parse_rating_event(event_data)
+            if parsed is None:
                 print(
                     f"[EVENT CONSUMER][ERROR] Missing rated_user_id or rating in event: {event_data}"
                 )
                 return
-            rated_user_id = uuid.UUID(rated_user_id)
-            rating_value = float(rating_value)
+            rated_user_id, rating_value = parsed
 
             db = SessionLocal()
             try:
@@ -148,3 +259,36 @@ class EventConsumer:
 
         except Exception as e:
             print(f"[EVENT CONSUMER][ERROR] Error handling RatingCreated: {e}")
+
+    def queue_rating(self, event_data: Dict[str, str]) -> None:
+        """Add a RatingCreated event to the current coalescing batch"""
+        parsed = parse_rating_event(event_data)
+        if parsed is None:
+            print(
+                f"[EVENT CONSUMER][ERROR] Missing rated_user_id or rating in event: {event_data}"
+            )
+            return
+        self.rating_batch.add(*parsed)
+
+    def flush_ratings(self, session_factory=None) -> int:
+        """Apply the batched ratings: one UPDATE per user, one commit"""
+        if not len(self.rating_batch):
+            return 0
+        events = len(self.rating_batch)
+        totals = self.rating_batch.drain()
+        db = (session_factory or SessionLocal)()
+        try:
+            updated = ProfileCRUD.apply_rating_totals(db, totals)
+            print(
+                f"[EVENT CONSUMER] Applied {events} ratings to {updated}/{len(totals)} profiles"
+            )
+            return updated
+        except Exception as e:
+            print(f"[EVENT CONSUMER][ERROR] Error applying rating batch: {e}")
+            db.rollback()
+            # The stream position has moved on; keep the totals for the next flush
+            for user_id, (rating_sum, rating_count) in totals.items():
+                self.rating_batch.add(user_id, rating_sum, rating_count)
+            return 0
+        finally:
+            db.close()
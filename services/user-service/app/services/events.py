@@ -1,9 +1,13 @@
 import json
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from ..metrics import record_publish
+from ..tracing import publish_span
+
 try:
     import redis
 except ImportError:
@@ -32,14 +36,20 @@ class EventPublisher:
         for k, v in payload.items():
             if v is not None:
                 event[k] = str(v)
-        try:
-            r = EventPublisher.get_redis_client()
-            r.xadd(stream, {k: v for k, v in event.items()})
-            print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
-            return event
-        except Exception as e:
-            print(f"[EVENT][ERROR] Redis publish failed: {e}")
-            return {"error": str(e), **event}
+        with publish_span(stream, event, event_type=event_type):
+            started = time.perf_counter()
+            try:
+                r = EventPublisher.get_redis_client()
+                r.xadd(stream, {k: v for k, v in event.items()})
+                record_publish(stream, event_type, time.perf_counter() - started)
+                print(f"[EVENT][PUBLISH] {event_type} -> {stream}: {json.dumps(event)}")
+                return event
+            except Exception as e:
+                record_publish(
+                    stream, event_type, time.perf_counter() - started, ok=False
+                )
+                print(f"[EVENT][ERROR] Redis publish failed: {e}")
+                return {"error": str(e), **event}
 
     @staticmethod
     def publish_profile_updated(user_id: str, profile_id: str, update_type: str):
@@ -50,6 +60,14 @@ class EventPublisher:
         }
         return EventPublisher.publish_event("user_lifecycle", "ProfileUpdated", payload)
 
+    @staticmethod
+    def publish_profile_cache_invalidated(user_ids):
+        """Tell every user-service replica to drop its cached copies"""
+        payload = {"user_ids": ",".join(str(u) for u in user_ids)}
+        return EventPublisher.publish_event(
+            "user_cache", "ProfileCacheInvalidated", payload
+        )
+
     @staticmethod
     def publish_mode_changed(user_id: str, old_mode: str, new_mode: str):
         payload = {
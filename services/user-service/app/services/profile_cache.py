@@ -0,0 +1,270 @@
+"""
+Read-through cache for the batch user/profile lookups.
+
+Two tiers sit in front of the database: a small in-process LRU (L1) and
+Redis (L2), both holding the serialized API response for one user. A batch
+lookup is answered from L1, then one MGET against Redis for what is left,
+then one ``IN`` query for the rest, back-filling both tiers on the way out.
+
+Writes in this service delete the user's keys from both tiers after commit
+and publish a ProfileCacheInvalidated event so the other replicas drop their
+L1 copies; ProfileUpdated and ModeChanged events do the same. The L1 TTL
+bounds how stale a replica can be if an invalidation is missed. Redis is
+optional: after a failure it is skipped for a few seconds and lookups fall
+through to the database. The async CRUD goes through ``aget_many`` and
+``ainvalidate``, which make the blocking Redis calls in a worker thread.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_L1_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_L1_TTL_SECONDS", "30"))
+PROFILE_CACHE_L2_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_L2_TTL_SECONDS", "300"))
+# Upper bound on ids per batch request
+PROFILE_BATCH_MAX_IDS = int(os.getenv("PROFILE_BATCH_MAX_IDS", "200"))
+
+REDIS_KEY_PREFIX = "user-service:"
+REDIS_RETRY_SECONDS = 5.0
+CACHE_KINDS = ("user", "profile")
+
+
+class LRUCache:
+    """Thread-safe LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ProfileCache:
+    """L1 (in-process LRU) + L2 (Redis) cache of serialized users and profiles"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        l1_ttl: Optional[float] = None,
+        l2_ttl: Optional[int] = None,
+        redis_url: Optional[str] = None,
+    ):
+        self.local = LRUCache(
+            max_entries or PROFILE_CACHE_SIZE,
+            PROFILE_CACHE_L1_TTL_SECONDS if l1_ttl is None else l1_ttl,
+        )
+        self.l2_ttl = PROFILE_CACHE_L2_TTL_SECONDS if l2_ttl is None else l2_ttl
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379/0")
+        self._client = None
+        self._redis_down_until = 0.0
+
+    @staticmethod
+    def key(kind: str, user_id) -> str:
+        return f"{kind}:{user_id}"
+
+    def get_redis_client(self):
+        if redis is None or self.l2_ttl <= 0:
+            return None
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.2, socket_timeout=0.2
+            )
+        return self._client
+
+    def _redis_failed(self, action: str, error: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        print(f"[PROFILE CACHE][ERROR] Redis {action} failed: {error}")
+
+    def _get_local(
+        self, kind: str, user_ids: Iterable[uuid.UUID]
+    ) -> Tuple[Dict[uuid.UUID, dict], List[uuid.UUID]]:
+        found: Dict[uuid.UUID, dict] = {}
+        missing: List[uuid.UUID] = []
+        for user_id in dict.fromkeys(user_ids):
+            value = self.local.get(self.key(kind, user_id))
+            if value is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = value
+        return found, missing
+
+    def _get_remote(
+        self, kind: str, missing: List[uuid.UUID], found: Dict[uuid.UUID, dict]
+    ) -> List[uuid.UUID]:
+        """Move the Redis hits among ``missing`` into ``found``; returns the rest"""
+        client = self.get_redis_client()
+        if client is None:
+            return missing
+        try:
+            values = client.mget(
+                [REDIS_KEY_PREFIX + self.key(kind, u) for u in missing]
+            )
+        except Exception as e:
+            self._redis_failed("read", e)
+            return missing
+        still_missing = []
+        for user_id, value in zip(missing, values):
+            if value is None:
+                still_missing.append(user_id)
+                continue
+            entry = json.loads(value)
+            self.local.set(self.key(kind, user_id), entry)
+            found[user_id] = entry
+        return still_missing
+
+    def _set_remote(self, kind: str, loaded: Dict[uuid.UUID, dict]) -> None:
+        client = self.get_redis_client()
+        if not loaded or client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            for user_id, entry in loaded.items():
+                pipe.set(
+                    REDIS_KEY_PREFIX + self.key(kind, user_id),
+                    json.dumps(entry),
+                    ex=self.l2_ttl,
+                )
+            pipe.execute()
+        except Exception as e:
+            self._redis_failed("write", e)
+
+    def _set_local(self, kind: str, loaded: Dict[uuid.UUID, dict]) -> None:
+        for user_id, entry in loaded.items():
+            self.local.set(self.key(kind, user_id), entry)
+
+    def get_many(
+        self,
+        kind: str,
+        user_ids: Iterable[uuid.UUID],
+        loader: Callable[[List[uuid.UUID]], Dict[uuid.UUID, dict]],
+    ) -> Dict[uuid.UUID, dict]:
+        """
+        Serialized entries for ``user_ids``, loading misses through
+        ``loader(missing_ids) -> {user_id: entry}``. Ids the loader does not
+        return are absent from the result and are not cached.
+        """
+        found, missing = self._get_local(kind, user_ids)
+        if missing:
+            missing = self._get_remote(kind, missing, found)
+        if not missing:
+            return found
+
+        loaded = loader(missing)
+        self._set_local(kind, loaded)
+        found.update(loaded)
+        self._set_remote(kind, loaded)
+        return found
+
+    async def aget_many(
+        self,
+        kind: str,
+        user_ids: Iterable[uuid.UUID],
+        loader: Callable[[List[uuid.UUID]], Awaitable[Dict[uuid.UUID, dict]]],
+    ) -> Dict[uuid.UUID, dict]:
+        """
+        ``get_many`` for the async CRUD: ``loader`` is awaited and the
+        blocking Redis calls run in a worker thread, off the event loop
+        """
+        found, missing = self._get_local(kind, user_ids)
+        if missing:
+            missing = await asyncio.to_thread(self._get_remote, kind, missing, found)
+        if not missing:
+            return found
+
+        loaded = await loader(missing)
+        self._set_local(kind, loaded)
+        found.update(loaded)
+        await asyncio.to_thread(self._set_remote, kind, loaded)
+        return found
+
+    def invalidate_local(self, user_ids: Iterable) -> None:
+        """Drop L1 entries only (another replica already cleared Redis)"""
+        for user_id in user_ids:
+            for kind in CACHE_KINDS:
+                self.local.delete(self.key(kind, user_id))
+
+    def invalidate(self, user_ids: Iterable, broadcast: bool = True) -> None:
+        """Drop a user's entries from both tiers and tell the other replicas"""
+        user_ids = [str(u) for u in user_ids]
+        if not user_ids:
+            return
+        self.invalidate_local(user_ids)
+        client = self.get_redis_client()
+        if client is None:
+            # No shared tier to clear and no way to reach the other replicas;
+            # their L1 entries expire on their own
+            return
+        try:
+            client.delete(
+                *(
+                    REDIS_KEY_PREFIX + self.key(kind, u)
+                    for u in user_ids
+                    for kind in CACHE_KINDS
+                )
+            )
+        except Exception as e:
+            self._redis_failed("delete", e)
+            return
+        if broadcast:
+            from .events import EventPublisher
+
+            EventPublisher.publish_profile_cache_invalidated(user_ids)
+
+    async def ainvalidate(self, user_ids: Iterable, broadcast: bool = True) -> None:
+        """``invalidate`` with the Redis delete and broadcast off the event loop"""
+        await asyncio.to_thread(self.invalidate, list(user_ids), broadcast)
+
+
+profile_cache = ProfileCache()
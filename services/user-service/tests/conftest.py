@@ -2,9 +2,11 @@ import os
 import tempfile
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.models.profile import UserProfile, ProviderProfile
-from app.db.base import Base, get_db
+from app.db.base import AsyncSessionLocal, Base, get_async_db, get_db
 from app.main import app  # 导入 FastAPI 实例
 
 
@@ -24,6 +26,14 @@ def engine(test_db_file):
     return create_engine(f"sqlite:///{test_db_file}")
 
 
+@pytest.fixture(scope="session")
+def async_engine(test_db_file):
+    """Async engine (aiosqlite) on the same test database file."""
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{test_db_file}", poolclass=NullPool
+    )
+
+
 @pytest.fixture(scope="session", autouse=True)
 def create_test_tables(engine):
     """Create all tables in the test database before tests, and drop after."""
@@ -50,3 +60,15 @@ def override_get_db(db_session):
     app.dependency_overrides[get_db] = _get_db_override
     yield
     app.dependency_overrides.pop(get_db, None)
+
+
+# 异步端点同样使用测试 SQLite（aiosqlite）
+@pytest.fixture(autouse=True, scope="function")
+def override_get_async_db(async_engine):
+    async def _get_async_db_override():
+        async with AsyncSessionLocal(bind=async_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = _get_async_db_override
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
@@ -56,6 +56,13 @@ def test_create_provider_profile():
     assert response.status_code in [200, 400, 404, 500]
 
 
+def test_get_provider_snapshot():
+    """Test the provider snapshot consumed by request-service dispatch"""
+    response = client.get("/api/v1/profiles/providers/snapshot")
+    assert response.status_code == 200
+    assert isinstance(response.json()["providers"], list)
+
+
 def test_get_my_user_info():
     """Test getting user info"""
     response = client.get("/api/v1/users/me")
@@ -75,3 +82,87 @@ def test_patch_profile_me_aliases():
     payload = {"avatar_url": "https://example.com/a.png"}
     response = client.patch("/api/v1/profiles/me", json=payload)
     assert response.status_code in [200, 404, 500]
+
+
+def test_get_profiles_batch(db_session):
+    """Test the batch profile lookup keeps request order and reports missing ids"""
+    from app.models.profile import UserProfile
+    from app.services.profile_cache import profile_cache
+
+    profile_cache.local.clear()
+    first, second, unknown = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    db_session.add_all(
+        [
+            UserProfile(user_id=first, bio="first", total_ratings=0),
+            UserProfile(user_id=second, bio="second", total_ratings=3),
+        ]
+    )
+    db_session.commit()
+
+    response = client.post(
+        "/api/v1/profiles/batch",
+        json={"userIds": [str(second), str(unknown), str(first), str(second)]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["userId"] for p in data["profiles"]] == [str(second), str(first)]
+    assert data["profiles"][0]["totalRatings"] == 3
+    assert data["missing"] == [str(unknown)]
+
+
+def test_get_users_batch(db_session):
+    """Test the batch user lookup"""
+    from app.models.user import User
+    from app.services.profile_cache import profile_cache
+
+    profile_cache.local.clear()
+    user_id = uuid.uuid4()
+    db_session.add(
+        User(user_id=user_id, email=f"{user_id}@example.com", password_hash="x")
+    )
+    db_session.commit()
+
+    response = client.post(
+        "/api/v1/users/batch", json={"user_ids": [str(user_id), str(uuid.uuid4())]}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["userId"] for u in data["users"]] == [str(user_id)]
+    assert len(data["missing"]) == 1
+
+
+def test_batch_lookup_limits():
+    """Test batch lookups reject empty and oversized id lists"""
+    from app.services.profile_cache import PROFILE_BATCH_MAX_IDS
+
+    assert client.post("/api/v1/profiles/batch", json={"userIds": []}).status_code == 422
+    too_many = [str(uuid.uuid4()) for _ in range(PROFILE_BATCH_MAX_IDS + 1)]
+    response = client.post("/api/v1/users/batch", json={"userIds": too_many})
+    assert response.status_code == 400
+
+
+def test_search_providers():
+    """Test the provider search API"""
+    response = client.get(
+        "/api/v1/profiles/providers/search",
+        params={
+            "service": "errands",
+            "day": "tue",
+            "start": "09:00",
+            "latitude": 34.05,
+            "longitude": -118.24,
+        },
+    )
+    assert response.status_code == 200
+    assert isinstance(response.json()["providers"], list)
+
+
+def test_search_providers_rejects_bad_slot():
+    response = client.get(
+        "/api/v1/profiles/providers/search", params={"day": "someday", "start": "9"}
+    )
+    assert response.status_code == 400
+    response = client.get("/api/v1/profiles/providers/search", params={"day": "mon"})
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.crud.profile import AsyncProfileCRUD
+from app.crud.user import AsyncUserCRUD
+from app.db.base import AsyncSessionLocal
+from app.models.profile import UserProfile
+from app.schemas.profile import ProviderProfileCreate, ProviderProfileUpdate
+from app.schemas.user import UserUpdate
+
+
+@pytest_asyncio.fixture
+async def async_db(async_engine):
+    async with AsyncSessionLocal(bind=async_engine) as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_create_and_update_user(async_db):
+    email = f"{uuid.uuid4()}@example.com"
+
+    user = await AsyncUserCRUD.create_user(async_db, email=email, password="secret")
+    assert user.password_hash != "secret"
+    assert user.created_at is not None
+
+    found = await AsyncUserCRUD.get_user_by_email(async_db, email)
+    assert found.user_id == user.user_id
+
+    updated = await AsyncUserCRUD.update_user(
+        async_db, user.user_id, UserUpdate(full_name="Async User")
+    )
+    assert updated.full_name == "Async User"
+    users = await AsyncUserCRUD.get_users(async_db, [user.user_id])
+    assert [u.user_id for u in users] == [user.user_id]
+
+
+@pytest.mark.asyncio
+async def test_get_user_profiles_skips_missing(async_db, db_session):
+    user_id = uuid.uuid4()
+    db_session.add(UserProfile(user_id=user_id))
+    db_session.commit()
+
+    profiles = await AsyncProfileCRUD.get_user_profiles(
+        async_db, [user_id, uuid.uuid4()]
+    )
+
+    assert [p.user_id for p in profiles] == [user_id]
+
+
+@pytest.mark.asyncio
+async def test_provider_writes_keep_the_availability_index(async_db):
+    user_id = uuid.uuid4()
+    await AsyncProfileCRUD.create_provider_profile(
+        async_db,
+        ProviderProfileCreate(
+            user_id=user_id,
+            services_offered=json.dumps(["snow removal"]),
+            availability_schedule=json.dumps({"sat": "8-12"}),
+        ),
+    )
+    await AsyncProfileCRUD.update_provider_profile(
+        async_db, user_id, ProviderProfileUpdate(hourly_rate=30)
+    )
+
+    results = await AsyncProfileCRUD.search_providers(
+        async_db, service="snow removal", day_of_week=5, start_minute=9 * 60
+    )
+
+    assert [r["user_id"] for r in results] == [user_id]
+    assert results[0]["hourly_rate"] == 30.0
@@ -0,0 +1,162 @@
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.crud.profile import ProfileCRUD
+from app.models.profile import ProviderAvailability, ProviderService, UserProfile
+from app.schemas.profile import ProviderProfileCreate, ProviderProfileUpdate
+from app.services.availability import (
+    bitmap_to_hex,
+    merge_intervals,
+    parse_schedule,
+    parse_services,
+    parse_time,
+    schedule_bitmap,
+)
+
+# Small town; a provider ~3.5 miles north of it
+TOWN = (34.05, -118.24)
+NORTH = (34.10, -118.24)
+
+
+def test_parse_time():
+    assert parse_time("9") == 540
+    assert parse_time("09:30") == 570
+    assert parse_time("24") == 1440
+    assert parse_time("24:30") is None
+    assert parse_time("noon") is None
+
+
+def test_parse_schedule_merges_and_wraps_overnight():
+    raw = json.dumps(
+        {"Mon": "9-12, 11-14", "tue": ["8:30-10"], "sun": "22-2", "xyz": "1-2"}
+    )
+
+    assert parse_schedule(raw) == [
+        (0, 0, 120),  # Sunday's overnight shift spills into Monday
+        (0, 540, 840),
+        (1, 510, 600),
+        (6, 1320, 1440),
+    ]
+
+
+@pytest.mark.parametrize("raw", [None, "", "not json", "[1, 2]", '{"mon": "9"}'])
+def test_parse_schedule_ignores_malformed_input(raw):
+    assert parse_schedule(raw) == []
+
+
+def test_parse_services():
+    assert parse_services('["Errands", " transportation", "errands", ""]') == [
+        "errands",
+        "transportation",
+    ]
+    assert parse_services("errands, groceries") == ["errands", "groceries"]
+    assert parse_services(None) == []
+
+
+def test_merge_intervals_joins_touching_ranges():
+    assert merge_intervals([(2, 600, 700), (2, 540, 600)]) == [(2, 540, 700)]
+
+
+def test_schedule_bitmap_sets_covered_hours():
+    # Tuesday 09:30-12:00 covers the tops of 10:00 and 11:00 only
+    bitmap = schedule_bitmap([(1, 570, 720)])
+
+    assert bitmap == (1 << (24 + 10)) | (1 << (24 + 11))
+    assert len(bitmap_to_hex(bitmap)) == 42
+    assert schedule_bitmap([(6, 0, 1440)]) >> (6 * 24) == (1 << 24) - 1
+
+
+def create_provider(db_session, services, schedule, location=TOWN, **fields):
+    user_id = uuid.uuid4()
+    ProfileCRUD.create_provider_profile(
+        db_session,
+        ProviderProfileCreate(
+            user_id=user_id,
+            services_offered=json.dumps(services),
+            availability_schedule=json.dumps(schedule),
+            base_latitude=Decimal(str(location[0])),
+            base_longitude=Decimal(str(location[1])),
+            service_radius_miles=Decimal("10"),
+            **fields,
+        ),
+    )
+    return user_id
+
+
+def test_create_and_update_sync_the_index(db_session):
+    user_id = create_provider(db_session, ["Plumbing"], {"tue": "9-17"})
+
+    intervals = db_session.query(ProviderAvailability).filter_by(user_id=user_id)
+    services = db_session.query(ProviderService).filter_by(user_id=user_id)
+    assert [(a.day_of_week, a.start_minute, a.end_minute) for a in intervals] == [
+        (1, 540, 1020)
+    ]
+    assert [s.service for s in services] == ["plumbing"]
+
+    ProfileCRUD.update_provider_profile(
+        db_session,
+        user_id,
+        ProviderProfileUpdate(availability_schedule=json.dumps({"wed": "8-12"})),
+    )
+
+    assert [(a.day_of_week, a.start_minute) for a in intervals] == [(2, 480)]
+    assert [s.service for s in services] == ["plumbing"]
+
+
+def test_search_providers(db_session):
+    near = create_provider(db_session, ["plumbing"], {"tue": "8-17"})
+    far = create_provider(db_session, ["plumbing"], {"tue": "8-17"}, location=NORTH)
+    create_provider(db_session, ["errands"], {"tue": "8-17"})
+    create_provider(db_session, ["plumbing"], {"tue": "10-17"})
+    create_provider(db_session, ["plumbing"], {"tue": "8-17"}, is_available="false")
+
+    def search(**kwargs):
+        results = ProfileCRUD.search_providers(
+            db_session, service="Plumbing", day_of_week=1, start_minute=540, **kwargs
+        )
+        return {r["user_id"]: r for r in results}
+
+    found = search(latitude=TOWN[0], longitude=TOWN[1], radius_miles=5)
+    assert [u for u in found if u in (near, far)] == [near, far]
+    assert found[far]["distance_miles"] == pytest.approx(3.45, abs=0.05)
+    assert len(found) == 2
+
+    found = search(latitude=TOWN[0], longitude=TOWN[1], radius_miles=2)
+    assert list(found) == [near]
+
+
+def test_search_without_location_limits_to_best_rated(db_session):
+    ratings = {}
+    for rating in ("3.00", "1.50", "5.00", "2.00", "4.00", "2.50"):
+        user_id = create_provider(db_session, ["beekeeping"], {"sat": "8-17"})
+        db_session.add(UserProfile(user_id=user_id, average_rating=Decimal(rating)))
+        ratings[user_id] = rating
+    db_session.commit()
+
+    results = ProfileCRUD.search_providers(db_session, service="beekeeping", limit=2)
+
+    assert [ratings[r["user_id"]] for r in results] == ["5.00", "4.00"]
+
+
+def test_snapshot_includes_availability_bitmap(db_session):
+    user_id = create_provider(db_session, ["errands"], {"mon": "0-1"})
+
+    entry = next(
+        p for p in ProfileCRUD.get_provider_snapshot(db_session) if p["user_id"] == user_id
+    )
+
+    assert int(entry["availability_bitmap"], 16) == 1
+
+
+def test_reindex_providers(db_session):
+    user_id = create_provider(db_session, ["errands"], {"fri": "9-10"})
+    db_session.query(ProviderAvailability).delete()
+    db_session.commit()
+
+    assert ProfileCRUD.reindex_providers(db_session) >= 1
+    assert (
+        db_session.query(ProviderAvailability).filter_by(user_id=user_id).count() == 1
+    )
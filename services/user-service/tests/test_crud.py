@@ -203,3 +203,119 @@ def test_update_provider_profile(db_session):
     assert getattr(updated_profile, "service_radius_miles") == Decimal("10.0")
     assert getattr(updated_profile, "hourly_rate") == Decimal("30.00")
     assert getattr(updated_profile, "is_available") == "false"
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    os.getenv("SKIP_INTEGRATION_TESTS") == "true" or os.getenv("TESTING") == "true",
+    reason="Skipping integration tests when database is not available",
+)
+def test_get_provider_snapshot(db_session):
+    """Test the compact provider snapshot used by request-service dispatch"""
+    from decimal import Decimal
+
+    rated_id = uuid.uuid4()
+    ProfileCRUD.create_user_profile(db_session, UserProfileCreate(user_id=rated_id))
+    ProfileCRUD.update_rating(db_session, rated_id, 4.0)
+    ProfileCRUD.create_provider_profile(
+        db_session,
+        ProviderProfileCreate(
+            user_id=rated_id,
+            service_radius_miles=Decimal("5.0"),
+            base_latitude=Decimal("40.7128"),
+            base_longitude=Decimal("-74.0060"),
+        ),
+    )
+    unrated_id = uuid.uuid4()
+    ProfileCRUD.create_provider_profile(
+        db_session, ProviderProfileCreate(user_id=unrated_id, is_available="false")
+    )
+
+    snapshot = {row["user_id"]: row for row in ProfileCRUD.get_provider_snapshot(db_session)}
+
+    assert snapshot[rated_id]["service_radius_miles"] == 5.0
+    assert snapshot[rated_id]["is_available"] is True
+    assert snapshot[rated_id]["latitude"] == pytest.approx(40.7128)
+    assert snapshot[rated_id]["average_rating"] == 4.0
+    assert snapshot[rated_id]["total_ratings"] == 1
+    assert snapshot[unrated_id]["is_available"] is False
+    assert snapshot[unrated_id]["latitude"] is None
+    assert snapshot[unrated_id]["average_rating"] == 0.0
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    os.getenv("SKIP_INTEGRATION_TESTS") == "true" or os.getenv("TESTING") == "true",
+    reason="Skipping integration tests when database is not available",
+)
+def test_update_rating_keeps_exact_sum(db_session):
+    """Averages are derived from the exact sum, so rounding does not compound"""
+    from decimal import Decimal
+
+    user_id = uuid.uuid4()
+    ProfileCRUD.create_user_profile(db_session, UserProfileCreate(user_id=user_id))
+
+    for rating in (5, 4, 4):
+        profile = ProfileCRUD.update_rating(db_session, user_id, rating)
+
+    assert profile.rating_sum == Decimal("13")
+    assert profile.total_ratings == 3
+    assert profile.average_rating == Decimal("4.33")
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    os.getenv("SKIP_INTEGRATION_TESTS") == "true" or os.getenv("TESTING") == "true",
+    reason="Skipping integration tests when database is not available",
+)
+def test_update_rating_ignores_stale_reads(db_session):
+    """The update is computed from the row, not from a copy read earlier"""
+    user_id = uuid.uuid4()
+    ProfileCRUD.create_user_profile(db_session, UserProfileCreate(user_id=user_id))
+    stale = ProfileCRUD.get_user_profile(db_session, user_id)
+
+    other = TestingSessionLocal()
+    try:
+        ProfileCRUD.update_rating(other, user_id, 5)
+    finally:
+        other.close()
+    assert stale.total_ratings == 0
+    profile = ProfileCRUD.update_rating(db_session, user_id, 3)
+
+    assert profile.total_ratings == 2
+    assert float(profile.average_rating) == 4.0
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    os.getenv("SKIP_INTEGRATION_TESTS") == "true" or os.getenv("TESTING") == "true",
+    reason="Skipping integration tests when database is not available",
+)
+def test_apply_rating_totals(db_session):
+    """Coalesced totals are applied per user; legacy profiles seed from their average"""
+    from decimal import Decimal
+
+    fresh_id, legacy_id, missing_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    ProfileCRUD.create_user_profile(db_session, UserProfileCreate(user_id=fresh_id))
+    legacy = ProfileCRUD.create_user_profile(
+        db_session, UserProfileCreate(user_id=legacy_id)
+    )
+    legacy.average_rating = Decimal("4.00")
+    legacy.total_ratings = 2
+    legacy.rating_sum = None
+    db_session.commit()
+
+    updated = ProfileCRUD.apply_rating_totals(
+        db_session,
+        {fresh_id: (9.0, 2), legacy_id: (2.0, 1), missing_id: (5.0, 1)},
+    )
+
+    assert updated == 2
+    db_session.expire_all()
+    fresh = ProfileCRUD.get_user_profile(db_session, fresh_id)
+    assert fresh.total_ratings == 2
+    assert fresh.average_rating == Decimal("4.50")
+    legacy = ProfileCRUD.get_user_profile(db_session, legacy_id)
+    assert legacy.total_ratings == 3
+    assert legacy.rating_sum == Decimal("10")
+    assert legacy.average_rating == Decimal("3.33")
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import time
+
+import pytest
+from sqlalchemy import column, table, text, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.db import engine as db_engine
+from app.db.engine import build_engine, engine_options, pool_metrics
+
+
+@pytest.fixture
+def sqlite_url():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield f"sqlite:///{path}"
+    os.remove(path)
+
+
+def test_postgres_session_mode_options(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    options = engine_options("postgresql://u:p@db/app")
+
+    assert options["poolclass"] is QueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (3, 2)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_pgbouncer_transaction_mode_options(monkeypatch):
+    monkeypatch.setenv("DB_POOL_MODE", "transaction")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    options = engine_options("postgresql+asyncpg://u:p@pgbouncer/app", is_async=True)
+
+    # PgBouncer pools; no startup parameters and no prepared statement caches
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    assert options["connect_args"] == {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+
+
+def test_invalid_pool_mode(monkeypatch):
+    monkeypatch.setenv("DB_POOL_MODE", "statement")
+    with pytest.raises(ValueError):
+        engine_options("postgresql://u:p@db/app")
+
+
+def test_pool_metrics_track_checkouts_and_overflow(sqlite_url):
+    engine = build_engine(
+        sqlite_url,
+        name="test-pool",
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    first, second = engine.connect(), engine.connect()
+
+    busy = pool_metrics()["test-pool"]
+    assert busy["checked_out"] == 2
+    assert busy["overflow"] == 1
+    assert busy["wait_count"] == 2
+
+    first.close()
+    second.close()
+    idle = pool_metrics()["test-pool"]
+    assert idle["checked_out"] == 0
+    assert idle["checked_out_peak"] == 2
+    assert idle["overflow_peak"] == 1
+    engine.dispose()
+
+
+def test_slow_query_hook(sqlite_url, monkeypatch):
+    calls = []
+    monkeypatch.setattr(db_engine, "SLOW_QUERY_HOOKS", [])
+    db_engine.on_slow_query(lambda name, statement, seconds: calls.append(statement))
+    engine = build_engine(sqlite_url, name="test-slow", slow_query_ms=0.000001)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert calls == ["SELECT 1"]
+    assert pool_metrics()["test-slow"]["slow_queries"] == 1
+    engine.dispose()
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path):
+    engines = []
+    for name in ("primary", "replica"):
+        engine = build_engine(f"sqlite:///{tmp_path / name}.db", name=f"test-{name}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (name TEXT)"))
+            conn.execute(text("INSERT INTO items VALUES (:name)"), {"name": name})
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def test_replica_router_read_your_writes(primary_and_replica, monkeypatch):
+    primary, replica = primary_and_replica
+    monkeypatch.setattr(db_engine, "sticky_writes", db_engine.StickyWrites(60))
+    router = db_engine.ReplicaRouter(lambda: replica)
+    Session = sessionmaker(bind=primary, class_=router.session_class)
+
+    items = table("items", column("name"))
+
+    def read(context, read_only=True):
+        token = db_engine._db_context.set(context)
+        try:
+            db = Session()
+            if read_only:
+                db_engine.read_only(db)
+            with db:
+                return db.execute(text("SELECT name FROM items")).scalar()
+        finally:
+            db_engine._db_context.reset(token)
+
+    # Plain sessions always use the primary; read-only ones use the replica
+    assert read("alice", read_only=False) == "primary"
+    assert read("alice") == "replica"
+
+    token = db_engine._db_context.set("alice")
+    with Session() as db:
+        db.execute(update(items).values(name="written"))
+        db.commit()
+    db_engine._db_context.reset(token)
+
+    # alice just wrote and is pinned to the primary; bob is not
+    assert read("alice") == "written"
+    assert read("bob") == "replica"
+
+
+def test_sticky_window_expires():
+    sticky = db_engine.StickyWrites(0.01)
+    sticky.mark("alice")
+    assert sticky.active("alice")
+    time.sleep(0.02)
+    assert not sticky.active("alice")
+    assert not sticky.active(None)
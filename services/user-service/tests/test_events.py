@@ -147,3 +147,84 @@ def test_event_consumer_initialization():
     """Test EventConsumer initialization"""
     consumer = EventConsumer()
     assert consumer.redis_url == "redis://redis:6379/0"
+
+
+def test_parse_rating_event_shapes():
+    """Flat and request-service RatingCreated payloads are both understood"""
+    from app.services.event_consumer import parse_rating_event
+
+    user_id = uuid.uuid4()
+    flat = {"event_type": "RatingCreated", "rated_user_id": str(user_id), "rating": "4.5"}
+    nested = {
+        "event_type": "RatingCreated",
+        "data": json.dumps({"ratee_id": str(user_id), "rating_score": 3}),
+    }
+
+    assert parse_rating_event(flat) == (user_id, 4.5)
+    assert parse_rating_event(nested) == (user_id, 3.0)
+    assert parse_rating_event({"event_type": "RatingCreated"}) is None
+    assert parse_rating_event({"rated_user_id": "not-a-uuid", "rating": "4"}) is None
+
+
+def test_rating_batch_coalesces_per_user():
+    from app.services.event_consumer import RatingBatch
+
+    batch = RatingBatch()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    for user_id, rating in ((first, 5), (second, 2), (first, 3)):
+        batch.add(user_id, rating)
+
+    assert len(batch) == 3
+    assert batch.due(window=60, max_events=3)
+    assert not batch.due(window=60, max_events=10)
+    assert batch.drain() == {first: (8.0, 2), second: (2.0, 1)}
+    assert len(batch) == 0
+    assert not batch.due(window=0, max_events=1)
+
+
+def test_flush_ratings_applies_one_update_per_user(db_session):
+    from sqlalchemy.orm import sessionmaker
+    from app.crud.profile import ProfileCRUD
+    from app.schemas.profile import UserProfileCreate
+
+    consumer = EventConsumer()
+    user_id = uuid.uuid4()
+    ProfileCRUD.create_user_profile(db_session, UserProfileCreate(user_id=user_id))
+    for rating in ("5", "4", "4", "2"):
+        consumer.queue_rating(
+            {
+                "event_type": "RatingCreated",
+                "rated_user_id": str(user_id),
+                "rating": rating,
+            }
+        )
+
+    updated = consumer.flush_ratings(sessionmaker(bind=db_session.get_bind()))
+
+    assert updated == 1
+    assert len(consumer.rating_batch) == 0
+    db_session.expire_all()
+    profile = ProfileCRUD.get_user_profile(db_session, user_id)
+    assert profile.total_ratings == 4
+    assert float(profile.average_rating) == 3.75
+
+
+def test_failed_flush_keeps_ratings_for_retry():
+    consumer = EventConsumer()
+    user_id = uuid.uuid4()
+    consumer.queue_rating(
+        {"event_type": "RatingCreated", "rated_user_id": str(user_id), "rating": "4"}
+    )
+
+    class BrokenSession:
+        def query(self, *args):
+            raise RuntimeError("database unavailable")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    assert consumer.flush_ratings(BrokenSession) == 0
+    assert consumer.rating_batch.drain() == {user_id: (4.0, 1)}
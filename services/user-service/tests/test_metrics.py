@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.crud.profile import ProfileCRUD
+from app.db.engine import build_engine
+from app.main import app
+from app.metrics import crud_function, entry_age, record_consume
+
+client = TestClient(app)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def sqlite_url():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield f"sqlite:///{path}"
+    os.remove(path)
+
+
+def test_requests_are_labeled_by_route_template():
+    before = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="/health",
+        status="200",
+    )
+    unmatched = sample(
+        "http_request_duration_seconds_count",
+        method="GET",
+        route="unmatched",
+        status="404",
+    )
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+
+    assert (
+        sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="/health",
+            status="200",
+        )
+        == before + 1
+    )
+    assert (
+        sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        == unmatched + 1
+    )
+
+
+def test_metrics_endpoint_exposes_pool_counters(sqlite_url):
+    engine = build_engine(sqlite_url, name="test-metrics-pool")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'db_pool_checkouts_total{engine="test-metrics-pool"} 1.0' in response.text
+    assert "http_request_duration_seconds" in response.text
+
+
+def test_queries_are_labeled_by_crud_function(sqlite_url):
+    engine = build_engine(sqlite_url, name="test-metrics-crud")
+
+    @crud_function("test.lookup")
+    def lookup():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT 1")).scalar()
+
+    assert lookup() == 1
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 2"))
+
+    labels = {"engine": "test-metrics-crud", "statement": "SELECT"}
+    assert (
+        sample("db_query_duration_seconds_count", function="test.lookup", **labels) == 1
+    )
+    assert sample("db_query_duration_seconds_count", function="other", **labels) == 1
+
+
+def test_crud_modules_are_instrumented():
+    label = getattr(ProfileCRUD.get_user_profile, "__crud_function__", None)
+    assert label == "profile.ProfileCRUD.get_user_profile"
+
+
+def test_consumer_lag_from_stream_entry_id():
+    added = int((time.time() - 2) * 1000)
+
+    record_consume("test_stream", "Tested", f"{added}-0".encode())
+
+    lag = sample("event_consumer_lag_seconds", stream="test_stream")
+    assert 2 <= lag < 5
+    assert (
+        sample(
+            "events_consumed_total",
+            stream="test_stream",
+            event_type="Tested",
+            outcome="ok",
+        )
+        == 1
+    )
+    assert entry_age("not-an-id") is None
@@ -0,0 +1,60 @@
+import json
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.db.migrate import migrate
+from app.models.profile import ProviderProfile, ProviderService
+
+
+def test_migrate_adds_and_backfills_rating_sum(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'deployed.db'}")
+    # user_profiles as deployed before rating_sum existed
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE user_profiles ("
+                "profile_id CHAR(32) PRIMARY KEY, user_id CHAR(32) NOT NULL, "
+                "bio TEXT, average_rating NUMERIC(3, 2), total_ratings INTEGER, "
+                "default_mode VARCHAR(3), phone_number VARCHAR(20), "
+                "profile_picture_url VARCHAR(500), created_at TIMESTAMP, "
+                "updated_at TIMESTAMP)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO user_profiles (profile_id, user_id, average_rating, "
+                "total_ratings) VALUES ('a', 'b', 4.50, 2), ('c', 'd', NULL, NULL)"
+            )
+        )
+
+    migrate(bind=engine)
+    migrate(bind=engine)  # the Job may run again on the next rollout
+
+    assert "provider_availability" in inspect(engine).get_table_names()
+    with engine.connect() as connection:
+        sums = connection.execute(
+            text("SELECT rating_sum FROM user_profiles ORDER BY profile_id")
+        ).scalars()
+        assert [Decimal(str(value)) for value in sums] == [Decimal("9"), Decimal("0")]
+    engine.dispose()
+
+
+def test_migrate_indexes_existing_providers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'deployed.db'}")
+    ProviderProfile.__table__.create(bind=engine)
+    user_id = uuid.uuid4()
+    with Session(bind=engine) as db:
+        db.add(
+            ProviderProfile(user_id=user_id, services_offered=json.dumps(["Errands"]))
+        )
+        db.commit()
+
+    migrate(bind=engine)
+
+    with Session(bind=engine) as db:
+        services = db.query(ProviderService).filter_by(user_id=user_id).all()
+        assert [s.service for s in services] == ["errands"]
+    engine.dispose()
@@ -0,0 +1,179 @@
+import threading
+import uuid
+
+import pytest
+
+from app.services import profile_cache as profile_cache_module
+from app.services.event_consumer import EventConsumer
+from app.services.events import EventPublisher
+from app.services.profile_cache import LRUCache, ProfileCache, REDIS_KEY_PREFIX
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("redis is down")
+
+
+class Loader:
+    """Records the ids each database load was asked for"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, missing):
+        self.calls.append(list(missing))
+        return {u: self.rows[u] for u in missing if u in self.rows}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ProfileCache(max_entries=100, l1_ttl=60, l2_ttl=300)
+    cache._client = FakeRedis()
+    published = []
+    monkeypatch.setattr(
+        EventPublisher,
+        "publish_profile_cache_invalidated",
+        staticmethod(lambda user_ids: published.append(list(user_ids))),
+    )
+    cache.published = published
+    return cache
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    lru = LRUCache(max_entries=2, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+
+    expired = LRUCache(max_entries=2, ttl_seconds=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+def test_read_through_loads_only_misses_once(cache):
+    a, b, unknown = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    loader = Loader({a: {"userId": str(a)}, b: {"userId": str(b)}})
+
+    first = cache.get_many("profile", [a, unknown, a], loader)
+    second = cache.get_many("profile", [a, b, unknown], loader)
+
+    assert first == {a: {"userId": str(a)}}
+    assert set(second) == {a, b}
+    # a came from L1; only b and the still-unknown id reached the loader
+    assert loader.calls == [[a, unknown], [b, unknown]]
+    assert REDIS_KEY_PREFIX + f"profile:{b}" in cache._client.store
+
+
+def test_redis_hits_fill_the_local_tier(cache):
+    user_id = uuid.uuid4()
+    cache.get_many("user", [user_id], Loader({user_id: {"email": "x"}}))
+    cache.local.clear()
+
+    loader = Loader({})
+    assert cache.get_many("user", [user_id], loader) == {user_id: {"email": "x"}}
+    assert loader.calls == []
+    assert cache.local.get(f"user:{user_id}") == {"email": "x"}
+
+
+def test_invalidate_clears_both_tiers_and_broadcasts(cache):
+    user_id = uuid.uuid4()
+    cache.get_many("profile", [user_id], Loader({user_id: {"bio": "old"}}))
+
+    cache.invalidate([user_id])
+
+    assert cache.local.get(f"profile:{user_id}") is None
+    assert cache._client.store == {}
+    assert cache.published == [[str(user_id)]]
+    loader = Loader({user_id: {"bio": "new"}})
+    assert cache.get_many("profile", [user_id], loader)[user_id] == {"bio": "new"}
+
+
+class ThreadRecordingRedis(FakeRedis):
+    """FakeRedis noting which thread each command ran on"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def mget(self, keys):
+        self.threads.append(threading.get_ident())
+        return super().mget(keys)
+
+    def execute(self):
+        self.threads.append(threading.get_ident())
+        return super().execute()
+
+    def delete(self, *keys):
+        self.threads.append(threading.get_ident())
+        super().delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_async_calls_keep_redis_off_the_event_loop(cache):
+    cache._client = ThreadRecordingRedis()
+    user_id = uuid.uuid4()
+    loader = Loader({user_id: {"bio": "db"}})
+
+    async def load(missing):
+        return loader(missing)
+
+    found = await cache.aget_many("profile", [user_id], load)
+    await cache.ainvalidate([user_id])
+
+    assert found == {user_id: {"bio": "db"}}
+    assert cache.published == [[str(user_id)]]
+    # MGET, the pipelined SETs and DELETE
+    assert len(cache._client.threads) == 3
+    assert threading.get_ident() not in cache._client.threads
+
+
+def test_redis_failure_falls_back_to_database(cache):
+    user_id = uuid.uuid4()
+    cache._client = BrokenRedis()
+    loader = Loader({user_id: {"bio": "db"}})
+
+    assert cache.get_many("profile", [user_id], loader) == {user_id: {"bio": "db"}}
+    # Redis is skipped while it is marked down
+    assert cache.get_redis_client() is None
+    cache.invalidate([user_id])
+    assert cache.published == []
+
+
+def test_consumer_drops_local_copies_on_profile_events(monkeypatch):
+    cache = ProfileCache(max_entries=10, l1_ttl=60, l2_ttl=0)
+    monkeypatch.setattr("app.services.event_consumer.profile_cache", cache)
+    a, b = uuid.uuid4(), uuid.uuid4()
+    cache.local.set(f"profile:{a}", {})
+    cache.local.set(f"user:{b}", {})
+    consumer = EventConsumer()
+
+    consumer.handle_profile_changed({"event_type": "ProfileUpdated", "user_id": str(a)})
+    consumer.handle_profile_changed(
+        {"event_type": "ProfileCacheInvalidated", "user_ids": f"{b},{a}"}
+    )
+
+    assert len(cache.local) == 0
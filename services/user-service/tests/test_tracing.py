@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import SpanKind
+
+from app.main import app
+from app.services.events import EventPublisher
+from app.tracing import OTLPJsonFileExporter, consume_span, tracer
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+TRACEPARENT = f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    provider = trace.get_tracer_provider()
+    assert isinstance(provider, TracerProvider)
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    exporter.shutdown()
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.added = []
+
+    def xadd(self, stream, fields, **kwargs):
+        self.added.append((stream, fields))
+        return b"1-0"
+
+
+def test_server_span_continues_incoming_trace(spans):
+    response = client.get("/health", headers={"traceparent": TRACEPARENT})
+
+    assert response.status_code == 200
+    (span,) = [s for s in spans.get_finished_spans() if s.kind == SpanKind.SERVER]
+    assert span.name == "GET /health"
+    assert format(span.context.trace_id, "032x") == TRACE_ID
+    assert format(span.parent.span_id, "016x") == PARENT_ID
+    assert span.attributes["http.response.status_code"] == 200
+
+
+def test_published_events_carry_trace_context(spans, monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(EventPublisher, "get_redis_client", lambda: redis)
+
+    with tracer().start_as_current_span("handler") as handler:
+        EventPublisher.publish_mode_changed("user-1", "NIN", "LAH")
+
+    stream, fields = redis.added[0]
+    producer = next(
+        s for s in spans.get_finished_spans() if s.kind == SpanKind.PRODUCER
+    )
+    assert stream == "user_lifecycle"
+    assert producer.parent.span_id == handler.get_span_context().span_id
+    _, trace_id, span_id, _ = fields["traceparent"].split("-")
+    assert int(trace_id, 16) == handler.get_span_context().trace_id
+    assert int(span_id, 16) == producer.context.span_id
+
+
+def test_consumer_continues_publisher_trace(spans):
+    fields = {b"event_type": b"ModeChanged", b"traceparent": TRACEPARENT.encode()}
+
+    with consume_span("user_lifecycle", fields, "ModeChanged"):
+        pass
+
+    (span,) = spans.get_finished_spans()
+    assert span.kind == SpanKind.CONSUMER
+    assert format(span.context.trace_id, "032x") == TRACE_ID
+    assert format(span.parent.span_id, "016x") == PARENT_ID
+
+
+def test_file_exporter_writes_otlp_json(spans, tmp_path):
+    with tracer().start_as_current_span("work"):
+        pass
+    path = tmp_path / "traces.jsonl"
+
+    OTLPJsonFileExporter(str(path)).export(spans.get_finished_spans())
+
+    document = json.loads(path.read_text().splitlines()[0])
+    span = document["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "work"
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    int(span["traceId"], 16)